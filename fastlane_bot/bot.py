@@ -50,7 +50,7 @@ import random
 import json
 import os
 from _decimal import Decimal
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime
 from typing import Generator, List, Dict, Tuple, Any, Callable
 from typing import Optional
@@ -61,12 +61,12 @@ from fastlane_bot.helpers import (
     TxHelpers,
     TradeInstruction,
     Univ3Calculator,
-    SolidlyV2StablePoolsNotSupported,
     add_wrap_or_unwrap_trades_to_route,
     split_carbon_trades,
     maximize_last_trade_per_tkn
 )
 from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer, T
+from fastlane_bot.tools.optimizer import CPCArbOptimizer
 from .config.constants import FLASHLOAN_FEE_MAP
 from .events.interface import QueryInterface
 from .modes.pairwise_multi import FindArbitrageMultiPairwise
@@ -127,6 +127,9 @@ class CarbonBot:
 
         self.db = QueryInterface(ConfigObj=self.ConfigObj)
         self.RUN_FLASHLOAN_TOKENS = [*self.ConfigObj.CHAIN_FLASHLOAN_TOKENS.values()]
+        # equilibrium prices per miniverse, used to warm start the optimizers in the next block (bounded, see
+        # ArbitrageFinderBase.WARM_START_PRICES_SIZE)
+        self.warm_start_prices = {}
 
     def get_curves(self) -> CPCContainer:
         """
@@ -150,10 +153,6 @@ class CarbonBot:
                     curve for curve in p.to_cpc()
                     if all(curve.params[tkn] not in self.ConfigObj.TAX_TOKENS for tkn in ['tknx_addr', 'tkny_addr'])
                 ]
-            except SolidlyV2StablePoolsNotSupported as e:
-                self.ConfigObj.logger.debug(
-                    f"[bot.get_curves] SolidlyV2StablePoolsNotSupported: {e}\n"
-                )
             except NotImplementedError as e:
                 self.ConfigObj.logger.error(
                     f"[bot.get_curves] Pool type not yet supported, error: {e}\n"
@@ -308,6 +307,7 @@ class CarbonBot:
             mode="bothin",
             result=random_mode,
             ConfigObj=self.ConfigObj,
+            warm_start_prices=self.warm_start_prices,
         )
         return {"finder": finder, "r": finder.find_arbitrage()}
 
@@ -357,6 +357,7 @@ class CarbonBot:
             f"[bot._run] Found {len(r)} eligible arb opportunities."
         )
         r = self.randomize(arb_opps=r, randomizer=randomizer)
+        r = self.merge_range_trades(arb_opp=r, CCm=CCm)
 
         if data_validator:
             r = self.validate_optimizer_trades(arb_opp=r, arb_finder=finder)
@@ -559,6 +560,68 @@ class CarbonBot:
         top_n_arbs = arb_opps[:randomizer]
         return random.choice(top_n_arbs)
 
+    @staticmethod
+    def merge_range_trades(arb_opp, CCm: CPCContainer = None):
+        """
+        Merges the trade instructions on the range curves of a Uniswap v3 pool (see ``Univ3Calculator.range_params``)
+        into a single trade instruction on the pool, which crosses the ticks when executed.
+        :param arb_opp: the tuple containing an arbitrage opportunity found by the Optimizer
+        :param CCm: the container of the curves, in which the curve of the current range of a pool is looked up if
+            only its other ranges were traded
+        returns:
+            The arbitrage opportunity, with one trade instruction per pool. The trade instruction objects are merged
+            (with the curve of the current range of the pool), and the dicts and the aggregated trade instructions are
+            rebuilt from them.
+
+        """
+        (
+            best_profit,
+            best_trade_instructions_df,
+            best_trade_instructions_dic,
+            best_src_token,
+            best_trade_instructions,
+        ) = arb_opp
+        if not any(Univ3Calculator.is_range_cid(ti.cid) for ti in best_trade_instructions):
+            return arb_opp
+
+        merged = {}
+        for ti in best_trade_instructions:
+            cid = Univ3Calculator.pool_cid(ti.cid)
+            pool = merged.setdefault(cid, [None, None, {}])
+            if ti.cid == cid:
+                pool[0] = ti.curve
+            elif pool[1] is None:
+                pool[1] = ti.curve
+            amounts = pool[2]
+            amounts[ti.tknin] = amounts.get(ti.tknin, 0) + ti.amtin
+            amounts[ti.tknout] = amounts.get(ti.tknout, 0) + ti.amtout
+
+        best_trade_instructions = []
+        for cid, (curve, range_curve, amounts) in merged.items():
+            if curve is None and CCm is not None:
+                curve = CCm.bycid(cid)
+            if curve is None and range_curve is not None:
+                # the current range is not in the container: the curve of a traded range stands in for the pool
+                curve = replace(range_curve, cid=cid)
+            # the amounts in are positive and the amounts out negative
+            (tknin, amtin), (tknout, amtout) = sorted(amounts.items(), key=lambda item: item[1], reverse=True)
+            best_trade_instructions.append(CPCArbOptimizer.TradeInstruction(
+                cid=cid, tknin=tknin, amtin=amtin, tknout=tknout, amtout=amtout, curve=curve
+            ))
+        best_trade_instructions = tuple(best_trade_instructions)
+        best_trade_instructions_dic = CPCArbOptimizer.TradeInstruction.to_dicts(best_trade_instructions)
+        best_trade_instructions_df = CPCArbOptimizer.AggrTradeInstructions(
+            best_trade_instructions, robj=getattr(best_trade_instructions_df, "robj", None)
+        )
+
+        return (
+            best_profit,
+            best_trade_instructions_df,
+            best_trade_instructions_dic,
+            best_src_token,
+            best_trade_instructions,
+        )
+
     @staticmethod
     def _carbon_in_trade_route(trade_instructions: List[TradeInstruction]) -> bool:
         """
@@ -896,6 +959,7 @@ class CarbonBot:
             expected_profit_gastkn=best_profit_gastkn,
             expected_profit_usd=best_profit_usd,
             flashloan_struct=flashloan_struct,
+            pool_addresses=[trade.pool.address for trade in split_calculated_trade_instructions],
         )
 
     def get_tokens_in_exchange(
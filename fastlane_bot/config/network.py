@@ -281,6 +281,9 @@ class ConfigNetwork(ConfigBase):
     #######################################################################################
     GAS_TKN_IN_FLASHLOAN_TOKENS = None
     IS_NO_FLASHLOAN_AVAILABLE = False
+    USE_ACCESS_LIST = False
+    # number of tick bitmap words fetched on either side of the current tick of Uniswap v3 pools (0 = current range only)
+    UNI_V3_TICK_WORDS = 0
 
     # HOOKS
     #######################################################################################
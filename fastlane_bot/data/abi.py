@@ -329,6 +329,18 @@ UNISWAP_V2_POOL_ABI = [
 ]
 
 UNISWAP_V3_POOL_ABI = [
+    {
+        "type": "event",
+        "name": "Burn",
+        "anonymous": False,
+        "inputs": [{"indexed": True, "internalType": "address", "name": "owner", "type": "address"}, {"indexed": True, "internalType": "int24", "name": "tickLower", "type": "int24"}, {"indexed": True, "internalType": "int24", "name": "tickUpper", "type": "int24"}, {"indexed": False, "internalType": "uint128", "name": "amount", "type": "uint128"}, {"indexed": False, "internalType": "uint256", "name": "amount0", "type": "uint256"}, {"indexed": False, "internalType": "uint256", "name": "amount1", "type": "uint256"}]
+    },
+    {
+        "type": "event",
+        "name": "Mint",
+        "anonymous": False,
+        "inputs": [{"indexed": False, "internalType": "address", "name": "sender", "type": "address"}, {"indexed": True, "internalType": "address", "name": "owner", "type": "address"}, {"indexed": True, "internalType": "int24", "name": "tickLower", "type": "int24"}, {"indexed": True, "internalType": "int24", "name": "tickUpper", "type": "int24"}, {"indexed": False, "internalType": "uint128", "name": "amount", "type": "uint128"}, {"indexed": False, "internalType": "uint256", "name": "amount0", "type": "uint256"}, {"indexed": False, "internalType": "uint256", "name": "amount1", "type": "uint256"}]
+    },
     {
         "type": "event",
         "name": "Swap",
@@ -356,6 +368,13 @@ UNISWAP_V3_POOL_ABI = [
         "inputs": [],
         "outputs": [{"internalType": "uint160", "name": "sqrtPriceX96", "type": "uint160"}, {"internalType": "int24", "name": "tick", "type": "int24"}, {"internalType": "uint16", "name": "observationIndex", "type": "uint16"}, {"internalType": "uint16", "name": "observationCardinality", "type": "uint16"}, {"internalType": "uint16", "name": "observationCardinalityNext", "type": "uint16"}, {"internalType": "uint8", "name": "feeProtocol", "type": "uint8"}, {"internalType": "bool", "name": "unlocked", "type": "bool"}]
     },
+    {
+        "type": "function",
+        "name": "tickBitmap",
+        "stateMutability": "view",
+        "inputs": [{"internalType": "int16", "name": "", "type": "int16"}],
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}]
+    },
     {
         "type": "function",
         "name": "tickSpacing",
@@ -363,6 +382,13 @@ UNISWAP_V3_POOL_ABI = [
         "inputs": [],
         "outputs": [{"internalType": "int24", "name": "", "type": "int24"}]
     },
+    {
+        "type": "function",
+        "name": "ticks",
+        "stateMutability": "view",
+        "inputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "outputs": [{"internalType": "uint128", "name": "liquidityGross", "type": "uint128"}, {"internalType": "int128", "name": "liquidityNet", "type": "int128"}, {"internalType": "uint256", "name": "feeGrowthOutside0X128", "type": "uint256"}, {"internalType": "uint256", "name": "feeGrowthOutside1X128", "type": "uint256"}, {"internalType": "int56", "name": "tickCumulativeOutside", "type": "int56"}, {"internalType": "uint160", "name": "secondsPerLiquidityOutsideX128", "type": "uint160"}, {"internalType": "uint32", "name": "secondsOutside", "type": "uint32"}, {"internalType": "bool", "name": "initialized", "type": "bool"}]
+    },
     {
         "type": "function",
         "name": "token0",
@@ -380,6 +406,18 @@ UNISWAP_V3_POOL_ABI = [
 ]
 
 PANCAKESWAP_V3_POOL_ABI = [
+    {
+        "type": "event",
+        "name": "Burn",
+        "anonymous": False,
+        "inputs": [{"indexed": True, "internalType": "address", "name": "owner", "type": "address"}, {"indexed": True, "internalType": "int24", "name": "tickLower", "type": "int24"}, {"indexed": True, "internalType": "int24", "name": "tickUpper", "type": "int24"}, {"indexed": False, "internalType": "uint128", "name": "amount", "type": "uint128"}, {"indexed": False, "internalType": "uint256", "name": "amount0", "type": "uint256"}, {"indexed": False, "internalType": "uint256", "name": "amount1", "type": "uint256"}]
+    },
+    {
+        "type": "event",
+        "name": "Mint",
+        "anonymous": False,
+        "inputs": [{"indexed": False, "internalType": "address", "name": "sender", "type": "address"}, {"indexed": True, "internalType": "address", "name": "owner", "type": "address"}, {"indexed": True, "internalType": "int24", "name": "tickLower", "type": "int24"}, {"indexed": True, "internalType": "int24", "name": "tickUpper", "type": "int24"}, {"indexed": False, "internalType": "uint128", "name": "amount", "type": "uint128"}, {"indexed": False, "internalType": "uint256", "name": "amount0", "type": "uint256"}, {"indexed": False, "internalType": "uint256", "name": "amount1", "type": "uint256"}]
+    },
     {
         "type": "event",
         "name": "Swap",
@@ -407,6 +445,13 @@ PANCAKESWAP_V3_POOL_ABI = [
         "inputs": [],
         "outputs": [{"internalType": "uint160", "name": "sqrtPriceX96", "type": "uint160"}, {"internalType": "int24", "name": "tick", "type": "int24"}, {"internalType": "uint16", "name": "observationIndex", "type": "uint16"}, {"internalType": "uint16", "name": "observationCardinality", "type": "uint16"}, {"internalType": "uint16", "name": "observationCardinalityNext", "type": "uint16"}, {"internalType": "uint32", "name": "feeProtocol", "type": "uint32"}, {"internalType": "bool", "name": "unlocked", "type": "bool"}]
     },
+    {
+        "type": "function",
+        "name": "tickBitmap",
+        "stateMutability": "view",
+        "inputs": [{"internalType": "int16", "name": "", "type": "int16"}],
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}]
+    },
     {
         "type": "function",
         "name": "tickSpacing",
@@ -414,6 +459,13 @@ PANCAKESWAP_V3_POOL_ABI = [
         "inputs": [],
         "outputs": [{"internalType": "int24", "name": "", "type": "int24"}]
     },
+    {
+        "type": "function",
+        "name": "ticks",
+        "stateMutability": "view",
+        "inputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "outputs": [{"internalType": "uint128", "name": "liquidityGross", "type": "uint128"}, {"internalType": "int128", "name": "liquidityNet", "type": "int128"}, {"internalType": "uint256", "name": "feeGrowthOutside0X128", "type": "uint256"}, {"internalType": "uint256", "name": "feeGrowthOutside1X128", "type": "uint256"}, {"internalType": "int56", "name": "tickCumulativeOutside", "type": "int56"}, {"internalType": "uint160", "name": "secondsPerLiquidityOutsideX128", "type": "uint160"}, {"internalType": "uint32", "name": "secondsOutside", "type": "uint32"}, {"internalType": "bool", "name": "initialized", "type": "bool"}]
+    },
     {
         "type": "function",
         "name": "token0",
@@ -683,6 +735,16 @@ MULTICALL_ABI = [
     }
 ]
 
+MULTICALL3_ABI = [
+    {
+        "type": "function",
+        "name": "tryAggregate",
+        "stateMutability": "view",
+        "inputs": [{"internalType": "bool", "name": "requireSuccess", "type": "bool"}, {"components": [{"internalType": "address", "name": "target", "type": "address"}, {"internalType": "bytes", "name": "callData", "type": "bytes"}], "internalType": "struct Multicall3.Call[]", "name": "calls", "type": "tuple[]"}],
+        "outputs": [{"components": [{"internalType": "bool", "name": "success", "type": "bool"}, {"internalType": "bytes", "name": "returnData", "type": "bytes"}], "internalType": "struct Multicall3.Result[]", "name": "returnData", "type": "tuple[]"}]
+    }
+]
+
 GAS_ORACLE_ABI = [
     {
         "type": "function",
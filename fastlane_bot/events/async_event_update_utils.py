@@ -27,6 +27,7 @@ from fastlane_bot.data.abi import ERC20_ABI
 from fastlane_bot.events.async_utils import get_contract_chunks
 from fastlane_bot.events.utils import update_pools_from_events
 from fastlane_bot.events.pools.utils import get_pool_cid
+from fastlane_bot.events.token_store import fetch_token_details
 
 nest_asyncio.apply()
 
@@ -248,6 +249,26 @@ def _get_token_contracts(
         f"fastlane_bot/data/blockchain_data/{mgr.blockchain}/tokens.csv"
     )
     missing_tokens = [tkn for tkn in tokens if tkn not in tokens_df["address"].tolist()]
+
+    # the missing tokens of all the pools are fetched with batched multicalls, only the tokens whose batch failed (or
+    # all of them if the network has no multicall contract) are fetched from their contracts
+    details = fetch_token_details(
+        mgr.web3,
+        [tkn for tkn in missing_tokens if tkn is not None and str(tkn) != "nan"],
+        mgr.cfg.MULTICALL_CONTRACT_ADDRESS,
+    )
+    if details:
+        tokens_df = pd.concat([
+            tokens_df,
+            pd.DataFrame(
+                [{"address": tkn, "symbol": symbol, "decimals": decimals} for tkn, (symbol, decimals) in details.items()]
+            ),
+        ])
+        missing_tokens = [
+            tkn for tkn in missing_tokens
+            if tkn is None or str(tkn) == "nan" or Web3.to_checksum_address(tkn) not in details
+        ]
+
     contracts = []
     failed_contracts = []
     contracts.extend(
@@ -373,7 +394,7 @@ def async_update_pools_from_contracts(mgr: Any, current_block: int):
         filename="missing_tokens_df.csv",
         subset=["address"],
         func=_get_missing_tkns,
-        df_combined=pd.read_csv(f"fastlane_bot/data/blockchain_data/{mgr.blockchain}/tokens.csv")
+        df_combined=tokens_df,
     )
     tokens_df["symbol"] = (
         tokens_df["symbol"]
@@ -79,6 +79,7 @@ class ExchangeFactory:
         elif exchange_name in cfg.UNI_V3_FORKS:
             extras['router_address'] = cfg.UNI_V3_ROUTER_MAPPING[exchange_name]
             extras['exchange_initialized'] = exchange_initialized
+            extras['tick_words'] = cfg.UNI_V3_TICK_WORDS
         elif exchange_name in cfg.SOLIDLY_V2_FORKS:
             extras['router_address'] = cfg.SOLIDLY_V2_ROUTER_MAPPING[exchange_name]
             extras['factory_address'] = cfg.FACTORY_MAPPING[exchange_name]
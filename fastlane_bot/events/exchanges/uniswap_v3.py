@@ -31,6 +31,7 @@ class UniswapV3(Exchange):
     exchange_name: str = "uniswap_v3"
     router_address: str = None
     exchange_initialized: bool = False
+    tick_words: int = 0
 
     def add_pool(self, pool: Pool):
         self.pools[pool.state["address"]] = pool
@@ -43,7 +44,12 @@ class UniswapV3(Exchange):
         return UNISWAP_V3_FACTORY_ABI
 
     def get_events(self, contract: Contract) -> List[Type[Contract]]:
-        return [contract.events.Swap] if self.exchange_initialized else []
+        if not self.exchange_initialized:
+            return []
+        # the Mint and Burn events are only needed to track the liquidity of the initialized ticks
+        if self.tick_words:
+            return [contract.events.Swap, contract.events.Mint, contract.events.Burn]
+        return [contract.events.Swap]
 
     async def get_fee(self, address: str, contract: Contract) -> Tuple[str, float]:
         fee = await contract.caller.fee()
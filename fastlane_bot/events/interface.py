@@ -8,8 +8,9 @@ Contains the interface for querying data from the data fetcher module.
 All rights reserved.
 Licensed under MIT.
 """
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Any, Dict, Optional
+from typing import List, Any, Callable, Dict, Iterable, Optional, Set, Tuple
 
 from fastlane_bot.config import Config
 from fastlane_bot.helpers.poolandtokens import PoolAndTokens
@@ -39,6 +40,108 @@ class Pool(PoolAndTokens):
     pass
 
 
+class TokenRegistry:
+    """
+    The tokens of the pools of a state, keyed by address, and the token addresses of each exchange.
+
+    The registry is updated as pools are added and removed (the tokens are reference counted), so that a token lookup
+    never requires a scan of the state.
+
+    Parameters
+    ----------
+    extra_tokens: Iterable[Token]
+        The tokens which are always in the registry (e.g., the native and wrapped gas tokens)
+    """
+
+    __VERSION__ = "1.0"
+    __DATE__ = "18/Oct/2026"
+
+    def __init__(self, extra_tokens: Iterable[Token] = ()):
+        self.tokens: Dict[str, Token] = {}
+        self.exchange_tokens: Dict[str, Set[str]] = {}
+        self._extra_tokens = {token.address: token for token in extra_tokens}
+        self._counts = Counter()
+        self._exchange_counts = Counter()
+        self.tokens.update(self._extra_tokens)
+
+    @staticmethod
+    def pool_token_indices(pool: Dict[str, Any]) -> List[int]:
+        """
+        The indices of the tokens of a pool (the ``tkn{idx}_address`` fields of the pool which are strings).
+        """
+        indices = []
+        for idx in range(8):
+            key = f"tkn{idx}_address"
+            if key not in pool:
+                break
+            if type(pool[key]) == str:
+                indices.append(idx)
+        return indices
+
+    def add_pool(self, pool: Dict[str, Any]) -> None:
+        """
+        Adds the tokens of a pool to the registry.
+        """
+        exchange_name = pool.get("exchange_name")
+        for idx in self.pool_token_indices(pool):
+            address = pool[f"tkn{idx}_address"]
+            self._counts[address] += 1
+            if address not in self.tokens:
+                self.tokens[address] = Token(
+                    symbol=pool.get(f"tkn{idx}_symbol"),
+                    decimals=pool.get(f"tkn{idx}_decimals"),
+                    address=address,
+                )
+            self._exchange_counts[(exchange_name, address)] += 1
+            self.exchange_tokens.setdefault(exchange_name, set()).add(address)
+
+    def remove_pool(self, pool: Dict[str, Any]) -> None:
+        """
+        Removes the tokens of a pool from the registry, unless they are in other pools.
+        """
+        exchange_name = pool.get("exchange_name")
+        for idx in self.pool_token_indices(pool):
+            address = pool[f"tkn{idx}_address"]
+            self._counts[address] -= 1
+            if self._counts[address] <= 0:
+                del self._counts[address]
+                if address not in self._extra_tokens:
+                    self.tokens.pop(address, None)
+            self._exchange_counts[(exchange_name, address)] -= 1
+            if self._exchange_counts[(exchange_name, address)] <= 0:
+                del self._exchange_counts[(exchange_name, address)]
+                self.exchange_tokens[exchange_name].discard(address)
+
+    def get(self, address: str) -> Optional[Token]:
+        """
+        The token with a given address (None if it is not in the registry).
+        """
+        return self.tokens.get(address)
+
+    def get_exchange_tokens(self, exchange_name: str) -> Set[str]:
+        """
+        The addresses of the tokens of the pools of an exchange.
+        """
+        return self.exchange_tokens.get(exchange_name, set())
+
+
+@dataclass
+class PoolFilter:
+    """
+    An eligibility check of the pools of the state.
+
+    Parameters
+    ----------
+    reason: str
+        The reason recorded for the pools which are not eligible
+    is_eligible: Callable[[Dict[str, Any]], bool]
+        Returns whether a pool is eligible
+    """
+
+    reason: str
+    is_eligible: Callable[[Dict[str, Any]], bool]
+
+
 @dataclass
 class QueryInterface:
     """
@@ -58,13 +161,275 @@ class QueryInterface:
     solidly_v2_event_mappings: Dict[str, str] = field(default_factory=dict)
     exchanges: List[str] = field(default_factory=list)
     token_list: Dict[str, Any] = None
+    excluded_pools: Dict[str, str] = field(default_factory=dict)
     pool_data = None
     pool_data_list = None
+    _token_registry: Optional[TokenRegistry] = field(default=None, init=False, repr=False)
+    _token_registry_version: Optional[int] = field(default=None, init=False, repr=False)
+    _pool_indexes: Dict[Tuple[str, ...], Dict[Tuple, List[PoolAndTokens]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    # the secondary indexes of the pools used by get_pool, in order of preference
+    POOL_INDEXES = (
+        ("address",),
+        ("tkn0_address", "tkn1_address"),
+        ("exchange_name",),
+    )
+
+    # the fields of the PoolAndTokens objects which are read from the records of the state
+    POOL_RECORD_KEYS = (
+        "cid",
+        "strategy_id",
+        "last_updated",
+        "last_updated_block",
+        "descr",
+        "pair_name",
+        "exchange_name",
+        "fee",
+        "fee_float",
+        "tkn0_balance",
+        "tkn1_balance",
+        "z_0",
+        "y_0",
+        "A_0",
+        "B_0",
+        "z_1",
+        "y_1",
+        "A_1",
+        "B_1",
+        "sqrt_price_q96",
+        "tick",
+        "tick_spacing",
+        "liquidity",
+        "address",
+        "anchor",
+        "tkn0",
+        "tkn1",
+        "tkn0_address",
+        "tkn0_decimals",
+        "tkn1_address",
+        "tkn1_decimals",
+        "tkn0_weight",
+        "tkn1_weight",
+        "tkn2",
+        "tkn2_balance",
+        "tkn2_address",
+        "tkn2_decimals",
+        "tkn2_weight",
+        "tkn3",
+        "tkn3_balance",
+        "tkn3_address",
+        "tkn3_decimals",
+        "tkn3_weight",
+        "tkn4",
+        "tkn4_balance",
+        "tkn4_address",
+        "tkn4_decimals",
+        "tkn4_weight",
+        "tkn5",
+        "tkn5_balance",
+        "tkn5_address",
+        "tkn5_decimals",
+        "tkn5_weight",
+        "tkn6",
+        "tkn6_balance",
+        "tkn6_address",
+        "tkn6_decimals",
+        "tkn6_weight",
+        "tkn7",
+        "tkn7_balance",
+        "tkn7_address",
+        "tkn7_decimals",
+        "tkn7_weight",
+        "pool_type",
+        "ticks",
+    )
+
+    def __setattr__(self, name: str, value: Any):
+        # a new state invalidates the token registry and the pool data (which are rebuilt from it on the next lookup)
+        if name == "state":
+            super().__setattr__("_token_registry", None)
+            super().__setattr__("pool_data", None)
+            super().__setattr__("pool_data_list", None)
+        super().__setattr__(name, value)
 
     @property
     def cfg(self) -> Config:
         return self.ConfigObj
 
+    @property
+    def token_registry(self) -> TokenRegistry:
+        """
+        The token registry of the state.
+
+        The registry is built from the state on first use, then updated as pools are removed by the filters. It is
+        rebuilt if the state is replaced, or if it is a ``PoolDataList`` which was changed in place.
+        """
+        version = getattr(self.state, "version", None)
+        if self._token_registry is None or self._token_registry_version != version:
+            extra_tokens = []
+            if self.ConfigObj.GAS_TKN_IN_FLASHLOAN_TOKENS:
+                extra_tokens = [
+                    Token(symbol=self.ConfigObj.NATIVE_GAS_TOKEN_SYMBOL, address=self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, decimals=18),
+                    Token(symbol=self.ConfigObj.WRAPPED_GAS_TOKEN_SYMBOL, address=self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS, decimals=18),
+                ]
+            registry = TokenRegistry(extra_tokens=extra_tokens)
+            for pool in self.state:
+                registry.add_pool(pool)
+            self._token_registry = registry
+            self._token_registry_version = version
+        return self._token_registry
+
+    def apply_filters(
+        self, filters: List[PoolFilter], exchanges_order: List[str] = None
+    ) -> Counter:
+        """
+        Removes the pools which are not eligible from the state, in a single pass over the pools.
+
+        The reason of the first filter which excludes a pool is recorded in ``excluded_pools`` (by cid).
+
+        Parameters
+        ----------
+        filters: List[PoolFilter]
+            The filters to apply, in order
+        exchanges_order: List[str], optional
+            If given, the remaining pools are grouped by exchange in this order
+
+        Returns
+        -------
+        Counter
+            The number of pools removed per (reason, exchange name)
+        """
+        removed = Counter()
+        remaining = []
+        excluded = []
+        for pool in self.state:
+            for pool_filter in filters:
+                if not pool_filter.is_eligible(pool):
+                    self.excluded_pools[pool.get("cid")] = pool_filter.reason
+                    removed[(pool_filter.reason, pool["exchange_name"])] += 1
+                    excluded.append(pool)
+                    break
+            else:
+                remaining.append(pool)
+
+        if exchanges_order is not None:
+            pools_by_exchange = {exchange_name: [] for exchange_name in exchanges_order}
+            for pool in remaining:
+                pools_by_exchange[pool["exchange_name"]].append(pool)
+            remaining = [pool for pools in pools_by_exchange.values() for pool in pools]
+
+        token_registry = self._token_registry
+        self.state = remaining
+        if token_registry is not None:
+            for pool in excluded:
+                token_registry.remove_pool(pool)
+            self._token_registry = token_registry
+            self._token_registry_version = getattr(self.state, "version", None)
+        return removed
+
+    def log_remaining_pools(self) -> None:
+        """
+        Log the number of pools remaining for each exchange
+        """
+        self.ConfigObj.logger.debug("Pools remaining per exchange:")
+        remaining = Counter(pool["exchange_name"] for pool in self.state)
+        for exchange_name in self.exchanges:
+            self.log_pool_count(remaining[exchange_name], exchange_name)
+
+    def target_tokens_filter(self, target_tokens: Iterable[str]) -> PoolFilter:
+        """
+        The filter of the pools which do not contain two target tokens.
+        """
+        target_tokens = set(target_tokens)
+        return PoolFilter(
+            reason="non_target_tokens",
+            is_eligible=lambda pool: pool["tkn0_address"] in target_tokens
+            and pool["tkn1_address"] in target_tokens,
+        )
+
+    def unsupported_exchanges_filter(self) -> PoolFilter:
+        """
+        The filter of the pools of unsupported exchanges.
+        """
+        exchanges = set(self.exchanges)
+        return PoolFilter(
+            reason="unsupported_exchange",
+            is_eligible=lambda pool: pool["exchange_name"] in exchanges,
+        )
+
+    def unmapped_pools_filter(
+        self, exchange_name: str, forks: List[str], event_mappings: Dict[str, str]
+    ) -> PoolFilter:
+        """
+        The filter of the pools of an exchange which are not in its event mappings.
+        """
+        return PoolFilter(
+            reason=f"unmapped_{exchange_name}",
+            is_eligible=lambda pool: pool["exchange_name"] != exchange_name
+            or (pool["exchange_name"] in forks and pool["address"] in event_mappings),
+        )
+
+    def zero_liquidity_keys(self) -> Dict[str, List[str]]:
+        """
+        The balance keys of the pools of each known exchange, at least one of which must be positive.
+        """
+        keys = {}
+        for ex in self.cfg.ALL_KNOWN_EXCHANGES:
+            if ex in keys:
+                continue
+            if ex in self.cfg.UNI_V2_FORKS + self.cfg.SOLIDLY_V2_FORKS + ["bancor_v2", "bancor_v3"]:
+                keys[ex] = ["tkn0_balance"]
+            elif ex in self.cfg.UNI_V3_FORKS:
+                keys[ex] = ["liquidity"]
+            elif ex in self.cfg.CARBON_V1_FORKS:
+                keys[ex] = ["y_0", "y_1"]
+            elif ex in "bancor_pol":
+                keys[ex] = ["y_0"]
+            elif ex in "balancer":
+                keys[ex] = ["tkn0_balance"]
+        return keys
+
+    def zero_liquidity_pools_filter(self, keys: Dict[str, List[str]]) -> PoolFilter:
+        """
+        The filter of the pools with zero liquidity (or of an exchange without balance keys).
+        """
+        return PoolFilter(
+            reason="zero_liquidity",
+            is_eligible=lambda pool: pool["exchange_name"] in keys
+            and self.has_balance(pool, keys[pool["exchange_name"]])
+            and pool["tkn0_decimals"] is not None
+            and pool["tkn1_decimals"] is not None,
+        )
+
+    def remove_ineligible_pools(self, target_tokens: List[str] = None) -> None:
+        """
+        Removes the unmapped uniswap_v2 pools, the pools with zero liquidity, the pools of unsupported exchanges and
+        (if target tokens are given) the non target-pools, in a single pass over the pools.
+
+        Parameters
+        ----------
+        target_tokens: List[str], optional
+            The list of tokens to filter pools by. Pools must contain both tokens in the list to be included.
+        """
+        keys = self.zero_liquidity_keys()
+        filters = [
+            self.unmapped_pools_filter("uniswap_v2", self.cfg.UNI_V2_FORKS, self.uniswap_v2_event_mappings),
+            self.zero_liquidity_pools_filter(keys),
+            self.unsupported_exchanges_filter(),
+        ]
+        if target_tokens:
+            filters.append(self.target_tokens_filter(target_tokens))
+        removed = self.apply_filters(filters, exchanges_order=list(keys))
+
+        for (reason, exchange_name), count in sorted(removed.items()):
+            self.log_pool_count(count, f"{exchange_name}_{reason}_pools")
+        self.cfg.logger.info(
+            f"[events.interface] Removed {sum(removed.values())} ineligible pools. {len(self.state)} pools remaining"
+        )
+        self.log_remaining_pools()
+
     def filter_target_tokens(self, target_tokens: List[str]):
         """
         Filter the pools to only include pools that are in the target pools list
@@ -74,37 +439,19 @@ class QueryInterface:
         target_tokens: List[str]
             The list of tokens to filter pools by. Pools must contain both tokens in the list to be included.
         """
-        initial_state = self.state.copy()
-        self.state = [
-            pool
-            for pool in self.state
-            if pool["tkn0_address"] in target_tokens and pool["tkn1_address"] in target_tokens
-        ]
+        removed = self.apply_filters([self.target_tokens_filter(target_tokens)])
 
         self.cfg.logger.info(
-            f"[events.interface] Limiting pools by target_tokens. Removed {len(initial_state) - len(self.state)} non target-pools. {len(self.state)} pools remaining"
+            f"[events.interface] Limiting pools by target_tokens. Removed {sum(removed.values())} non target-pools. {len(self.state)} pools remaining"
         )
-
-        # Log the total number of pools remaining for each exchange
-        self.ConfigObj.logger.debug("Pools remaining per exchange:")
-        for exchange_name in self.exchanges:
-            pools = self.filter_pools(exchange_name)
-            self.log_pool_numbers(pools, exchange_name)
+        self.log_remaining_pools()
 
     def remove_unsupported_exchanges(self) -> None:
-        initial_state = self.state.copy()
-        self.state = [
-            pool for pool in self.state if pool["exchange_name"] in self.exchanges
-        ]
+        removed = self.apply_filters([self.unsupported_exchanges_filter()])
         self.cfg.logger.debug(
-            f"Removed {len(initial_state) - len(self.state)} unsupported exchanges. {len(self.state)} pools remaining"
+            f"Removed {sum(removed.values())} unsupported exchanges. {len(self.state)} pools remaining"
         )
-
-        # Log the total number of pools remaining for each exchange
-        self.ConfigObj.logger.debug("Pools remaining per exchange:")
-        for exchange_name in self.exchanges:
-            pools = self.filter_pools(exchange_name)
-            self.log_pool_numbers(pools, exchange_name)
+        self.log_remaining_pools()
 
     def has_balance(self, pool: Dict[str, Any], keys: List[str]) -> bool:
         """
@@ -142,19 +489,7 @@ class QueryInterface:
         list[str]
             Returns a list of token keys.
         """
-        pools = self.filter_pools(exchange_name=exchange_name)
-        tokens = []
-        for pool in pools:
-            for idx in range(8):
-                try:
-                    tkn = pool[f"tkn{idx}_address"]
-                    if type(tkn) == str:
-                        tokens.append(tkn)
-                except KeyError:
-                    # Out of bounds
-                    break
-        tokens = list(set(tokens))
-        return tokens
+        return list(self.token_registry.get_exchange_tokens(exchange_name))
 
     def filter_pools(
         self, exchange_name: str, keys: List[str] = ""
@@ -200,115 +535,77 @@ class QueryInterface:
             The exchange name to log
 
         """
-        self.cfg.logger.debug(f"[events.interface] {exchange_name}: {len(pools)}")
+        self.log_pool_count(len(pools), exchange_name)
+
+    def log_pool_count(self, count: int, exchange_name: str) -> None:
+        """
+        Log a number of pools for a given exchange name
+        """
+        self.cfg.logger.debug(f"[events.interface] {exchange_name}: {count}")
 
     def remove_zero_liquidity_pools(self) -> None:
         """
         Remove pools with zero liquidity.
         """
-        initial_state = self.state.copy()
-
-        exchanges = []
-        keys = []
-
-        for ex in self.cfg.ALL_KNOWN_EXCHANGES:
-            if ex in self.cfg.UNI_V2_FORKS + self.cfg.SOLIDLY_V2_FORKS + ["bancor_v2", "bancor_v3"]:
-                exchanges.append(ex)
-                keys.append(["tkn0_balance"])
-            elif ex in self.cfg.UNI_V3_FORKS:
-                exchanges.append(ex)
-                keys.append(["liquidity"])
-            elif ex in self.cfg.CARBON_V1_FORKS:
-                exchanges.append(ex)
-                keys.append(["y_0", "y_1"])
-            elif ex in "bancor_pol":
-                exchanges.append(ex)
-                keys.append(["y_0"])
-            elif ex in "balancer":
-                exchanges.append(ex)
-                keys.append(["tkn0_balance"])
-
-        self.state = [
-            pool
-            for exchange, key in zip(exchanges, keys)
-            for pool in self.filter_pools(exchange, key)
-        ]
-
-        for exchange in exchanges:
-            self.log_pool_numbers(
-                [pool for pool in self.state if pool["exchange_name"] == exchange],
-                exchange,
-            )
-
-        zero_liquidity_pools = [
-            pool for pool in initial_state if pool not in self.state
-        ]
+        keys = self.zero_liquidity_keys()
+        removed = self.apply_filters(
+            [self.zero_liquidity_pools_filter(keys)], exchanges_order=list(keys)
+        )
 
-        for exchange in exchanges:
-            self.log_pool_numbers(
-                [
-                    pool
-                    for pool in zero_liquidity_pools
-                    if pool["exchange_name"] == exchange
-                ],
-                f"{exchange}_zero_liquidity_pools",
-            )
+        remaining = Counter(pool["exchange_name"] for pool in self.state)
+        for exchange in keys:
+            self.log_pool_count(remaining[exchange], exchange)
+        for exchange in keys:
+            self.log_pool_count(removed[("zero_liquidity", exchange)], f"{exchange}_zero_liquidity_pools")
 
     def remove_unmapped_uniswap_v2_pools(self) -> None:
         """
         Remove unmapped uniswap_v2 pools
         """
-        initial_state = self.state.copy()
-        self.state = [
-            pool
-            for pool in self.state
-            if pool["exchange_name"] != "uniswap_v2"
-            or (
-                pool["exchange_name"] in self.cfg.UNI_V2_FORKS
-                and pool["address"] in self.uniswap_v2_event_mappings
-            )
-        ]
+        removed = self.apply_filters(
+            [self.unmapped_pools_filter("uniswap_v2", self.cfg.UNI_V2_FORKS, self.uniswap_v2_event_mappings)]
+        )
         self.cfg.logger.debug(
-            f"Removed {len(initial_state) - len(self.state)} unmapped uniswap_v2/sushi pools. {len(self.state)} uniswap_v2/sushi pools remaining"
+            f"Removed {sum(removed.values())} unmapped uniswap_v2/sushi pools. {len(self.state)} uniswap_v2/sushi pools remaining"
         )
-        self.log_umapped_pools_by_exchange(initial_state)
+        self.log_umapped_pools_by_exchange(removed)
 
     def remove_unmapped_uniswap_v3_pools(self) -> None:
         """
-        Remove unmapped uniswap_v2 pools
+        Remove unmapped uniswap_v3 pools
         """
-        initial_state = self.state.copy()
-        self.state = [
-            pool
-            for pool in self.state
-            if pool["exchange_name"] != "uniswap_v3"
-            or (
-                pool["exchange_name"] in self.cfg.UNI_V3_FORKS
-                and pool["address"] in self.uniswap_v3_event_mappings
-            )
-        ]
+        removed = self.apply_filters(
+            [self.unmapped_pools_filter("uniswap_v3", self.cfg.UNI_V3_FORKS, self.uniswap_v3_event_mappings)]
+        )
         self.cfg.logger.debug(
-            f"Removed {len(initial_state) - len(self.state)} unmapped uniswap_v2/sushi pools. {len(self.state)} uniswap_v2/sushi pools remaining"
+            f"Removed {sum(removed.values())} unmapped uniswap_v2/sushi pools. {len(self.state)} uniswap_v2/sushi pools remaining"
         )
-        self.log_umapped_pools_by_exchange(initial_state)
+        self.log_umapped_pools_by_exchange(removed)
 
-    def log_umapped_pools_by_exchange(self, initial_state):
+    def log_umapped_pools_by_exchange(self, removed: Counter):
         # Log the total number of pools filtered out for each exchange
         self.ConfigObj.logger.debug("Unmapped uniswap_v2/sushi pools:")
-        unmapped_pools = [pool for pool in initial_state if pool not in self.state]
-        assert len(unmapped_pools) == len(initial_state) - len(self.state)
-        # uniswap_v3_unmapped = [
-        #     pool for pool in unmapped_pools if pool["exchange_name"] == "uniswap_v3"
-        # ]
-        # self.log_pool_numbers(uniswap_v3_unmapped, "uniswap_v3")
-        uniswap_v2_unmapped = [
-            pool for pool in unmapped_pools if pool["exchange_name"] == "uniswap_v2"
-        ]
-        self.log_pool_numbers(uniswap_v2_unmapped, "uniswap_v2")
-        sushiswap_v2_unmapped = [
-            pool for pool in unmapped_pools if pool["exchange_name"] == "sushiswap_v2"
-        ]
-        self.log_pool_numbers(sushiswap_v2_unmapped, "sushiswap_v2")
+        unmapped = Counter()
+        for (reason, exchange_name), count in removed.items():
+            unmapped[exchange_name] += count
+        self.log_pool_count(unmapped["uniswap_v2"], "uniswap_v2")
+        self.log_pool_count(unmapped["sushiswap_v2"], "sushiswap_v2")
+
+    def is_safe_token_pool(self, pool: Dict[str, Any]) -> bool:
+        """
+        Whether the tokens of a pool can be found.
+        """
+        self.cfg.logger.info(pool)
+        try:
+            self.get_token(pool["tkn0_address"])
+            self.get_token(pool["tkn1_address"])
+            return True
+        except Exception as e:
+            self.cfg.logger.warning(f"[events.interface] Exception: {e}")
+            self.cfg.logger.warning(
+                f"Removing pool for exchange={pool['pair_name']}, pair_name={pool['pair_name']} token={pool['tkn0_key']} from state for faulty token"
+            )
+            return False
 
     def remove_faulty_token_pools(self) -> None:
         """
@@ -317,22 +614,7 @@ class QueryInterface:
         self.cfg.logger.debug(
             f"Total number of pools. {len(self.state)} before removing faulty token pools"
         )
-
-        safe_pools = []
-        for pool in self.state:
-            self.cfg.logger.info(pool)
-            try:
-                self.get_token(pool["tkn0_address"])
-                self.get_token(pool["tkn1_address"])
-                safe_pools.append(pool)
-            except Exception as e:
-
-                self.cfg.logger.warning(f"[events.interface] Exception: {e}")
-                self.cfg.logger.warning(
-                    f"Removing pool for exchange={pool['pair_name']}, pair_name={pool['pair_name']} token={pool['tkn0_key']} from state for faulty token"
-                )
-
-        self.state = safe_pools
+        self.apply_filters([PoolFilter(reason="faulty_token", is_eligible=self.is_safe_token_pool)])
 
     def update_state(self, state: List[Dict[str, Any]]) -> None:
         """
@@ -345,6 +627,7 @@ class QueryInterface:
 
         """
         self.state = state.copy()
+        self.excluded_pools = {}
         if self.state == state:
             self.cfg.logger.warning("WARNING: State not updated")
 
@@ -379,6 +662,33 @@ class QueryInterface:
             for idx, record in enumerate(self.state)
         ]
         self.pool_data = {str(pool.cid): pool for pool in self.pool_data_list}
+        self._pool_indexes = {}
+
+    def get_pool_index(self, index: Tuple[str, ...]) -> Dict[Tuple, List[PoolAndTokens]]:
+        """
+        Get a secondary index of the pools (built on first use)
+
+        Parameters
+        ----------
+        index: Tuple[str, ...]
+            The attributes of the pools which are indexed
+
+        Returns
+        -------
+        Dict[Tuple, List[PoolAndTokens]]
+            The pools (in the order of the state) by values of the attributes
+        """
+        pools = self.get_pool_data_with_tokens()
+        if index not in self._pool_indexes:
+            pools_by_values = {}
+            for pool in pools:
+                try:
+                    values = tuple(getattr(pool, key) for key in index)
+                except AttributeError:
+                    continue
+                pools_by_values.setdefault(values, []).append(pool)
+            self._pool_indexes[index] = pools_by_values
+        return self._pool_indexes[index]
 
     def create_pool_and_tokens(self, idx: int, record: Dict[str, Any]) -> PoolAndTokens:
         """
@@ -400,75 +710,7 @@ class QueryInterface:
         result = PoolAndTokens(
             ConfigObj=self.ConfigObj,
             id=idx,
-            **{
-                key: record.get(key)
-                for key in [
-                    "cid",
-                    "strategy_id",
-                    "last_updated",
-                    "last_updated_block",
-                    "descr",
-                    "pair_name",
-                    "exchange_name",
-                    "fee",
-                    "fee_float",
-                    "tkn0_balance",
-                    "tkn1_balance",
-                    "z_0",
-                    "y_0",
-                    "A_0",
-                    "B_0",
-                    "z_1",
-                    "y_1",
-                    "A_1",
-                    "B_1",
-                    "sqrt_price_q96",
-                    "tick",
-                    "tick_spacing",
-                    "liquidity",
-                    "address",
-                    "anchor",
-                    "tkn0",
-                    "tkn1",
-                    "tkn0_address",
-                    "tkn0_decimals",
-                    "tkn1_address",
-                    "tkn1_decimals",
-                    "tkn0_weight",
-                    "tkn1_weight",
-                    "tkn2",
-                    "tkn2_balance",
-                    "tkn2_address",
-                    "tkn2_decimals",
-                    "tkn2_weight",
-                    "tkn3",
-                    "tkn3_balance",
-                    "tkn3_address",
-                    "tkn3_decimals",
-                    "tkn3_weight",
-                    "tkn4",
-                    "tkn4_balance",
-                    "tkn4_address",
-                    "tkn4_decimals",
-                    "tkn4_weight",
-                    "tkn5",
-                    "tkn5_balance",
-                    "tkn5_address",
-                    "tkn5_decimals",
-                    "tkn5_weight",
-                    "tkn6",
-                    "tkn6_balance",
-                    "tkn6_address",
-                    "tkn6_decimals",
-                    "tkn6_weight",
-                    "tkn7",
-                    "tkn7_balance",
-                    "tkn7_address",
-                    "tkn7_decimals",
-                    "tkn7_weight",
-                    "pool_type",
-                ]
-            },
+            **{key: record.get(key) for key in self.POOL_RECORD_KEYS},
         )
         result.tkn0 = result.pair_name.split("/")[0].split("-")[0]
         result.tkn1 = result.pair_name.split("/")[1].split("-")[0]
@@ -485,35 +727,14 @@ class QueryInterface:
         List[Token]
             The list of tokens
         """
-        token_set = set()
-        for record in self.state:
-            for idx in range(len(record["descr"].split("/"))):
-                try:
-                    token_set.add(self.create_token(record, f"tkn{str(idx)}_"))
-                except AttributeError:
-                    pass
-        if self.ConfigObj.GAS_TKN_IN_FLASHLOAN_TOKENS:
-            token_set.add(Token(symbol=self.ConfigObj.NATIVE_GAS_TOKEN_SYMBOL, address=self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, decimals=18))
-            token_set.add(Token(symbol=self.ConfigObj.WRAPPED_GAS_TOKEN_SYMBOL, address=self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS, decimals=18))
-        return list(token_set)
+        return list(self.token_registry.tokens.values())
 
     def populate_tokens(self):
         """
         Populate the token Dict with tokens using the available pool data.
         """
-        self.token_list = {}
-        for record in self.state:
-            for idx in range(len(record["descr"].split("/"))):
-                try:
-                    token = self.create_token(record, f"tkn{str(idx)}_")
-                    self.token_list[token.address] = token
-                except AttributeError:
-                    pass
-        if self.ConfigObj.GAS_TKN_IN_FLASHLOAN_TOKENS:
-            native_gas_tkn = Token(symbol=self.ConfigObj.NATIVE_GAS_TOKEN_SYMBOL, address=self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, decimals=18)
-            wrapped_gas_tkn = Token(symbol=self.ConfigObj.WRAPPED_GAS_TOKEN_SYMBOL, address=self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS, decimals=18)
-            self.token_list[native_gas_tkn.address] = native_gas_tkn
-            self.token_list[wrapped_gas_tkn.address] = wrapped_gas_tkn
+        self._token_registry = None
+        self.token_list = self.token_registry.tokens
 
     def create_token(self, record: Dict[str, Any], prefix: str) -> Token:
         """
@@ -572,21 +793,10 @@ class QueryInterface:
             The token
 
         """
-        if self.token_list is None:
-            self.populate_tokens()
-        try:
-            return self.token_list.get(tkn_address)
-        except KeyError:
-            try:
-                self.populate_tokens()
-                return self.token_list.get(tkn_address)
-            except KeyError as e:
-                self.ConfigObj.logger.info(f"[interface.py get_token] Could not find token: {tkn_address} in token_list")
-                tokens = self.get_tokens()
-                if tkn_address.startswith("0x"):
-                    return next((tkn for tkn in tokens if tkn.address == tkn_address), None)
-                else:
-                    raise ValueError(f"[get_token] Invalid token: {tkn_address}")
+        token = self.token_registry.get(tkn_address)
+        if token is None:
+            self.ConfigObj.logger.debug(f"[interface.py get_token] Could not find token: {tkn_address} in token_list")
+        return token
 
     def get_pool(self, **kwargs) -> Optional[PoolAndTokens]:
         """
@@ -603,27 +813,32 @@ class QueryInterface:
             The pool
 
         """
-        pool_data_with_tokens = self.get_pool_data_lookup()
         if "cid" in kwargs:
             cid = str(kwargs['cid'])
             try:
-                return pool_data_with_tokens[cid]
+                return self.get_pool_data_lookup()[cid]
             except KeyError:
                 # pool not in data
                 self.cfg.logger.error(f"[interface.py get_pool] pool with cid: {cid} not in data")
                 return None
+
+        # use the first declared index whose attributes are all given, if any
+        index = next((index for index in self.POOL_INDEXES if all(key in kwargs for key in index)), None)
+        if index is None:
+            pools = self.get_pool_data_with_tokens()
         else:
-            try:
-                return next(
-                    (
-                        pool
-                        for pool in pool_data_with_tokens
-                        if all(getattr(pool, key) == kwargs[key] for key in kwargs)
-                    ),
-                    None,
-                )
-            except AttributeError:
-                return None
+            pools = self.get_pool_index(index).get(tuple(kwargs[key] for key in index), [])
+        try:
+            return next(
+                (
+                    pool
+                    for pool in pools
+                    if all(getattr(pool, key) == kwargs[key] for key in kwargs)
+                ),
+                None,
+            )
+        except AttributeError:
+            return None
 
     def get_pools(self) -> List[PoolAndTokens]:
         """
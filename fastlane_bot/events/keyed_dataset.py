@@ -0,0 +1,297 @@
+"""
+Keyed, append-only Parquet datasets mirroring the static pool data and event mappings CSVs
+
+The terraformer upserts the pools it finds into a ``KeyedDataset``: the rows whose key is not known yet are written to a
+new Parquet file and appended to the CSV, without reading or rewriting the existing data. The
+dataset is a mirror of its CSV, which remains the reference format; it is rebuilt from the CSV whenever the CSV is
+changed by anything else (e.g., pulled from the repository), which is detected from the size and modification time of
+the CSV recorded in the manifest of the dataset.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+__VERSION__ = "1.1"
+__DATE__ = "19/Oct/2026"
+
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST_FILE = "_manifest.json"
+STATIC_POOL_DATA_KEY = ["exchange_name", "address", "anchor"]
+EVENT_MAPPINGS_KEY = ["address"]
+ARROW_TYPES = {"int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_(), "object": pa.string()}
+
+
+def to_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the values of a dataframe to the strings written to a CSV (None for missing values).
+    """
+    return pd.DataFrame(
+        {column: [None if pd.isna(value) else str(value) for value in df[column]] for column in df.columns},
+        columns=df.columns,
+        index=df.index,
+    )
+
+
+def infer_dtype(values: pd.Series) -> str:
+    """
+    Infers the dtype of a column of strings like ``pd.read_csv``: int64 or float64 for numeric columns (float64 if
+    some values are missing), bool for True/False columns, and object (i.e., strings) otherwise (including if there are
+    no values).
+    """
+    if len(values) == 0:
+        return "object"
+    try:
+        dtype = str(pd.to_numeric(values).dtype)
+        return dtype if dtype in ("int64", "float64") else "object"
+    except (ValueError, TypeError):
+        pass
+    if values.notna().all() and values.isin(["True", "False"]).all():
+        return "bool"
+    return "object"
+
+
+def is_compatible(dtype: str, new_dtype: str, all_missing: bool) -> bool:
+    """
+    Whether the dtype inferred for a column remains the same after adding values whose inferred dtype is ``new_dtype``.
+    """
+    return (
+        dtype == "object"
+        or dtype == new_dtype
+        or (dtype == "float64" and (new_dtype == "int64" or all_missing))
+    )
+
+
+def to_dtypes(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """
+    Converts a dataframe of strings to the given dtypes.
+    """
+    df = df.copy()
+    for column, dtype in dtypes.items():
+        if dtype == "bool":
+            df[column] = df[column] == "True"
+        elif dtype != "object":
+            df[column] = pd.to_numeric(df[column]).astype(dtype)
+    return df
+
+
+@dataclass
+class KeyedDataset:
+    """
+    A Parquet dataset of the rows of a CSV, keyed by some of its columns.
+
+    The rows are stored in append-only Parquet files, each of which is named after the index of its first row in the CSV,
+    with the dtypes that ``pd.read_csv`` would infer for the whole CSV (recorded in the manifest).
+
+    :csv_path:          the path of the CSV mirrored by the dataset
+    :key:               the columns which identify a row
+    :max_files:         the number of Parquet files above which the dataset is compacted after an upsert
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    csv_path: str
+    key: List[str]
+    max_files: int = 256
+    _keys: Optional[Set[Tuple]] = field(default=None, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    @property
+    def path(self) -> str:
+        """
+        The directory of the dataset (next to the CSV).
+        """
+        return os.path.splitext(self.csv_path)[0] + ".parquet"
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILE), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_manifest(self, dtypes: Dict[str, str], rows: int):
+        stat = os.stat(self.csv_path)
+        manifest = {
+            "dtypes": dtypes,
+            "rows": rows,
+            "csv_size": stat.st_size,
+            "csv_mtime_ns": stat.st_mtime_ns,
+        }
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def is_synced(self) -> bool:
+        """
+        Whether the dataset contains the same rows as the CSV.
+        """
+        manifest = self._read_manifest()
+        if manifest is None or not os.path.exists(self.csv_path):
+            return False
+        stat = os.stat(self.csv_path)
+        return manifest["csv_size"] == stat.st_size and manifest["csv_mtime_ns"] == stat.st_mtime_ns
+
+    def _files(self) -> List[str]:
+        return sorted(
+            os.path.join(self.path, file) for file in os.listdir(self.path) if file.endswith(".parquet")
+        )
+
+    def _write(self, df: pd.DataFrame, dtypes: Dict[str, str], first_row: int):
+        schema = pa.schema([(column, ARROW_TYPES[dtype]) for column, dtype in dtypes.items()])
+        table = pa.Table.from_pandas(to_dtypes(df, dtypes), schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(self.path, f"part-{first_row:012d}.parquet"))
+
+    def _key_tuples(self, df: pd.DataFrame) -> List[Tuple]:
+        return [tuple(row) for row in to_strings(df.reindex(columns=self.key)).values]
+
+    def sync(self, force: bool = False):
+        """
+        Rebuilds the dataset from the CSV, unless it is already in sync with it.
+        """
+        with self._lock:
+            if self.is_synced() and not force:
+                return
+            df = pd.read_csv(self.csv_path, dtype=str, index_col=False)
+            dtypes = {column: infer_dtype(df[column]) for column in df.columns}
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path)
+            if len(df) > 0:
+                self._write(df, dtypes, 0)
+            self._write_manifest(dtypes, len(df))
+            self._keys = set(self._key_tuples(df))
+
+    @property
+    def keys(self) -> Set[Tuple]:
+        """
+        The keys of the rows of the dataset (read once, then maintained by the upserts).
+        """
+        with self._lock:
+            self.sync()
+            if self._keys is None:
+                self._keys = set(self._key_tuples(self.read(columns=self.key)))
+            return self._keys
+
+    def read(self, columns: List[str] = None, filters: List[Tuple] = None) -> pd.DataFrame:
+        """
+        Reads the rows of the dataset, in the order of the CSV, with the dtypes inferred by ``pd.read_csv``.
+
+        :columns:       the columns to read (all the columns if None)
+        :filters:       the filters of the rows to read, in the format of ``pyarrow.parquet.read_table``
+        """
+        manifest = self._read_manifest()
+        columns = list(manifest["dtypes"]) if columns is None else list(columns)
+        files = self._files()
+        if not files:
+            return pd.DataFrame({column: pd.Series(dtype=manifest["dtypes"][column]) for column in columns})
+        df = pq.read_table(files, columns=columns, filters=filters).to_pandas()
+        for column in columns:
+            if manifest["dtypes"][column] == "object":
+                values = df[column].to_numpy(dtype=object)
+                values[pd.isna(values)] = np.nan
+                df[column] = pd.Series(values, index=df.index, dtype=object)
+        return df
+
+    def upsert(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Appends the rows whose key is not known yet to the CSV and to the dataset, without rewriting the existing data
+        (unless the new rows change the dtype of a column, in which case the dataset is rebuilt from the CSV, or have
+        columns which are not in the CSV, in which case the CSV is rewritten with these columns first).
+
+        :df:        the rows to upsert
+        :returns:   the rows appended
+        """
+        with self._lock:
+            if not os.path.exists(self.csv_path):
+                df.iloc[:0].to_csv(self.csv_path, index=False)
+            self.sync()
+            new_columns = [column for column in df.columns if column not in self._read_manifest()["dtypes"]]
+            if new_columns:
+                self.add_columns(new_columns)
+            keys = self.keys
+            manifest = self._read_manifest()
+            dtypes = manifest["dtypes"]
+            new_rows = []
+            for n, key in enumerate(self._key_tuples(df)):
+                if key not in keys:
+                    keys.add(key)
+                    new_rows.append(n)
+            new_df = df.iloc[new_rows].reindex(columns=list(dtypes))
+            if len(new_df) == 0:
+                return new_df
+            new_df.to_csv(self.csv_path, mode="a", header=False, index=False)
+            new_strings = to_strings(new_df)
+            new_dtypes = {column: infer_dtype(new_strings[column]) for column in dtypes}
+            if manifest["rows"] == 0:
+                dtypes = new_dtypes
+            if all(
+                is_compatible(dtype, new_dtypes[column], new_strings[column].isna().all())
+                for column, dtype in dtypes.items()
+            ):
+                self._write(new_strings, dtypes, manifest["rows"])
+                self._write_manifest(dtypes, manifest["rows"] + len(new_df))
+                if len(self._files()) > self.max_files:
+                    self.compact()
+            else:
+                self.sync(force=True)
+            return new_df
+
+    def add_columns(self, columns: List[str]):
+        """
+        Rewrites the CSV with additional columns (missing in the existing rows), and rebuilds the dataset from it.
+        """
+        with self._lock:
+            df = pd.read_csv(self.csv_path, dtype=str, index_col=False)
+            df.reindex(columns=list(df.columns) + list(columns)).to_csv(self.csv_path, index=False)
+            self.sync(force=True)
+
+    def compact(self):
+        """
+        Rewrites the dataset into a single Parquet file.
+        """
+        with self._lock:
+            files = self._files()
+            if len(files) <= 1:
+                return
+            table = pq.read_table(files)
+            tmp_path = os.path.join(self.path, "_compacted.tmp")
+            pq.write_table(table, tmp_path)
+            for file in files:
+                os.remove(file)
+            os.replace(tmp_path, os.path.join(self.path, f"part-{0:012d}.parquet"))
+
+
+def read_keyed_csv(
+    csv_path: str, key: List[str], filters: List[Tuple] = None, read_only: bool = False
+) -> Optional[pd.DataFrame]:
+    """
+    Reads a CSV from its keyed dataset, if the dataset is in sync with it.
+
+    :csv_path:      the path of the CSV
+    :key:           the key columns of the dataset
+    :filters:       the filters of the rows to read, in the format of ``pyarrow.parquet.read_table``
+    :read_only:     if False, the dataset is (re)built from the CSV when it is not in sync
+    :returns:       the rows, with the dtypes inferred by ``pd.read_csv`` (None if the CSV must be read instead)
+    """
+    dataset = KeyedDataset(csv_path=csv_path, key=key)
+    try:
+        if not dataset.is_synced():
+            if read_only:
+                return None
+            dataset.sync()
+        return dataset.read(filters=filters)
+    except (OSError, pa.ArrowException, KeyError, ValueError):
+        return None
@@ -0,0 +1,186 @@
+"""
+Fetches event logs over block ranges of adaptive size
+
+The providers limit the ``eth_getLogs`` requests either by block range, by number of results or by response time,
+and the suitable block range depends on the activity of the chain and of the contracts queried. The ``LogFetcher``
+splits a block range into chunks, whose size is adapted from the observed number of results, the latency and the
+"too many results" errors of the provider, and remembers the chunk size per key (e.g. per chain and exchange).
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+__VERSION__ = "1.1"
+__DATE__ = "19/Oct/2026"
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from requests.exceptions import Timeout
+
+# the messages of the providers' errors on block ranges or responses which are too large (lowercase)
+RANGE_ERROR_MESSAGES = (
+    "query returned more than",
+    "response size",
+    "block range",
+    "too many results",
+    "is limited to a",
+    "timeout",
+    "timed out",
+)
+
+
+@dataclass
+class LogFetcher:
+    """
+    Fetches logs in chunks of blocks whose size adapts to the provider's responses.
+
+    A key without a known chunk size is fetched over the whole range at once (or with the initial range size given
+    to ``get_logs``). The chunk size of a key is halved when a request fails with a range error, returns more than
+    ``max_results`` results or takes longer than ``max_latency`` seconds, and that size is remembered as the limit of
+    the key. The chunk size grows when a full chunk returns less than a quarter of both thresholds: it is doubled, but
+    never beyond halfway to the limit, so that it converges to the largest size the provider accepts.
+
+    A limit may stem from a transient error (e.g. a single timeout), so it does not last forever: after
+    ``limit_recovery_requests`` successful requests without a reduction, the limit of the key is doubled (and dropped
+    once it exceeds ``max_range_size``), which lets the chunk size grow back.
+
+    :max_results:       the number of results above which the chunk size is reduced
+    :max_latency:       the request duration (in seconds) above which the chunk size is reduced
+    :min_range_size:    the minimum chunk size
+    :max_range_size:    the maximum chunk size (None for no limit)
+    :range_sizes:       the chunk size per key
+    :range_limits:      the smallest chunk size known to be too large, per key
+    :limit_recovery_requests:   the number of successful requests after which the limit of a key is doubled
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    max_results: int = 5000
+    max_latency: float = 10.0
+    min_range_size: int = 1
+    max_range_size: Optional[int] = None
+    range_sizes: Dict[Hashable, int] = field(default_factory=dict)
+    range_limits: Dict[Hashable, int] = field(default_factory=dict)
+    limit_recovery_requests: int = 100
+    _limit_successes: Dict[Hashable, int] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def is_range_error(e: Exception) -> bool:
+        """
+        Returns True if the exception indicates that the block range of the request is too large.
+        """
+        if isinstance(e, (Timeout, TimeoutError)):
+            return True
+        message = str(e).lower()
+        return any(text in message for text in RANGE_ERROR_MESSAGES)
+
+    def get_range_size(self, key: Hashable, initial_range_size: int = None) -> Optional[int]:
+        """
+        Returns the chunk size of the key (None for the whole range).
+        """
+        return self.range_sizes.get(key, initial_range_size or None)
+
+    def set_range_size(self, key: Hashable, range_size: int):
+        """
+        Sets the chunk size of the key, within the limits.
+        """
+        range_size = max(range_size, self.min_range_size)
+        if self.max_range_size is not None:
+            range_size = min(range_size, self.max_range_size)
+        self.range_sizes[key] = range_size
+
+    def reduce_range_size(self, key: Hashable, range_size: int):
+        """
+        Halves the chunk size of the key, after a request over ``range_size`` blocks proved too large.
+        """
+        self.range_limits[key] = min(range_size, self.range_limits.get(key, range_size))
+        self._limit_successes[key] = 0
+        self.set_range_size(key, range_size // 2)
+
+    def relax_range_limit(self, key: Hashable):
+        """
+        Counts a successful request of the key, and doubles its limit after ``limit_recovery_requests`` of them.
+        """
+        if key not in self.range_limits:
+            return
+        self._limit_successes[key] = self._limit_successes.get(key, 0) + 1
+        if self._limit_successes[key] < self.limit_recovery_requests:
+            return
+        self._limit_successes[key] = 0
+        range_limit = 2 * self.range_limits[key]
+        if self.max_range_size is not None and range_limit > self.max_range_size:
+            del self.range_limits[key]
+        else:
+            self.range_limits[key] = range_limit
+
+    def increase_range_size(self, key: Hashable):
+        """
+        Doubles the chunk size of the key, without exceeding halfway to its limit.
+        """
+        range_size = self.range_sizes[key]
+        if key in self.range_limits:
+            self.set_range_size(key, min(2 * range_size, (range_size + self.range_limits[key]) // 2))
+        else:
+            self.set_range_size(key, 2 * range_size)
+
+    def update(self, key: Hashable, range_size: int, num_results: int, latency: float):
+        """
+        Adapts the chunk size of the key from the outcome of a successful request.
+
+        :key:           the key
+        :range_size:    the number of blocks of the request
+        :num_results:   the number of results of the request
+        :latency:       the duration of the request in seconds
+        """
+        current_range_size = self.range_sizes.get(key)
+        if num_results > self.max_results or latency > self.max_latency:
+            self.reduce_range_size(key, range_size)
+            return
+        self.relax_range_limit(key)
+        if (
+            current_range_size is not None
+            and range_size >= current_range_size
+            and num_results < self.max_results / 4
+            and latency < self.max_latency / 4
+        ):
+            self.increase_range_size(key)
+
+    def get_logs(
+        self,
+        get_logs: Callable[..., List[Any]],
+        start_block: int,
+        end_block: int,
+        key: Hashable = None,
+        initial_range_size: int = None,
+    ) -> List[Any]:
+        """
+        Fetches the logs of a block range in chunks.
+
+        :get_logs:              the function fetching the logs, called with the ``fromBlock`` and ``toBlock`` kwargs
+        :start_block:           the first block of the range
+        :end_block:             the last block of the range
+        :key:                   the key under which the chunk size is remembered
+        :initial_range_size:    the chunk size to use if none is known for the key yet (None for the whole range)
+        :returns:               the logs of all chunks, in block order
+        """
+        logs = []
+        from_block = start_block
+        while from_block <= end_block:
+            range_size = self.get_range_size(key, initial_range_size)
+            to_block = end_block if range_size is None else min(from_block + range_size - 1, end_block)
+            start_time = time.monotonic()
+            try:
+                chunk_logs = get_logs(fromBlock=from_block, toBlock=to_block)
+            except Exception as e:
+                if to_block - from_block < self.min_range_size or not self.is_range_error(e):
+                    raise e
+                self.reduce_range_size(key, to_block - from_block + 1)
+                continue
+            self.update(key, to_block - from_block + 1, len(chunk_logs), time.monotonic() - start_time)
+            logs += chunk_logs
+            from_block = to_block + 1
+        return logs
@@ -10,7 +10,7 @@ Licensed under MIT.
 """
 import time
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Type, Optional, Tuple
+from typing import List, Dict, Any, Type, Optional, Set, Tuple
 
 from web3 import Web3, AsyncWeb3
 from web3.contract import Contract
@@ -21,6 +21,8 @@ from fastlane_bot.config.constants import PANCAKESWAP_V2_NAME, PANCAKESWAP_V3_NA
 from fastlane_bot.config.multicaller import MultiCaller
 from fastlane_bot.events.exchanges import exchange_factory
 from fastlane_bot.events.exchanges.base import Exchange
+from fastlane_bot.events.log_fetcher import LogFetcher
+from fastlane_bot.events.pool_data import PoolDataList
 from fastlane_bot.events.pools.utils import get_pool_cid
 from fastlane_bot.events.pools import pool_factory
 
@@ -40,6 +42,8 @@ class BaseManager:
         The pool data.
     alchemy_max_block_fetch : int
         The maximum number of blocks to fetch from Alchemy.
+    log_fetcher : LogFetcher
+        Fetches the event logs in block ranges of adaptive size.
     event_contracts : Dict[str, Contract or Type[Contract]]
         The event contracts.
     pool_contracts : Dict[str, Contract or Type[Contract]]
@@ -107,10 +111,18 @@ class BaseManager:
     replay_from_block: int = None
 
     forked_exchanges: List[str] = field(default_factory=list)
-    static_pools: Dict[str, List[str]] = field(default_factory=dict)
+    static_pools: Dict[str, Set[str]] = field(default_factory=dict)
 
     prefix_path: str = ""
     read_only: bool = False
+    log_fetcher: LogFetcher = field(default_factory=LogFetcher)
+
+    def __setattr__(self, name: str, value: Any):
+        if name == "pool_data" and value is not None and not isinstance(value, PoolDataList):
+            previous = self.__dict__.get("pool_data")
+            version = previous.version + 1 if isinstance(previous, PoolDataList) else 0
+            value = PoolDataList(value, version=version)
+        super().__setattr__(name, value)
 
     def __post_init__(self):
         initialized_exchanges = []
@@ -338,11 +350,14 @@ class BaseManager:
             if ex in self.SUPPORTED_EXCHANGES:
                 self.update_carbon(update_from_contract_block, ex)
 
+        # the Uniswap v3 pools whose ticks are tracked but not known yet are updated as well
+        tick_exchanges = set(self.cfg.UNI_V3_FORKS) if self.cfg.UNI_V3_TICK_WORDS else set()
         return [
             i
             for i, pool_info in enumerate(self.pool_data)
             if pool_info["last_updated_block"]
                < update_from_contract_block - self.alchemy_max_block_fetch
+            or (pool_info["exchange_name"] in tick_exchanges and not isinstance(pool_info.get("ticks"), list))
         ]
 
     def update_carbon(self, current_block: int, exchange_name: str):
@@ -872,16 +887,24 @@ class BaseManager:
 
     def deduplicate_pool_data(self) -> None:
         """
-        Deduplicate the pool data.
+        Deduplicate the pool data, keeping the most recently updated pool of each duplicate cid.
         """
-        self.pool_data = sorted(
-            self.pool_data, key=lambda x: x["last_updated_block"], reverse=True
-        )
-        seen = set()
-        no_duplicates = [
-            d for d in self.pool_data if d["cid"] not in seen and not seen.add(d["cid"])
+        duplicate_cids = self.pool_data.duplicate_cids
+        if not duplicate_cids:
+            return
+        latest = {}
+        for idx, pool in enumerate(self.pool_data):
+            cid = pool["cid"]
+            if cid in duplicate_cids and (
+                cid not in latest
+                or pool["last_updated_block"] > self.pool_data[latest[cid]]["last_updated_block"]
+            ):
+                latest[cid] = idx
+        self.pool_data = [
+            pool
+            for idx, pool in enumerate(self.pool_data)
+            if pool["cid"] not in duplicate_cids or latest[pool["cid"]] == idx
         ]
-        self.pool_data = no_duplicates
 
     @staticmethod
     def pool_key_value_from_event(key: str, event: Dict[str, Any]) -> Any:
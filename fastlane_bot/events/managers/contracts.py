@@ -10,13 +10,8 @@ All rights reserved.
 Licensed under MIT.
 """
 
-import os.path
-import random
-from datetime import datetime
-from glob import glob
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 
-import pandas as pd
 from web3 import Web3
 from web3.contract import Contract
 
@@ -28,6 +23,7 @@ from fastlane_bot.data.abi import (
 )
 from fastlane_bot.events.managers.base import BaseManager
 from fastlane_bot.events.pools.utils import get_pool_cid
+from fastlane_bot.events.token_store import TokenStore, fetch_token_details
 
 
 class ContractsManager(BaseManager):
@@ -326,29 +322,14 @@ class ContractsManager(BaseManager):
             The token info.
 
         """
-        contract = self.get_or_create_token_contracts(web3, erc20_contracts, addr)
-        tokens_filepath = os.path.normpath(
-            f"fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/tokens.csv"
-        )
-        token_data = pd.read_csv(tokens_filepath)
-        extra_info = glob(
-            os.path.normpath(
-                f"{self.prefix_path}fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/token_detail/*.csv"
-            )
-        )
-        if len(extra_info) > 0:
-            extra_info_df = pd.concat(
-                [pd.read_csv(f) for f in extra_info], ignore_index=True
-            )
-            token_data = pd.concat([token_data, extra_info_df], ignore_index=True)
-            token_data = token_data.drop_duplicates(subset=["address"])
-            self.tokens = token_data.to_dict(orient="records")
+        token_store = self.get_token_store()
+        self.tokens = token_store.records
         try:
             return self._get_and_save_token_info_from_contract(
-                contract=contract,
+                web3=web3,
+                erc20_contracts=erc20_contracts,
                 addr=addr,
-                token_data=token_data,
-                tokens_filepath=tokens_filepath
+                token_store=token_store,
             )
         except self.FailedToGetTokenDetailsException as e:
             self.cfg.logger.debug(
@@ -366,26 +347,67 @@ class ContractsManager(BaseManager):
         def __str__(self):
             return self.message
 
+    def get_token_store(self) -> TokenStore:
+        """
+        Get the token store of the tokens csv of the network.
+        """
+        return TokenStore.load(
+            f"{self.prefix_path}fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/tokens.csv"
+        )
+
+    def prefetch_token_info(self, web3: Web3, addrs: List[str]) -> Dict[str, Tuple[Optional[str], Optional[int]]]:
+        """
+        Fetch the symbol and decimals of the tokens missing from the token store with one batched multicall, and add
+        the valid ones to the token store.
+
+        Parameters
+        ----------
+        web3 : Web3
+            The web3 instance.
+        addrs : List[str]
+            The token addresses.
+
+        Returns
+        -------
+        Dict[str, Tuple[Optional[str], Optional[int]]]
+            The fetched (symbol, decimals) of each missing token; empty if there were no missing tokens, or if the
+            multicall failed or is not available on the network.
+
+        """
+        token_store = self.get_token_store()
+        missing = [addr for addr in dict.fromkeys(addrs) if addr not in token_store]
+        if not missing:
+            return {}
+        details = fetch_token_details(web3, missing, self.cfg.MULTICALL_CONTRACT_ADDRESS)
+        for addr, (symbol, decimals) in details.items():
+            if symbol is not None and decimals is not None:
+                token_store.add(addr, symbol.replace("-", "_"), decimals)
+        return details
+
     def _get_and_save_token_info_from_contract(
         self,
-        contract: Contract,
+        web3: Web3,
+        erc20_contracts: Dict[str, Contract],
         addr: str,
-        token_data: pd.DataFrame,
-        tokens_filepath: str,
+        token_store: TokenStore,
     ) -> Tuple[str, int]:
         """
-        Get and save the token info from contract to csv.
+        Get the token info from the token store, or from the contract and add it to the token store.
+
+        Missing tokens are fetched with a multicall (see ``prefetch_token_info``); the token contract is only called
+        directly if the multicall is not available. The new tokens are appended to the tokens csv by
+        ``handle_tokens_csv`` (unless in read only mode).
 
         Parameters
         ----------
-        contract : Contract
-            The contract.
+        web3 : Web3
+            The web3 instance.
+        erc20_contracts : Dict[str, Contract]
+            The erc20 contracts.
         addr : str
             The address.
-        token_data : pd.DataFrame
-            The token data.
-        tokens_filepath : str
-            The tokens filepath.
+        token_store : TokenStore
+            The token store of the tokens csv.
 
         Returns
         -------
@@ -393,16 +415,20 @@ class ContractsManager(BaseManager):
             The token info.
 
         """
+        record = token_store.get(addr)
+        if record is None and addr in self.prefetch_token_info(web3, [addr]):
+            record = token_store.get(addr)
+            if record is None:
+                raise self.FailedToGetTokenDetailsException(addr=addr)
+        if record is not None:
+            return record["symbol"], record["decimals"]
+
+        contract = self.get_or_create_token_contracts(web3, erc20_contracts, addr)
         try:
             symbol = contract.functions.symbol().call()
         except OverflowError:
             raise self.FailedToGetTokenDetailsException(addr=addr)
-
-        if addr in token_data["address"].unique():
-            decimals = token_data.loc[token_data["address"] == addr, "decimals"].iloc[0]
-            return symbol, decimals
-        else:
-            decimals = int(float(contract.functions.decimals().call()))
+        decimals = int(float(contract.functions.decimals().call()))
 
         if (
             symbol is None
@@ -412,43 +438,14 @@ class ContractsManager(BaseManager):
         ):
             raise self.FailedToGetTokenDetailsException(addr=addr)
         symbol = str(symbol).replace("-", "_")
-        new_data = {
-            "symbol": symbol,
-            "address": addr,
-            "decimals": decimals,
-        }
         try:
 
             self.cfg.logger.debug(
-                f"[events.managers.contracts._get_and_save_token_info_from_contract] Adding new token {symbol} to {tokens_filepath}"
+                f"[events.managers.contracts._get_and_save_token_info_from_contract] Adding new token {symbol} to {token_store.path}"
             )
         except UnicodeEncodeError:
             raise self.FailedToGetTokenDetailsException(addr=addr)
 
-        row = pd.DataFrame(new_data, columns=token_data.columns, index=[1])
-        if not os.path.exists(
-            os.path.normpath(
-                f"{self.prefix_path}fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/token_detail"
-            )
-        ):
-            try:
-                os.mkdir(
-                    os.path.normpath(
-                        f"{self.prefix_path}fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/token_detail"
-                    )
-                )
-            except FileExistsError:
-                pass
-
-        if not self.read_only:
-            collision_safety = str(random.randrange(1, 1000))
-            ts = datetime.now().strftime("%d-%H-%M-%S-%f")
-            ts += collision_safety
-            row.to_csv(
-                os.path.normpath(
-                    f"{self.prefix_path}fastlane_bot/data/blockchain_data/{self.cfg.NETWORK}/token_detail/{ts}.csv"
-                ),
-                index=False,
-            )
+        token_store.add(addr, symbol, decimals)
 
         return (symbol, decimals)
@@ -8,13 +8,97 @@ Contains the events manager module for handling event related functionality of d
 All rights reserved.
 Licensed under MIT.
 """
-from typing import Dict, Any, List, Type, Tuple
+import json
+from dataclasses import dataclass
+from typing import Dict, Any, List, Type, Tuple, Iterable, Hashable
 
+from eth_abi.exceptions import DecodingError
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
 from web3.contract import Contract
+from web3.exceptions import Web3Exception
 
+from fastlane_bot.events.log_fetcher import LogFetcher
 from fastlane_bot.events.managers.base import BaseManager
 
 
+@dataclass
+class TopicsLogFilter:
+    """
+    Fetches the logs of several event topics with a single ``eth_getLogs`` request.
+
+    If a log fetcher is given, the block range is split into chunks of adaptive size (one request per chunk). It
+    exposes the ``get_all_entries`` method of the web3 log filters, so it can be used in their place.
+
+    Attributes
+    ----------
+    w3 : Web3
+        The web3 instance.
+    events_by_topic : Dict[bytes, List[Any]]
+        The contract events, grouped by their topic.
+    from_block : int
+        The first block of the range.
+    to_block : int
+        The last block of the range.
+    log_fetcher : LogFetcher, optional
+        The log fetcher.
+    key : Hashable, optional
+        The key under which the log fetcher remembers the chunk size.
+    """
+
+    w3: Web3
+    events_by_topic: Dict[bytes, List[Any]]
+    from_block: int
+    to_block: int
+    log_fetcher: LogFetcher = None
+    key: Hashable = None
+
+    def filter_params(self, from_block: int, to_block: int) -> Dict[str, Any]:
+        """
+        The ``eth_getLogs`` parameters; the topics of all events are OR-ed in the first topic position.
+        """
+        return {
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [["0x" + topic.hex() for topic in self.events_by_topic]],
+        }
+
+    def get_logs(self, fromBlock: int, toBlock: int) -> List[Any]:
+        """
+        Fetches the raw logs of a block range.
+        """
+        return self.w3.eth.get_logs(self.filter_params(fromBlock, toBlock))
+
+    def get_all_entries(self) -> List[Any]:
+        """
+        Fetches the logs and decodes each of them with the events of its topic.
+
+        Returns
+        -------
+        List[Any]
+            The decoded events.
+        """
+        if not self.events_by_topic:
+            return []
+        if self.log_fetcher is None:
+            logs = self.get_logs(fromBlock=self.from_block, toBlock=self.to_block)
+        else:
+            logs = self.log_fetcher.get_logs(self.get_logs, self.from_block, self.to_block, key=self.key)
+        return [entry for log in logs for entry in self.decode_log(log)]
+
+    def decode_log(self, log: Any) -> List[Any]:
+        """
+        Decodes a log with every event of its topic whose ABI matches it.
+        """
+        entries = []
+        for event in self.events_by_topic.get(bytes(log["topics"][0]), []):
+            try:
+                entries.append(event.process_log(log))
+            except (Web3Exception, DecodingError):
+                continue
+        return entries
+
+
 class EventManager(BaseManager):
     @property
     def events(self) -> List[Contract]:
@@ -33,3 +117,63 @@ class EventManager(BaseManager):
                 self.event_contracts[exchange.exchange_name]
             )
         ]
+
+    def get_events_by_topic(self, excluded_events: Iterable[str] = ()) -> Dict[bytes, List[Any]]:
+        """
+        Get the events from the exchanges, grouped by topic.
+
+        Each exchange declares in `get_events` the minimal set of events needed to reconstruct the state of its
+        pools. Forks of the same exchange share their events, so every topic is only listed once, with one event per
+        distinct ABI (events with the same signature may differ in their argument names or indexing).
+
+        Parameters
+        ----------
+        excluded_events : Iterable[str], optional
+            The names of the events to leave out.
+
+        Returns
+        -------
+        Dict[bytes, List[Any]]
+            The events for each topic.
+        """
+        excluded_events = set(excluded_events)
+        events_by_topic = {}
+        abis = set()
+        for event in self.events:
+            event = event()
+            abi = json.dumps(event.abi, sort_keys=True)
+            if event.event_name in excluded_events or abi in abis:
+                continue
+            abis.add(abi)
+            events_by_topic.setdefault(event_abi_to_log_topic(event.abi), []).append(event)
+        return events_by_topic
+
+    def get_topics_log_filter(
+        self, from_block: int, to_block: int, excluded_events: Iterable[str] = ()
+    ) -> TopicsLogFilter:
+        """
+        Get a filter fetching the events of all exchanges in the block range with a single request per chunk of
+        blocks, the chunk size being adapted by the log fetcher of the manager.
+
+        Parameters
+        ----------
+        from_block : int
+            The first block of the range.
+        to_block : int
+            The last block of the range.
+        excluded_events : Iterable[str], optional
+            The names of the events to leave out.
+
+        Returns
+        -------
+        TopicsLogFilter
+            The log filter.
+        """
+        return TopicsLogFilter(
+            w3=self.web3,
+            events_by_topic=self.get_events_by_topic(excluded_events),
+            from_block=from_block,
+            to_block=to_block,
+            log_fetcher=self.log_fetcher,
+            key=self.cfg.NETWORK,
+        )
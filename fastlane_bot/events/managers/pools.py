@@ -395,6 +395,7 @@ class PoolManager(BaseManager):
         for pool in self.pool_data:
             if pool["cid"] == pool_info["cid"]:
                 pool.update(data)
+                self.pool_data.touch()
                 break
 
     def get_or_init_pool(self, pool_info: Dict[str, Any]) -> Pool:
@@ -18,85 +18,14 @@ from fastlane_bot.config.multicaller import MultiCaller
 from fastlane_bot.data.abi import ERC20_ABI
 from fastlane_bot.events.pools import CarbonV1Pool
 from fastlane_bot.events.pools.base import Pool
-
-ONE = 2 ** 48
-
-
-def bit_length(value: int) -> int:
-    """
-    Get the bit length of a value.
-
-    Parameters
-    ----------
-    value: int
-        The value to get the bit length of.
-
-    Returns
-    -------
-    int
-        The bit length of the value.
-
-    """
-
-    return len(bin(value).lstrip("0b")) if value > 0 else 0
-
-
-def encode_float(value: int) -> int:
-    """
-    Encode a float value.
-
-    Parameters
-    ----------
-    value: int
-        The value to encode.
-
-    Returns
-    -------
-    int
-        The encoded value.
-
-    """
-    exponent = bit_length(value // ONE)
-    mantissa = value >> exponent
-    return mantissa | (exponent * ONE)
-
-
-def encode_rate(value: int) -> int:
-    """
-    Encode a rate value.
-
-    Parameters
-    ----------
-    value: int
-        The value to encode.
-
-    Returns
-    -------
-    int
-        The encoded value.
-
-    """
-    data = int(value.sqrt() * ONE)
-    length = bit_length(data // ONE)
-    return (data >> length) << length
-
-
-def encode_token_price(price: Decimal) -> int:
-    """
-    Encode a token price.
-
-    Parameters
-    ----------
-    price: Decimal
-        The price to encode.
-
-    Returns
-    -------
-    int
-        The encoded price.
-
-    """
-    return encode_float(encode_rate((price)))
+from fastlane_bot.helpers.carboncalc import CarbonCalculator
+
+# the Carbon encoding functions live with the rest of the Carbon order math
+ONE = CarbonCalculator.ONE
+bit_length = CarbonCalculator.bit_length
+encode_float = CarbonCalculator.encode_float
+encode_rate = CarbonCalculator.encode_rate
+encode_token_price = CarbonCalculator.encode_token_price
 
 
 def get_pools_for_exchange(exchange: str, mgr: Any) -> [Any]:
@@ -0,0 +1,123 @@
+"""
+Pool data list which keeps track of its changes and of its duplicate cids
+
+The pool data of the manager is a ``PoolDataList``: a list of pool dicts which increments a version counter on every
+change, and counts the pools per cid as they are added and removed. Checking whether the state changed during an
+iteration, or whether it contains duplicate cids, is then O(1) instead of a copy, a sort or a scan of all the pools.
+
+The changes made in place to the pool dicts (e.g., ``pool.update(data)``) are not visible to the list, and must be
+reported with ``touch``.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+__VERSION__ = "1.0"
+__DATE__ = "18/Oct/2026"
+
+from collections import Counter
+from typing import Any, Dict, Iterable, Set
+
+
+class PoolDataList(list):
+    """
+    A list of pool dicts which keeps track of its changes and of its duplicate cids.
+
+    :version:           the number of changes made to the list (or reported with ``touch``)
+    :duplicate_cids:    the cids of more than one pool of the list
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    def __init__(self, pools: Iterable[Dict[str, Any]] = (), version: int = 0):
+        super().__init__(pools)
+        self.version = version
+        self._cid_counts = Counter()
+        self.duplicate_cids: Set[str] = set()
+        for pool in self:
+            self._add_cid(pool)
+
+    def __reduce__(self):
+        return self.__class__, (list(self), self.version)
+
+    def _add_cid(self, pool: Dict[str, Any]):
+        cid = pool.get("cid")
+        self._cid_counts[cid] += 1
+        if self._cid_counts[cid] > 1:
+            self.duplicate_cids.add(cid)
+
+    def _remove_cid(self, pool: Dict[str, Any]):
+        cid = pool.get("cid")
+        self._cid_counts[cid] -= 1
+        if self._cid_counts[cid] <= 1:
+            self.duplicate_cids.discard(cid)
+        if self._cid_counts[cid] <= 0:
+            del self._cid_counts[cid]
+
+    def touch(self):
+        """
+        Reports a change made in place to a pool of the list.
+        """
+        self.version += 1
+
+    def __setitem__(self, index, value):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        added = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, added if isinstance(index, slice) else value)
+        for pool in removed:
+            self._remove_cid(pool)
+        for pool in added:
+            self._add_cid(pool)
+        self.touch()
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for pool in removed:
+            self._remove_cid(pool)
+        self.touch()
+
+    def __iadd__(self, pools: Iterable[Dict[str, Any]]):
+        self.extend(pools)
+        return self
+
+    def append(self, pool: Dict[str, Any]):
+        super().append(pool)
+        self._add_cid(pool)
+        self.touch()
+
+    def extend(self, pools: Iterable[Dict[str, Any]]):
+        for pool in pools:
+            self.append(pool)
+
+    def insert(self, index: int, pool: Dict[str, Any]):
+        super().insert(index, pool)
+        self._add_cid(pool)
+        self.touch()
+
+    def pop(self, index: int = -1) -> Dict[str, Any]:
+        pool = super().pop(index)
+        self._remove_cid(pool)
+        self.touch()
+        return pool
+
+    def remove(self, pool: Dict[str, Any]):
+        super().remove(pool)
+        self._remove_cid(pool)
+        self.touch()
+
+    def clear(self):
+        super().clear()
+        self._cid_counts.clear()
+        self.duplicate_cids.clear()
+        self.touch()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.touch()
+
+    def reverse(self):
+        super().reverse()
+        self.touch()
@@ -18,6 +18,7 @@ import web3.exceptions
 
 from fastlane_bot.data.abi import ERC20_ABI, BANCOR_POL_ABI
 from fastlane_bot.events.pools.base import Pool
+from fastlane_bot.helpers.carboncalc import CarbonCalculator
 from _decimal import Decimal
 
 
@@ -176,21 +177,8 @@ class BancorPolPool(Pool):
 
 
     @staticmethod
-    def bitLength(value):
-        return len(bin(value).lstrip("0b")) if value > 0 else 0
-
-    def encodeFloat(self, value):
-        exponent = self.bitLength(value // self.ONE)
-        mantissa = value >> exponent
-        return mantissa | (exponent * self.ONE)
-
-    def encodeRate(self, value):
-        data = int(value.sqrt() * self.ONE)
-        length = self.bitLength(data // self.ONE)
-        return (data >> length) << length
-
-    def encode_token_price(self, price):
-        return self.encodeFloat(self.encodeRate((price)))
+    def encode_token_price(price):
+        return CarbonCalculator.encode_token_price(price)
 
     def update_erc20_balance(self, token_contract, address) -> dict:
         """
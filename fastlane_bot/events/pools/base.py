@@ -59,6 +59,24 @@ class Pool(ABC):
         """
         pass
 
+    @staticmethod
+    def is_incremental_event(event: Dict[str, Any]) -> bool:
+        """
+        Check if an event changes the pool state incrementally rather than setting it. All such events must be
+        processed, rather than only the latest event of the pool.
+
+        Parameters
+        ----------
+        event : Dict[str, Any]
+            The event.
+
+        Returns
+        -------
+        bool
+            True if the event is incremental, False otherwise.
+        """
+        return False
+
     @staticmethod
     def get_common_data(
         event: Dict[str, Any], pool_info: Dict[str, Any]
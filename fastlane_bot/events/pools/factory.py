@@ -70,6 +70,8 @@ class PoolFactory:
             extras['fee'] = cfg.UNI_V2_FEE_MAPPING[exchange_name]
         elif exchange_name in cfg.UNI_V3_FORKS:
             extras['router_address'] = cfg.UNI_V3_ROUTER_MAPPING[exchange_name]
+            extras['tick_words'] = cfg.UNI_V3_TICK_WORDS
+            extras['multicall_address'] = cfg.MULTICALL_CONTRACT_ADDRESS
         elif exchange_name in cfg.SOLIDLY_V2_FORKS:
             extras['router_address'] = cfg.SOLIDLY_V2_ROUTER_MAPPING[exchange_name]
         elif exchange_name in cfg.CARBON_V1_FORKS:
@@ -9,10 +9,14 @@ All rights reserved.
 Licensed under MIT.
 """
 from dataclasses import dataclass
+from threading import Lock
 from typing import Dict, Any, List
 
+from eth_abi import decode
 from web3.contract import Contract
 
+from fastlane_bot.config.multicaller import get_output_types_from_abi
+from fastlane_bot.data.abi import MULTICALL_ABI
 from fastlane_bot.events.pools.base import Pool
 
 
@@ -20,10 +24,24 @@ from fastlane_bot.events.pools.base import Pool
 class UniswapV3Pool(Pool):
     """
     Class representing a Uniswap v3 pool.
+
+    If `tick_words` is set, the state also holds the `ticks` of the pool, ie the sorted [tick, liquidityNet] pairs of
+    the initialized ticks within `tick_words` bitmap words (of 256 ticks each) on either side of the current tick. The
+    bounds of that window are always included (with a liquidityNet of 0 unless initialized), so that the ticks describe
+    the liquidity of the pool across the whole window. The ticks are read from the contract with two multicalls and
+    kept up to date with the Mint and Burn events.
     """
     base_exchange_name: str = "uniswap_v3"
     exchange_name: str = "uniswap_v3"
     router_address: str = None
+    tick_words: int = 0
+    multicall_address: str = None
+
+    MIN_TICK = -887272
+    MAX_TICK = 887272
+
+    # the events are processed in parallel threads, and the Mint and Burn events of a pool update the same ticks
+    _ticks_lock = Lock()
 
     @staticmethod
     def unique_key() -> str:
@@ -41,16 +59,26 @@ class UniswapV3Pool(Pool):
         """
         event_args = event["args"]
         return (
-            "sqrtPriceX96" in event_args
+            ("sqrtPriceX96" in event_args or "tickLower" in event_args)
             and event["address"] in static_pools[f"{exchange_name}_pools"]
         )
 
+    @staticmethod
+    def is_incremental_event(event: Dict[str, Any]) -> bool:
+        """
+        See base class.
+        """
+        return "tickLower" in event["args"]
+
     def update_from_event(
         self, event_args: Dict[str, Any], data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         See base class.
         """
+        if self.is_incremental_event(event_args):
+            return self.update_ticks_from_event(event_args, data)
+
         event_args = event_args["args"]
         data["liquidity"] = event_args["liquidity"]
         data["sqrt_price_q96"] = event_args["sqrtPriceX96"]
@@ -72,6 +100,172 @@ class UniswapV3Pool(Pool):
             print(f"[pools.update_from_event] Exception: {e}")
         return data
 
+    def update_ticks_from_event(
+        self, event: Dict[str, Any], data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Update the liquidity net of the ticks of the pool from a Mint or Burn event.
+
+        The ticks outside of the tracked window are ignored. The current liquidity is not changed, it is set by the
+        Swap events (the events of a pool may be processed in any order).
+
+        Parameters
+        ----------
+        event : Dict[str, Any]
+            The Mint or Burn event.
+        data : Dict[str, Any]
+            The pool data.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The updated pool data.
+        """
+        event_args = event["args"]
+        amount = event_args["amount"] if event["event"] == "Mint" else -event_args["amount"]
+        with self._ticks_lock:
+            ticks = self.state.get("ticks")
+            if not isinstance(ticks, list) or not ticks:
+                return data
+
+            liquidity_net = dict(ticks)
+            for tick, delta in [(event_args["tickLower"], amount), (event_args["tickUpper"], -amount)]:
+                if ticks[0][0] <= tick <= ticks[-1][0]:
+                    liquidity_net[tick] = liquidity_net.get(tick, 0) + delta
+            data["ticks"] = [[tick, net] for tick, net in sorted(liquidity_net.items())]
+
+            for key, value in data.items():
+                self.state[key] = value
+        return data
+
+    @staticmethod
+    def ticks_from_bitmap(word: int, bitmap: int, tick_spacing: int) -> List[int]:
+        """
+        Get the initialized ticks of a tick bitmap word.
+
+        Parameters
+        ----------
+        word : int
+            The position of the word (the compressed tick, ie tick // tick_spacing, shifted right by 8 bits).
+        bitmap : int
+            The word of the tick bitmap.
+        tick_spacing : int
+            The tick spacing of the pool.
+
+        Returns
+        -------
+        List[int]
+            The initialized ticks, in ascending order.
+        """
+        ticks = []
+        while bitmap:
+            bit = (bitmap & -bitmap).bit_length() - 1
+            ticks.append((word * 256 + bit) * tick_spacing)
+            bitmap &= bitmap - 1
+        return ticks
+
+    def get_ticks(
+        self, contract: Contract, tick: int, tick_spacing: int, block_number: Any = "latest"
+    ) -> List[List[int]]:
+        """
+        Get the liquidity net of the initialized ticks within `tick_words` bitmap words of the current tick.
+
+        The bitmap words are read with one multicall, and the initialized ticks they contain with another.
+
+        Parameters
+        ----------
+        contract : Contract
+            The pool contract.
+        tick : int
+            The current tick.
+        tick_spacing : int
+            The tick spacing of the pool.
+        block_number : Any, optional
+            The block at which the ticks are read (the block of the current tick), by default "latest".
+
+        Returns
+        -------
+        List[List[int]]
+            The sorted [tick, liquidityNet] pairs, including the bounds of the window.
+        """
+        words = self._tick_words(tick, tick_spacing)
+        bitmaps = self._multicall(contract, "tickBitmap", words, block_number)
+        initialized = self._initialized_ticks(words, bitmaps, tick_spacing)
+        ticks = self._multicall(contract, "ticks", initialized, block_number) if initialized else []
+        return self._liquidity_net(words, tick_spacing, initialized, ticks)
+
+    async def async_get_ticks(
+        self, contract: Contract, tick: int, tick_spacing: int, block_number: Any = "latest"
+    ) -> List[List[int]]:
+        """
+        See `get_ticks`.
+        """
+        words = self._tick_words(tick, tick_spacing)
+        bitmaps = await self._async_multicall(contract, "tickBitmap", words, block_number)
+        initialized = self._initialized_ticks(words, bitmaps, tick_spacing)
+        ticks = await self._async_multicall(contract, "ticks", initialized, block_number) if initialized else []
+        return self._liquidity_net(words, tick_spacing, initialized, ticks)
+
+    def _tick_words(self, tick: int, tick_spacing: int) -> List[int]:
+        """
+        Get the positions of the bitmap words within `tick_words` words of the current tick.
+        """
+        word = (tick // tick_spacing) >> 8
+        return list(range(word - self.tick_words, word + self.tick_words + 1))
+
+    def _initialized_ticks(self, words: List[int], bitmaps: List[tuple], tick_spacing: int) -> List[int]:
+        """
+        Get the initialized ticks of the bitmap words.
+        """
+        return [
+            tick
+            for word, (bitmap,) in zip(words, bitmaps)
+            for tick in self.ticks_from_bitmap(word, bitmap, tick_spacing)
+        ]
+
+    def _liquidity_net(
+        self, words: List[int], tick_spacing: int, initialized: List[int], ticks: List[tuple]
+    ) -> List[List[int]]:
+        """
+        Get the sorted [tick, liquidityNet] pairs of the initialized ticks, including the bounds of the window.
+        """
+        liquidity_net = {
+            max(words[0] * 256 * tick_spacing, self.MIN_TICK): 0,
+            min((words[-1] + 1) * 256 * tick_spacing, self.MAX_TICK): 0,
+        }
+        liquidity_net.update({tick: tick_info[1] for tick, tick_info in zip(initialized, ticks)})
+        return [[tick, net] for tick, net in sorted(liquidity_net.items())]
+
+    def _aggregate(self, contract: Contract, fn_name: str, args: List[Any]):
+        """
+        Get the multicall which calls a function of the pool contract once for each argument.
+        """
+        w3 = contract.w3
+        multicall = w3.eth.contract(address=w3.to_checksum_address(self.multicall_address), abi=MULTICALL_ABI)
+        calls = [
+            {"target": contract.address, "callData": contract.functions[fn_name](arg)._encode_transaction_data()}
+            for arg in args
+        ]
+        return multicall.functions.aggregate(calls)
+
+    def _multicall(self, contract: Contract, fn_name: str, args: List[Any], block_number: Any = "latest") -> List[tuple]:
+        """
+        Call a function of the pool contract once for each argument, with a single multicall.
+        """
+        _, results = self._aggregate(contract, fn_name, args).call(block_identifier=block_number)
+        output_types = get_output_types_from_abi(contract.abi, fn_name)
+        return [decode(output_types, result) for result in results]
+
+    async def _async_multicall(
+        self, contract: Contract, fn_name: str, args: List[Any], block_number: Any = "latest"
+    ) -> List[tuple]:
+        """
+        See `_multicall`.
+        """
+        _, results = await self._aggregate(contract, fn_name, args).call(block_identifier=block_number)
+        output_types = get_output_types_from_abi(contract.abi, fn_name)
+        return [decode(output_types, result) for result in results]
+
     def update_from_contract(
         self,
         contract: Contract,
@@ -82,20 +276,27 @@ class UniswapV3Pool(Pool):
     ) -> Dict[str, Any]:
         """
         See base class.
+
+        If the ticks are tracked, the pool state and the ticks are all read at the same block.
         """
-        slot0 = contract.caller.slot0()
-        fee = contract.caller.fee()
+        fetch_ticks = bool(self.tick_words and self.multicall_address)
+        block_number = contract.w3.eth.block_number if fetch_ticks else "latest"
+        caller = contract.caller(block_identifier=block_number) if fetch_ticks else contract.caller
+        slot0 = caller.slot0()
+        fee = caller.fee()
         params = {
             "tick": slot0[1],
             "sqrt_price_q96": slot0[0],
-            "liquidity": contract.caller.liquidity(),
+            "liquidity": caller.liquidity(),
             "fee": fee,
             "fee_float": fee / 1e6,
-            "tick_spacing": contract.caller.tickSpacing(),
+            "tick_spacing": caller.tickSpacing(),
             "exchange_name": self.state["exchange_name"],
             "address": self.state["address"],
             "router": self.router_address,
         }
+        if fetch_ticks:
+            params["ticks"] = self.get_ticks(contract, params["tick"], params["tick_spacing"], block_number)
         for key, value in params.items():
             self.state[key] = value
         return params
@@ -110,21 +311,28 @@ class UniswapV3Pool(Pool):
     ) -> Dict[str, Any]:
         """
         See base class.
+
+        If the ticks are tracked, the pool state and the ticks are all read at the same block.
         """
-        fee = await contract.caller.fee()
-        slot0 = await contract.caller.slot0()
+        fetch_ticks = bool(self.tick_words and self.multicall_address)
+        block_number = await contract.w3.eth.block_number if fetch_ticks else "latest"
+        caller = contract.caller(block_identifier=block_number) if fetch_ticks else contract.caller
+        fee = await caller.fee()
+        slot0 = await caller.slot0()
 
         params = {
             "tick": slot0[1],
             "sqrt_price_q96": slot0[0],
-            "liquidity": await contract.caller.liquidity(),
+            "liquidity": await caller.liquidity(),
             "fee": fee,
             "fee_float": fee / 1e6,
-            "tick_spacing": await contract.caller.tickSpacing(),
+            "tick_spacing": await caller.tickSpacing(),
             "exchange_name": self.state["exchange_name"],
             "address": self.state["address"],
             "router": self.router_address,
         }
+        if fetch_ticks:
+            params["ticks"] = await self.async_get_ticks(contract, params["tick"], params["tick_spacing"], block_number)
         for key, value in params.items():
             self.state[key] = value
         return params
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Runs the terraformer in a background thread
+
+The periodic discovery of new pools takes minutes, during which the main loop would otherwise stop looking for
+arbitrage. The ``TerraformerWorker`` runs it in a background thread, and publishes the pools discovered (i.e., the new
+entries of the event mappings) as a ``TerraformerDelta``, which the main loop merges at the next block boundary.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+__VERSION__ = "1.0"
+__DATE__ = "18/Oct/2026"
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+
+@dataclass
+class TerraformerDelta:
+    """
+    The event mappings (address -> exchange name) of the pools discovered by a terraformer run.
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    uniswap_v2_event_mappings: Dict[str, str] = field(default_factory=dict)
+    uniswap_v3_event_mappings: Dict[str, str] = field(default_factory=dict)
+    solidly_v2_event_mappings: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self):
+        return (
+            len(self.uniswap_v2_event_mappings)
+            + len(self.uniswap_v3_event_mappings)
+            + len(self.solidly_v2_event_mappings)
+        )
+
+    @property
+    def event_mappings(self) -> Dict[str, str]:
+        """
+        All the new event mappings.
+        """
+        return {**self.uniswap_v2_event_mappings, **self.uniswap_v3_event_mappings, **self.solidly_v2_event_mappings}
+
+    @staticmethod
+    def new_event_mappings(mappings_df: pd.DataFrame, known_addresses: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the mappings of a terraformer mappings dataframe whose address is not known yet.
+        """
+        known_addresses = set(known_addresses)
+        return {
+            address: exchange
+            for address, exchange in mappings_df[["address", "exchange"]].values
+            if address not in known_addresses
+        }
+
+    @classmethod
+    def from_terraformer_result(cls, result: tuple, known_addresses: Iterable[str]) -> "TerraformerDelta":
+        """
+        Creates the delta from the result of ``terraform_blockchain``, relative to the known pool addresses.
+        """
+        _, uniswap_v2_mapdf, uniswap_v3_mapdf, solidly_v2_mapdf = result
+        known_addresses = set(known_addresses)
+        return cls(
+            uniswap_v2_event_mappings=cls.new_event_mappings(uniswap_v2_mapdf, known_addresses),
+            uniswap_v3_event_mappings=cls.new_event_mappings(uniswap_v3_mapdf, known_addresses),
+            solidly_v2_event_mappings=cls.new_event_mappings(solidly_v2_mapdf, known_addresses),
+        )
+
+
+@dataclass
+class TerraformerWorker:
+    """
+    Runs ``terraform_blockchain`` in a background thread, at most one run at a time.
+
+    :terraform:     the terraformer function (``run_blockchain_terraformer.terraform_blockchain``)
+    :logger:        the logger
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    terraform: Callable[..., tuple]
+    logger: Any = None
+    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+    _delta: Optional[TerraformerDelta] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, known_addresses: Iterable[str], **kwargs) -> bool:
+        """
+        Starts a terraformer run in the background, unless one is already running.
+
+        :known_addresses:   the addresses of the pools already known (a snapshot is taken)
+        :kwargs:            the arguments of the terraformer function
+        :returns:           True if a run was started
+        """
+        if self.is_running:
+            return False
+        self._thread = threading.Thread(
+            target=self._run, args=(set(known_addresses), kwargs), name="terraformer", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, known_addresses: set, kwargs: Dict[str, Any]):
+        try:
+            delta = TerraformerDelta.from_terraformer_result(self.terraform(**kwargs), known_addresses)
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.error(f"[events.terraformer_worker] Terraforming failed: {e}")
+            return
+        with self._lock:
+            if self._delta is None:
+                self._delta = delta
+            else:
+                for name in ["uniswap_v2_event_mappings", "uniswap_v3_event_mappings", "solidly_v2_event_mappings"]:
+                    getattr(self._delta, name).update(getattr(delta, name))
+
+    def pop_delta(self) -> Optional[TerraformerDelta]:
+        """
+        Returns the delta published by the last run(s) which has not been merged yet (None if there is none).
+        """
+        with self._lock:
+            delta, self._delta = self._delta, None
+        return delta
+
+    def join(self, timeout: float = None):
+        """
+        Waits for the current run to finish.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
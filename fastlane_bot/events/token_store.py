@@ -0,0 +1,201 @@
+"""
+Keyed store of the token metadata (symbol and decimals) of the tokens CSV
+
+The tokens CSV of a network is loaded once per process into a ``TokenStore``, which is keyed by token address and
+updated in place. Only the tokens added since the last write are appended to the CSV. The metadata of unknown tokens
+is fetched in batches with the ``tryAggregate`` function of the multicall contract of the network
+(``MULTICALL_CONTRACT_ADDRESS``, Multicall2 or Multicall3), instead of two calls per token.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+__VERSION__ = "1.1"
+__DATE__ = "19/Oct/2026"
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from eth_abi import decode
+from web3 import Web3
+
+from fastlane_bot.data.abi import MULTICALL3_ABI
+
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")  # decimals()
+SYMBOL_SELECTOR = bytes.fromhex("95d89b41")  # symbol()
+TOKEN_STORE_COLUMNS = ["address", "decimals", "symbol"]
+
+_TOKEN_STORES = {}
+_TOKEN_STORES_LOCK = threading.Lock()
+
+
+def decode_decimals(success: bool, data: bytes) -> Optional[int]:
+    """
+    Decodes the result of a ``decimals()`` call (None if the call failed or returned an invalid value).
+    """
+    if not success or len(data) < 32:
+        return None
+    decimals = decode(["uint256"], data[:32])[0]
+    return decimals if decimals < 256 else None
+
+
+def decode_symbol(success: bool, data: bytes) -> Optional[str]:
+    """
+    Decodes the result of a ``symbol()`` call, returned either as a string or as a bytes32 (None if the call failed).
+    """
+    if not success or len(data) < 32:
+        return None
+    try:
+        symbol = decode(["string"], data)[0]
+    except Exception:
+        symbol = data[:32].rstrip(b"\x00").decode("utf-8", errors="ignore")
+    return symbol.replace(os.linesep, "") or "???"
+
+
+def fetch_token_details(
+    web3: Web3,
+    addresses: Iterable[str],
+    multicall_address: str,
+    batch_size: int = 500,
+) -> Dict[str, Tuple[Optional[str], Optional[int]]]:
+    """
+    Fetches the symbol and decimals of tokens with batched multicalls.
+
+    :web3:                  the web3 instance
+    :addresses:             the token addresses
+    :multicall_address:     the address of the multicall contract (``cfg.MULTICALL_CONTRACT_ADDRESS``)
+    :batch_size:            the number of tokens per multicall
+    :returns:               the (symbol, decimals) of each token whose batch succeeded; either may be None if the
+                            corresponding call of the token failed; empty if the network has no multicall contract
+    """
+    if not multicall_address:
+        return {}
+    addresses = list(dict.fromkeys(web3.to_checksum_address(address) for address in addresses))
+    multicall = web3.eth.contract(address=web3.to_checksum_address(multicall_address), abi=MULTICALL3_ABI)
+    details = {}
+    for i in range(0, len(addresses), batch_size):
+        batch = addresses[i : i + batch_size]
+        calls = [(address, selector) for address in batch for selector in [SYMBOL_SELECTOR, DECIMALS_SELECTOR]]
+        try:
+            results = multicall.functions.tryAggregate(False, calls).call()
+        except Exception:
+            continue
+        for n, address in enumerate(batch):
+            details[address] = (decode_symbol(*results[2 * n]), decode_decimals(*results[2 * n + 1]))
+    return details
+
+
+@dataclass
+class TokenStore:
+    """
+    The token metadata of a tokens CSV, keyed by address.
+
+    :path:          the path of the tokens CSV
+    :tokens:        the token record (a dict with at least the address, decimals and symbol) per address
+    :records:       the token records, in the order of the CSV followed by the order in which they were added
+    """
+
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    path: str = None
+    tokens: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    _new_records: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "TokenStore":
+        """
+        Reads the tokens CSV (the store is empty if it does not exist).
+        """
+        store = cls(path=path)
+        if os.path.exists(path):
+            for record in pd.read_csv(path, index_col=False).to_dict(orient="records"):
+                store._add_record(record)
+        return store
+
+    @classmethod
+    def load(cls, path: str) -> "TokenStore":
+        """
+        Returns the store of the tokens CSV, which is only read the first time it is loaded in the process.
+        """
+        path = os.path.normpath(path)
+        with _TOKEN_STORES_LOCK:
+            if path not in _TOKEN_STORES:
+                _TOKEN_STORES[path] = cls.from_csv(path)
+            return _TOKEN_STORES[path]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self.tokens
+
+    def get(self, address: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the record of the token (None if it is not known).
+        """
+        return self.tokens.get(address)
+
+    def _add_record(self, record: Dict[str, Any]) -> bool:
+        if record["address"] in self.tokens:
+            return False
+        self.tokens[record["address"]] = record
+        self.records.append(record)
+        return True
+
+    def add(self, address: str, symbol: str, decimals: int, **kwargs) -> bool:
+        """
+        Adds a token, unless it is already known.
+
+        :returns:   True if the token was added
+        """
+        record = {"address": address, "decimals": decimals, "symbol": symbol, **kwargs}
+        with self._lock:
+            added = self._add_record(record)
+            if added:
+                self._new_records.append(record)
+        return added
+
+    def add_missing(
+        self, web3: Web3, addresses: Iterable[str], multicall_address: str
+    ) -> Dict[str, Tuple[Optional[str], Optional[int]]]:
+        """
+        Fetches the metadata of the unknown tokens with batched multicalls, and adds those with a valid symbol and decimals.
+
+        :returns:   the fetched (symbol, decimals) of each unknown token whose batch succeeded
+        """
+        missing = [address for address in dict.fromkeys(addresses) if address not in self.tokens]
+        if not missing:
+            return {}
+        details = fetch_token_details(web3, missing, multicall_address)
+        for address, (symbol, decimals) in details.items():
+            if symbol is not None and decimals is not None:
+                self.add(address, symbol, decimals)
+        return details
+
+    def flush(self):
+        """
+        Appends the tokens added since the last flush to the CSV (in the column order of the CSV if it exists).
+        """
+        with self._lock:
+            new_records, self._new_records = self._new_records, []
+        if not new_records:
+            return
+        df = pd.DataFrame(new_records)
+        try:
+            if os.path.exists(self.path):
+                columns = pd.read_csv(self.path, nrows=0).columns
+                df.reindex(columns=columns).to_csv(self.path, mode="a", header=False, index=False)
+            else:
+                columns = TOKEN_STORE_COLUMNS + [c for c in df.columns if c not in TOKEN_STORE_COLUMNS]
+                df.reindex(columns=columns).to_csv(self.path, index=False)
+        except Exception:
+            with self._lock:
+                self._new_records = new_records + self._new_records
+            raise
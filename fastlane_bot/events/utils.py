@@ -9,13 +9,15 @@ All rights reserved.
 Licensed under MIT.
 """
 import base64
+import hashlib
 import json
 import os
+import pickle
 import random
 import time
 from _decimal import Decimal
 from glob import glob
-from typing import Any, Union, Dict, Set, Tuple, Hashable
+from typing import Any, Union, Dict, Set, Tuple, Hashable, Iterable
 from typing import List
 
 import numpy as np
@@ -32,45 +34,64 @@ from fastlane_bot.data.abi import FAST_LANE_CONTRACT_ABI
 from fastlane_bot.exceptions import ReadOnlyException
 from fastlane_bot.events.interface import QueryInterface
 from fastlane_bot.events.managers.manager import Manager
+from fastlane_bot.events.terraformer_worker import TerraformerDelta
+from fastlane_bot.events.token_store import TokenStore
+from fastlane_bot.events.keyed_dataset import (
+    read_keyed_csv,
+    STATIC_POOL_DATA_KEY,
+    EVENT_MAPPINGS_KEY,
+)
 
 from fastlane_bot.helpers import TxHelpers
 from fastlane_bot.utils import safe_int
 
 
 def filter_latest_events(
-    mgr: Manager, events: List[List[AttributeDict]]
+    mgr: Manager,
+    events: List[List[AttributeDict]],
+    excluded_exchanges: Iterable[str] = (),
+    normalize: bool = False,
 ) -> List[AttributeDict]:
     """
     This function filters out the latest events for each pool. Given a nested list of events, it iterates through all events
     and keeps track of the latest event (i.e., with the highest block number) for each pool. The key used to identify each pool
-    is derived from the event data using manager's methods.
+    is derived from the event data using manager's methods. The incremental events (see `Pool.is_incremental_event`) are
+    all kept, in their original order, after the latest events.
 
     Args:
         mgr (Base): A Base object that provides methods to handle events and their related pools.
         events (List[List[AttributeDict]]): A nested list of events, where each event is an AttributeDict that includes
         the event data and associated metadata.
+        excluded_exchanges (Iterable[str]): Exchanges whose events are dropped (e.g. the exchanges whose events are
+        fetched from Tenderly instead).
+        normalize (bool): If True, the latest events are converted to plain dicts with `normalize_event`. Only the events
+        which are kept are converted, all others are discarded without conversion.
 
     Returns:
-        List[AttributeDict]: A list of events, each representing the latest event for its corresponding pool.
+        List[AttributeDict]: A list of events, each representing the latest event for its corresponding pool, followed by
+        the incremental events.
     """
     latest_entry_per_pool = {}
-    all_events = [event for event_list in events for event in event_list]
-
-    # Handles the case where multiple pools are created in the same block
-    all_events.reverse()
+    incremental_events = []
+    excluded_exchanges = set(excluded_exchanges)
 
     bancor_v2_anchor_addresses = {
         pool["anchor"] for pool in mgr.pool_data if pool["exchange_name"] == "bancor_v2"
     }
 
-    for event in all_events:
-        pool_type = mgr.pool_type_from_exchange_name(
-            mgr.exchange_name_from_event(event)
-        )
+    # Iterates in reverse order to handle the case where multiple pools are created in the same block
+    for event in (event for event_list in reversed(events) for event in reversed(event_list)):
+        exchange_name = mgr.exchange_name_from_event(event)
+        if exchange_name in excluded_exchanges:
+            continue
+        pool_type = mgr.pool_type_from_exchange_name(exchange_name)
         if pool_type:
             key = pool_type.unique_key()
         else:
             continue
+        if pool_type.is_incremental_event(event):
+            incremental_events.append(event)
+            continue
         if key == "cid":
             key = "id"
         elif key == "tkn1_address":
@@ -92,34 +113,15 @@ def filter_latest_events(
         ):
             continue
 
-        if unique_key in latest_entry_per_pool:
-            if event["blockNumber"] > latest_entry_per_pool[unique_key]["blockNumber"]:
-                latest_entry_per_pool[unique_key] = event
-            elif (
-                event["blockNumber"] == latest_entry_per_pool[unique_key]["blockNumber"]
-            ):
-                if (
-                    event["transactionIndex"]
-                    == latest_entry_per_pool[unique_key]["transactionIndex"]
-                ):
-                    if (
-                        event["logIndex"]
-                        > latest_entry_per_pool[unique_key]["logIndex"]
-                    ):
-                        latest_entry_per_pool[unique_key] = event
-                elif (
-                    event["transactionIndex"]
-                    > latest_entry_per_pool[unique_key]["transactionIndex"]
-                ):
-                    latest_entry_per_pool[unique_key] = event
-                else:
-                    continue
-            else:
-                continue
-        else:
-            latest_entry_per_pool[unique_key] = event
+        # The latest event is the one with the highest (block number, transaction index, log index)
+        position = (event["blockNumber"], event["transactionIndex"], event["logIndex"])
+        if unique_key not in latest_entry_per_pool or position > latest_entry_per_pool[unique_key][0]:
+            latest_entry_per_pool[unique_key] = (position, event)
 
-    return list(latest_entry_per_pool.values())
+    events = [event for _, event in latest_entry_per_pool.values()] + incremental_events[::-1]
+    if normalize:
+        return [normalize_event(event) for event in events]
+    return events
 
 
 def complex_handler(obj: Any) -> Union[Dict, str, List, Set, Any]:
@@ -153,6 +155,22 @@ def complex_handler(obj: Any) -> Union[Dict, str, List, Set, Any]:
         return obj
 
 
+def normalize_event(event: AttributeDict) -> Dict[str, Any]:
+    """
+    Converts a web3 event into a plain dict in a single pass.
+
+    The result is the same as ``complex_handler(complex_handler(event))``: the event and its args become dicts and the
+    HexBytes values of the event (e.g. the transaction hash) become hex strings.
+
+    Args:
+        event (AttributeDict): The event as returned by web3.
+
+    Returns:
+        Dict[str, Any]: The event as a plain dict.
+    """
+    return {k: complex_handler(v) for k, v in event.items()}
+
+
 def add_initial_pool_data(cfg: Config, mgr: Any, n_jobs: int = -1):
     """
     Adds initial pool data to the manager.
@@ -240,6 +258,59 @@ def get_tkn_symbols(flashloan_tokens, tokens: pd.DataFrame) -> List:
     return flashloan_tkn_symbols
 
 
+STATIC_DATA_CACHE_FILENAME = "static_data_cache.pkl"
+STATIC_DATA_CACHE_VERSION = 1
+
+
+def checksum_addresses(addresses: pd.Series) -> pd.Series:
+    """
+    Checksums a column of addresses, computing the checksum of each distinct address only once.
+
+    Parameters
+    ----------
+    addresses : pd.Series
+        The addresses.
+
+    Returns
+    -------
+    pd.Series
+        The checksummed addresses (missing addresses are left as is).
+
+    """
+    checksums = {
+        address: Web3.to_checksum_address(address)
+        for address in addresses.dropna().unique()
+    }
+    return addresses.map(checksums)
+
+
+def hash_files(filepaths: List[str]) -> str:
+    """
+    Hashes the contents of files (a missing file is hashed as such).
+
+    Parameters
+    ----------
+    filepaths : List[str]
+        The paths of the files.
+
+    Returns
+    -------
+    str
+        The hex digest of the hash.
+
+    """
+    file_hash = hashlib.sha256()
+    for filepath in filepaths:
+        file_hash.update(filepath.encode())
+        try:
+            with open(filepath, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    file_hash.update(chunk)
+        except FileNotFoundError:
+            file_hash.update(b"<missing>")
+    return file_hash.hexdigest()
+
+
 def get_static_data(
     cfg: Config,
     exchanges: List[str],
@@ -250,6 +321,9 @@ def get_static_data(
     """
     Helper function to get static pool data, tokens, and Uniswap v2 event mappings.
 
+    The processed (i.e., checksummed and typed) static data is cached on disk, and reused as long as the hash of the
+    static pool data, tokens and event mappings CSVs and the exchanges are unchanged.
+
     Parameters
     ----------
     cfg : Config
@@ -261,7 +335,7 @@ def get_static_data(
     static_pool_data_filename : str
         The filename of the static pool data CSV file.
     read_only : bool, optional
-        Whether to run the bot in read-only mode, by default False
+        Whether to run the bot in read-only mode (in which case the cache is read but not written), by default False
 
     Returns
     -------
@@ -270,34 +344,85 @@ def get_static_data(
 
     """
     base_path = os.path.normpath(f"fastlane_bot/data/blockchain_data/{blockchain}/")
-    # Read static pool data from CSV
+    cache_filepath = os.path.join(base_path, STATIC_DATA_CACHE_FILENAME)
+    cache_key = (
+        STATIC_DATA_CACHE_VERSION,
+        hash_files(
+            [
+                os.path.join(base_path, f"{static_pool_data_filename}.csv"),
+                os.path.join(base_path, "tokens.csv"),
+                os.path.join(base_path, "uniswap_v2_event_mappings.csv"),
+                os.path.join(base_path, "uniswap_v3_event_mappings.csv"),
+                os.path.join(base_path, "solidly_v2_event_mappings.csv"),
+            ]
+        ),
+        tuple(sorted(set(exchanges))),
+    )
+
+    try:
+        with open(cache_filepath, "rb") as f:
+            cache = pickle.load(f)
+        if cache["key"] == cache_key:
+            return cache["static_data"]
+    except Exception:
+        pass
+
+    static_data = _read_static_data(
+        cfg, exchanges, base_path, static_pool_data_filename, read_only
+    )
+
+    if not read_only:
+        try:
+            with open(cache_filepath + ".tmp", "wb") as f:
+                pickle.dump({"key": cache_key, "static_data": static_data}, f)
+            os.replace(cache_filepath + ".tmp", cache_filepath)
+        except OSError as e:
+            cfg.logger.warning(
+                f"[events.utils.get_static_data] Failed to cache the static data: {e}"
+            )
+
+    return static_data
+
+
+def _read_static_data(
+    cfg: Config,
+    exchanges: List[str],
+    base_path: str,
+    static_pool_data_filename: str,
+    read_only: bool,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """
+    Reads and processes the static pool data, tokens, and event mappings (see ``get_static_data``).
+    """
+    # Read static pool data from its keyed dataset (or from CSV if it is not in sync)
     static_pool_data_filepath = os.path.join(
         base_path, f"{static_pool_data_filename}.csv"
     )
-    static_pool_data = read_csv_file(static_pool_data_filepath)
+    static_pool_data = read_keyed_csv(
+        static_pool_data_filepath,
+        key=STATIC_POOL_DATA_KEY,
+        filters=[("exchange_name", "in", list(exchanges))],
+        read_only=read_only,
+    )
+    if static_pool_data is None:
+        static_pool_data = read_csv_file(static_pool_data_filepath)
     static_pool_data = static_pool_data[
         static_pool_data["exchange_name"].isin(exchanges)
-    ]
+    ].copy()
 
-    # Read Uniswap v2 event mappings and tokens
-    uniswap_v2_filepath = os.path.join(base_path, "uniswap_v2_event_mappings.csv")
-    uniswap_v2_event_mappings_df = read_csv_file(uniswap_v2_filepath)
-    uniswap_v2_event_mappings = dict(
-        uniswap_v2_event_mappings_df[["address", "exchange"]].values
-    )
+    def read_event_mappings(filename: str) -> Dict[str, str]:
+        filepath = os.path.join(base_path, filename)
+        event_mappings_df = read_keyed_csv(
+            filepath, key=EVENT_MAPPINGS_KEY, read_only=read_only
+        )
+        if event_mappings_df is None:
+            event_mappings_df = read_csv_file(filepath)
+        return dict(event_mappings_df[["address", "exchange"]].values)
 
-    # Read Uniswap v3 event mappings and tokens
-    uniswap_v3_filepath = os.path.join(base_path, "uniswap_v3_event_mappings.csv")
-    uniswap_v3_event_mappings_df = read_csv_file(uniswap_v3_filepath)
-    uniswap_v3_event_mappings = dict(
-        uniswap_v3_event_mappings_df[["address", "exchange"]].values
-    )
-    # Read Solidly v2 event mappings and tokens
-    solidly_v2_filepath = os.path.join(base_path, "solidly_v2_event_mappings.csv")
-    solidly_v2_event_mappings_df = read_csv_file(solidly_v2_filepath)
-    solidly_v2_event_mappings = dict(
-        solidly_v2_event_mappings_df[["address", "exchange"]].values
-    )
+    # Read Uniswap v2, Uniswap v3 and Solidly v2 event mappings
+    uniswap_v2_event_mappings = read_event_mappings("uniswap_v2_event_mappings.csv")
+    uniswap_v3_event_mappings = read_event_mappings("uniswap_v3_event_mappings.csv")
+    solidly_v2_event_mappings = read_event_mappings("solidly_v2_event_mappings.csv")
 
     tokens_filepath = os.path.join(base_path, "tokens.csv")
     if not os.path.exists(tokens_filepath) and not read_only:
@@ -308,7 +433,7 @@ def get_static_data(
             f"Tokens file {tokens_filepath} does not exist. Please run the bot in non-read-only mode to create it."
         )
     tokens = read_csv_file(tokens_filepath)
-    tokens["address"] = tokens["address"].apply(lambda x: Web3.to_checksum_address(x))
+    tokens["address"] = checksum_addresses(tokens["address"])
     tokens = tokens.drop_duplicates(subset=["address"])
     tokens = tokens.dropna(subset=["decimals", "symbol", "address"])
     tokens["symbol"] = (
@@ -318,30 +443,25 @@ def get_static_data(
         .str.replace("-", "_")
     )
 
-    def correct_tkn(tkn_address, keyname):
-        try:
-            return tokens[tokens["address"] == tkn_address][keyname].values[0]
-        except IndexError:
-            return np.nan
-
-    static_pool_data["tkn0_address"] = static_pool_data["tkn0_address"].apply(
-        lambda x: Web3.to_checksum_address(x)
+    token_decimals = dict(tokens[["address", "decimals"]].values)
+    token_symbols = dict(tokens[["address", "symbol"]].values)
+    static_pool_data["tkn0_address"] = checksum_addresses(
+        static_pool_data["tkn0_address"]
     )
-    static_pool_data["tkn1_address"] = static_pool_data["tkn1_address"].apply(
-        lambda x: Web3.to_checksum_address(x)
+    static_pool_data["tkn1_address"] = checksum_addresses(
+        static_pool_data["tkn1_address"]
     )
-    static_pool_data["tkn0_decimals"] = static_pool_data["tkn0_address"].apply(
-        lambda x: correct_tkn(x, "decimals")
+    static_pool_data["tkn0_decimals"] = static_pool_data["tkn0_address"].map(
+        token_decimals
     )
-    static_pool_data["tkn1_decimals"] = static_pool_data["tkn1_address"].apply(
-        lambda x: correct_tkn(x, "decimals")
+    static_pool_data["tkn1_decimals"] = static_pool_data["tkn1_address"].map(
+        token_decimals
     )
-
-    static_pool_data["tkn0_symbol"] = static_pool_data["tkn0_address"].apply(
-        lambda x: correct_tkn(x, "symbol")
+    static_pool_data["tkn0_symbol"] = static_pool_data["tkn0_address"].map(
+        token_symbols
     )
-    static_pool_data["tkn1_symbol"] = static_pool_data["tkn1_address"].apply(
-        lambda x: correct_tkn(x, "symbol")
+    static_pool_data["tkn1_symbol"] = static_pool_data["tkn1_address"].map(
+        token_symbols
     )
     static_pool_data["pair_name"] = (
         static_pool_data["tkn0_address"] + "/" + static_pool_data["tkn1_address"]
@@ -365,10 +485,8 @@ def get_static_data(
         + " "
         + static_pool_data["fee"].astype(str)
     )
-    # Initialize web3
     static_pool_data["cid"] = [
-        cfg.w3.keccak(text=f"{row['descr']}").hex()
-        for index, row in static_pool_data.iterrows()
+        cfg.w3.keccak(text=descr).hex() for descr in static_pool_data["descr"]
     ]
 
     static_pool_data = static_pool_data.drop_duplicates(subset=["cid"])
@@ -571,6 +689,8 @@ def get_config(
     tenderly_fork_id: str = None,
     self_fund: bool = False,
     rpc_url: str = None,
+    use_access_list: bool = False,
+    uni_v3_tick_words: int = 0,
 ) -> Config:
     """
     Gets the config object.
@@ -595,6 +715,10 @@ def get_config(
         The bot will default to using flashloans if False, otherwise it will attempt to use funds from the wallet.
     rpc_url : str, optional
         The RPC URL to use, by default None
+    use_access_list : bool, optional
+        Whether to attach access lists to arb transactions, by default False
+    uni_v3_tick_words : int, optional
+        The number of tick bitmap words fetched on either side of the current tick of Uniswap v3 pools, by default 0
     Returns
     -------
     Config
@@ -637,6 +761,8 @@ def get_config(
 
     cfg.LIMIT_BANCOR3_FLASHLOAN_TOKENS = limit_bancor3_flashloan_tokens
     cfg.DEFAULT_MIN_PROFIT_GAS_TOKEN = Decimal(default_min_profit_gas_token)
+    cfg.USE_ACCESS_LIST = use_access_list
+    cfg.UNI_V3_TICK_WORDS = uni_v3_tick_words
     cfg.GAS_TKN_IN_FLASHLOAN_TOKENS = (
         cfg.NATIVE_GAS_TOKEN_ADDRESS in flashloan_tokens
         or cfg.WRAPPED_GAS_TOKEN_ADDRESS in flashloan_tokens
@@ -678,6 +804,9 @@ def get_event_filters(
     """
     Creates event filters for the specified block range.
 
+    The events of all exchanges (except Bancor POL) are fetched with a single ``eth_getLogs`` request, whose first
+    topic is the OR-list of the topics of all events.
+
     Parameters
     ----------
     n_jobs : int
@@ -696,12 +825,10 @@ def get_event_filters(
     """
     bancor_pol_events = ["TradingEnabled", "TokenTraded"]
 
-    # Get for exchanges except POL contract
-    by_block_events = Parallel(n_jobs=n_jobs, backend="threading")(
-        delayed(event.create_filter)(fromBlock=start_block, toBlock=current_block)
-        for event in mgr.events
-        if event.__name__ not in bancor_pol_events
-    )
+    # Get for exchanges except POL contract, all topics in a single request
+    by_block_events = [
+        mgr.get_topics_log_filter(start_block, current_block, excluded_events=bancor_pol_events)
+    ]
 
     # Get all events since the beginning of time for Bancor POL contract
     max_num_events = Parallel(n_jobs=n_jobs, backend="threading")(
@@ -1027,17 +1154,13 @@ def handle_subsequent_iterations(
     """
     if loop_idx > 0 or replay_from_block:
         # bot.db.handle_token_key_cleanup()
-        bot.db.remove_unmapped_uniswap_v2_pools()
-        bot.db.remove_zero_liquidity_pools()
-        bot.db.remove_unsupported_exchanges()
+        # Remove the unmapped uniswap_v2 pools, the zero liquidity pools, the pools of unsupported exchanges and the
+        # non target-pools in a single pass
+        bot.db.remove_ineligible_pools(target_tokens=target_tokens)
         # bot.db.remove_faulty_token_pools()
         # bot.db.remove_pools_with_invalid_tokens()
         # bot.db.ensure_descr_in_pool_data()
 
-        # Filter the target tokens
-        if target_tokens:
-            bot.db.filter_target_tokens(target_tokens)
-
         # Log the forked_from_block
         if forked_from_block:
             mgr.cfg.logger.info(
@@ -1059,7 +1182,27 @@ def handle_subsequent_iterations(
         )
 
 
-def verify_state_changed(bot: CarbonBot, initial_state: List[Dict[str, Any]], mgr: Any):
+def set_missing_last_updated_block(mgr: Any, block_number: int):
+    """
+    Sets the last updated block of the pools which do not have one.
+
+    The pool dicts are changed in place without reporting the change to the pool data (see ``PoolDataList``), since
+    the state of the pools does not change.
+
+    Parameters
+    ----------
+    mgr : Any
+        The manager object.
+    block_number : int
+        The block number.
+
+    """
+    for pool in mgr.pool_data:
+        if not pool.get("last_updated_block"):
+            pool["last_updated_block"] = block_number
+
+
+def verify_state_changed(bot: CarbonBot, initial_state: int, mgr: Any):
     """
     Verifies that the state has changed.
 
@@ -1067,21 +1210,14 @@ def verify_state_changed(bot: CarbonBot, initial_state: List[Dict[str, Any]], mg
     ----------
     bot : CarbonBot
         The bot object.
-    initial_state : Dict[str, Any]
-        The initial state.
+    initial_state : int
+        The version of the pool data at the start of the iteration.
     mgr : Any
         The manager object.
 
     """
-    # Compare the initial state to the final state, and update the state if it has changed
-    final_state = mgr.pool_data.copy()
-    final_state_bancor_pol = [
-        final_state[i]
-        for i in range(len(final_state))
-        if final_state[i]["exchange_name"] == mgr.cfg.BANCOR_POL_NAME
-    ]
-    # assert bot.db.state == final_state, "\n *** bot failed to update state *** \n"
-    if initial_state != final_state_bancor_pol:
+    # Compare the initial version of the pool data to its final version
+    if mgr.pool_data.version != initial_state:
         mgr.cfg.logger.debug("[events.utils.verify_state_changed] State has changed...")
     else:
         mgr.cfg.logger.warning(
@@ -1101,8 +1237,7 @@ def handle_duplicates(mgr: Any):
     """
     # check if any duplicate cid's exist in the pool data
     mgr.deduplicate_pool_data()
-    cids = [pool["cid"] for pool in mgr.pool_data]
-    assert len(cids) == len(set(cids)), "duplicate cid's exist in the pool data"
+    assert not mgr.pool_data.duplicate_cids, "duplicate cid's exist in the pool data"
 
 
 def get_pools_for_exchange(exchange: str, mgr: Any) -> [Any]:
@@ -1200,7 +1335,7 @@ def get_tenderly_events(
     Returns
     -------
     List[Any]
-        A list of Tenderly POL events.
+        A nested list of Tenderly POL events (as returned by web3, see `normalize_event`).
 
     """
     # connect to the Tenderly fork
@@ -1219,10 +1354,6 @@ def get_tenderly_events(
         ]
 
         tenderly_events = [event for event in tenderly_events if len(event) > 0]
-        tenderly_events = [
-            complex_handler(event)
-            for event in [complex_handler(event) for event in tenderly_events]
-        ]
         tenderly_events_all += tenderly_events
     return tenderly_events_all
 
@@ -1271,37 +1402,23 @@ def get_latest_events(
             f"[events.utils.get_latest_events] tenderly_events: {len(tenderly_events)}"
         )
 
-    # Get all event filters, events, and flatten them
-    events = [
-        complex_handler(event)
-        for event in [
-            complex_handler(event)
-            for event in get_all_events(
-                n_jobs,
-                get_event_filters(n_jobs, mgr, start_block, current_block),
-            )
-        ]
-    ]
+    # Get all events, keep the latest event per pool and only convert those. The events of the exchanges
+    # whose events are fetched from Tenderly are dropped here, and replaced by the Tenderly events below.
+    latest_events = filter_latest_events(
+        mgr,
+        get_all_events(
+            n_jobs,
+            get_event_filters(n_jobs, mgr, start_block, current_block),
+        ),
+        excluded_exchanges=mgr.tenderly_event_exchanges if mgr.tenderly_fork_id else (),
+        normalize=True,
+    )
+    if mgr.tenderly_fork_id and tenderly_events:
+        latest_events += filter_latest_events(mgr, tenderly_events, normalize=True)
 
-    # Filter out the latest events per pool, save them to disk, and update the pools
-    latest_events = filter_latest_events(mgr, events)
-    if mgr.tenderly_fork_id:
-        if tenderly_events:
-            latest_tenderly_events = filter_latest_events(mgr, tenderly_events)
-            latest_events += latest_tenderly_events
-
-        # remove the events from any mgr.tenderly_event_exchanges exchanges
-        for exchange in mgr.tenderly_event_exchanges:
-            if pool_type := mgr.pool_type_from_exchange_name(exchange):
-                latest_events = [
-                    event
-                    for event in latest_events
-                    if not pool_type.event_matches_format(event)
-                ]
-
-    carbon_pol_events = [event for event in latest_events if "token" in event["args"]]
+    carbon_pol_events = sum("token" in event["args"] for event in latest_events)
     mgr.cfg.logger.info(
-        f"[events.utils.get_latest_events] Found {len(latest_events)} new events, {len(carbon_pol_events)} carbon_pol_events"
+        f"[events.utils.get_latest_events] Found {len(latest_events)} new events, {carbon_pol_events} carbon_pol_events"
     )
 
     # Save the latest events to disk
@@ -1771,24 +1888,13 @@ def handle_target_token_addresses(static_pool_data: pd.DataFrame, target_tokens:
         The addresses of the target tokens.
 
     """
-    # Get the addresses of the target tokens
-    target_token_addresses = []
-    if target_tokens:
-        for token in target_tokens:
-            target_token_addresses = (
-                target_token_addresses
-                + static_pool_data[static_pool_data["tkn0_address"] == token][
-                    "tkn0_address"
-                ].tolist()
-            )
-            target_token_addresses = (
-                target_token_addresses
-                + static_pool_data[static_pool_data["tkn1_address"] == token][
-                    "tkn1_address"
-                ].tolist()
-            )
-    target_token_addresses = list(set(target_token_addresses))
-    return target_token_addresses
+    # Get the addresses of the target tokens which are in some pool
+    if not target_tokens:
+        return []
+    pool_token_addresses = set(static_pool_data["tkn0_address"]) | set(
+        static_pool_data["tkn1_address"]
+    )
+    return list(set(target_tokens) & pool_token_addresses)
 
 
 def get_current_block(
@@ -1831,7 +1937,7 @@ def get_current_block(
     return current_block
 
 
-def handle_static_pools_update(mgr: Any):
+def handle_static_pools_update(mgr: Any, delta: TerraformerDelta = None):
     """
     Handles the static pools update 1x at startup and then periodically thereafter upon terraformer runs.
 
@@ -1839,90 +1945,94 @@ def handle_static_pools_update(mgr: Any):
     ----------
     mgr : Any
         The manager object.
+    delta : TerraformerDelta, optional
+        The pools discovered by a terraformer run. If given, only these pools are merged into the event mappings and
+        the static pools of the manager, otherwise the static pools are rebuilt from the event mappings.
+
+    The static pools of the manager map the ``{exchange}_pools`` of each forked exchange to the set of its pool
+    addresses.
 
     """
-    uniswap_v2_event_mappings = pd.DataFrame(
-        [
-            {"address": k, "exchange_name": v}
-            for k, v in mgr.uniswap_v2_event_mappings.items()
-        ]
-    )
-    uniswap_v3_event_mappings = pd.DataFrame(
-        [
-            {"address": k, "exchange_name": v}
-            for k, v in mgr.uniswap_v3_event_mappings.items()
-        ]
-    )
-    solidly_v2_event_mappings = pd.DataFrame(
-        [
-            {"address": k, "exchange_name": v}
-            for k, v in mgr.solidly_v2_event_mappings.items()
-        ]
-    )
-    all_event_mappings = (
-        pd.concat([uniswap_v2_event_mappings, uniswap_v3_event_mappings, solidly_v2_event_mappings])
-        .drop_duplicates("address")
-        .to_dict(orient="records")
-    )
-    if "uniswap_v2_pools" not in mgr.static_pools:
-        mgr.static_pools["uniswap_v2_pools"] = []
-    if "uniswap_v3_pools" not in mgr.static_pools:
-        mgr.static_pools["uniswap_v3_pools"] = []
-    if "solidly_v2_pools" not in mgr.static_pools:
-        mgr.static_pools["solidly_v2_pools"] = []
+    if delta is not None:
+        mgr.uniswap_v2_event_mappings.update(delta.uniswap_v2_event_mappings)
+        mgr.uniswap_v3_event_mappings.update(delta.uniswap_v3_event_mappings)
+        mgr.solidly_v2_event_mappings.update(delta.solidly_v2_event_mappings)
+        for address, ex in delta.event_mappings.items():
+            if ex in mgr.forked_exchanges and ex in mgr.exchanges:
+                mgr.static_pools.setdefault(f"{ex}_pools", set()).add(address)
+        mgr.cfg.logger.info(
+            f"[events.utils.handle_static_pools_update] Added {len(delta)} new pools to static pools"
+        )
+        return
+
+    # Index the pool addresses by exchange in a single pass (the first mapping of an address wins)
+    exchange_pools = {}
+    indexed_addresses = set()
+    for event_mappings in [
+        mgr.uniswap_v2_event_mappings,
+        mgr.uniswap_v3_event_mappings,
+        mgr.solidly_v2_event_mappings,
+    ]:
+        for address, ex in event_mappings.items():
+            if address not in indexed_addresses:
+                indexed_addresses.add(address)
+                exchange_pools.setdefault(ex, set()).add(address)
+
+    for attr_name in ["uniswap_v2_pools", "uniswap_v3_pools", "solidly_v2_pools"]:
+        mgr.static_pools.setdefault(attr_name, set())
 
     for ex in mgr.forked_exchanges:
         if ex in mgr.exchanges:
-            exchange_pools = [
-                e["address"] for e in all_event_mappings if e["exchange_name"] == ex
-            ]
+            pools = exchange_pools.get(ex, set())
             mgr.cfg.logger.info(
-                f"[events.utils.handle_static_pools_update] Adding {len(exchange_pools)} {ex} pools to static pools"
+                f"[events.utils.handle_static_pools_update] Adding {len(pools)} {ex} pools to static pools"
             )
-            attr_name = f"{ex}_pools"
-            mgr.static_pools[attr_name] = exchange_pools
+            mgr.static_pools[f"{ex}_pools"] = pools
 
 
 def handle_tokens_csv(mgr, prefix_path, read_only: bool = False):
+    """
+    Merges the new tokens into the tokens CSV and updates the tokens of the manager.
+
+    The tokens CSV is loaded once into a token store, which is updated in place: the tokens found in the
+    ``token_detail`` CSVs (if any) are added to it, and only the tokens added since the last call are appended to the
+    tokens CSV, instead of rewriting it.
+    """
     tokens_filepath = os.path.normpath(
         f"{prefix_path}fastlane_bot/data/blockchain_data/{mgr.cfg.NETWORK}/tokens.csv"
     )
 
-    try:
-        token_data = pd.read_csv(tokens_filepath)
-    except Exception as e:
+    if not os.path.exists(tokens_filepath):
         if not read_only:
             mgr.cfg.logger.info(
-                f"[events.utils.handle_tokens_csv] Error reading token data: {e}... creating new file"
+                f"[events.utils.handle_tokens_csv] Error reading token data: {tokens_filepath} not found... creating new file"
             )
-            token_data = pd.DataFrame(mgr.tokens)
-            token_data.to_csv(tokens_filepath, index=False)
+            pd.DataFrame(mgr.tokens).to_csv(tokens_filepath, index=False)
         else:
-            raise ReadOnlyException(tokens_filepath) from e
+            raise ReadOnlyException(tokens_filepath)
+
+    token_store = TokenStore.load(tokens_filepath)
 
     extra_info = glob(
         os.path.normpath(
             f"{prefix_path}fastlane_bot/data/blockchain_data/{mgr.cfg.NETWORK}/token_detail/*.csv"
         )
     )
-    if len(extra_info) > 0:
-        extra_info_df = pd.concat(
-            [pd.read_csv(f) for f in extra_info], ignore_index=True
-        )
-        token_data = pd.concat([token_data, extra_info_df], ignore_index=True)
-        token_data = token_data.drop_duplicates(subset=["address"])
+    for f in extra_info:
+        for record in pd.read_csv(f).to_dict(orient="records"):
+            token_store.add(**record)
 
-        if not read_only:
-            token_data.to_csv(tokens_filepath, index=False)
+    if not read_only:
+        token_store.flush()
 
-            # delete all files in token_detail
-            for f in extra_info:
-                try:
-                    os.remove(f)
-                except FileNotFoundError:
-                    pass
+        # delete all files in token_detail
+        for f in extra_info:
+            try:
+                os.remove(f)
+            except FileNotFoundError:
+                pass
 
-    mgr.tokens = token_data.to_dict(orient="records")
+    mgr.tokens = token_store.records
 
     mgr.cfg.logger.info(
         f"[events.utils.handle_tokens_csv] Updated token data with {len(extra_info)} new tokens"
@@ -0,0 +1,304 @@
+"""
+simulating Balancer weighted pool trades
+
+This class contains the integer math that the Balancer vault uses for trades against weighted
+pools (``FixedPoint``, ``LogExpMath`` and ``WeightedMath`` in the contracts), including the scaling
+of the token amounts to 18 decimals and the swap fee. All amounts are integers (wei) and the
+results match the contracts up to the wei. The optimizer uses the float math of the n-token curve
+of the pool instead (``WeightedPoolCurve``), and only the final simulation of a route uses this class.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+
+__VERSION__ = "1.0"
+__DATE__ = "18/Oct/2026"
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Tuple
+
+
+def _div(a: int, b: int) -> int:
+    """integer division rounding towards zero (Solidity semantics)"""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b > 0) else -q
+
+
+@dataclass(frozen=True)
+class BalancerCalculator():
+    """
+    a weighted Balancer pool, described by its contract values
+
+    :balances:      token balances of the pool (in wei)
+    :weights:       normalized token weights of the pool (18 decimals fixed point)
+    :decimals:      decimals of the tokens
+    :fee:           swap fee (18 decimals fixed point)
+    """
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    ONE = 10**18
+    MAX_IN_RATIO = 3 * 10**17
+    MAX_OUT_RATIO = 3 * 10**17
+    MAX_POW_RELATIVE_ERROR = 10000
+
+    balances: Tuple[int, ...]
+    weights: Tuple[int, ...]
+    decimals: Tuple[int, ...]
+    fee: int
+
+    @classmethod
+    def from_pool(cls, balances, weights, decimals, fee):
+        """
+        alternative constructor: from the (float or Decimal) values of the pool records
+
+        :balances:      token balances of the pool (in wei)
+        :weights:       normalized token weights of the pool (eg 0.8)
+        :decimals:      decimals of the tokens
+        :fee:           swap fee (eg 0.003)
+        """
+        return cls(
+            balances=tuple(int(b) for b in balances),
+            weights=tuple(cls.to_fixed(w) for w in weights),
+            decimals=tuple(int(d) for d in decimals),
+            fee=cls.to_fixed(fee),
+        )
+
+    @classmethod
+    def to_fixed(cls, value) -> int:
+        """converts a float or Decimal value to 18 decimals fixed point"""
+        return int(Decimal(str(value)) * cls.ONE)
+
+    # FixedPoint
+    @classmethod
+    def mul_down(cls, a: int, b: int) -> int:
+        return a * b // cls.ONE
+
+    @classmethod
+    def mul_up(cls, a: int, b: int) -> int:
+        product = a * b
+        return 0 if product == 0 else (product - 1) // cls.ONE + 1
+
+    @classmethod
+    def div_down(cls, a: int, b: int) -> int:
+        return a * cls.ONE // b
+
+    @classmethod
+    def div_up(cls, a: int, b: int) -> int:
+        return 0 if a == 0 else (a * cls.ONE - 1) // b + 1
+
+    @classmethod
+    def complement(cls, x: int) -> int:
+        return cls.ONE - x if x < cls.ONE else 0
+
+    @classmethod
+    def pow_down(cls, x: int, y: int) -> int:
+        if y == cls.ONE:
+            return x
+        if y == 2 * cls.ONE:
+            return cls.mul_down(x, x)
+        if y == 4 * cls.ONE:
+            square = cls.mul_down(x, x)
+            return cls.mul_down(square, square)
+        raw = LogExpMath.pow(x, y)
+        max_error = cls.mul_up(raw, cls.MAX_POW_RELATIVE_ERROR) + 1
+        return 0 if raw < max_error else raw - max_error
+
+    @classmethod
+    def pow_up(cls, x: int, y: int) -> int:
+        if y == cls.ONE:
+            return x
+        if y == 2 * cls.ONE:
+            return cls.mul_up(x, x)
+        if y == 4 * cls.ONE:
+            square = cls.mul_up(x, x)
+            return cls.mul_up(square, square)
+        raw = LogExpMath.pow(x, y)
+        return raw + cls.mul_up(raw, cls.MAX_POW_RELATIVE_ERROR) + 1
+
+    # WeightedMath
+    @classmethod
+    def out_given_in(cls, balance_in: int, weight_in: int, balance_out: int, weight_out: int, amount_in: int) -> int:
+        """amount out for amount in (all values 18 decimals fixed point, fees excluded)"""
+        assert amount_in <= cls.mul_down(balance_in, cls.MAX_IN_RATIO), "amount in exceeds the maximum in ratio"
+        base = cls.div_up(balance_in, balance_in + amount_in)
+        exponent = cls.div_down(weight_in, weight_out)
+        power = cls.pow_up(base, exponent)
+        return cls.mul_down(balance_out, cls.complement(power))
+
+    @classmethod
+    def in_given_out(cls, balance_in: int, weight_in: int, balance_out: int, weight_out: int, amount_out: int) -> int:
+        """amount in for amount out (all values 18 decimals fixed point, fees excluded)"""
+        assert amount_out <= cls.mul_down(balance_out, cls.MAX_OUT_RATIO), "amount out exceeds the maximum out ratio"
+        base = cls.div_up(balance_out, balance_out - amount_out)
+        exponent = cls.div_up(weight_out, weight_in)
+        power = cls.pow_up(base, exponent)
+        return cls.mul_up(balance_in, power - cls.ONE)
+
+    def _scaling_factor(self, i: int) -> int:
+        return 10 ** (18 - self.decimals[i])
+
+    def amount_net_of_fee(self, amount_in: int) -> int:
+        """the amount in (wei) net of the swap fee, which is taken from the amount in"""
+        return amount_in - self.mul_up(amount_in, self.fee)
+
+    def max_amount_in(self, i: int) -> int:
+        """the largest amount (wei, net of fee) of token i the pool accepts in a trade"""
+        scaling = self._scaling_factor(i)
+        return self.mul_down(self.balances[i] * scaling, self.MAX_IN_RATIO) // scaling
+
+    def max_amount_out(self, i: int) -> int:
+        """the largest amount (wei) of token i the pool pays out in a trade by target"""
+        scaling = self._scaling_factor(i)
+        return self.mul_down(self.balances[i] * scaling, self.MAX_OUT_RATIO) // scaling
+
+    def trade_by_source(self, i_in: int, i_out: int, amount_in: int) -> int:
+        """
+        simulates a trade by source amount against the pool (amounts in wei)
+
+        :i_in:          index of the token going into the pool
+        :i_out:         index of the token coming out of the pool
+        :amount_in:     the amount of token in (including the fee)
+        :returns:       the amount of token out
+        """
+        scaling_in, scaling_out = self._scaling_factor(i_in), self._scaling_factor(i_out)
+        amount_out = self.out_given_in(
+            balance_in=self.balances[i_in] * scaling_in,
+            weight_in=self.weights[i_in],
+            balance_out=self.balances[i_out] * scaling_out,
+            weight_out=self.weights[i_out],
+            amount_in=self.amount_net_of_fee(amount_in) * scaling_in,
+        )
+        return amount_out // scaling_out
+
+
+class LogExpMath():
+    """
+    exponentiation and logarithm with 18 decimals fixed point numbers (Balancer ``LogExpMath``)
+
+    the arguments and the results are integers, and all intermediate operations round towards
+    zero as the Solidity code does
+    """
+    ONE_18 = 10**18
+    ONE_20 = 10**20
+    ONE_36 = 10**36
+
+    MAX_NATURAL_EXPONENT = 130 * 10**18
+    MIN_NATURAL_EXPONENT = -41 * 10**18
+    LN_36_LOWER_BOUND = 10**18 - 10**17
+    LN_36_UPPER_BOUND = 10**18 + 10**17
+    MILD_EXPONENT_BOUND = 2**254 // 10**20
+
+    # 18 decimals, and the values of e^x without decimals
+    x0, a0 = 128000000000000000000, 38877084059945950922200000000000000000000000000000000000
+    x1, a1 = 64000000000000000000, 6235149080811616882910000000
+
+    # 20 decimals
+    x2, a2 = 3200000000000000000000, 7896296018268069516100000000000000
+    x3, a3 = 1600000000000000000000, 888611052050787263676000000
+    x4, a4 = 800000000000000000000, 298095798704172827474000
+    x5, a5 = 400000000000000000000, 5459815003314423907810
+    x6, a6 = 200000000000000000000, 738905609893065022723
+    x7, a7 = 100000000000000000000, 271828182845904523536
+    x8, a8 = 50000000000000000000, 164872127070012814685
+    x9, a9 = 25000000000000000000, 128402541668774148407
+    x10, a10 = 12500000000000000000, 113314845306682631683
+    x11, a11 = 6250000000000000000, 106449445891785942956
+
+    @classmethod
+    def pow(cls, x: int, y: int) -> int:
+        """x^y for x, y in 18 decimals fixed point"""
+        if y == 0:
+            return cls.ONE_18
+        if x == 0:
+            return 0
+        assert x >> 255 == 0, "x out of bounds"
+        assert y < cls.MILD_EXPONENT_BOUND, "y out of bounds"
+        if cls.LN_36_LOWER_BOUND < x < cls.LN_36_UPPER_BOUND:
+            ln_36_x = cls._ln_36(x)
+            q = _div(ln_36_x, cls.ONE_18)
+            logx_times_y = q * y + _div((ln_36_x - q * cls.ONE_18) * y, cls.ONE_18)
+        else:
+            logx_times_y = cls._ln(x) * y
+        logx_times_y = _div(logx_times_y, cls.ONE_18)
+        assert cls.MIN_NATURAL_EXPONENT <= logx_times_y <= cls.MAX_NATURAL_EXPONENT, "product out of bounds"
+        return cls.exp(logx_times_y)
+
+    @classmethod
+    def exp(cls, x: int) -> int:
+        """e^x for x in 18 decimals fixed point"""
+        assert cls.MIN_NATURAL_EXPONENT <= x <= cls.MAX_NATURAL_EXPONENT, "invalid exponent"
+        if x < 0:
+            return cls.ONE_18 * cls.ONE_18 // cls.exp(-x)
+        if x >= cls.x0:
+            x -= cls.x0
+            first_an = cls.a0
+        elif x >= cls.x1:
+            x -= cls.x1
+            first_an = cls.a1
+        else:
+            first_an = 1
+        x *= 100
+        product = cls.ONE_20
+        for xn, an in (
+            (cls.x2, cls.a2), (cls.x3, cls.a3), (cls.x4, cls.a4), (cls.x5, cls.a5),
+            (cls.x6, cls.a6), (cls.x7, cls.a7), (cls.x8, cls.a8), (cls.x9, cls.a9),
+        ):
+            if x >= xn:
+                x -= xn
+                product = product * an // cls.ONE_20
+        series_sum = cls.ONE_20
+        term = x
+        series_sum += term
+        for n in range(2, 13):
+            term = term * x // cls.ONE_20 // n
+            series_sum += term
+        return product * series_sum // cls.ONE_20 * first_an // 100
+
+    @classmethod
+    def _ln(cls, a: int) -> int:
+        """natural logarithm of a in 18 decimals fixed point"""
+        if a < cls.ONE_18:
+            return -cls._ln(cls.ONE_18 * cls.ONE_18 // a)
+        sum_ = 0
+        if a >= cls.a0 * cls.ONE_18:
+            a //= cls.a0
+            sum_ += cls.x0
+        if a >= cls.a1 * cls.ONE_18:
+            a //= cls.a1
+            sum_ += cls.x1
+        sum_ *= 100
+        a *= 100
+        for xn, an in (
+            (cls.x2, cls.a2), (cls.x3, cls.a3), (cls.x4, cls.a4), (cls.x5, cls.a5),
+            (cls.x6, cls.a6), (cls.x7, cls.a7), (cls.x8, cls.a8), (cls.x9, cls.a9),
+            (cls.x10, cls.a10), (cls.x11, cls.a11),
+        ):
+            if a >= an:
+                a = a * cls.ONE_20 // an
+                sum_ += xn
+        z = (a - cls.ONE_20) * cls.ONE_20 // (a + cls.ONE_20)
+        z_squared = z * z // cls.ONE_20
+        num = z
+        series_sum = num
+        for n in (3, 5, 7, 9, 11):
+            num = num * z_squared // cls.ONE_20
+            series_sum += num // n
+        series_sum *= 2
+        return (sum_ + series_sum) // 100
+
+    @classmethod
+    def _ln_36(cls, x: int) -> int:
+        """natural logarithm of x in 18 decimals fixed point, with 36 decimals result (x close to one)"""
+        x *= cls.ONE_18
+        z = _div((x - cls.ONE_36) * cls.ONE_36, x + cls.ONE_36)
+        z_squared = z * z // cls.ONE_36
+        num = z
+        series_sum = num
+        for n in (3, 5, 7, 9, 11, 13, 15):
+            num = _div(num * z_squared, cls.ONE_36)
+            series_sum += _div(num, n)
+        return series_sum * 2
@@ -0,0 +1,204 @@
+"""
+parsing Carbon contract values
+
+This class decodes a single Carbon order -- as stored by the contract, ie with its rates
+A and B compressed into mantissa/exponent form -- into values that make sense from a
+financial perspective. It exposes the parameters of the order as generic constant product
+curve parameters that are suitable for our ``CPC`` class, as well as the exact integer
+trade functions of the contract, which are used when simulating the trades of a route.
+
+Decoded orders are cached by their contract values (``from_state``), so every order is
+decoded only once per state change, no matter how many times it is turned into a curve or
+traded against.
+
+The module also contains the functions encoding rates and prices into the contract format.
+
+---
+(c) Copyright Bprotocol foundation 2023-24.
+All rights reserved.
+Licensed under MIT.
+"""
+
+__VERSION__ = "1.0"
+__DATE__ = "18/Oct/2026"
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class CarbonCalculator():
+    """
+    a single Carbon order, decoded
+
+    :y:     liquidity of the order (in wei of the token sold)
+    :z:     capacity of the order (in wei of the token sold)
+    :A:     rate parameter A, encoded as stored by the contract
+    :B:     rate parameter B, encoded as stored by the contract
+    """
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    ONE = 2**48
+    PPM_RESOLUTION = 1_000_000
+    MAX_UINT256 = 2**256 - 1
+
+    CACHE_SIZE = 100_000
+
+    y: int
+    z: int
+    A: int
+    B: int
+
+    def __post_init__(self):
+        super().__setattr__("A_exp", self.decode_float(self.A))
+        super().__setattr__("B_exp", self.decode_float(self.B))
+
+    _cache = {}
+
+    @classmethod
+    def from_state(cls, y, z, A, B):
+        """
+        alternative constructor: returns the decoded order for the given contract values (cached)
+
+        :y, z, A, B:    the order values as stored in the pool state (int or int-like; A may be None)
+        :raises:        ValueError or TypeError if the values are not int-like (eg nan)
+        """
+        key = (y, z, A, B)
+        order = cls._cache.get(key)
+        if order is None:
+            if len(cls._cache) >= cls.CACHE_SIZE:
+                cls._cache.clear()
+            order = cls(y=int(y), z=int(z), A=int(A or 0), B=int(B))
+            cls._cache[key] = order
+        return order
+
+    @classmethod
+    def bit_length(cls, value: int) -> int:
+        """minimal number of bits needed to represent the value"""
+        return value.bit_length() if value > 0 else 0
+
+    @classmethod
+    def encode_float(cls, value: int) -> int:
+        """encodes a long int value as mantissa/exponent into a shorter integer"""
+        exponent = cls.bit_length(value // cls.ONE)
+        mantissa = value >> exponent
+        return mantissa | (exponent * cls.ONE)
+
+    @classmethod
+    def decode_float(cls, value: int) -> int:
+        """undoes the mantissa/exponent encoding of ``encode_float`` (contract ``expandRate``)"""
+        return (value % cls.ONE) << (value // cls.ONE)
+
+    @classmethod
+    def encode_rate(cls, value: Decimal) -> int:
+        """encodes a price (Decimal, in dy/dx wei) as rate, ie sqrt(price) scaled by ONE"""
+        data = int(value.sqrt() * cls.ONE)
+        length = cls.bit_length(data // cls.ONE)
+        return (data >> length) << length
+
+    @classmethod
+    def encode_token_price(cls, price: Decimal) -> int:
+        """encodes a price (Decimal, in dy/dx wei) into the contract format of A and B"""
+        return cls.encode_float(cls.encode_rate(price))
+
+    @property
+    def A_(self) -> float:
+        """rate parameter A in proper units, ie sqrt(p_start) - sqrt(p_end)"""
+        return self.A_exp / self.ONE
+
+    @property
+    def B_(self) -> float:
+        """rate parameter B in proper units, ie sqrt(p_end)"""
+        return self.B_exp / self.ONE
+
+    @property
+    def p_start(self) -> float:
+        """start wei price of the order (in dy/dx; highest)"""
+        return (self.B_ + self.A_) ** 2
+
+    @property
+    def p_end(self) -> float:
+        """end wei price of the order (in dy/dx; lowest)"""
+        return self.B_ * self.B_
+
+    def cpc_args(self, decimals_y: int, decimals_x: int) -> dict:
+        """
+        returns the curve parameters yint, y, pa, pb in token units, as expected by ``CPC.from_carbon``
+
+        :decimals_y:    decimals of the token sold by the order
+        :decimals_x:    decimals of the other token
+        """
+        dec = decimals_x - decimals_y
+        scale = (lambda p: p * 10**dec) if dec >= 0 else (lambda p: p / 10**-dec)
+        return {
+            "yint": self.z / 10**decimals_y,
+            "y": self.y / 10**decimals_y,
+            "pa": scale(self.p_start),
+            "pb": scale(self.p_end),
+        }
+
+    @classmethod
+    def _min_factor(cls, x: int, y: int) -> int:
+        """the smallest integer f such that x * y / f fits into 256 bits (contract ``MathEx.minFactor``)"""
+        xy = x * y
+        hi, lo = xy >> 256, xy & cls.MAX_UINT256
+        return hi + 2 if hi > cls.MAX_UINT256 ^ lo else hi + 1
+
+    @staticmethod
+    def _mul_div_f(x: int, y: int, z: int) -> int:
+        return x * y // z
+
+    @staticmethod
+    def _mul_div_c(x: int, y: int, z: int) -> int:
+        return -(-x * y // z)
+
+    def target_amount(self, x: int) -> int:
+        """
+        the amount (in wei) bought from the order for the amount x (in wei) sold to it, before fees
+
+        this is the contract function ``_calculateTradeTargetAmount``
+        """
+        A, B, y, z = self.A_exp, self.B_exp, self.y, self.z
+        if A == 0:
+            return self._mul_div_f(x, B * B, self.ONE * self.ONE)
+        temp1 = z * self.ONE
+        temp2 = y * A + z * B
+        temp3 = temp2 * x
+        factor = max(self._min_factor(temp1, temp1), self._min_factor(temp3, A))
+        temp4 = self._mul_div_c(temp1, temp1, factor)
+        temp5 = self._mul_div_c(temp3, A, factor)
+        return self._mul_div_f(temp2, temp3 // factor, temp4 + temp5)
+
+    def source_amount(self, x: int) -> int:
+        """
+        the amount (in wei) to be sold to the order to buy the amount x (in wei) from it, before fees
+
+        this is the contract function ``_calculateTradeSourceAmount``
+        """
+        A, B, y, z = self.A_exp, self.B_exp, self.y, self.z
+        if A == 0:
+            return self._mul_div_c(x, self.ONE * self.ONE, B * B)
+        temp1 = z * self.ONE
+        temp2 = y * A + z * B
+        temp3 = temp2 - x * A
+        factor = max(self._min_factor(temp1, temp1), self._min_factor(temp2, temp3))
+        temp4 = self._mul_div_c(temp1, temp1, factor)
+        temp5 = self._mul_div_f(temp2, temp3, factor)
+        return self._mul_div_c(x, temp4, temp5)
+
+    def trade_by_source(self, x: int, fee_ppm: int) -> Tuple[int, int]:
+        """
+        simulates a trade by source amount against the order (all amounts in wei)
+
+        :x:         the amount sold to the order
+        :fee_ppm:   the trading fee in ppm, which is taken from the amount bought
+        :returns:   tuple (amount sold, amount bought net of fees); if the order does not
+                    have enough liquidity, the amount sold is reduced to the amount needed
+                    to buy all of it
+        """
+        target = self.target_amount(x)
+        if target > self.y:
+            x, target = self.source_amount(self.y), self.y
+        return x, self._mul_div_f(target, self.PPM_RESOLUTION - fee_ppm, self.PPM_RESOLUTION)
@@ -6,26 +6,49 @@ Defines the ``PoolAndTokens`` class, representing a pool and its tokens in a sin
 All rights reserved.
 Licensed under MIT.
 """
-__VERSION__ = "1.2"
-__DATE__ = "05/May/2023"
+__VERSION__ = "1.6"
+__DATE__ = "18/Oct/2026"
 
 import decimal
 import math
 from _decimal import Decimal
-from dataclasses import dataclass
-from typing import Dict, Any, List, Union
+from dataclasses import dataclass, fields
+from typing import Dict, Any, List, Union, Tuple
 
 from fastlane_bot.config import Config
 
 # from fastlane_bot.config import SUPPORTED_EXCHANGES, CARBON_V1_NAME, UNISWAP_V3_NAME
+from fastlane_bot.helpers.carboncalc import CarbonCalculator
 from fastlane_bot.helpers.univ3calc import Univ3Calculator
 from fastlane_bot.tools.cpc import ConstantProductCurve
-from fastlane_bot.utils import EncodedOrder
 
 
 class SolidlyV2StablePoolsNotSupported(Exception):
     pass
 
+
+def add_slots(extra_slots: Tuple[str, ...] = ()):
+    """
+    Class decorator which recreates a dataclass with ``__slots__`` (``@dataclass(slots=True)`` requires Python 3.10)
+
+    :extra_slots:   the names of the attributes which are not fields
+    """
+    def wrap(cls):
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(f.name for f in fields(cls))
+        cls_dict["__slots__"] = field_names + tuple(extra_slots)
+        for name in field_names:
+            # the defaults are bound to the generated __init__, not read from the class
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        new_cls.__qualname__ = cls.__qualname__
+        return new_cls
+    return wrap
+
+
+@add_slots(extra_slots=("ADDRDEC",))
 @dataclass
 class PoolAndTokens:
     """
@@ -93,7 +116,11 @@ class PoolAndTokens:
         The address of token 1
     tkn1_decimals : int
         The decimals of token 1
+    ticks : list
+        The [tick, liquidityNet] pairs of the initialized ticks near the price (Uniswap v3 only, optional)
 
+    The instances are slotted (one instance exists per pool), and the per-token lists of multi-token pools (``tokens``,
+    ``token_weights``, ``token_balances``, ``token_decimals``) are computed when needed rather than for every pool.
     """
 
     __VERSION__ = __VERSION__
@@ -174,9 +201,9 @@ class PoolAndTokens:
     tkn5_symbol: str = None
     tkn6_symbol: str = None
     tkn7_symbol: str = None
-    ADDRDEC = None
 
     pool_type: str = None
+    ticks: list = None
 
 
     def __post_init__(self):
@@ -189,46 +216,37 @@ class PoolAndTokens:
         self.y_0 = self.y_0 or 0
         self.z_1 = self.z_1 or 0
         self.y_1 = self.y_1 or 0
+        if not isinstance(self.ticks, list):
+            self.ticks = None
+        self.ADDRDEC = None
 
-        self.tokens = (
-            self.get_tokens
-        )
-        self.token_weights = self.remove_nan(
-            [
-                self.tkn0_weight,
-                self.tkn1_weight,
-                self.tkn2_weight,
-                self.tkn3_weight,
-                self.tkn4_weight,
-                self.tkn5_weight,
-                self.tkn6_weight,
-                self.tkn7_weight,
-            ]
-        )
-        self.token_balances = self.remove_nan(
-            [
-                self.tkn0_balance,
-                self.tkn1_balance,
-                self.tkn2_balance,
-                self.tkn3_balance,
-                self.tkn4_balance,
-                self.tkn5_balance,
-                self.tkn6_balance,
-                self.tkn7_balance,
-            ]
-        )
-        self.token_decimals = self.remove_nan(
-            [
-                self.tkn0_decimals,
-                self.tkn1_decimals,
-                self.tkn2_decimals,
-                self.tkn3_decimals,
-                self.tkn4_decimals,
-                self.tkn5_decimals,
-                self.tkn6_decimals,
-                self.tkn7_decimals,
-            ]
-        )
+    @property
+    def tokens(self) -> List[str]:
+        """
+        returns the addresses of the tokens of the pool
+        """
+        return self.get_tokens
+
+    @property
+    def token_weights(self) -> List[float]:
+        """
+        returns the weights of the tokens of the pool (for the tokens which have one)
+        """
+        return self.remove_nan([getattr(self, f"tkn{idx}_weight") for idx in range(8)])
+
+    @property
+    def token_balances(self) -> List[Decimal]:
+        """
+        returns the balances of the tokens of the pool (for the tokens which have one)
+        """
+        return self.remove_nan([getattr(self, f"tkn{idx}_balance") for idx in range(8)])
+
+    @property
+    def token_decimals(self) -> List[int]:
+        """
+        returns the decimals of the tokens of the pool (for the tokens which have them)
+        """
+        return self.remove_nan([getattr(self, f"tkn{idx}_decimals") for idx in range(8)])
 
     @property
     def get_tokens(self):
@@ -276,7 +294,7 @@ class PoolAndTokens:
             if self.pool_type == "volatile":
                 out = self._other_to_cpc()
             else:
-                raise SolidlyV2StablePoolsNotSupported(f"exchange {self.exchange_name}")
+                out = self._solidly_stable_to_cpc()
         elif self.exchange_name in self.ConfigObj.SUPPORTED_EXCHANGES:
             out = self._other_to_cpc()
         else:
@@ -300,52 +318,63 @@ class PoolAndTokens:
 
     def _balancer_to_cpc(self) -> List[Any]:
         """
-        constructor: from Uniswap V2 pool (see class docstring for other parameters)
+        constructor: from weighted Balancer pool (see class docstring for other parameters)
 
-        :x_tknb:    current pool liquidity in token x (base token of the pair)*
-        :y_tknq:    current pool liquidity in token y (quote token of the pair)*
-        :k:         uniswap liquidity parameter (k = xy)*
+        :tokens:            the tokens of the pool
+        :token_balances:    the token balances of the pool (in wei)
+        :token_weights:     the token weights of the pool
 
-        *exactly one of k,x,y must be None; all other parameters must not be None;
-        a reminder that x is TKNB and y is TKNQ
+        returns one curve for every pair of tokens of the pool; all of them carry the n-token
+        curve of the pool (see ``ConstantProductCurve.from_balancer``)
+        """
+        tokens = [
+            tkn.replace(self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS)
+            for tkn in self.tokens
+        ]
+        balances = [
+            float(self.convert_decimals(balance, decimals))
+            for balance, decimals in zip(self.token_balances, self.token_decimals)
+        ]
+        if not all(balance > 0 for balance in balances):
+            self.ConfigObj.logger.debug(f"empty balancer pool [{self.cid}]")
+            return []
+
+        typed_args = {
+            "tokens": tokens,
+            "balances": balances,
+            "weights": [float(str(weight)) for weight in self.token_weights],
+            "fee": self.fee,
+            "cid": self.cid,
+            "descr": self.descr,
+            "params": self._params,
+        }
+        return ConstantProductCurve.from_balancer(**self._convert_to_float(typed_args))
+
+    def _solidly_stable_to_cpc(self) -> List[Any]:
         """
+        constructor: from Solidly stable pool (see class docstring for other parameters)
 
-        typed_args_all = []
+        :x:         current pool liquidity in token x (token 0)
+        :y:         current pool liquidity in token y (token 1)
 
-        for idx, tkn in enumerate(self.tokens):
-            for _idx, _tkn in enumerate(self.tokens[idx:], start=idx):
-                if _idx >= len(self.tokens) or tkn == _tkn:
-                    continue
+        the curve follows the Solidly invariant x^3 y + x y^3 = k exactly (see ``ConstantProductCurve.from_solidly``)
+        """
+        tkn0_balance = self.convert_decimals(self.tkn0_balance, self.tkn0_decimals)
+        tkn1_balance = self.convert_decimals(self.tkn1_balance, self.tkn1_decimals)
+        if tkn0_balance == 0 or tkn1_balance == 0:
+            self.ConfigObj.logger.debug(f"empty solidly stable pool [{self.cid}]")
+            return []
 
-                # convert tkn0_balance and tkn1_balance to Decimal from wei
-                tkn0_balance = self.convert_decimals(
-                    self.token_balances[idx], self.token_decimals[idx]
-                )
-                tkn1_balance = self.convert_decimals(
-                    self.token_balances[_idx], self.token_decimals[_idx]
-                )
-                weight0 = float(str(self.token_weights[idx]))
-                weight1 = float(str(self.token_weights[_idx]))
-                eta = weight0 / weight1
-                _pair_name = tkn + "/" + _tkn
-                # create a typed-dictionary of the arguments
-                typed_args_all.append(
-                    {
-                        "x": tkn0_balance,
-                        "y": tkn1_balance,
-                        # "alpha": weight0,
-                        "eta": eta,
-                        "pair": _pair_name.replace(self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS),
-                        "fee": self.fee,
-                        "cid": self.cid,
-                        "descr": self.descr,
-                        "params": self._params,
-                    }
-                )
-        return [
-            ConstantProductCurve.from_xyal(**self._convert_to_float(typed_args))
-            for typed_args in typed_args_all
-        ]
+        typed_args = {
+            "x": tkn0_balance,
+            "y": tkn1_balance,
+            "pair": self.pair_name.replace(self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS),
+            "fee": self.fee,
+            "cid": self.cid,
+            "descr": self.descr,
+            "params": self._params,
+        }
+        return ConstantProductCurve.from_solidly(**self._convert_to_float(typed_args), exact=True)
 
     class DoubleInvalidCurveError(ValueError):
         pass
@@ -404,69 +433,27 @@ class PoolAndTokens:
         a difference for the result)
         """
 
-        # if idx == 0, use the first curve, otherwise use the second curve. change the numerical values to Decimal
+        # if idx == 0, use the first curve, otherwise use the second curve; orders are decoded once per state
         lst = []
         errors = []
         for i in [0, 1]:
-
-            S = Decimal(self.A_1) if i == 0 else Decimal(self.A_0)
-            B = Decimal(self.B_1) if i == 0 else Decimal(self.B_0)
-            try:
-                if B <= 0:
-                    continue
-            except decimal.InvalidOperation:
-                continue
-            y = Decimal(self.y_1) if i == 0 else Decimal(self.y_0)
-            z = yint = Decimal(self.z_1) if i == 0 else Decimal(self.z_0)
+            A, B, y, z = (self.A_1, self.B_1, self.y_1, self.z_1) if i == 0 else (self.A_0, self.B_0, self.y_0, self.z_0)
             try:
-                if y <= Decimal("0"):
+                if Decimal(B) <= 0 or Decimal(y) <= 0:
                     continue
-            except decimal.InvalidOperation:
-                # print(
-                #     f"decimal.InvalidOperation attributes: {self.exchange_name}, {self.pair_name}, {self.cid}, y={y}, y_0={self.y_0}, y_1={self.y_1}, skipping..."
-                # )
+                order = CarbonCalculator.from_state(y=y, z=z, A=A, B=B)
+            except (decimal.InvalidOperation, ValueError, TypeError):
                 continue
-            encoded_order = EncodedOrder(
-                **{
-                    "token": self.pair_name.split("/")[i].replace(
-                        self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS
-                    ),
-                    "A": S,
-                    "B": B,
-                    "y": y,
-                    "z": z,
-                }
-            )
 
-            def decimal_converter(idx):
-                if idx == 0:
-                    dec0 = self.tkn0_decimals
-                    dec1 = self.tkn1_decimals
-                else:
-                    dec0 = self.tkn1_decimals
-                    dec1 = self.tkn0_decimals
-                return Decimal(str(10 ** (dec0 - dec1)))
-
-            decimal_converter = decimal_converter(i)
-
-            p_start = Decimal(encoded_order.p_start) * decimal_converter
-            p_end = Decimal(encoded_order.p_end) * decimal_converter
-            yint = Decimal(yint) / (
-                Decimal("10") ** [self.tkn1_decimals, self.tkn0_decimals][i]
-            )
-            y = Decimal(y) / (
-                Decimal("10") ** [self.tkn1_decimals, self.tkn0_decimals][i]
-            )
+            decimals = [self.tkn0_decimals, self.tkn1_decimals]
+            typed_args = order.cpc_args(decimals_y=decimals[1 - i], decimals_x=decimals[i])
 
             tkny = 1 if i == 0 else 0
             typed_args = {
+                **typed_args,
                 "cid": f"{self.cid}-{i}"
                 if self.exchange_name in self.ConfigObj.CARBON_V1_FORKS
                 else self.cid,
-                "yint": yint,
-                "y": y,
-                "pb": p_end,
-                "pa": p_start,
                 "tkny": self.pair_name.split("/")[tkny].replace(
                     self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS
                 ),
@@ -524,6 +511,8 @@ class PoolAndTokens:
             :descr:    description (optional; eg. "UniV3 0.1%")
             :params:   additional parameters (optional)
 
+        if the initialized ticks of the pool are known, the curve of the current range is followed
+        by the curves of the adjacent ranges (see ``Univ3Calculator.range_params``)
         """
         args = {
             "token0": self.tkn0_address,
@@ -546,7 +535,16 @@ class PoolAndTokens:
         params["cid"] = self.cid
         params["descr"] = self.descr
         params["params"] = self._params
-        return [ConstantProductCurve.from_univ3(**params)]
+        curves = [ConstantProductCurve.from_univ3(**params)]
+        if self.ticks:
+            for offset, range_params in uni3.range_params(self.ticks).items():
+                curves.append(ConstantProductCurve.from_univ3(
+                    **range_params,
+                    cid=uni3.range_cid(self.cid, offset),
+                    descr=self.descr,
+                    params=self._params,
+                ))
+        return curves
 
     @staticmethod
     def convert_decimals(tkn_balance_wei: Decimal, tkn_decimals: int) -> Decimal:
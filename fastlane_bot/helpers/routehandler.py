@@ -13,8 +13,8 @@ even if they happen to be exported.
 All rights reserved.
 Licensed under MIT.
 """
-__VERSION__ = "1.1.1"
-__DATE__ = "02/May/2023"
+__VERSION__ = "1.3"
+__DATE__ = "18/Oct/2026"
 
 import decimal
 import math
@@ -25,6 +25,8 @@ from typing import List, Any, Dict, Tuple
 import eth_abi
 import pandas as pd
 
+from .balancercalc import BalancerCalculator
+from .carboncalc import CarbonCalculator
 from .tradeinstruction import TradeInstruction
 from ..events.interface import Pool
 from ..tools.cpc import T
@@ -892,11 +894,16 @@ class TxRouteHandler:
             tkn_in: str,
             tkn_out: str,
             tkn_0_address: str,
-            tkn_1_address: str
+            tkn_1_address: str,
+            tick: int = None,
+            ticks: List[List[int]] = None,
     ) -> Decimal:
         """
         Refactored calc uniswap v3 output.
 
+        If the initialized ticks of the pool are known, the swap crosses them (see `_swap_across_ticks`), otherwise
+        it is computed with the liquidity of the current range.
+
         Parameters
         ----------
         amount_in: Decimal
@@ -915,6 +922,10 @@ class TxRouteHandler:
             The token in.
         tkn_0_address: str
             The token 0 key.
+        tick: int, optional
+            The current tick.
+        ticks: List[List[int]], optional
+            The [tick, liquidityNet] pairs of the initialized ticks.
 
         Returns
         -------
@@ -932,6 +943,19 @@ class TxRouteHandler:
 
         # print(f"[_calc_uniswap_v3_output] tkn_in={tkn_in}, tkn_0_address={tkn_0_address}, tkn_1_address={tkn_1_address}, tkn0_in={tkn_in == tkn_0_address}, liquidity={liquidity}, fee={fee}, sqrt_price={sqrt_price}, decimal_tkn0_modifier={decimal_tkn0_modifier}, decimal_tkn1_modifier={decimal_tkn1_modifier}")
 
+        if ticks and tick is not None:
+            return self._swap_across_ticks(
+                amount_in=amount_in,
+                fee=fee,
+                liquidity=liquidity,
+                sqrt_price=sqrt_price,
+                decimal_tkn0_modifier=decimal_tkn0_modifier,
+                decimal_tkn1_modifier=decimal_tkn1_modifier,
+                zero_for_one=tkn_in == tkn_0_address,
+                tick=int(tick),
+                ticks=ticks,
+            )
+
         return (
             self._swap_token0_in(
                 amount_in=amount_in,
@@ -952,100 +976,94 @@ class TxRouteHandler:
             )
         )
 
-    ONE = 2 ** 48
-
-    def decodeFloat(self, value):
-        return (value % self.ONE) << (value // self.ONE)
-
-    def decode(self, value):
-        return self.decodeFloat(int(value)) / self.ONE
-
-    def decode_decimal_adjustment(self, value: Decimal, tkn_in_decimals: int or str, tkn_out_decimals: int or str):
-        tkn_in_decimals = int(tkn_in_decimals)
-        tkn_out_decimals = int(tkn_out_decimals)
-        return value * Decimal("10") ** (
-                (tkn_in_decimals - tkn_out_decimals) / Decimal("2")
-        )
-
-    @staticmethod
-    def _get_input_trade_by_target_carbon(
-            y, z, A, B, fee, tkns_out: Decimal, trade_by_source: bool = True
-    ) -> Tuple[Decimal, Decimal]:
-        """
-        Refactored get input trade by target fastlane_bot.
-
-        Parameters
-        ----------
-        y: Decimal
-            The y.
-        z: Decimal
-            The z.
-        A: Decimal
-            The A.
-        B: Decimal
-            The B.
-        fee: Decimal
-            The fee.
-        tkns_out: Decimal
-            The tokens out.
-
-        Returns
-        -------
-        Tuple[Decimal, Decimal]
-            The tokens in and tokens out.
+    def _swap_across_ticks(
+            self,
+            amount_in: Decimal,
+            fee: Decimal,
+            liquidity: Decimal,
+            sqrt_price: Decimal,
+            decimal_tkn0_modifier: Decimal,
+            decimal_tkn1_modifier: Decimal,
+            zero_for_one: bool,
+            tick: int,
+            ticks: List[List[int]],
+    ) -> Decimal:
         """
-        # Fee set to 0 to avoid
-        fee = Decimal(str(fee))
-        tkns_out = min(tkns_out, y)
-        tkns_in = (
-                (tkns_out * z ** 2) / ((A * y + B * z) * (A * y + B * z - A * tkns_out))
-        )
+        Swap across the initialized ticks of a Uniswap v3 pool.
 
-        if not trade_by_source:
-            # Only taking fee if calculating by trade by target. Otherwise fee will be calculated in trade by source function.
-            tkns_in = tkns_in * Decimal(1 - fee)
-
-        return tkns_in, tkns_out
-
-    def _get_output_trade_by_source_carbon(
-            self, y, z, A, B, fee, tkns_in: Decimal
-    ) -> Tuple[Decimal, Decimal]:
-        """
-        Refactored get output trade by source fastlane_bot.
+        The ranges between the initialized ticks are consumed one after the other, and the liquidity net of every
+        crossed tick is applied to the liquidity. Beyond the last known tick the swap continues with the last
+        liquidity, as for a single range.
 
         Parameters
         ----------
-        y: Decimal
-            The y.
-        z: Decimal
-            The z.
-        A: Decimal
-            The A.
-        B: Decimal
-            The B.
+        amount_in: Decimal
+            The amount in.
         fee: Decimal
             The fee.
-        tkns_in: Decimal
-            The tokens in.
+        liquidity: Decimal
+            The liquidity of the current range.
+        sqrt_price: Decimal
+            The sqrt price.
+        decimal_tkn0_modifier: Decimal
+            The decimal tkn0 modifier.
+        decimal_tkn1_modifier: Decimal
+            The decimal tkn1 modifier.
+        zero_for_one: bool
+            True if token 0 is swapped for token 1 (the price decreases).
+        tick: int
+            The current tick.
+        ticks: List[List[int]]
+            The [tick, liquidityNet] pairs of the initialized ticks.
 
         Returns
         -------
-        Tuple[Decimal, Decimal]
-            The tuple of tokens in and tokens out.
+        Decimal
+            The amount out.
         """
+        q96 = Decimal(self.ConfigObj.Q96)
+        if zero_for_one:
+            crossed = sorted(((int(t), int(net)) for t, net in ticks if int(t) <= tick), reverse=True)
+            amount = amount_in * (Decimal(1) - fee) * decimal_tkn0_modifier
+        else:
+            crossed = sorted((int(t), int(net)) for t, net in ticks if int(t) > tick)
+            amount = amount_in * (Decimal(1) - fee) * decimal_tkn1_modifier
+
+        amount_out = Decimal(0)
+        for next_tick, liquidity_net in crossed:
+            sqrt_price_next = Decimal("1.0001") ** (Decimal(next_tick) / 2) * q96
+            if zero_for_one:
+                step_in = liquidity * q96 * (sqrt_price - sqrt_price_next) / (sqrt_price * sqrt_price_next)
+            else:
+                step_in = liquidity * (sqrt_price_next - sqrt_price) / q96
+            if amount <= step_in:
+                break
+            if zero_for_one:
+                amount_out += self._calc_amount1(liquidity, sqrt_price_next, sqrt_price) / q96
+                liquidity -= liquidity_net
+            else:
+                amount_out += self._calc_amount0(liquidity, sqrt_price, sqrt_price_next) * q96
+                liquidity += liquidity_net
+            amount -= step_in
+            sqrt_price = sqrt_price_next
 
-        fee = Decimal(str(fee))
-        tkns_out = Decimal(
-            (tkns_in * (B * z + A * y) ** 2)
-            / (tkns_in * (B * A * z + A ** 2 * y) + z ** 2)
+        if zero_for_one:
+            amount_out /= decimal_tkn1_modifier
+        else:
+            amount_out /= decimal_tkn0_modifier
+        if amount <= 0 or liquidity <= 0:
+            return amount_out
+
+        # the remaining amount is swapped within the range of the current price
+        swap = self._swap_token0_in if zero_for_one else self._swap_token1_in
+        return amount_out + swap(
+            amount_in=amount / (decimal_tkn0_modifier if zero_for_one else decimal_tkn1_modifier),
+            fee=Decimal(0),
+            liquidity=liquidity,
+            sqrt_price=sqrt_price,
+            decimal_tkn0_modifier=decimal_tkn0_modifier,
+            decimal_tkn1_modifier=decimal_tkn1_modifier,
         )
-        if tkns_out > y:
-            tkns_in, tkns_out = self._get_input_trade_by_target_carbon(
-                y=y, z=z, A=A, B=B, fee=fee, tkns_out=y, trade_by_source=True
-            )
-
-        tkns_out = tkns_out * (Decimal("1") - fee)
-        return tkns_in, tkns_out
 
     def _calc_carbon_output(
             self, curve: Pool, tkn_in: str, tkn_in_decimals: int, tkn_out_decimals: int, amount_in: Decimal
@@ -1064,8 +1082,8 @@ class TxRouteHandler:
 
         Returns
         -------
-        Decimal
-            The amount out.
+        Tuple[Decimal, Decimal]
+            The amount in (reduced if the order runs out of liquidity) and the amount out.
         """
         assert tkn_in != self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS, "[routehandler.py _calc_carbon_output] Function does not expect native gas token as input."
         amount_in = Decimal(str(amount_in))
@@ -1086,25 +1104,15 @@ class TxRouteHandler:
             else (curve.y_1, curve.z_1, curve.A_1, curve.B_1)
         )
 
-        if A is None:
-            A = 0
-
-        # print('[_calc_carbon_output] before decode: ', y, z, A, B)
-        A = self.decode_decimal_adjustment(value=Decimal(str(self.decode(A))), tkn_in_decimals=tkn_in_decimals,
-                                           tkn_out_decimals=tkn_out_decimals)
-        B = self.decode_decimal_adjustment(value=Decimal(str(self.decode(B))), tkn_in_decimals=tkn_in_decimals,
-                                           tkn_out_decimals=tkn_out_decimals)
-        y = Decimal(y) / Decimal("10") ** Decimal(str(tkn_out_decimals))
-        z = Decimal(z) / Decimal("10") ** Decimal(str(tkn_out_decimals))
-        # print('[_calc_carbon_output] after decode: ', y, z, A, B)
-        assert y > 0, f"Trade incoming to empty Carbon curve: {curve}"
+        order = CarbonCalculator.from_state(y=y, z=z, A=A, B=B)
+        assert order.y > 0, f"Trade incoming to empty Carbon curve: {curve}"
 
-        # print(f"[_calc_carbon_output] Carbon curve decoded: {y, z, A, B}, fee = {Decimal(curve.fee)}, amount_in={amount_in}")
-
-        amt_in, result = self._get_output_trade_by_source_carbon(
-            y=y, z=z, A=A, B=B, fee=Decimal(curve.fee_float), tkns_in=amount_in
-        )
-        return amt_in, result
+        # the trade is calculated in wei with the integer math of the contract
+        tkn_in_modifier = Decimal("10") ** tkn_in_decimals
+        tkn_out_modifier = Decimal("10") ** tkn_out_decimals
+        fee_ppm = int(Decimal(str(curve.fee_float)) * CarbonCalculator.PPM_RESOLUTION)
+        amt_in_wei, result_wei = order.trade_by_source(int(amount_in * tkn_in_modifier), fee_ppm=fee_ppm)
+        return Decimal(amt_in_wei) / tkn_in_modifier, Decimal(result_wei) / tkn_out_modifier
 
     @staticmethod
     def _single_trade_result_constant_product(
@@ -1114,9 +1122,48 @@ class TxRouteHandler:
             (tokens_in * token1_amt * (1 - Decimal(fee))) / (tokens_in + token0_amt)
         )
 
+    SOLIDLY_STABLE_MAX_ITERATIONS = 255
+
+    @staticmethod
+    def _single_trade_result_solidly_stable(
+            tokens_in, token0_amt, token1_amt, fee
+    ) -> Decimal:
+        """
+        The output of a trade on a Solidly stable pool, whose invariant is x^3 y + x y^3 = k.
+
+        As in the pool contract, the fee is taken from the amount in, and the new balance of the token out is solved
+        with Newton's method (``_get_y``), starting from the current balance.
+
+        Parameters
+        ----------
+        tokens_in: Decimal
+            The amount in.
+        token0_amt: Decimal
+            The pool balance of the token in.
+        token1_amt: Decimal
+            The pool balance of the token out.
+        fee: float
+            The fee.
+
+        Returns
+        -------
+        Decimal
+            The amount out.
+        """
+        k = token0_amt ** 3 * token1_amt + token0_amt * token1_amt ** 3
+        x = token0_amt + tokens_in * (1 - Decimal(str(fee)))
+        y = token1_amt
+        tolerance = token1_amt * Decimal("1e-24")
+        for _ in range(TxRouteHandler.SOLIDLY_STABLE_MAX_ITERATIONS):
+            dy = (x ** 3 * y + x * y ** 3 - k) / (x ** 3 + 3 * x * y ** 2)
+            y -= dy
+            if dy <= tolerance:
+                break
+        return token1_amt - y
+
     def _calc_balancer_output(self, curve: Pool, tkn_in: str, tkn_out: str, amount_in: Decimal):
         """
-        This is a wrapper function that extracts the necessary pool values to pass into the Balancer swap equation and passes them into the low-level function.
+        This function simulates a trade against a Balancer weighted pool, using the integer math of the Balancer vault.
         curve: Pool
             The pool.
         tkn_in: str
@@ -1129,86 +1176,28 @@ class TxRouteHandler:
         returns:
             The number of tokens expected to be received by the trade.
         """
-        tkn_in_weight = Decimal(str(curve.get_token_weight(tkn=tkn_in)))
-        tkn_in_balance = Decimal(str(curve.get_token_balance(tkn=tkn_in))) / 10 ** Decimal(
-            str(curve.get_token_decimals(tkn=tkn_in)))
-        tkn_out_weight = Decimal(str(curve.get_token_weight(tkn=tkn_out)))
-        tkn_out_balance = Decimal(str(curve.get_token_balance(tkn=tkn_out))) / 10 ** Decimal(
-            str(curve.get_token_decimals(tkn=tkn_out)))
+        tkn_in_decimals = int(curve.get_token_decimals(tkn=tkn_in))
+        tkn_out_decimals = int(curve.get_token_decimals(tkn=tkn_out))
+        pool = BalancerCalculator.from_pool(
+            balances=[curve.get_token_balance(tkn=tkn_in), curve.get_token_balance(tkn=tkn_out)],
+            weights=[curve.get_token_weight(tkn=tkn_in), curve.get_token_weight(tkn=tkn_out)],
+            decimals=[tkn_in_decimals, tkn_out_decimals],
+            fee=curve.fee_float,
+        )
         self.ConfigObj.logger.debug(
-            f"[routehandler.py _calc_balancer_output] tknin {tkn_in} weight: {tkn_in_weight}, tknout {tkn_out} tknout weight: {tkn_out_weight}")
-
-        # Extract trade fee from amount in
-        fee = Decimal(str(amount_in)) * Decimal(str(curve.fee_float))
-        amount_in = amount_in - fee
+            f"[routehandler.py _calc_balancer_output] tknin {tkn_in} weight: {pool.weights[0]}, tknout {tkn_out} tknout weight: {pool.weights[1]}")
 
-        if amount_in > (tkn_in_balance * Decimal("0.3")):
+        amount_in_wei = int(Decimal(str(amount_in)) * 10 ** tkn_in_decimals)
+        if pool.amount_net_of_fee(amount_in_wei) > pool.max_amount_in(0):
             raise BalancerInputTooLargeError(
                 "Balancer has a hard constraint that amount in must be less than 30% of the pool balance of tkn in, making this trade invalid.")
 
-        amount_out = self._calc_balancer_out_given_in(balance_in=tkn_in_balance, weight_in=tkn_in_weight,
-                                                      balance_out=tkn_out_balance, weight_out=tkn_out_weight,
-                                                      amount_in=amount_in)
-        if amount_out > (tkn_out_balance * Decimal("0.3")):
+        amount_out_wei = pool.trade_by_source(0, 1, amount_in_wei)
+        if amount_out_wei > pool.max_amount_out(1):
             raise BalancerOutputTooLargeError(
                 "Balancer has a hard constraint that the amount out must be less than 30% of the pool balance of tkn out, making this trade invalid.")
 
-        # amount_in = (1 - Decimal(str(curve.fee_float))) * Decimal(str(amount_in))
-        return amount_out
-
-    @staticmethod
-    def _calc_balancer_out_given_in(balance_in: Decimal,
-                                    weight_in: Decimal,
-                                    balance_out: Decimal,
-                                    weight_out: Decimal,
-                                    amount_in: Decimal) -> Decimal:
-        """
-        This function uses the Balancer swap equation to calculate the token output, given an input.
-
-        :param balance_in: the pool balance of the source token
-        :param weight_in: the pool weight of the source token
-        :param balance_out: the pool balance of the target token
-        :param weight_out: the pool weight of the target token
-        :param amount_in: the number of source tokens trading into the pool
-
-        returns:
-        The number of tokens expected to be received by the trade.
-
-        """
-
-        denominator = balance_in + amount_in
-        base = divUp(balance_in, denominator)  # balanceIn.divUp(denominator);
-        exponent = divDown(weight_in, weight_out)  # weightIn.divDown(weightOut);
-        power = powUp(base, exponent)  # base.powUp(exponent);
-
-        return mulDown(balance_out, complement(power))  # balanceOut.mulDown(power.complement());
-
-    @staticmethod
-    def _calc_balancer_input_given_output(balance_in: Decimal,
-                                          weight_in: Decimal,
-                                          balance_out: Decimal,
-                                          weight_out: Decimal,
-                                          amount_out: Decimal):
-        """
-        This function uses the Balancer swap equation to calculate the token output, given an input.
-
-        :param balance_in: the pool balance of the source token
-        :param weight_in: the pool weight of the source token
-        :param balance_out: the pool balance of the target token
-        :param weight_out: the pool weight of the target token
-        :param amount_in: the number of source tokens trading into the pool
-
-        returns:
-        The number of tokens expected to be received by the trade.
-
-        """
-
-        base = divUp(balance_out, (balance_out - amount_out))
-        exponent = divUp(weight_out, weight_in)
-        power = powUp(base, exponent)
-        ratio = power - Decimal(1)
-        result = mulUp(balance_in, ratio)
-        return result
+        return Decimal(amount_out_wei) / 10 ** tkn_out_decimals
 
     def _solve_trade_output(
             self, curve: Pool, trade: TradeInstruction, amount_in: Decimal = None
@@ -1253,7 +1242,9 @@ class TxRouteHandler:
                 decimal_tkn0_modifier=Decimal(10 ** tkn0_decimals),
                 decimal_tkn1_modifier=Decimal(10 ** tkn1_decimals),
                 tkn_0_address=tkn0_address,
-                tkn_1_address=tkn1_address
+                tkn_1_address=tkn1_address,
+                tick=curve.tick,
+                ticks=curve.ticks,
             )
         elif curve.exchange_name in self.ConfigObj.CARBON_V1_FORKS or curve.exchange_name == self.ConfigObj.BANCOR_POL_NAME:
             amount_in, amount_out = self._calc_carbon_output(
@@ -1264,9 +1255,6 @@ class TxRouteHandler:
             amount_out = self._calc_balancer_output(curve=curve, tkn_in=trade.tknin_address,
                                                     tkn_out=trade.tknout_address, amount_in=amount_in)
 
-        elif curve.exchange_name in self.ConfigObj.SOLIDLY_V2_FORKS and curve.pool_type in "stable":
-            raise ExchangeNotSupportedError(
-                f"[routerhandler.py _solve_trade_output] Solidly V2 stable pools are not yet supported")
         else:
             tkn0_amt, tkn1_amt = (
                 (curve.tkn0_balance, curve.tkn1_balance)
@@ -1279,12 +1267,20 @@ class TxRouteHandler:
             tkn0_amt = self._from_wei_to_decimals(tkn0_amt, tkn0_dec)
             tkn1_amt = self._from_wei_to_decimals(tkn1_amt, tkn1_dec)
 
-            amount_out = self._single_trade_result_constant_product(
-                tokens_in=amount_in,
-                token0_amt=tkn0_amt,
-                token1_amt=tkn1_amt,
-                fee=curve.fee_float,
-            )
+            if curve.exchange_name in self.ConfigObj.SOLIDLY_V2_FORKS and curve.pool_type == self.ConfigObj.network.POOL_TYPE_STABLE:
+                amount_out = self._single_trade_result_solidly_stable(
+                    tokens_in=amount_in,
+                    token0_amt=tkn0_amt,
+                    token1_amt=tkn1_amt,
+                    fee=curve.fee_float,
+                )
+            else:
+                amount_out = self._single_trade_result_constant_product(
+                    tokens_in=amount_in,
+                    token0_amt=tkn0_amt,
+                    token1_amt=tkn1_amt,
+                    fee=curve.fee_float,
+                )
 
         amount_out = amount_out * Decimal("0.9999")
         amount_out = TradeInstruction._quantize(amount_out, tkn_out_decimals)
@@ -1478,41 +1474,6 @@ class TxRouteHandler:
     def _cid_to_pool(self, cid: str, db: any) -> Pool:
         return db.get_pool(cid=cid)
 
-# TODO: Those functions should probably be private; also -- are they needed at
-# all? Most of them seem to be extremely trivial
-
-def mulUp(a: Decimal, b: Decimal) -> Decimal:
-    return a * b
-
-
-def divUp(a: Decimal, b: Decimal) -> Decimal:
-    if a * b == 0:
-        return Decimal(0)
-    else:
-        return a / b
-
-
-def mulDown(a: Decimal, b: Decimal) -> Decimal:
-    return a * b
-
-
-def divDown(a: Decimal, b: Decimal) -> Decimal:
-    result = a / b
-    return result
-
-
-def complement(a: Decimal) -> Decimal:
-    return Decimal(1 - a) if a < 1 else Decimal(0)
-
-
-def powUp(a: Decimal, b: Decimal) -> Decimal:
-    return a ** b
-
-
-def powDown(a: Decimal, b: Decimal) -> Decimal:
-    return a ** b
-
-
 class BalancerInputTooLargeError(AssertionError):
     pass
 
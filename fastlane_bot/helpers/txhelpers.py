@@ -7,13 +7,20 @@ and methods for working with transactions:
 - ``validate_and_submit_transaction``: Validates a transaction and then submits it to the arb contract
 - ``check_and_approve_tokens``: Approves every token with zero allowance to the maximum allowance
 
+When access lists are enabled (``USE_ACCESS_LIST``, not on Ethereum where transactions are
+sent privately through flashbots), the access list returned by ``eth_createAccessList`` for a
+route is cached under the contract addresses of that route (pools, tokens, routers, the Carbon
+controller and the arb contract). The next transaction on the same route gets its access list
+from the cache, and its gas is estimated once with it, without an ``eth_createAccessList``
+round-trip. The cache holds the most recently used ``ACCESS_LIST_CACHE_SIZE`` routes.
+
 ---
 (c) Copyright Bprotocol foundation 2023-24.
 All rights reserved.
 Licensed under MIT.
 """
-__VERSION__ = "1.0"
-__DATE__ = "01/May/2023"
+__VERSION__ = "1.1"
+__DATE__ = "19/Oct/2026"
 
 from _decimal import Decimal
 
@@ -29,6 +36,7 @@ from fastlane_bot.utils import num_format
 from fastlane_bot.data.abi import ERC20_ABI
 
 MAX_UINT256 = 2 ** 256 - 1
+ACCESS_LIST_CACHE_SIZE = 256
 ETH_RESOLUTION = 10 ** 18
 
 @dataclass
@@ -48,11 +56,13 @@ class TxHelpers:
         self.arb_rewards_portion = Decimal(self.cfg.ARB_REWARDS_PPM) / 1_000_000
         self.wallet_address = self.cfg.w3.eth.account.from_key(self.cfg.ETH_PRIVATE_KEY_BE_CAREFUL).address
 
+        self.access_list_cache: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+
         if self.cfg.NETWORK == self.cfg.NETWORK_ETHEREUM:
             self.use_access_list = False # TODO: figure out why flashbots is unable to handle this
             self.send_transaction = self._send_private_transaction
         else:
-            self.use_access_list = False
+            self.use_access_list = self.cfg.USE_ACCESS_LIST
             self.send_transaction = self._send_regular_transaction
 
     def validate_and_submit_transaction(
@@ -62,7 +72,8 @@ class TxHelpers:
         src_address: str,
         expected_profit_gastkn: Decimal,
         expected_profit_usd: Decimal,
-        flashloan_struct: List[Dict]
+        flashloan_struct: List[Dict],
+        pool_addresses: Optional[List[str]] = None
     ) -> Tuple[Optional[str], Optional[dict]]:
         """
         This method validates and submits a transaction to the arb contract.
@@ -74,6 +85,7 @@ class TxHelpers:
             expected_profit_gastkn: 
             expected_profit_usd: 
             flashloan_struct: 
+            pool_addresses: the addresses of the pools traded in the route (used for the access list)
 
         Returns:
             The hash of the transaction if submitted, None otherwise.
@@ -99,9 +111,10 @@ class TxHelpers:
             value = 0
 
         tx = self._create_transaction(self.arb_contract, fn_name, args, value)
+        access_list_addresses = self._get_access_list_addresses(route_struct, flashloan_struct, pool_addresses)
 
         try:
-            self._update_transaction(tx)
+            self._update_transaction(tx, access_list_addresses)
         except Exception as e:
             self.cfg.logger.info(f"Transaction {dumps(tx, indent=4)}\nFailed with {e}")
             return None, None
@@ -167,15 +180,84 @@ class TxHelpers:
             "nonce": self.cfg.w3.eth.get_transaction_count(self.wallet_address)
         }
 
-    def _update_transaction(self, tx: dict):
+    def _update_transaction(self, tx: dict, access_list_addresses: Optional[List[str]] = None):
+        route = tuple(access_list_addresses or ())
+        access_list = self._get_cached_access_list(route) if self.use_access_list and route else None
+        if access_list:
+            tx["accessList"] = access_list
         tx["gas"] = self.cfg.w3.eth.estimate_gas(tx) # may throw an exception
-        if self.use_access_list:
+        if self.use_access_list and access_list is None:
             result = self.cfg.w3.eth.create_access_list(tx) # may return an error
-            if tx["gas"] > result["gasUsed"] and "error" not in result:
-                tx["gas"] = result["gasUsed"]
-                tx["accessList"] = loads(self.cfg.w3.to_json(result["accessList"]))
+            if "error" not in result:
+                access_list = loads(self.cfg.w3.to_json(result["accessList"])) if tx["gas"] > result["gasUsed"] else []
+                if access_list:
+                    tx["gas"] = result["gasUsed"]
+                    tx["accessList"] = access_list
+                if route:
+                    self._update_access_list_cache(route, access_list)
         tx.update(self.cfg.network.gas_strategy(self.cfg.w3))
 
+    def _get_access_list_addresses(
+        self,
+        route_struct: List[Dict[str, Any]],
+        flashloan_struct: List[Dict],
+        pool_addresses: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Collects the contract addresses touched by an arb transaction, in order of first appearance.
+
+        Args:
+            route_struct: the route struct (tokens and custom addresses, i.e. routers, anchors or the Carbon controller)
+            flashloan_struct: the flashloan struct (flashloan source tokens)
+            pool_addresses: the addresses of the pools traded in the route
+
+        Returns:
+            The list of unique checksummed addresses, excluding the native gas token and the zero address.
+        """
+        candidates = [self.arb_contract.address]
+        candidates += [token for flashloan in flashloan_struct for token in flashloan["sourceTokens"]]
+        for route in route_struct:
+            candidates += [route["sourceToken"], route["targetToken"], route["customAddress"]]
+        candidates += pool_addresses or []
+
+        excluded = {self.cfg.NATIVE_GAS_TOKEN_ADDRESS, self.cfg.ZERO_ADDRESS}
+        addresses = {}
+        for address in candidates:
+            if isinstance(address, str) and self.cfg.w3.is_address(address):
+                address = self.cfg.w3.to_checksum_address(address)
+                if address not in excluded:
+                    addresses[address] = None
+        return list(addresses)
+
+    def _get_cached_access_list(self, route: Tuple[str, ...]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gets the cached access list of a route, and marks the route as recently used.
+
+        Args:
+            route: the addresses touched by the transaction
+
+        Returns:
+            The access list (empty if an access list does not save gas on the route), or None if the route is not cached.
+        """
+        access_list = self.access_list_cache.pop(route, None)
+        if access_list is not None:
+            self.access_list_cache[route] = access_list
+        return access_list
+
+    def _update_access_list_cache(self, route: Tuple[str, ...], access_list: List[Dict[str, Any]]):
+        """
+        Caches the access list of a route (replacing any previous one), evicting the least recently used routes
+        beyond ``ACCESS_LIST_CACHE_SIZE``.
+
+        Args:
+            route: the addresses touched by the transaction
+            access_list: the access list returned by ``eth_createAccessList`` (empty if it does not save gas)
+        """
+        self.access_list_cache.pop(route, None)
+        self.access_list_cache[route] = access_list
+        while len(self.access_list_cache) > ACCESS_LIST_CACHE_SIZE:
+            del self.access_list_cache[next(iter(self.access_list_cache))]
+
     def _sign_transaction(self, tx: dict) -> str:
         return self.cfg.w3.eth.account.sign_transaction(tx, self.cfg.ETH_PRIVATE_KEY_BE_CAREFUL).rawTransaction.hex()
 
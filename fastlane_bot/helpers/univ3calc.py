@@ -6,14 +6,18 @@ from a financial perspective, either in Wei or in token units. It also allows to
 convert Uniswap v3 contract parameters into generic constant product curve parameters
 that are suitable for our ``CPC`` class.
 
+When the initialized ticks of the pool are known, the liquidity outside of the current
+range is described by a chain of adjacent ranges (see ``range_params``), each of which
+becomes a separate curve whose cid is the cid of the pool plus a range suffix.
+
 ---
 (c) Copyright Bprotocol foundation 2023-24.
 All rights reserved.
 Licensed under MIT.
 """
 
-__VERSION__ = "1.4.1" 
-__DATE__ = "25/Jul/2023"
+__VERSION__ = "1.5" 
+__DATE__ = "18/Oct/2026"
 
 from math import sqrt
 from dataclasses import dataclass, InitVar, asdict
@@ -58,6 +62,8 @@ class Univ3Calculator():
 
     Q96 = 2**96
     Q192 = 2**192
+
+    RANGE_CID_SEP = "#"
     
     tkn0: str
     tkn1: str
@@ -237,10 +243,14 @@ class Univ3Calculator():
         """calculate sp96 = sqrt(p) * Q96"""
         return sqrt(price) * cls.Q96
     
+    def _tokenL(self, liquidity):
+        """converts a liquidity value into token units"""
+        return liquidity/10**(0.5*(self.tkn0dec+self.tkn1dec)) if liquidity!=0 else 0
+
     @property
     def L(self):
         """the Uniswap L value, in token units; L**2=k, and k=xy where x,y are virtual token amounts"""
-        return self.liquidity/10**(0.5*(self.tkn0dec+self.tkn1dec)) if self.liquidity!=0 else 0
+        return self._tokenL(self.liquidity)
     
     @property
     def Lsquared(self):
@@ -325,6 +335,69 @@ class Univ3Calculator():
         )
         return result
     
+    def range_params(self, ticks, **kwargs):
+        """
+        returns the kwarg dicts suitable for CPC.from_univ3 of the ranges adjacent to the current one
+        
+        :ticks:         iterable of (tick, liquidityNet) tuples of the initialized ticks
+        :kwargs:        additional kwargs to return
+        :returns:       dict offset -> kwarg dict, where offset is 1, 2, ... for the ranges above the
+                        current one and -1, -2, ... for the ranges below it
+        
+        the ranges are delimited by the initialized ticks and extend up to the highest and down to the 
+        lowest of them; ranges without liquidity are skipped; the ranges above the current one only 
+        hold token 0 (Pmarg=Pa), the ranges below it only token 1 (Pmarg=Pb)
+        """
+        liquidity_net = {int(tick): int(net) for tick, net in ticks}
+        ticka, tickb = self.tickab
+        result = {}
+
+        liquidity, lower, offset = self.liquidity, tickb, 0
+        for tick in sorted(t for t in liquidity_net if t >= tickb):
+            if tick > lower and liquidity > 0:
+                offset += 1
+                result[offset] = self._range_params(lower, tick, liquidity, True, **kwargs)
+            liquidity += liquidity_net[tick]
+            lower = tick
+
+        liquidity, upper, offset = self.liquidity, ticka, 0
+        for tick in sorted((t for t in liquidity_net if t <= ticka), reverse=True):
+            if tick < upper and liquidity > 0:
+                offset -= 1
+                result[offset] = self._range_params(tick, upper, liquidity, False, **kwargs)
+            liquidity -= liquidity_net[tick]
+            upper = tick
+
+        return result
+
+    def _range_params(self, ticka, tickb, liquidity, above, **kwargs):
+        """kwarg dict suitable for CPC.from_univ3 of the range [ticka, tickb] outside the current range"""
+        pa, pb = 1.0001**ticka*self.decf, 1.0001**tickb*self.decf
+        return dict(
+            Pmarg = pa if above else pb,
+            uniL = self._tokenL(liquidity),
+            uniPa = pa,
+            uniPb = pb,
+            pair = self.pair,
+            fee = self.fee,
+            **kwargs,
+        )
+
+    @classmethod
+    def range_cid(cls, cid, offset):
+        """the cid of the range curve at offset (see range_params) of the pool with the given cid"""
+        return f"{cid}{cls.RANGE_CID_SEP}{'u' if offset > 0 else 'd'}{abs(offset)}"
+
+    @classmethod
+    def pool_cid(cls, cid):
+        """the cid of the pool of a curve (the cid itself unless it is a range curve)"""
+        return cid.split(cls.RANGE_CID_SEP)[0]
+
+    @classmethod
+    def is_range_cid(cls, cid):
+        """True iff the cid is the cid of a range curve"""
+        return cls.RANGE_CID_SEP in cid
+
     def info(self):
         pa, pb = self.papb
         p = self.p
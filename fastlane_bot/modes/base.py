@@ -11,8 +11,10 @@ Licensed under MIT.
 import abc
 from typing import Any, Tuple, Dict, List, Union
 from _decimal import Decimal
+import numpy as np
 import pandas as pd
 
+from fastlane_bot.helpers.univ3calc import Univ3Calculator
 from fastlane_bot.tools.cpc import T
 from fastlane_bot.utils import num_format
 
@@ -25,6 +27,9 @@ class ArbitrageFinderBase:
     AO_TOKENS = "tokens"
     AO_CANDIDATES = "candidates"
 
+    # maximum number of miniverses whose prices are kept for warm starts (least recently used are evicted)
+    WARM_START_PRICES_SIZE = 10_000
+
     def __init__(
         self,
         flashloan_tokens,
@@ -33,6 +38,7 @@ class ArbitrageFinderBase:
         result=AO_CANDIDATES,
         ConfigObj: Any = None,
         arb_mode: str = None,
+        warm_start_prices: Dict[Tuple, Dict[str, float]] = None,
     ):
         self.flashloan_tokens = flashloan_tokens
         self.CCm = CCm
@@ -45,6 +51,84 @@ class ArbitrageFinderBase:
         self.best_trade_instructions_dic = None
         self.ConfigObj = ConfigObj
         self.base_exchange = "bancor_v3" if arb_mode == "bancor_v3" else "carbon_v1"
+        self._gastkn_price_oracle = None
+        self.warm_start_prices = warm_start_prices
+        self._optimizers = {}
+
+    def get_optimizer(self, optimizer_class: Any, CC: Any) -> Any:
+        """
+        Get an optimizer of the given class for the given curves.
+
+        One optimizer instance per class is kept for the lifetime of the finder, and its curves
+        are replaced for every miniverse instead of creating a new instance.
+        """
+        optimizer = self._optimizers.get(optimizer_class)
+        if optimizer is None:
+            optimizer = self._optimizers[optimizer_class] = optimizer_class(CC)
+        return optimizer.set_curves(CC)
+
+    @staticmethod
+    def group_curves_by_pool(curves: List[Any]) -> List[List[Any]]:
+        """
+        Group the curves by pool, keeping the tick range curves of a Uniswap v3 pool together.
+
+        The groups are returned in the order of their first curve, and every curve that is not a
+        tick range curve forms a group of its own.
+        """
+        groups = {}
+        for curve in curves:
+            groups.setdefault(Univ3Calculator.pool_cid(curve.cid), []).append(curve)
+        return list(groups.values())
+
+    @staticmethod
+    def remove_range_curves(curves: List[Any]) -> List[Any]:
+        """
+        Remove the tick range curves, keeping only the current range curve of each Uniswap v3 pool.
+        """
+        return [curve for curve in curves if not Univ3Calculator.is_range_cid(curve.cid)]
+
+    @staticmethod
+    def get_warm_start_key(src_token: str, CC: Any) -> Tuple:
+        """
+        Get the key identifying a miniverse (the source token and the cids of its curves).
+        """
+        return src_token, tuple(sorted(curve.cid for curve in CC))
+
+    def get_pstart(self, src_token: str, CC: Any, pstart: Dict[str, float] = None) -> Dict[str, float]:
+        """
+        Get the starting prices for optimizing a miniverse.
+
+        Returns the equilibrium prices found for the same miniverse in a previous block (prices
+        move very little between blocks, so the optimizer converges in very few steps), or the
+        given cold start prices if the miniverse has not been optimized before.
+        """
+        if self.warm_start_prices is None:
+            return pstart
+        key = self.get_warm_start_key(src_token, CC)
+        prices = self.warm_start_prices.pop(key, None)
+        if prices is None:
+            return pstart
+        self.warm_start_prices[key] = prices  # reinserted as most recently used
+        if pstart is not None and not all(tkn in prices for tkn in pstart):
+            return pstart
+        return prices
+
+    def set_pstart(self, src_token: str, CC: Any, r: Any):
+        """
+        Store the equilibrium prices of an optimization result as starting prices for the next block.
+
+        The prices are kept in insertion (ie recency) order, and the least recently used ones are
+        evicted once there are more than ``WARM_START_PRICES_SIZE`` of them.
+        """
+        if self.warm_start_prices is None or r is None or r.is_error:
+            return
+        prices = r.p_optimal
+        if all(np.isfinite(p) and p > 0 for p in prices.values()):
+            key = self.get_warm_start_key(src_token, CC)
+            self.warm_start_prices.pop(key, None)
+            self.warm_start_prices[key] = prices
+            while len(self.warm_start_prices) > self.WARM_START_PRICES_SIZE:
+                del self.warm_start_prices[next(iter(self.warm_start_prices))]
 
     @abc.abstractmethod
     def find_arbitrage(
@@ -105,8 +189,9 @@ class ArbitrageFinderBase:
         best_trade_instructions_dic = trade_instructions_dic
         best_trade_instructions = trade_instructions
 
+        # the aggregated dataframe is only materialized if debug logging is enabled
         self.ConfigObj.logger.debug(
-            f"[modes.base._set_best_ops] best_trade_instructions_df: {best_trade_instructions_df}"
+            "[modes.base._set_best_ops] best_trade_instructions_df: %s", best_trade_instructions_df
         )
 
         # Update the optimal operations
@@ -148,6 +233,62 @@ class ArbitrageFinderBase:
         sort_order = self.create_sort_order(sort_sequence)
         return sorted(data, key=lambda item: self.sort_key(item, sort_order))
 
+    # Exchanges whose curves are preferred for the gas token conversion rate (in that order)
+    GASTKN_PRICE_SORT_SEQUENCE = ['bancor_v2','bancor_v3','uniswap_v2','uniswap_v3']
+
+    def build_gastkn_price_oracle(self, CCm: Any, sort_sequence: List[str] = None) -> Dict[str, Any]:
+        """
+        Build the reference curve of every token against the wrapped gas token in a single pass.
+
+        For each token, the reference curve is the first curve that ``custom_sort`` would select
+        from ``get_prices_simple(CCm, WRAPPED_GAS_TOKEN_ADDRESS, tkn)``, so that lookups give the
+        same conversion rate as the full scan, but in O(1).
+
+        Parameters
+        ----------
+        CCm : CPCContainer
+            The container of all curves
+        sort_sequence : List[str], optional
+            The exchange preference order, by default GASTKN_PRICE_SORT_SEQUENCE
+
+        Returns
+        -------
+        Dict[str, Any]
+            Maps each token to a tuple (curve, inverted), where inverted is True if the gas
+            token is the curve's tkny (ie the conversion rate is 1/p rather than p)
+        """
+        if sort_sequence is None:
+            sort_sequence = self.GASTKN_PRICE_SORT_SEQUENCE
+        sort_order = self.create_sort_order(sort_sequence)
+        gastkn = self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS
+
+        ranked = {}
+        for idx, curve in enumerate(CCm):
+            if curve.tknx == gastkn:
+                tkn, inverted = curve.tkny, False
+            elif curve.tkny == gastkn:
+                tkn, inverted = curve.tknx, True
+            else:
+                continue
+            rank = (self.sort_key((curve.params['exchange'],), sort_order), inverted, idx)
+            if tkn not in ranked or rank < ranked[tkn][0]:
+                ranked[tkn] = (rank, curve, inverted)
+        return {tkn: (curve, inverted) for tkn, (_, curve, inverted) in ranked.items()}
+
+    def get_gastkn_conversion_rate(self, CCm: Any, tkn: str) -> Union[float, None]:
+        """
+        Get the conversion rate of ``tkn`` against the wrapped gas token (None if no curve exists).
+
+        The price oracle is built once per container and reused for every subsequent lookup.
+        """
+        if self._gastkn_price_oracle is None or self._gastkn_price_oracle[0] is not CCm:
+            self._gastkn_price_oracle = (CCm, self.build_gastkn_price_oracle(CCm))
+        reference = self._gastkn_price_oracle[1].get(tkn)
+        if reference is None:
+            return None
+        curve, inverted = reference
+        return 1 / curve.p if inverted else curve.p
+
     def calculate_profit(
         self,
         src_token: str,
@@ -165,24 +306,13 @@ class ArbitrageFinderBase:
             self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS,
             self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS,
         ]:
-            if src_token == self.ConfigObj.NATIVE_GAS_TOKEN_ADDRESS:
-                fl_token_with_weth = self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS
-            else:
-                fl_token_with_weth = src_token
-
-            sort_sequence = ['bancor_v2','bancor_v3','uniswap_v2','uniswap_v3']
-            price_curves = self.get_prices_simple(CCm, self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS, fl_token_with_weth)
-            sorted_price_curves = self.custom_sort(price_curves, sort_sequence)
-            self.ConfigObj.logger.debug(f"[modes.base.calculate_profit sort_sequence] {sort_sequence}")
-            self.ConfigObj.logger.debug(f"[modes.base.calculate_profit price_curves] {price_curves}")
-            self.ConfigObj.logger.debug(f"[modes.base.calculate_profit sorted_price_curves] {sorted_price_curves}")
-            if len(sorted_price_curves)>0:
-                fltkn_eth_conversion_rate = sorted_price_curves[0][-1]
+            fltkn_eth_conversion_rate = self.get_gastkn_conversion_rate(CCm, src_token)
+            if fltkn_eth_conversion_rate is not None:
                 best_profit_eth = Decimal(str(best_profit_fl_token)) / Decimal(str(fltkn_eth_conversion_rate))
                 self.ConfigObj.logger.debug(f"[modes.base.calculate_profit] {src_token, best_profit_fl_token, fltkn_eth_conversion_rate, best_profit_eth}")
             else:
                 self.ConfigObj.logger.error(
-                    f"[modes.base.calculate_profit] Failed to get conversion rate for {fl_token_with_weth} and {self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS}. Raise"
+                    f"[modes.base.calculate_profit] Failed to get conversion rate for {src_token} and {self.ConfigObj.WRAPPED_GAS_TOKEN_ADDRESS}. Raise"
                 )
                 raise
         else:
@@ -193,9 +323,15 @@ class ArbitrageFinderBase:
     def get_netchange(trade_instructions_df: pd.DataFrame) -> List[float]:
         """
         Get the net change from the trade instructions.
+
+        Accepts either the aggregated dataframe (TIF_DFAGGR), whose last row is the net change,
+        or the lightweight aggregated trade instructions (TIF_AGGR), which compute it without pandas.
         """
         try:
-            return trade_instructions_df.iloc[-1]
+            if isinstance(trade_instructions_df, pd.DataFrame):
+                return trade_instructions_df.iloc[-1]
+            netchange = trade_instructions_df.netchange
+            return netchange if len(netchange) > 0 else [500]
         except Exception:
             return [500]  # an arbitrary large number
 
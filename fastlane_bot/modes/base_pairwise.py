@@ -14,6 +14,7 @@ from typing import List, Tuple, Any, Union
 
 from fastlane_bot.modes.base import ArbitrageFinderBase
 from fastlane_bot.tools.cpc import CPCContainer
+from fastlane_bot.tools.optimizer import PairOptimizer
 
 
 class ArbitrageFinderPairwiseBase(ArbitrageFinderBase):
@@ -58,3 +59,55 @@ class ArbitrageFinderPairwiseBase(ArbitrageFinderBase):
             if tkn0 != tkn1
         ]
         return all_tokens, combos
+
+    def run_main_flow_batch(
+        self, problems: List[Tuple[List[Any], str, str]]
+    ) -> List[Union[Tuple[Any, float, Any, Any], None]]:
+        """
+        Run the main flow on many curve combos at once.
+
+        All pair optimizations are solved in a single batched bisection (see
+        ``PairOptimizer.optimize_batch``) instead of one bisection per curve combo.
+
+        Parameters
+        ----------
+        problems : list
+            List of (curves, tkn0, tkn1) tuples, where tkn1 is the source token
+
+        Returns
+        -------
+        list
+            For each problem, the tuple (O, profit_src, r, trade_instructions_df), where O is the
+            optimizer, profit_src the profit in the source token, r the optimizer result and
+            trade_instructions_df its aggregated trade instructions, or None if the problem could
+            not be set up or solved
+        """
+        setups = []
+        for curves, tkn0, tkn1 in problems:
+            try:
+                CC_cc = CPCContainer(curves)
+                pstart = {
+                    tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p
+                }  # this intentionally selects the non_carbon curve
+                setups.append((CC_cc, tkn1, self.get_pstart(tkn1, CC_cc, pstart)))
+            except Exception:
+                setups.append(None)
+
+        valid_setups = [setup for setup in setups if setup is not None]
+        results = iter(PairOptimizer.optimize_batch(
+            [CC_cc for CC_cc, _, _ in valid_setups],
+            [src_token for _, src_token, _ in valid_setups],
+            pstarts=[pstart for _, _, pstart in valid_setups],
+            optimizer=self.get_optimizer(PairOptimizer, valid_setups[0][0]) if valid_setups else None,
+        ))
+
+        flows = []
+        for setup in setups:
+            r = next(results) if setup is not None else None
+            if r is None or r.is_error:
+                flows.append(None)
+                continue
+            CC_cc, src_token, _ = setup
+            self.set_pstart(src_token, CC_cc, r)
+            flows.append((r.optimizer, -r.result, r, r.trade_instructions(PairOptimizer.TIF_AGGR)))
+        return flows
@@ -42,6 +42,9 @@ class ArbitrageFinderTriangleBase(ArbitrageFinderBase):
         """
         Get miniverse for triangular arbitrage
 
+        The single triangle modes use the current range curve of a Uniswap v3 pool only, while the
+        multi triangle modes include all its tick range curves.
+
         Parameters
         ----------
         y_match_curves_not_carbon : list
@@ -66,17 +69,20 @@ class ArbitrageFinderTriangleBase(ArbitrageFinderBase):
         if arb_mode in ["single_triangle", "triangle"]:
             miniverses = list(
                 itertools.product(
-                    y_match_curves_not_carbon,
+                    ArbitrageFinderBase.remove_range_curves(y_match_curves_not_carbon),
                     base_exchange_curves,
-                    x_match_curves_not_carbon,
+                    ArbitrageFinderBase.remove_range_curves(x_match_curves_not_carbon),
                 )
             )
         else:
             external_curve_combos = list(
-                itertools.product(y_match_curves_not_carbon, x_match_curves_not_carbon)
+                itertools.product(
+                    ArbitrageFinderBase.group_curves_by_pool(y_match_curves_not_carbon),
+                    ArbitrageFinderBase.group_curves_by_pool(x_match_curves_not_carbon),
+                )
             )
             miniverses = [
-                base_exchange_curves + list(combo) for combo in external_curve_combos
+                base_exchange_curves + y_group + x_group for y_group, x_group in external_curve_combos
             ]
         if miniverses:
             combos += list(zip([flt] * len(miniverses), miniverses))
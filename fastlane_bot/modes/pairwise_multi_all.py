@@ -14,8 +14,6 @@ from typing import List, Any, Tuple, Union, Hashable
 import pandas as pd
 
 from fastlane_bot.modes.base_pairwise import ArbitrageFinderPairwiseBase
-from fastlane_bot.tools.cpc import CPCContainer
-from fastlane_bot.tools.optimizer import MargPOptimizer, PairOptimizer
 
 
 class FindArbitrageMultiPairwiseAll(ArbitrageFinderPairwiseBase):
@@ -43,8 +41,8 @@ class FindArbitrageMultiPairwiseAll(ArbitrageFinderPairwiseBase):
             f"\n ************ combos: {len(combos)} ************\n"
         )
 
+        problems = []
         for tkn0, tkn1 in combos:
-            r = None
             CC = self.CCm.bypairs(f"{tkn0}/{tkn1}")
             if len(CC) < 2:
                 continue
@@ -53,7 +51,8 @@ class FindArbitrageMultiPairwiseAll(ArbitrageFinderPairwiseBase):
                 x for x in CC.curves if x.params.exchange not in self.ConfigObj.CARBON_V1_FORKS
             ]
 
-            curve_combos = [[_curve0] + [_curve1] for _curve0 in not_carbon_curves for _curve1 in not_carbon_curves if (_curve0 != _curve1)]
+            curve_groups = self.group_curves_by_pool(not_carbon_curves)
+            curve_combos = [_group0 + _group1 for _group0 in curve_groups for _group1 in curve_groups if (_group0 is not _group1)]
 
             if len(carbon_curves) > 0:
                 base_direction_pair = carbon_curves[0].pair
@@ -62,62 +61,64 @@ class FindArbitrageMultiPairwiseAll(ArbitrageFinderPairwiseBase):
                 curve_combos = []
 
                 if len(base_direction_one) > 0:
-                    curve_combos += [[curve] + base_direction_one for curve in not_carbon_curves]
+                    curve_combos += [group + base_direction_one for group in curve_groups]
 
                 if len(base_direction_two) > 0:
-                    curve_combos += [[curve] + base_direction_two for curve in not_carbon_curves]
-
-            for curve_combo in curve_combos:
-                src_token = tkn1
-                if len(curve_combo) < 2:
-                    continue
-                try:
-                    (
-                        O,
-                        profit_src,
-                        r,
-                        trade_instructions_df,
-                    ) = self.run_main_flow(curves=curve_combo, src_token=src_token, tkn0=tkn0, tkn1=tkn1)
-                except ValueError:
-                    #Optimizer did not converge
-                    continue
-
-
-                trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
-                trade_instructions = r.trade_instructions()
-                if trade_instructions_dic is None:
-                    continue
-                if len(trade_instructions_dic) < 2:
-                    continue
-                # Get the cids
-                cids = [ti["cid"] for ti in trade_instructions_dic]
-
-                # Calculate the profit
-                profit = self.calculate_profit(src_token, profit_src, self.CCm, cids)
-                if str(profit) == "nan":
-                    self.ConfigObj.logger.debug("profit is nan, skipping")
-                    continue
-
-                # Handle candidates based on conditions
-                candidates += self.handle_candidates(
-                    best_profit,
-                    profit,
-                    trade_instructions_df,
-                    trade_instructions_dic,
-                    src_token,
-                    trade_instructions,
-                )
-
-                # Find the best operations
-                best_profit, ops = self.find_best_operations(
-                    best_profit,
-                    ops,
-                    profit,
-                    trade_instructions_df,
-                    trade_instructions_dic,
-                    src_token,
-                    trade_instructions,
-                )
+                    curve_combos += [group + base_direction_two for group in curve_groups]
+
+            problems += [
+                (curve_combo, tkn0, tkn1) for curve_combo in curve_combos if len(curve_combo) >= 2
+            ]
+
+        # Solve all pair optimizations at once
+        flows = self.run_main_flow_batch(problems)
+
+        for (curve_combo, tkn0, tkn1), flow in zip(problems, flows):
+            src_token = tkn1
+            if flow is None:
+                continue
+            (
+                O,
+                profit_src,
+                r,
+                trade_instructions_df,
+            ) = flow
+
+            trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
+            trade_instructions = r.trade_instructions()
+            if trade_instructions_dic is None:
+                continue
+            if len(trade_instructions_dic) < 2:
+                continue
+            # Get the cids
+            cids = [ti["cid"] for ti in trade_instructions_dic]
+
+            # Calculate the profit
+            profit = self.calculate_profit(src_token, profit_src, self.CCm, cids)
+            if str(profit) == "nan":
+                self.ConfigObj.logger.debug("profit is nan, skipping")
+                continue
+
+            # Handle candidates based on conditions
+            candidates += self.handle_candidates(
+                best_profit,
+                profit,
+                trade_instructions_df,
+                trade_instructions_dic,
+                src_token,
+                trade_instructions,
+            )
+
+            # Find the best operations
+            best_profit, ops = self.find_best_operations(
+                best_profit,
+                ops,
+                profit,
+                trade_instructions_df,
+                trade_instructions_dic,
+                src_token,
+                trade_instructions,
+            )
 
         return candidates if self.result == self.AO_CANDIDATES else ops
 
@@ -150,25 +151,6 @@ class FindArbitrageMultiPairwiseAll(ArbitrageFinderPairwiseBase):
             and ("-0" in idx or "-1" in idx)
         ]
 
-    @staticmethod
-    def run_main_flow(
-        curves: List[Any], src_token: str, tkn0: str, tkn1: str
-    ) -> Tuple[Any, float, Any, pd.DataFrame]:
-        """
-        Run main flow to find arbitrage.
-        """
-        CC_cc = CPCContainer(curves)
-        O = PairOptimizer(CC_cc)
-        pstart = {
-            tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p
-        }  # this intentionally selects the non_carbon curve
-
-        r = O.optimize(src_token, params=dict(pstart=pstart))
-
-        profit_src = -r.result
-        trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
-        return O, profit_src, r, trade_instructions_df
-
     @staticmethod
     def process_wrong_direction_pools(
         curve_combo: List[Any], wrong_direction_cids: List[Hashable]
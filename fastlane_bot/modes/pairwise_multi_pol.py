@@ -14,7 +14,6 @@ import pandas as pd
 import itertools
 from fastlane_bot.modes.base_pairwise import ArbitrageFinderPairwiseBase
 from fastlane_bot.tools.cpc import CPCContainer
-from fastlane_bot.tools.optimizer import MargPOptimizer, PairOptimizer
 from fastlane_bot.tools.cpc import T
 
 
@@ -39,8 +38,8 @@ class FindArbitrageMultiPairwisePol(ArbitrageFinderPairwiseBase):
             f"\n ************ combos: {len(combos)} ************\n"
         )
 
+        problems = []
         for tkn0, tkn1 in combos:
-            r = None
             CC = self.CCm.bypairs(f"{tkn0}/{tkn1}")
             if len(CC) < 2:
                 continue
@@ -49,7 +48,7 @@ class FindArbitrageMultiPairwisePol(ArbitrageFinderPairwiseBase):
                 x for x in CC.curves if x.params.exchange not in ["bancor_pol"] + self.ConfigObj.CARBON_V1_FORKS
             ]
             carbon_curves = [x for x in CC.curves if x.params.exchange in self.ConfigObj.CARBON_V1_FORKS]
-            curve_combos = [[curve] + pol_curves for curve in not_bancor_pol_curves]
+            curve_combos = [group + pol_curves for group in self.group_curves_by_pool(not_bancor_pol_curves)]
 
             if len(carbon_curves) > 0:
                 base_direction_pair = carbon_curves[0].pair
@@ -62,58 +61,65 @@ class FindArbitrageMultiPairwisePol(ArbitrageFinderPairwiseBase):
                 if len(base_direction_two) > 0:
                     curve_combos += [[curve] + base_direction_two for curve in pol_curves]
 
-            for curve_combo in curve_combos:
-                src_token = tkn1
-                if len(curve_combo) < 2:
-                    continue
-
-                try:
-                    (
-                        O,
-                        profit_src,
-                        r,
-                        trade_instructions_df,
-                    ) = self.run_main_flow(curves=curve_combo, src_token=src_token, tkn0=tkn0, tkn1=tkn1)
-
-                    trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
-                    trade_instructions = r.trade_instructions()
-
-                except Exception:
-                    continue
-                if trade_instructions_dic is None:
-                    continue
-                if len(trade_instructions_dic) < 2:
-                    continue
-                # Get the cids
-                cids = [ti["cid"] for ti in trade_instructions_dic]
-
-                # Calculate the profit
-                profit = self.calculate_profit(src_token, profit_src, self.CCm, cids)
-
-                if str(profit) == "nan":
-                    self.ConfigObj.logger.debug("profit is nan, skipping")
-                    continue
-
-                # Handle candidates based on conditions
-                candidates += self.handle_candidates(
-                    best_profit,
-                    profit,
-                    trade_instructions_df,
-                    trade_instructions_dic,
-                    src_token,
-                    trade_instructions,
-                )
-
-                # Find the best operations
-                best_profit, ops = self.find_best_operations(
-                    best_profit,
-                    ops,
-                    profit,
+            problems += [
+                (curve_combo, tkn0, tkn1) for curve_combo in curve_combos if len(curve_combo) >= 2
+            ]
+
+        # Solve all pair optimizations at once
+        flows = self.run_main_flow_batch(problems)
+
+        for (curve_combo, tkn0, tkn1), flow in zip(problems, flows):
+            src_token = tkn1
+            if flow is None:
+                continue
+
+            try:
+                (
+                    O,
+                    profit_src,
+                    r,
                     trade_instructions_df,
-                    trade_instructions_dic,
-                    src_token,
-                    trade_instructions,
-                )
+                ) = flow
+
+                trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
+                trade_instructions = r.trade_instructions()
+
+            except Exception:
+                continue
+            if trade_instructions_dic is None:
+                continue
+            if len(trade_instructions_dic) < 2:
+                continue
+            # Get the cids
+            cids = [ti["cid"] for ti in trade_instructions_dic]
+
+            # Calculate the profit
+            profit = self.calculate_profit(src_token, profit_src, self.CCm, cids)
+
+            if str(profit) == "nan":
+                self.ConfigObj.logger.debug("profit is nan, skipping")
+                continue
+
+            # Handle candidates based on conditions
+            candidates += self.handle_candidates(
+                best_profit,
+                profit,
+                trade_instructions_df,
+                trade_instructions_dic,
+                src_token,
+                trade_instructions,
+            )
+
+            # Find the best operations
+            best_profit, ops = self.find_best_operations(
+                best_profit,
+                ops,
+                profit,
+                trade_instructions_df,
+                trade_instructions_dic,
+                src_token,
+                trade_instructions,
+            )
 
         return candidates if self.result == self.AO_CANDIDATES else ops
 
@@ -145,23 +151,6 @@ class FindArbitrageMultiPairwisePol(ArbitrageFinderPairwiseBase):
             and ("-0" in idx or "-1" in idx)
         ]
 
-    @staticmethod
-    def run_main_flow(
-        curves: List[Any], src_token: str, tkn0: str, tkn1: str
-    ) -> Tuple[Any, float, Any, pd.DataFrame]:
-        """
-        Run main flow to find arbitrage.
-        """
-        CC_cc = CPCContainer(curves)
-        O = PairOptimizer(CC_cc)
-        pstart = {
-            tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p
-        }  # this intentionally selects the non_carbon curve
-        r = O.optimize(src_token, params=dict(pstart=pstart))
-        profit_src = -r.result
-        trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
-        return O, profit_src, r, trade_instructions_df
-
     def process_wrong_direction_pools(
         self, curve_combo: List[Any], wrong_direction_cids: List[Hashable]
     ) -> [str]:
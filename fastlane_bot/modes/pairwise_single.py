@@ -46,7 +46,7 @@ class FindArbitrageSinglePairwise(ArbitrageFinderPairwiseBase):
                 x for x in CC.curves if x.params.exchange == self.base_exchange
             ]
             not_base_exchange_curves = [
-                x for x in CC.curves if x.params.exchange != self.base_exchange
+                x for x in self.remove_range_curves(CC.curves) if x.params.exchange != self.base_exchange
             ]
             self.ConfigObj.logger.debug(
                 f"base_exchange: {self.base_exchange}, base_exchange_curves: {len(base_exchange_curves)}, not_base_exchange_curves: {len(not_base_exchange_curves)}"
@@ -61,13 +61,14 @@ class FindArbitrageSinglePairwise(ArbitrageFinderPairwiseBase):
 
             for curve_combo in curve_combos:
                 CC_cc = CPCContainer(curve_combo)
-                O = PairOptimizer(CC_cc)
+                O = self.get_optimizer(PairOptimizer, CC_cc)
                 src_token = tkn1
                 try:
-                    pstart = {tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p}
+                    pstart = self.get_pstart(src_token, CC_cc, {tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p})
                     r = O.optimize(src_token, params=dict(pstart=pstart))
+                    self.set_pstart(src_token, CC_cc, r)
                     profit_src = -r.result
-                    trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
+                    trade_instructions_df = r.trade_instructions(O.TIF_AGGR)
                     trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
                     trade_instructions = r.trade_instructions()
                 except Exception as e:
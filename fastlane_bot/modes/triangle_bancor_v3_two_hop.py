@@ -277,16 +277,17 @@ class ArbitrageFinderTriangleBancor3TwoHop(ArbitrageFinderTriangleBase):
 
         # Instantiate the container and optimizer objects
         CC_cc = CPCContainer(miniverse)
-        O = MargPOptimizer(CC_cc)
-        pstart = self.build_pstart(CC_cc, CC_cc.tokens(), src_token)
+        O = self.get_optimizer(MargPOptimizer, CC_cc)
+        pstart = self.get_pstart(src_token, CC_cc, self.build_pstart(CC_cc, CC_cc.tokens(), src_token))
         # Perform the optimization
         r = O.optimize(src_token, params=dict(pstart=pstart))
+        self.set_pstart(src_token, CC_cc, r)
 
         # Get the profit in the source token
         profit_src = -r.result
 
         # Get trade instructions in different formats
-        trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
+        trade_instructions_df = r.trade_instructions(O.TIF_AGGR)
         trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
         trade_instructions = r.trade_instructions()
 
@@ -347,8 +348,8 @@ class ArbitrageFinderTriangleBancor3TwoHop(ArbitrageFinderTriangleBase):
 
             miniverses = []
             if len(external_curves) > 0:
-                for curve in external_curves:
-                    miniverses += [bancor_v3_curve_0 + bancor_v3_curve_1 + [curve]]
+                for group in self.group_curves_by_pool(external_curves):
+                    miniverses += [bancor_v3_curve_0 + bancor_v3_curve_1 + group]
             if len(carbon_curves) > 0:
 
                 if len(carbon_curves) > 0:
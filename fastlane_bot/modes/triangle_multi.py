@@ -41,15 +41,16 @@ class ArbitrageFinderTriangleMulti(ArbitrageFinderTriangleBase):
             try:
                 r = None
                 CC_cc = CPCContainer(miniverse)
-                O = MargPOptimizer(CC_cc)
+                O = self.get_optimizer(MargPOptimizer, CC_cc)
                 #try:
-                pstart = self.build_pstart(CC_cc, CC_cc.tokens(), src_token)
+                pstart = self.get_pstart(src_token, CC_cc, self.build_pstart(CC_cc, CC_cc.tokens(), src_token))
                 r = O.optimize(src_token, params=dict(pstart=pstart)) #debug=True, debug2=True
+                self.set_pstart(src_token, CC_cc, r)
                 trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
                 if len(trade_instructions_dic) < 3:
                     # Failed to converge
                     continue
-                trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
+                trade_instructions_df = r.trade_instructions(O.TIF_AGGR)
                 trade_instructions = r.trade_instructions()
 
             except Exception as e:
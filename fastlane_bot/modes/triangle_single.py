@@ -41,17 +41,18 @@ class ArbitrageFinderTriangleSingle(ArbitrageFinderTriangleBase):
 
             # Instantiate the container and optimizer objects
             CC_cc = CPCContainer(miniverse)
-            O = MargPOptimizer(CC_cc)
+            O = self.get_optimizer(MargPOptimizer, CC_cc)
 
             try:
-                # Perform the optimization
-                r = O.margp_optimizer(src_token)
+                # Perform the optimization (warm started if this miniverse was optimized before)
+                r = O.margp_optimizer(src_token, params=dict(pstart=self.get_pstart(src_token, CC_cc)))
+                self.set_pstart(src_token, CC_cc, r)
 
                 # Get the profit in the source token
                 profit_src = -r.result
 
                 # Get trade instructions in different formats
-                trade_instructions_df = r.trade_instructions(O.TIF_DFAGGR)
+                trade_instructions_df = r.trade_instructions(O.TIF_AGGR)
                 trade_instructions_dic = r.trade_instructions(O.TIF_DICTS)
                 trade_instructions = r.trade_instructions()
             except Exception:
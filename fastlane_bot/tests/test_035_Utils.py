@@ -41,6 +41,9 @@ class MockManager():
 
             def unique_key(self):
                 return 'address'
+
+            def is_incremental_event(self, event):
+                return False
         return MockPoolType()
 
     def exchange_name_from_event(self, event):
@@ -0,0 +1,65 @@
+# coding=utf-8
+
+'''
+This module tests the gas token price oracle used by the arbitrage finders
+'''
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+from pytest import raises
+
+from fastlane_bot.modes.base import ArbitrageFinderBase
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+
+WETH = 'WETH-0x01'
+USDC = 'USDC-0x02'
+LINK = 'LINK-0x03'
+WBTC = 'WBTC-0x04'
+
+class Config:
+    WRAPPED_GAS_TOKEN_ADDRESS = WETH
+    NATIVE_GAS_TOKEN_ADDRESS = 'ETH-0x00'
+    CARBON_V1_FORKS = ['carbon_v1']
+    logger = MagicMock()
+
+def curve(cid, pair, p, exchange):
+    return CPC.from_pk(p=p, k=10000, pair=pair, cid=cid, params=dict(exchange=exchange))
+
+CCm = CPCContainer([
+    curve('1', f'{USDC}/{WETH}', 1/3000, 'carbon_v1'),
+    curve('2', f'{USDC}/{WETH}', 1/3100, 'pancakeswap_v2'),
+    curve('3', f'{WETH}/{USDC}', 2900, 'uniswap_v3'),
+    curve('4', f'{USDC}/{WETH}', 1/2950, 'uniswap_v3'),
+    curve('5', f'{WETH}/{LINK}', 200, 'carbon_v1'),
+    curve('6', f'{LINK}/{WETH}', 1/210, 'sushiswap_v2'),
+    curve('7', f'{WBTC}/{USDC}', 1/60000, 'uniswap_v2'),
+])
+
+def finder():
+    return ArbitrageFinderBase(flashloan_tokens=[WETH], CCm=CCm, ConfigObj=Config())
+
+def scanned_rate(arb_finder, tkn):
+    sort_sequence = arb_finder.GASTKN_PRICE_SORT_SEQUENCE
+    price_curves = arb_finder.get_prices_simple(CCm, WETH, tkn)
+    return arb_finder.custom_sort(price_curves, sort_sequence)[0][-1]
+
+def test_oracle_matches_full_scan():
+    arb_finder = finder()
+    for tkn in [USDC, LINK]:
+        assert arb_finder.get_gastkn_conversion_rate(CCm, tkn) == scanned_rate(arb_finder, tkn)
+
+def test_oracle_is_built_once_per_container():
+    arb_finder = finder()
+    arb_finder.get_gastkn_conversion_rate(CCm, USDC)
+    oracle = arb_finder._gastkn_price_oracle
+    arb_finder.get_gastkn_conversion_rate(CCm, LINK)
+    assert arb_finder._gastkn_price_oracle is oracle
+    assert arb_finder.get_gastkn_conversion_rate(CCm, WBTC) is None
+
+def test_calculate_profit():
+    arb_finder = finder()
+    rate = scanned_rate(arb_finder, USDC)
+    assert arb_finder.calculate_profit(USDC, 100, CCm, []) == Decimal('100') / Decimal(str(rate))
+    assert arb_finder.calculate_profit(WETH, 100, CCm, []) == 100
+    with raises(RuntimeError):
+        arb_finder.calculate_profit(WBTC, 100, CCm, [])
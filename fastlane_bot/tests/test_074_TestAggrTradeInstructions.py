@@ -0,0 +1,45 @@
+# coding=utf-8
+
+'''
+This module tests the lightweight aggregated trade instructions (TIF_AGGR) used by the arbitrage finders
+'''
+
+import numpy as np
+import pandas as pd
+
+from fastlane_bot.modes.base import ArbitrageFinderBase
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.optimizer import PairOptimizer, MargPOptimizer
+
+CC = CPCContainer([
+    CPC.from_pk(p=2000, k=10000*20000, pair="WETH/USDC", cid="1"),
+    CPC.from_pk(p=2100, k=10000*20000, pair="WETH/USDC", cid="2"),
+    CPC.from_pk(p=1/2000, k=10000*20000, pair="USDC/WETH", cid="3"),
+])
+
+def optimize(Optimizer, curves):
+    O = Optimizer(CPCContainer(curves))
+    r = O.optimize("USDC", params=dict(pstart={"WETH": 2050, "USDC": 1}))
+    return O, r
+
+def test_aggr_matches_dfaggr():
+    for Optimizer in [PairOptimizer, MargPOptimizer]:
+        O, r = optimize(Optimizer, CC.curves)
+        ti_aggr = r.trade_instructions(O.TIF_AGGR)
+        ti_df = r.trade_instructions(O.TIF_DFAGGR)
+        assert len(ti_aggr) == len(r.trade_instructions())
+        assert list(ti_aggr.tokens) == list(ti_df.columns)
+        assert np.allclose(ti_aggr.netchange, ti_df.loc["TOTAL NET"].values)
+        assert ti_aggr.df.equals(ti_df)
+        assert ti_aggr.df is ti_aggr.df
+
+def test_get_netchange():
+    O, r = optimize(PairOptimizer, CC.curves[:2])
+    ti_aggr = r.trade_instructions(O.TIF_AGGR)
+    ti_df = r.trade_instructions(O.TIF_DFAGGR)
+    assert ti_aggr._df is None
+    assert np.allclose(ArbitrageFinderBase.get_netchange(ti_aggr), ArbitrageFinderBase.get_netchange(ti_df))
+    assert ti_aggr._df is None
+    empty = O.TradeInstruction.to_format([], robj=r, ti_format=O.TIF_AGGR)
+    assert ArbitrageFinderBase.get_netchange(empty) == [500]
+    assert ArbitrageFinderBase.get_netchange(pd.DataFrame()) == [500]
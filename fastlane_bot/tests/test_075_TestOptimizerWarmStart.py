@@ -0,0 +1,77 @@
+# coding=utf-8
+
+'''
+This module tests reusing optimizer instances and warm starting them from previous equilibrium prices
+'''
+
+from unittest.mock import MagicMock
+from pytest import approx
+
+from fastlane_bot.modes.base import ArbitrageFinderBase
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.optimizer import PairOptimizer, MargPOptimizer
+
+class Config:
+    logger = MagicMock()
+
+CC_PAIR = CPCContainer([
+    CPC.from_pk(p=2000, k=10000*20000, pair="WETH/USDC", cid="1"),
+    CPC.from_pk(p=2100, k=10000*20000, pair="WETH/USDC", cid="2"),
+])
+
+CC_TRIANGLE = CPCContainer([
+    CPC.from_pk(p=2000, k=10000*20000, pair="WETH/USDC", cid="1"),
+    CPC.from_pk(p=1/2050, k=10000*20000, pair="USDC/WETH", cid="2"),
+    CPC.from_pk(p=20, k=1000*20000, pair="LINK/USDC", cid="3"),
+    CPC.from_pk(p=0.0095, k=1000*10, pair="LINK/WETH", cid="4"),
+])
+
+def test_pair_optimizer_warm_start():
+    O = PairOptimizer(CC_PAIR)
+    r_cold = O.optimize("USDC", params=dict(pstart={"WETH": 2000}))
+    r_warm = O.optimize("USDC", params=dict(pstart=r_cold.p_optimal))
+    assert r_warm.result == approx(r_cold.result, rel=1e-9)
+    assert r_warm.p_optimal["WETH"] == approx(r_cold.p_optimal["WETH"], rel=1e-9)
+    r_inv = O.optimize("WETH", params=dict(pstart={"USDC": 1/2050}))
+    assert r_inv.result == approx(O.optimize("WETH").result, rel=1e-9)
+
+def test_margp_optimizer_warm_start():
+    O = MargPOptimizer(CC_TRIANGLE)
+    r_cold = O.optimize("USDC")
+    r_warm = O.optimize("USDC", params=dict(pstart=r_cold.p_optimal))
+    assert r_warm.n_iterations <= 1 < r_cold.n_iterations
+    assert r_warm.result == approx(r_cold.result, rel=1e-6)
+
+def test_optimizer_set_curves():
+    O = MargPOptimizer(CC_TRIANGLE)
+    assert O.set_curves(CC_PAIR.curves) is O
+    assert isinstance(O.curve_container, CPCContainer)
+    assert O.optimize("USDC").result == approx(PairOptimizer(CC_PAIR).optimize("USDC").result, rel=1e-6)
+
+def test_finder_warm_start_prices():
+    warm_start_prices = {}
+    finder = ArbitrageFinderBase(flashloan_tokens=["USDC"], CCm=CC_TRIANGLE, ConfigObj=Config(), warm_start_prices=warm_start_prices)
+    O = finder.get_optimizer(MargPOptimizer, CC_TRIANGLE)
+    assert finder.get_optimizer(MargPOptimizer, CC_PAIR) is O
+    assert finder.get_pstart("USDC", CC_TRIANGLE, {"WETH": 2000}) == {"WETH": 2000}
+    r = finder.get_optimizer(MargPOptimizer, CC_TRIANGLE).optimize("USDC")
+    finder.set_pstart("USDC", CC_TRIANGLE, r)
+
+    next_block_finder = ArbitrageFinderBase(flashloan_tokens=["USDC"], CCm=CC_TRIANGLE, ConfigObj=Config(), warm_start_prices=warm_start_prices)
+    assert next_block_finder.get_pstart("USDC", CPCContainer(CC_TRIANGLE.curves[::-1]), {"WETH": 2000}) == r.p_optimal
+    assert next_block_finder.get_pstart("WETH", CC_TRIANGLE) is None
+    assert ArbitrageFinderBase(flashloan_tokens=["USDC"], CCm=CC_TRIANGLE, ConfigObj=Config()).get_pstart("USDC", CC_TRIANGLE) is None
+
+def test_finder_warm_start_prices_bounded():
+    warm_start_prices = {}
+    finder = ArbitrageFinderBase(flashloan_tokens=["USDC"], CCm=CC_TRIANGLE, ConfigObj=Config(), warm_start_prices=warm_start_prices)
+    finder.WARM_START_PRICES_SIZE = 2
+    r = finder.get_optimizer(MargPOptimizer, CC_TRIANGLE).optimize("USDC")
+    for tkn in ["USDC", "WETH", "LINK"]:
+        finder.set_pstart(tkn, CC_TRIANGLE, r)
+    assert len(warm_start_prices) == 2 and finder.get_pstart("USDC", CC_TRIANGLE) is None
+
+    finder.get_pstart("WETH", CC_TRIANGLE)
+    finder.set_pstart("USDC", CC_TRIANGLE, r)
+    assert finder.get_pstart("WETH", CC_TRIANGLE) == r.p_optimal
+    assert finder.get_pstart("LINK", CC_TRIANGLE) is None
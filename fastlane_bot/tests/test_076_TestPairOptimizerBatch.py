@@ -0,0 +1,99 @@
+# coding=utf-8
+
+'''
+This module tests the batched bisection of the pair optimizer against the scalar one
+'''
+
+import random
+from unittest.mock import MagicMock
+
+from fastlane_bot.modes.pairwise_multi import FindArbitrageMultiPairwise
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.optimizer import PairOptimizer
+
+class Config:
+    CARBON_V1_FORKS = ['carbon_v1']
+    logger = MagicMock()
+
+def make_problems(n):
+    random.seed(42)
+    problems = []
+    for i in range(n):
+        p0 = random.uniform(1, 3000)
+        curves = [
+            CPC.from_pk(p=p0, k=random.uniform(1e4, 1e8), pair=f"A{i}/B" if i % 2 else f"B/A{i}", cid=f"{i}-a"),
+            CPC.from_univ3(Pmarg=p0*random.uniform(0.95, 1.05), uniL=random.uniform(100, 1e4), uniPa=p0*0.9, uniPb=p0*1.1, pair=f"A{i}/B", fee=0.003, cid=f"{i}-b", descr=""),
+        ]
+        if i % 5 == 0:
+            curves += [CPC.from_carbon(pa=p0*1.02, pb=p0*1.01, yint=1000, y=500, pair=f"A{i}/B", tkny="B", cid=f"{i}-c")]
+        problems += [(CPCContainer(curves), "B" if i % 4 else f"A{i}")]
+    return problems
+
+def assert_same_results(results, expected):
+    assert len(results) == len(expected)
+    for r, r0 in zip(results, expected):
+        assert r.is_error == r0.is_error
+        if r0.is_error:
+            continue
+        assert r.result == r0.result
+        assert r.p_optimal_t == r0.p_optimal_t
+        assert r.dtokens == r0.dtokens
+        assert r.trade_instructions(PairOptimizer.TIF_DICTS) == r0.trade_instructions(PairOptimizer.TIF_DICTS)
+
+def test_batch_matches_scalar():
+    problems = make_problems(50)
+    expected = [PairOptimizer(CC).optimize(targettkn) for CC, targettkn in problems]
+    results = PairOptimizer.optimize_batch([CC for CC, _ in problems], [targettkn for _, targettkn in problems])
+    assert_same_results(results, expected)
+
+def test_batch_warm_start():
+    problems = make_problems(20)
+    expected = [PairOptimizer(CC).optimize(targettkn) for CC, targettkn in problems]
+    pstarts = [r.p_optimal for r in expected]
+    pstarts[3] = {tkn: 2 * p for tkn, p in pstarts[3].items()}   # bracket misses the solution
+    pstarts[4] = None
+    results = PairOptimizer.optimize_batch([CC for CC, _ in problems], [targettkn for _, targettkn in problems], pstarts=pstarts)
+    warm = [PairOptimizer(CC).optimize(targettkn, params=dict(pstart=pstart)) for (CC, targettkn), pstart in zip(problems, pstarts)]
+    assert_same_results(results, warm)
+
+def test_batch_errors():
+    CC, targettkn = make_problems(1)[0]
+    mixed = CPCContainer([CPC.from_pk(p=1, k=100, pair="X/Y", cid="x"), CPC.from_pk(p=1, k=100, pair="X/Z", cid="z")])
+    results = PairOptimizer.optimize_batch([mixed, CC, CC], ["Y", targettkn, "C"])
+    assert results[0].is_error and results[2].is_error
+    assert_same_results(results[1:2], [PairOptimizer(CC).optimize(targettkn)])
+
+def scalar_flow(curves, tkn0, tkn1):
+    """the flow of a single curve combo, solved by the scalar pair optimizer"""
+    CC_cc = CPCContainer(curves)
+    O = PairOptimizer(CC_cc)
+    r = O.optimize(tkn1, params=dict(pstart={tkn0: CC_cc.bypairs(f"{tkn0}/{tkn1}")[0].p}))
+    return O, -r.result, r, r.trade_instructions(O.TIF_AGGR)
+
+def test_run_main_flow_batch():
+    finder = FindArbitrageMultiPairwise(flashloan_tokens=["B"], CCm=None, ConfigObj=Config())
+    problems = [(CC.curves, [t for t in CC.tokens() if t != "B"][0], "B") for CC, _ in make_problems(10)]
+    flows = finder.run_main_flow_batch(problems)
+    for (curves, tkn0, tkn1), flow in zip(problems, flows):
+        try:
+            expected = scalar_flow(curves, tkn0, tkn1)
+        except Exception:
+            expected = None
+        if expected is None or expected[2].is_error:
+            assert flow is None
+            continue
+        assert flow[1] == expected[1]
+        assert list(flow[3].netchange) == list(expected[3].netchange)
+    assert not hasattr(finder, "run_main_flow")
+
+def test_batch_reuses_optimizer():
+    problems = make_problems(5)
+    O = PairOptimizer(problems[0][0])
+    results = PairOptimizer.optimize_batch([CC for CC, _ in problems], [targettkn for _, targettkn in problems], optimizer=O)
+    assert all(r.optimizer is O for r in results)
+    assert O.curve_container is problems[-1][0]
+    assert_same_results(results, [PairOptimizer(CC).optimize(targettkn) for CC, targettkn in problems])
+
+    finder = FindArbitrageMultiPairwise(flashloan_tokens=["B"], CCm=None, ConfigObj=Config())
+    flows = finder.run_main_flow_batch([(CC.curves, [t for t in CC.tokens() if t != "B"][0], "B") for CC, _ in problems])
+    assert {id(flow[0]) for flow in flows if flow is not None} == {id(finder.get_optimizer(PairOptimizer, problems[0][0]))}
@@ -0,0 +1,64 @@
+# coding=utf-8
+
+'''
+This module tests the single pass filtering and normalization of the latest events
+'''
+
+from web3.datastructures import AttributeDict
+from hexbytes import HexBytes
+
+from fastlane_bot.events.utils import filter_latest_events, complex_handler, normalize_event
+
+class MockPoolType:
+    def unique_key(self):
+        return 'address'
+
+    def is_incremental_event(self, event):
+        return False
+
+class MockManager:
+    pool_data = [{'anchor': '0xabc', 'exchange_name': 'bancor_v2'}]
+
+    def pool_type_from_exchange_name(self, exchange_name):
+        return MockPoolType()
+
+    def exchange_name_from_event(self, event):
+        return 'carbon_v1' if 'id' in event['args'] else 'uniswap_v2'
+
+def sync(address, reserve, block, tx, log):
+    return AttributeDict({
+        'args': AttributeDict({'reserve0': reserve, 'reserve1': reserve}),
+        'event': 'Sync',
+        'address': address,
+        'blockNumber': block,
+        'transactionIndex': tx,
+        'logIndex': log,
+        'transactionHash': HexBytes(f'0x{block:064x}'),
+    })
+
+events = [
+    [sync('0x01', 1, 5, 0, 0), sync('0x01', 2, 10, 1, 1), sync('0x02', 3, 7, 1, 1)],
+    [sync('0x01', 4, 10, 1, 0), sync('0x02', 5, 7, 2, 0), sync('0x03', 6, 7, 0, 0)],
+]
+
+def test_normalize_event():
+    event = sync('0x01', 1, 5, 0, 0)
+    assert normalize_event(event) == complex_handler(complex_handler(event))
+    assert type(normalize_event(event)['args']) == dict
+
+def test_filter_latest_events():
+    latest = {event['address']: event for event in filter_latest_events(MockManager(), events)}
+    assert set(latest) == {'0x01', '0x02', '0x03'}
+    assert latest['0x01']['args']['reserve0'] == 2
+    assert latest['0x02']['args']['reserve0'] == 5
+    assert latest['0x03']['args']['reserve0'] == 6
+
+def test_filter_latest_events_normalize():
+    latest = filter_latest_events(MockManager(), events)
+    normalized = filter_latest_events(MockManager(), events, normalize=True)
+    assert normalized == [complex_handler(complex_handler(event)) for event in latest]
+
+def test_filter_latest_events_excluded_exchanges():
+    carbon_event = AttributeDict({**sync('0x04', 7, 8, 0, 0), 'args': AttributeDict({'id': 1})})
+    result = filter_latest_events(MockManager(), events + [[carbon_event]], excluded_exchanges=['carbon_v1'])
+    assert {event['address'] for event in result} == {'0x01', '0x02', '0x03'}
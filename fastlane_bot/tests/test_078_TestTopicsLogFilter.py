@@ -0,0 +1,77 @@
+# coding=utf-8
+
+'''
+This module tests fetching the events of all exchanges with a single `eth_getLogs` request
+'''
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from fastlane_bot.data.abi import UNISWAP_V2_POOL_ABI, UNISWAP_V3_POOL_ABI, BANCOR_POL_ABI
+from fastlane_bot.events.managers.events import EventManager, TopicsLogFilter
+
+w3 = Web3()
+uniswap_v2 = w3.eth.contract(abi=UNISWAP_V2_POOL_ABI)
+uniswap_v3 = w3.eth.contract(abi=UNISWAP_V3_POOL_ABI)
+bancor_pol = w3.eth.contract(abi=BANCOR_POL_ABI)
+
+# the forks of an exchange share their event contract
+mgr = SimpleNamespace(
+    events=[
+        uniswap_v2.events.Sync,
+        uniswap_v2.events.Sync,
+        uniswap_v3.events.Swap,
+        bancor_pol.events.TokenTraded,
+        bancor_pol.events.TradingEnabled,
+    ]
+)
+
+SYNC_TOPIC = HexBytes(w3.keccak(text='Sync(uint112,uint112)'))
+
+def sync_log(address, reserve0, reserve1, log_index):
+    return {
+        'address': address,
+        'topics': [SYNC_TOPIC],
+        'data': HexBytes(encode(['uint112', 'uint112'], [reserve0, reserve1])),
+        'blockNumber': 100,
+        'blockHash': HexBytes(b'\x01' * 32),
+        'transactionHash': HexBytes(b'\x02' * 32),
+        'transactionIndex': 0,
+        'logIndex': log_index,
+    }
+
+def test_events_by_topic():
+    events_by_topic = EventManager.get_events_by_topic(mgr, excluded_events=['TradingEnabled', 'TokenTraded'])
+    assert len(events_by_topic) == 2
+    assert [event.event_name for event in events_by_topic[bytes(SYNC_TOPIC)]] == ['Sync']
+
+def test_single_request_for_all_topics():
+    events_by_topic = EventManager.get_events_by_topic(mgr, excluded_events=['TradingEnabled', 'TokenTraded'])
+    web3 = MagicMock()
+    web3.eth.get_logs.return_value = [
+        sync_log('0x0000000000000000000000000000000000000001', 10, 20, 0),
+        sync_log('0x0000000000000000000000000000000000000002', 30, 40, 1),
+    ]
+    log_filter = TopicsLogFilter(w3=web3, events_by_topic=events_by_topic, from_block=90, to_block=100)
+    entries = log_filter.get_all_entries()
+
+    web3.eth.get_logs.assert_called_once()
+    params = web3.eth.get_logs.call_args[0][0]
+    assert params['fromBlock'] == 90 and params['toBlock'] == 100
+    assert len(params['topics']) == 1 and len(params['topics'][0]) == 2
+    assert '0x' + bytes(SYNC_TOPIC).hex() in params['topics'][0]
+
+    assert [entry['event'] for entry in entries] == ['Sync', 'Sync']
+    assert [dict(entry['args']) for entry in entries] == [
+        {'reserve0': 10, 'reserve1': 20},
+        {'reserve0': 30, 'reserve1': 40},
+    ]
+
+def test_no_topics():
+    web3 = MagicMock()
+    assert TopicsLogFilter(w3=web3, events_by_topic={}, from_block=0, to_block=1).get_all_entries() == []
+    web3.eth.get_logs.assert_not_called()
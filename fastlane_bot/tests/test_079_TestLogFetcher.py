@@ -0,0 +1,94 @@
+# coding=utf-8
+
+'''
+This module tests the fetching of event logs in block ranges of adaptive size
+'''
+
+from pytest import raises
+
+from fastlane_bot.events.log_fetcher import LogFetcher
+
+class Provider:
+    def __init__(self, max_range_size, logs_per_block=1):
+        self.max_range_size = max_range_size
+        self.logs_per_block = logs_per_block
+        self.requests = []
+
+    def get_logs(self, fromBlock, toBlock):
+        self.requests.append((fromBlock, toBlock))
+        if toBlock - fromBlock + 1 > self.max_range_size:
+            raise ValueError({'code': -32602, 'message': 'Log response size exceeded.'})
+        return [(block, i) for block in range(fromBlock, toBlock + 1) for i in range(self.logs_per_block)]
+
+def test_whole_range_without_errors():
+    provider = Provider(max_range_size=1000)
+    log_fetcher = LogFetcher()
+    logs = log_fetcher.get_logs(provider.get_logs, 100, 199, key='a')
+    assert logs == [(block, 0) for block in range(100, 200)]
+    assert provider.requests == [(100, 199)]
+    assert log_fetcher.range_sizes == {}
+
+def test_range_errors_reduce_and_remember_range_size():
+    provider = Provider(max_range_size=30)
+    log_fetcher = LogFetcher()
+    logs = log_fetcher.get_logs(provider.get_logs, 0, 99, key=('ethereum', 'uniswap_v2'))
+    assert logs == [(block, 0) for block in range(100)]
+    assert 30 < log_fetcher.range_limits[('ethereum', 'uniswap_v2')] <= 50
+    assert log_fetcher.get_range_size(('ethereum', 'uniswap_v2')) < log_fetcher.range_limits[('ethereum', 'uniswap_v2')]
+
+    # the range size is remembered per key, and converges to the largest accepted size
+    for n in range(1, 10):
+        logs = log_fetcher.get_logs(provider.get_logs, 100 * n, 100 * n + 99, key=('ethereum', 'uniswap_v2'))
+        assert logs == [(block, 0) for block in range(100 * n, 100 * n + 100)]
+    assert log_fetcher.get_range_size(('ethereum', 'uniswap_v2')) == 30
+    assert log_fetcher.range_limits[('ethereum', 'uniswap_v2')] == 31
+    assert log_fetcher.get_range_size(('ethereum', 'uniswap_v3')) is None
+
+def test_range_size_adapts_to_number_of_results():
+    provider = Provider(max_range_size=1000, logs_per_block=10)
+    log_fetcher = LogFetcher(max_results=100)
+    logs = log_fetcher.get_logs(provider.get_logs, 0, 99, key='a', initial_range_size=40)
+    assert len(logs) == 1000
+    assert log_fetcher.get_range_size('a') == 10
+
+    # small responses grow the range size
+    provider.logs_per_block = 0
+    log_fetcher.get_logs(provider.get_logs, 0, 99, key='a')
+    assert log_fetcher.get_range_size('a') > 10
+
+def test_other_errors_are_raised():
+    def get_logs(fromBlock, toBlock):
+        raise ValueError('execution reverted')
+    with raises(ValueError):
+        LogFetcher().get_logs(get_logs, 0, 99)
+
+    for message in [
+        "eth_getLogs: 429 Too Many Requests, more than 25 requests per second",
+        "Must be authenticated! (eth_getLogs)",
+        "the method eth_getLogs does not exist/is not available",
+    ]:
+        assert not LogFetcher.is_range_error(ValueError({"code": -32000, "message": message}))
+    for message in [
+        "query returned more than 10000 results",
+        "Log response size exceeded. You can make eth_getLogs requests with up to a 2K block range",
+        "eth_getLogs is limited to a 10,000 range",
+    ]:
+        assert LogFetcher.is_range_error(ValueError({"code": -32005, "message": message}))
+
+    provider = Provider(max_range_size=0)
+    with raises(ValueError):
+        LogFetcher().get_logs(provider.get_logs, 0, 3)
+    assert provider.requests[-1][1] - provider.requests[-1][0] == 0
+
+def test_range_limit_recovers_after_transient_errors():
+    provider = Provider(max_range_size=10)
+    log_fetcher = LogFetcher(limit_recovery_requests=5, max_range_size=80)
+    log_fetcher.get_logs(provider.get_logs, 0, 99, key='a', initial_range_size=80)
+    assert log_fetcher.range_limits['a'] <= 20 and log_fetcher.get_range_size('a') < log_fetcher.range_limits['a']
+
+    # the provider accepts large ranges again: the limit is relaxed and the range size grows back to the maximum
+    provider.max_range_size = 1000
+    for n in range(1, 20):
+        log_fetcher.get_logs(provider.get_logs, 100 * n, 100 * n + 99, key='a')
+    assert 'a' not in log_fetcher.range_limits
+    assert log_fetcher.get_range_size('a') == 80
@@ -0,0 +1,69 @@
+# coding=utf-8
+
+'''
+This module tests the checkpoints of the Terraformer
+'''
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+import run_blockchain_terraformer as terraformer
+from run_blockchain_terraformer import read_checkpoints, save_checkpoint, terraform_exchange_and_save
+
+ROW = pd.Series({"exchange_name": "uniswap_v2", "fork": "uniswap_v2", "factory_address": "0x1", "fee": "0.003"})
+
+def test_checkpoints(tmp_path):
+    assert read_checkpoints(str(tmp_path)) == {}
+    save_checkpoint(str(tmp_path), "uniswap_v2", 100)
+    save_checkpoint(str(tmp_path), "uniswap_v3", 200)
+    save_checkpoint(str(tmp_path), "uniswap_v2", 300)
+    assert read_checkpoints(str(tmp_path)) == {"uniswap_v2": 300, "uniswap_v3": 200}
+
+def test_read_dataset(tmp_path):
+    path = str(tmp_path / "uniswap_v2_event_mappings.csv")
+    pd.DataFrame([{"exchange": "uniswap_v2", "address": "0x1"}]).to_csv(path, index=False)
+    # nothing was upserted during the run: the dataset is built from the CSV
+    assert terraformer.read_dataset(path).values.tolist() == [["uniswap_v2", "0x1"]]
+    terraformer.get_dataset(path).upsert(pd.DataFrame([{"exchange": "uniswap_v2", "address": "0x2"}]))
+    assert terraformer.read_dataset(path)["address"].tolist() == ["0x1", "0x2"]
+
+def test_exchange_is_saved_with_its_checkpoint(tmp_path):
+    u_df = pd.DataFrame([{"cid": "0x3", "exchange_name": "uniswap_v2"}])
+    m_df = pd.DataFrame([{"exchange": "uniswap_v2", "address": "0x3"}])
+    with patch.object(terraformer, "terraform_exchange", return_value=(u_df, "uniswap_v2_event_mappings.csv", m_df)):
+        assert terraform_exchange_and_save(ROW, None, 10, 20, None, None, "ethereum", str(tmp_path))
+    assert read_checkpoints(str(tmp_path)) == {"uniswap_v2": 20}
+    assert pd.read_csv(tmp_path / "static_pool_data.csv")["cid"].tolist() == ["0x3"]
+    assert pd.read_csv(tmp_path / "uniswap_v2_event_mappings.csv")["address"].tolist() == ["0x3"]
+
+def test_failed_exchange_keeps_its_checkpoint(tmp_path):
+    save_checkpoint(str(tmp_path), "uniswap_v2", 10)
+    with patch.object(terraformer, "terraform_exchange", side_effect=ValueError("eth_call failed")):
+        assert not terraform_exchange_and_save(ROW, None, 11, 20, None, None, "ethereum", str(tmp_path))
+    assert read_checkpoints(str(tmp_path)) == {"uniswap_v2": 10}
+    assert not (tmp_path / "static_pool_data.csv").exists()
+
+def test_checkpoint_before_start_block(tmp_path, monkeypatch):
+    # the checkpoint of uniswap_v2 is older than start_block: the blocks in between must be terraformed
+    monkeypatch.chdir(tmp_path)
+    write_path = tmp_path / "fastlane_bot/data/blockchain_data/ethereum"
+    write_path.mkdir(parents=True)
+    save_checkpoint(str(write_path), "uniswap_v2", 100)
+    exchanges = pd.DataFrame([
+        {**ROW, "chain": "ethereum", "active": "TRUE", "start_block": 10},
+        {**ROW, "exchange_name": "sushiswap_v2", "chain": "ethereum", "active": "TRUE", "start_block": 10},
+    ])
+    web3 = MagicMock()
+    web3.eth.block_number = 1000
+    web3.provider.endpoint_uri = "http://localhost:8545"
+    from_blocks = {}
+    def terraform_exchange_and_save(row, from_block, **kwargs):
+        from_blocks[row["exchange_name"]] = from_block
+        return True
+    with patch.object(terraformer, "get_multichain_addresses", return_value=exchanges), \
+         patch.object(terraformer, "get_all_token_details", return_value=MagicMock()), \
+         patch.object(terraformer, "save_token_data"), \
+         patch.object(terraformer, "terraform_exchange_and_save", side_effect=terraform_exchange_and_save):
+        terraformer.terraform_blockchain("ethereum", web3=web3, start_block=500, n_jobs=1)
+    assert from_blocks == {"uniswap_v2": 101, "sushiswap_v2": 500}
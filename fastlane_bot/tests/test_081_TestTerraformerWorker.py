@@ -0,0 +1,94 @@
+# coding=utf-8
+
+'''
+This module tests the background terraformer and the merge of the pools it discovers
+'''
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from fastlane_bot.events.terraformer_worker import TerraformerWorker, TerraformerDelta
+from fastlane_bot.events.utils import handle_static_pools_update
+
+def mappings(*rows):
+    return pd.DataFrame([{"exchange": exchange, "address": address} for exchange, address in rows], columns=["exchange", "address"])
+
+RESULT = (
+    pd.DataFrame(),
+    mappings(("uniswap_v2", "0x1"), ("sushiswap_v2", "0x2")),
+    mappings(("uniswap_v3", "0x3")),
+    mappings(("velocimeter_v2", "0x4")),
+)
+
+def test_worker_publishes_new_pools_only():
+    worker = TerraformerWorker(terraform=lambda **kwargs: RESULT)
+    assert worker.pop_delta() is None
+    assert worker.start(known_addresses=["0x1", "0x3"], network_name="ethereum")
+    worker.join()
+    delta = worker.pop_delta()
+    assert delta.uniswap_v2_event_mappings == {"0x2": "sushiswap_v2"}
+    assert delta.uniswap_v3_event_mappings == {}
+    assert delta.solidly_v2_event_mappings == {"0x4": "velocimeter_v2"}
+    assert len(delta) == 2
+    assert worker.pop_delta() is None
+
+def test_worker_runs_once_at_a_time():
+    release = threading.Event()
+    def terraform(**kwargs):
+        release.wait()
+        return RESULT
+    worker = TerraformerWorker(terraform=terraform)
+    assert worker.start(known_addresses=[])
+    assert worker.is_running
+    assert not worker.start(known_addresses=[])
+    release.set()
+    worker.join()
+    assert not worker.is_running
+    assert len(worker.pop_delta()) == 4
+
+def test_worker_failure_publishes_nothing():
+    def terraform(**kwargs):
+        raise ValueError("eth_getLogs failed")
+    logger = MagicMock()
+    worker = TerraformerWorker(terraform=terraform, logger=logger)
+    worker.start(known_addresses=[])
+    worker.join()
+    assert worker.pop_delta() is None
+    logger.error.assert_called_once()
+
+def test_delta_is_merged_into_static_pools():
+    mgr = SimpleNamespace(
+        uniswap_v2_event_mappings={"0x1": "uniswap_v2"},
+        uniswap_v3_event_mappings={},
+        solidly_v2_event_mappings={},
+        static_pools={"uniswap_v2_pools": {"0x1"}, "sushiswap_v2_pools": set()},
+        forked_exchanges=["uniswap_v2", "sushiswap_v2", "uniswap_v3"],
+        exchanges={"uniswap_v2": None, "sushiswap_v2": None, "uniswap_v3": None},
+        cfg=SimpleNamespace(logger=MagicMock()),
+    )
+    delta = TerraformerDelta.from_terraformer_result(RESULT, known_addresses=["0x1"])
+    handle_static_pools_update(mgr, delta)
+    assert mgr.uniswap_v2_event_mappings == {"0x1": "uniswap_v2", "0x2": "sushiswap_v2"}
+    assert mgr.uniswap_v3_event_mappings == {"0x3": "uniswap_v3"}
+    assert mgr.static_pools == {"uniswap_v2_pools": {"0x1"}, "sushiswap_v2_pools": {"0x2"}, "uniswap_v3_pools": {"0x3"}}
+
+def test_static_pools_are_indexed_by_exchange():
+    mgr = SimpleNamespace(
+        uniswap_v2_event_mappings={"0x1": "uniswap_v2", "0x2": "sushiswap_v2", "0x5": "uniswap_v2"},
+        uniswap_v3_event_mappings={"0x3": "uniswap_v3", "0x1": "uniswap_v3"},
+        solidly_v2_event_mappings={"0x4": "velocimeter_v2"},
+        static_pools={},
+        forked_exchanges=["uniswap_v2", "sushiswap_v2", "uniswap_v3", "velocimeter_v2"],
+        exchanges={"uniswap_v2": None, "uniswap_v3": None, "velocimeter_v2": None},
+        cfg=SimpleNamespace(logger=MagicMock()),
+    )
+    handle_static_pools_update(mgr)
+    assert mgr.static_pools == {
+        "uniswap_v2_pools": {"0x1", "0x5"},
+        "uniswap_v3_pools": {"0x3"},
+        "solidly_v2_pools": set(),
+        "velocimeter_v2_pools": {"0x4"},
+    }
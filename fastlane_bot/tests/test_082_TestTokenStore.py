@@ -0,0 +1,154 @@
+# coding=utf-8
+
+'''
+This module tests the token store and the batched fetching of token details
+'''
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+from eth_abi import encode
+from web3 import Web3
+
+import run_blockchain_terraformer as terraformer
+from fastlane_bot.events.async_event_update_utils import _get_token_contracts
+from fastlane_bot.events.managers.contracts import ContractsManager
+from fastlane_bot.events.token_store import TokenStore, decode_symbol, decode_decimals, fetch_token_details
+
+TKN0 = "0x0000000000000000000000000000000000000001"
+TKN1 = "0x0000000000000000000000000000000000000002"
+MULTICALL = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+def write_tokens(path):
+    pd.DataFrame([{"symbol": "WETH", "address": TKN0, "decimals": 18}]).to_csv(path, index=False)
+
+def multicall_web3(results):
+    web3 = MagicMock()
+    web3.to_checksum_address = Web3.to_checksum_address
+    web3.eth.contract.return_value.functions.tryAggregate.return_value.call.return_value = results
+    return web3
+
+def test_load_is_cached_per_path(tmp_path):
+    path = str(tmp_path / "tokens.csv")
+    write_tokens(path)
+    store = TokenStore.load(path)
+    assert TokenStore.load(path) is store
+    assert TKN0 in store and len(store) == 1
+    assert store.get(TKN0)["decimals"] == 18
+    assert store.get(TKN1) is None
+
+def test_flush_appends_new_tokens_only(tmp_path):
+    path = str(tmp_path / "tokens.csv")
+    write_tokens(path)
+    store = TokenStore.from_csv(path)
+    assert store.add(TKN1, "USDC", 6)
+    assert not store.add(TKN0, "WETH", 18)
+    store.flush()
+    store.flush()
+    df = pd.read_csv(path)
+    assert list(df.columns) == ["symbol", "address", "decimals"]
+    assert df.values.tolist() == [["WETH", TKN0, 18], ["USDC", TKN1, 6]]
+    assert [record["address"] for record in store.records] == [TKN0, TKN1]
+
+def test_decoding():
+    assert decode_symbol(True, encode(["string"], ["USDC"])) == "USDC"
+    assert decode_symbol(True, b"MKR".ljust(32, b"\x00")) == "MKR"
+    assert decode_symbol(False, b"") is None
+    assert decode_decimals(True, encode(["uint256"], [6])) == 6
+    assert decode_decimals(True, encode(["uint256"], [2 ** 255])) is None
+    assert decode_decimals(False, b"") is None
+
+def test_fetch_token_details():
+    web3 = multicall_web3([
+        (True, encode(["string"], ["USDC"])), (True, encode(["uint256"], [6])),
+        (False, b""), (True, encode(["uint256"], [18])),
+    ])
+    details = fetch_token_details(web3, [TKN0, TKN1, TKN0], MULTICALL)
+    assert details == {TKN0: ("USDC", 6), TKN1: (None, 18)}
+    web3.eth.contract.return_value.functions.tryAggregate.assert_called_once()
+    assert web3.eth.contract.call_args.kwargs["address"] == MULTICALL
+
+    # networks without a multicall contract
+    assert fetch_token_details(web3, [TKN0], "") == {}
+    web3.eth.contract.return_value.functions.tryAggregate.assert_called_once()
+
+def test_prefetch_token_details(tmp_path):
+    store = TokenStore(path=str(tmp_path / "tokens.csv"))
+    web3 = multicall_web3([
+        (False, b""), (True, encode(["uint256"], [18])),
+        (True, encode(["string"], ["BAD"])), (False, b""),
+    ])
+    token_manager = terraformer.TokenManager(token_dict=store.tokens, token_store=store, multicall_address=MULTICALL)
+    pool_data = [{"args": {"token0": TKN0, "token1": TKN1}}]
+    terraformer.prefetch_token_details(pool_data, token_manager, web3)
+    assert store.get(TKN0)["symbol"] == "SYMBOL_FAILED"
+    assert TKN1 not in store
+    assert terraformer.skip_tokens(TKN1)
+
+def contracts_manager(tmp_path, multicall_address=MULTICALL):
+    mgr = ContractsManager.__new__(ContractsManager)
+    mgr.cfg = SimpleNamespace(MULTICALL_CONTRACT_ADDRESS=multicall_address, NETWORK="test", logger=MagicMock())
+    mgr.prefix_path = f"{tmp_path}/"
+    (tmp_path / "fastlane_bot/data/blockchain_data/test").mkdir(parents=True)
+    write_tokens(str(tmp_path / "fastlane_bot/data/blockchain_data/test/tokens.csv"))
+    return mgr
+
+def test_contracts_manager_batches_missing_tokens(tmp_path):
+    mgr = contracts_manager(tmp_path)
+    TKN2 = "0x0000000000000000000000000000000000000003"
+    web3 = multicall_web3([
+        (True, encode(["string"], ["USD-C"])), (True, encode(["uint256"], [6])),
+        (True, encode(["string"], ["BAD"])), (False, b""),
+    ])
+    details = mgr.prefetch_token_info(web3, [TKN0, TKN1, TKN2, TKN1])
+    assert details == {TKN1: ("USD-C", 6), TKN2: ("BAD", None)}
+    web3.eth.contract.return_value.functions.tryAggregate.assert_called_once()
+    calls = web3.eth.contract.return_value.functions.tryAggregate.call_args.args[1]
+    assert [address for address, _ in calls] == [TKN1, TKN1, TKN2, TKN2]
+
+    # known tokens come from the store, and tokens missing from it cost one multicall, not contract calls
+    assert mgr.get_token_info_from_contract(web3, {}, TKN1) == ("USD_C", 6)
+    tryAggregate = web3.eth.contract.return_value.functions.tryAggregate
+    tryAggregate.return_value.call.return_value = [(True, encode(["string"], ["BAD"])), (False, b"")]
+    assert mgr.get_token_info_from_contract(web3, {}, TKN2) is None
+    assert web3.eth.contract.return_value.functions.tryAggregate.call_count == 2
+    web3.eth.contract.return_value.functions.symbol.assert_not_called()
+
+def test_contracts_manager_without_multicall(tmp_path):
+    mgr = contracts_manager(tmp_path, multicall_address="")
+    web3 = MagicMock()
+    web3.eth.contract.return_value.functions.symbol.return_value.call.return_value = "USDC"
+    web3.eth.contract.return_value.functions.decimals.return_value.call.return_value = 6
+    assert mgr.get_token_info_from_contract(web3, {}, TKN1) == ("USDC", 6)
+    web3.eth.contract.return_value.functions.tryAggregate.assert_not_called()
+
+def test_new_pools_batch_missing_tokens(tmp_path, monkeypatch):
+    # the missing tokens of all the new pools are fetched with one multicall, not from their contracts
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "fastlane_bot/data/blockchain_data/test").mkdir(parents=True)
+    write_tokens("fastlane_bot/data/blockchain_data/test/tokens.csv")
+    TKN2 = "0x0000000000000000000000000000000000000003"
+    web3 = multicall_web3([
+        (True, encode(["string"], ["USDC"])), (True, encode(["uint256"], [6])),
+        (True, encode(["string"], ["DAI"])), (True, encode(["uint256"], [18])),
+    ])
+    mgr = SimpleNamespace(
+        blockchain="test", web3=web3, w3_async=MagicMock(),
+        cfg=SimpleNamespace(MULTICALL_CONTRACT_ADDRESS=MULTICALL, logger=MagicMock()),
+    )
+    pools = pd.DataFrame([
+        {"tkn0_address": TKN0, "tkn1_address": TKN1},
+        {"tkn0_address": TKN0, "tkn1_address": TKN2},
+    ])
+    contracts, tokens_df = _get_token_contracts(mgr, pools)
+    assert contracts == []
+    web3.eth.contract.return_value.functions.tryAggregate.assert_called_once()
+    # (the order of the missing tokens is not deterministic)
+    assert sorted(tokens_df["address"]) == [TKN0, TKN1, TKN2]
+    assert sorted(tokens_df["symbol"]) == ["DAI", "USDC", "WETH"]
+
+    # without a multicall contract the tokens are fetched from their contracts
+    mgr.cfg.MULTICALL_CONTRACT_ADDRESS = ""
+    contracts, _ = _get_token_contracts(mgr, pools)
+    assert sorted(c["tkn"] for c in contracts) == [TKN1, TKN2]
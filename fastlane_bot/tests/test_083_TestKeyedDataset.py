@@ -0,0 +1,85 @@
+# coding=utf-8
+
+'''
+This module tests the keyed Parquet datasets of the static pool data and event mappings CSVs
+'''
+
+import os
+import shutil
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+from web3 import Web3
+
+from fastlane_bot.events.keyed_dataset import KeyedDataset, read_keyed_csv, STATIC_POOL_DATA_KEY, EVENT_MAPPINGS_KEY
+from fastlane_bot.events.utils import get_static_data
+
+DATA_PATH = os.path.abspath("fastlane_bot/data/blockchain_data")
+
+def mappings(*rows):
+    return pd.DataFrame([{"exchange": exchange, "address": address} for exchange, address in rows])
+
+def test_upsert_appends_new_keys_only(tmp_path):
+    path = str(tmp_path / "uniswap_v2_event_mappings.csv")
+    dataset = KeyedDataset(csv_path=path, key=EVENT_MAPPINGS_KEY)
+    assert len(dataset.upsert(mappings(("uniswap_v2", "0x1"), ("sushiswap_v2", "0x2")))) == 2
+    assert len(dataset.upsert(mappings(("uniswap_v2", "0x1"), ("uniswap_v2", "0x3"), ("uniswap_v2", "0x3")))) == 1
+    assert pd.read_csv(path).values.tolist() == [["uniswap_v2", "0x1"], ["sushiswap_v2", "0x2"], ["uniswap_v2", "0x3"]]
+    assert dataset.is_synced()
+    pd.testing.assert_frame_equal(dataset.read(), pd.read_csv(path))
+
+    # the keys are read from the dataset by a new instance
+    dataset = KeyedDataset(csv_path=path, key=EVENT_MAPPINGS_KEY)
+    assert dataset.upsert(mappings(("uniswap_v2", "0x2"))).empty
+
+def test_upsert_adds_new_columns(tmp_path):
+    path = str(tmp_path / "static_pool_data.csv")
+    dataset = KeyedDataset(csv_path=path, key=["address"])
+    dataset.upsert(pd.DataFrame([{"address": "0x1", "fee": 0.003}]))
+    appended = dataset.upsert(pd.DataFrame([{"address": "0x2", "tick_spacing": 60, "fee": 0.0005}]))
+    assert list(appended.columns) == ["address", "fee", "tick_spacing"]
+    df = pd.read_csv(path)
+    assert list(df.columns) == ["address", "fee", "tick_spacing"]
+    assert df["tick_spacing"].isna().tolist() == [True, False] and df["tick_spacing"].iloc[1] == 60
+    pd.testing.assert_frame_equal(dataset.read(), df)
+
+def test_dataset_matches_csv(tmp_path):
+    path = str(tmp_path / "static_pool_data.csv")
+    shutil.copy(os.path.join(DATA_PATH, "ethereum", "static_pool_data.csv"), path)
+    df = pd.read_csv(path, low_memory=False)
+    assert read_keyed_csv(path, key=STATIC_POOL_DATA_KEY, read_only=True) is None
+    pd.testing.assert_frame_equal(read_keyed_csv(path, key=STATIC_POOL_DATA_KEY), df)
+
+    # a change of dtype rebuilds the dataset
+    new_pool = df.iloc[[0]].assign(address="0x0", exchange_id="seven")
+    KeyedDataset(csv_path=path, key=STATIC_POOL_DATA_KEY).upsert(new_pool)
+    pd.testing.assert_frame_equal(read_keyed_csv(path, key=STATIC_POOL_DATA_KEY), pd.read_csv(path, low_memory=False))
+
+    # the dataset is not used once the CSV is changed by anything else
+    df.iloc[:10].to_csv(path, index=False)
+    assert read_keyed_csv(path, key=STATIC_POOL_DATA_KEY, read_only=True) is None
+    assert len(read_keyed_csv(path, key=STATIC_POOL_DATA_KEY)) == 10
+
+def test_compaction(tmp_path):
+    path = str(tmp_path / "uniswap_v3_event_mappings.csv")
+    dataset = KeyedDataset(csv_path=path, key=EVENT_MAPPINGS_KEY, max_files=3)
+    for n in range(10):
+        dataset.upsert(mappings(("uniswap_v3", f"0x{n}")))
+    assert len(os.listdir(dataset.path)) <= 4
+    assert dataset.read()["address"].tolist() == [f"0x{n}" for n in range(10)]
+
+def test_get_static_data_reads_the_dataset(tmp_path, monkeypatch):
+    blockchain_path = tmp_path / "fastlane_bot" / "data" / "blockchain_data" / "linea"
+    shutil.copytree(os.path.join(DATA_PATH, "linea"), blockchain_path)
+    monkeypatch.chdir(tmp_path)
+    cfg = SimpleNamespace(w3=Web3(), logger=MagicMock())
+    exchanges = ["lynex_v2", "pancakeswap_v3", "uniswap_v3"]
+    from_csv = get_static_data(cfg, exchanges, "linea", "static_pool_data", read_only=True)
+    assert not (blockchain_path / "static_pool_data.parquet").exists()
+    get_static_data(cfg, exchanges, "linea", "static_pool_data")
+    assert (blockchain_path / "static_pool_data.parquet").exists()
+    os.remove(blockchain_path / "static_data_cache.pkl")
+    from_dataset = get_static_data(cfg, exchanges, "linea", "static_pool_data")
+    pd.testing.assert_frame_equal(from_dataset[0], from_csv[0])
+    assert from_dataset[2:] == from_csv[2:]
@@ -0,0 +1,58 @@
+# coding=utf-8
+
+'''
+This module tests the processing and the on-disk cache of the static data
+'''
+
+import os
+import shutil
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+from web3 import Web3
+
+from fastlane_bot.events import utils
+from fastlane_bot.events.utils import checksum_addresses, get_static_data, handle_target_token_addresses
+
+DATA_PATH = os.path.abspath("fastlane_bot/data/blockchain_data")
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+def test_checksum_addresses():
+    addresses = pd.Series([WETH.lower(), USDC.lower(), WETH.lower(), np.nan])
+    checksummed = checksum_addresses(addresses)
+    assert checksummed[:3].tolist() == [WETH, USDC, WETH]
+    assert pd.isna(checksummed[3])
+
+def test_handle_target_token_addresses():
+    static_pool_data = pd.DataFrame({"tkn0_address": [WETH, USDC], "tkn1_address": [USDC, WETH]})
+    assert sorted(handle_target_token_addresses(static_pool_data, [WETH, USDC, DAI])) == sorted([WETH, USDC])
+    assert handle_target_token_addresses(static_pool_data, None) == []
+
+def test_static_data_is_cached_until_a_file_changes(tmp_path, monkeypatch):
+    blockchain_path = tmp_path / "fastlane_bot" / "data" / "blockchain_data" / "linea"
+    shutil.copytree(os.path.join(DATA_PATH, "linea"), blockchain_path)
+    monkeypatch.chdir(tmp_path)
+    cfg = SimpleNamespace(w3=Web3(), logger=MagicMock())
+    exchanges = ["lynex_v2", "pancakeswap_v3"]
+    read_static_data = utils._read_static_data
+
+    with patch.object(utils, "_read_static_data", side_effect=read_static_data) as mock:
+        get_static_data(cfg, exchanges, "linea", "static_pool_data", read_only=True)
+        assert not (blockchain_path / "static_data_cache.pkl").exists()
+        static_data = get_static_data(cfg, exchanges, "linea", "static_pool_data")
+        cached_static_data = get_static_data(cfg, exchanges[::-1], "linea", "static_pool_data", read_only=True)
+        assert mock.call_count == 2
+        pd.testing.assert_frame_equal(cached_static_data[0], static_data[0])
+        assert cached_static_data[2:] == static_data[2:]
+
+        # the cache is invalidated by a change of the exchanges or of a file
+        get_static_data(cfg, exchanges[:1], "linea", "static_pool_data")
+        assert mock.call_count == 3
+        with open(blockchain_path / "tokens.csv", "a") as f:
+            f.write("0x0000000000000000000000000000000000000001,18,TKN\n")
+        get_static_data(cfg, exchanges[:1], "linea", "static_pool_data")
+        assert mock.call_count == 4
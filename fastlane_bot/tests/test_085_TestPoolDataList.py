@@ -0,0 +1,81 @@
+# coding=utf-8
+
+'''
+This module tests the change tracking of the pool data
+'''
+
+import pickle
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastlane_bot.events.managers.base import BaseManager
+from fastlane_bot.events.pool_data import PoolDataList
+from fastlane_bot.events.utils import handle_duplicates, verify_state_changed, set_missing_last_updated_block
+
+def pool(cid, last_updated_block=1):
+    return {"cid": cid, "last_updated_block": last_updated_block}
+
+def manager(pools):
+    mgr = BaseManager.__new__(BaseManager)
+    mgr.cfg = SimpleNamespace(logger=MagicMock())
+    mgr.pool_data = pools
+    return mgr
+
+def test_changes_and_duplicates_are_tracked():
+    pools = PoolDataList([pool("a"), pool("b")])
+    assert pools.version == 0 and not pools.duplicate_cids
+    pools.append(pool("a"))
+    assert pools.duplicate_cids == {"a"}
+    pools[2] = pool("c")
+    assert not pools.duplicate_cids
+    pools[0:2] = [pool("c"), pool("d")]
+    assert pools.duplicate_cids == {"c"}
+    del pools[0]
+    pools.extend([pool("e"), pool("e")])
+    assert pools.duplicate_cids == {"e"}
+    pools.pop()
+    assert not pools.duplicate_cids
+    assert pools.version == 7
+    pools.touch()
+    assert pools.version == 8
+
+    copy = pickle.loads(pickle.dumps(pools))
+    assert copy == pools and copy.version == 8
+    copy.append(pool("d"))
+    assert copy.duplicate_cids == {"d"}
+
+def test_manager_wraps_assigned_pool_data():
+    mgr = manager([pool("a")])
+    assert isinstance(mgr.pool_data, PoolDataList)
+    version = mgr.pool_data.version
+    mgr.pool_data = [p for p in mgr.pool_data]
+    assert isinstance(mgr.pool_data, PoolDataList)
+    assert mgr.pool_data.version == version + 1
+
+def test_handle_duplicates_keeps_latest_pool_in_place():
+    mgr = manager([pool("a", 1), pool("b", 5), pool("a", 3), pool("c", 2), pool("a", 3)])
+    handle_duplicates(mgr)
+    assert mgr.pool_data == [pool("b", 5), pool("a", 3), pool("c", 2)]
+    assert mgr.pool_data[1] is not mgr.pool_data[2]
+
+    # no duplicates: the pool data is left as is
+    pool_data = mgr.pool_data
+    handle_duplicates(mgr)
+    assert mgr.pool_data is pool_data
+
+def test_verify_state_changed():
+    mgr = manager([pool("a")])
+    initial_state = mgr.pool_data.version
+    verify_state_changed(bot=None, initial_state=initial_state, mgr=mgr)
+    mgr.cfg.logger.warning.assert_called_once()
+    mgr.pool_data[0] = pool("a", 2)
+    verify_state_changed(bot=None, initial_state=initial_state, mgr=mgr)
+    mgr.cfg.logger.debug.assert_called_once()
+
+def test_set_missing_last_updated_block_is_not_a_change():
+    pools = PoolDataList([pool("a"), {"cid": "b"}, pool("c", last_updated_block=None)])
+    mgr = manager(pools)
+    set_missing_last_updated_block(mgr, 100)
+    assert [p["last_updated_block"] for p in pools] == [1, 100, 100]
+    verify_state_changed(None, 0, mgr)
+    mgr.cfg.logger.warning.assert_called_once()
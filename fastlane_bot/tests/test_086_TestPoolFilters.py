@@ -0,0 +1,84 @@
+# coding=utf-8
+
+'''
+This module tests the single-pass filtering of the pools of the query interface
+'''
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastlane_bot.events.interface import QueryInterface
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+def pool(cid, exchange_name, tkn0_address=WETH, tkn1_address=USDC, **balances):
+    return {
+        "cid": cid,
+        "exchange_name": exchange_name,
+        "address": f"0x{cid}",
+        "tkn0_address": tkn0_address,
+        "tkn1_address": tkn1_address,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 6,
+        **balances,
+    }
+
+def query_interface():
+    cfg = SimpleNamespace(
+        logger=MagicMock(),
+        GAS_TKN_IN_FLASHLOAN_TOKENS=False,
+        ALL_KNOWN_EXCHANGES=["uniswap_v2", "uniswap_v3", "carbon_v1", "bancor_v3", "bancor_pol"],
+        UNI_V2_FORKS=["uniswap_v2"],
+        SOLIDLY_V2_FORKS=[],
+        UNI_V3_FORKS=["uniswap_v3"],
+        CARBON_V1_FORKS=["carbon_v1"],
+    )
+    qi = QueryInterface(
+        mgr=None,
+        ConfigObj=cfg,
+        exchanges=["uniswap_v2", "uniswap_v3", "carbon_v1"],
+        uniswap_v2_event_mappings={"0x1": "uniswap_v2", "0x6": "uniswap_v2"},
+    )
+    qi.state = [
+        pool("1", "uniswap_v2", tkn0_balance=10),
+        pool("2", "carbon_v1", y_0=0, y_1=5),
+        pool("3", "uniswap_v2", tkn0_balance=10),
+        pool("4", "uniswap_v3", liquidity=0),
+        pool("5", "bancor_v3", tkn0_balance=10),
+        pool("6", "uniswap_v2", tkn1_address=DAI, tkn0_balance=10),
+        pool("7", "uniswap_v3", liquidity=3),
+        pool("8", "unknown_exchange", tkn0_balance=10),
+    ]
+    return qi
+
+def test_single_pass_matches_sequential_filters():
+    for target_tokens in [None, [WETH, USDC]]:
+        sequential = query_interface()
+        sequential.remove_unmapped_uniswap_v2_pools()
+        sequential.remove_zero_liquidity_pools()
+        sequential.remove_unsupported_exchanges()
+        if target_tokens:
+            sequential.filter_target_tokens(target_tokens)
+
+        single_pass = query_interface()
+        single_pass.remove_ineligible_pools(target_tokens=target_tokens)
+        assert single_pass.state == sequential.state
+        assert single_pass.excluded_pools == sequential.excluded_pools
+
+    assert [p["cid"] for p in single_pass.state] == ["1", "7", "2"]
+    assert single_pass.excluded_pools == {
+        "3": "unmapped_uniswap_v2",
+        "4": "zero_liquidity",
+        "5": "unsupported_exchange",
+        "6": "non_target_tokens",
+        "8": "zero_liquidity",
+    }
+
+def test_excluded_pools_are_reset_with_the_state():
+    qi = query_interface()
+    qi.remove_ineligible_pools()
+    assert qi.excluded_pools
+    qi.update_state([pool("1", "uniswap_v2", tkn0_balance=10)])
+    assert qi.excluded_pools == {}
@@ -0,0 +1,79 @@
+# coding=utf-8
+
+'''
+This module tests the token registry of the query interface
+'''
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastlane_bot.events.interface import QueryInterface, Token, TokenRegistry
+from fastlane_bot.events.pool_data import PoolDataList
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+ETH = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+SYMBOLS = {WETH: "WETH", USDC: "USDC", DAI: "DAI"}
+DECIMALS = {WETH: 18, USDC: 6, DAI: 18}
+
+def pool(cid, exchange_name, *addresses):
+    record = {"cid": cid, "exchange_name": exchange_name, "address": f"0x{cid}", "tkn2_address": float("nan")}
+    for idx, address in enumerate(addresses):
+        record[f"tkn{idx}_address"] = address
+        record[f"tkn{idx}_symbol"] = SYMBOLS[address]
+        record[f"tkn{idx}_decimals"] = DECIMALS[address]
+    return record
+
+def query_interface(state, gas_tokens=False):
+    cfg = SimpleNamespace(
+        logger=MagicMock(),
+        GAS_TKN_IN_FLASHLOAN_TOKENS=gas_tokens,
+        NATIVE_GAS_TOKEN_SYMBOL="ETH",
+        NATIVE_GAS_TOKEN_ADDRESS=ETH,
+        WRAPPED_GAS_TOKEN_SYMBOL="WETH",
+        WRAPPED_GAS_TOKEN_ADDRESS=WETH,
+        UNI_V2_FORKS=["uniswap_v2"],
+    )
+    return QueryInterface(mgr=None, ConfigObj=cfg, state=state, exchanges=["uniswap_v2", "uniswap_v3"])
+
+def test_registry_reference_counts_tokens():
+    registry = TokenRegistry()
+    registry.add_pool(pool("1", "uniswap_v2", WETH, USDC))
+    registry.add_pool(pool("2", "uniswap_v3", WETH, DAI))
+    assert registry.get(DAI) == Token(symbol="DAI", address=DAI, decimals=18)
+    assert registry.get_exchange_tokens("uniswap_v2") == {WETH, USDC}
+
+    registry.remove_pool(pool("2", "uniswap_v3", WETH, DAI))
+    assert registry.get(DAI) is None and registry.get(WETH) is not None
+    assert registry.get_exchange_tokens("uniswap_v3") == set()
+    assert registry.get_exchange_tokens("unknown_exchange") == set()
+
+def test_lookups_follow_the_state():
+    qi = query_interface([pool("1", "uniswap_v2", WETH, USDC), pool("2", "sushiswap_v2", WETH, DAI)])
+    assert qi.get_token(DAI).decimals == 18
+    assert sorted(qi.get_tokens_from_exchange("uniswap_v2")) == sorted([WETH, USDC])
+
+    # the pools removed by the filters are removed from the registry
+    registry = qi.token_registry
+    qi.remove_unsupported_exchanges()
+    assert qi.token_registry is registry
+    assert qi.get_token(DAI) is None
+    assert {token.address for token in qi.get_tokens()} == {WETH, USDC}
+
+    # a new state, or a change of a pool data list, rebuilds the registry
+    qi.update_state([pool("3", "uniswap_v3", DAI, USDC)])
+    assert qi.get_token(WETH) is None and qi.get_token(DAI) is not None
+    state = PoolDataList([pool("1", "uniswap_v2", WETH, USDC)])
+    qi.state = state
+    assert qi.get_token(DAI) is None
+    state.append(pool("2", "uniswap_v2", WETH, DAI))
+    assert qi.get_token(DAI) is not None
+
+def test_gas_tokens_are_always_registered():
+    qi = query_interface([pool("1", "uniswap_v2", WETH, USDC)], gas_tokens=True)
+    assert qi.get_token(ETH).symbol == "ETH"
+    qi.remove_unmapped_uniswap_v2_pools()
+    assert qi.state == []
+    assert qi.get_token(ETH) is not None and qi.get_token(WETH) is not None
+    assert qi.get_token(USDC) is None
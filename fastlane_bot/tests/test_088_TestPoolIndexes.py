@@ -0,0 +1,65 @@
+# coding=utf-8
+
+'''
+This module tests the indexed lookups of the pools of the query interface
+'''
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastlane_bot.events.interface import QueryInterface
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+def pool(cid, exchange_name, address, tkn0_address, tkn1_address, fee="0.003"):
+    return {
+        "cid": cid,
+        "exchange_name": exchange_name,
+        "address": address,
+        "tkn0_address": tkn0_address,
+        "tkn1_address": tkn1_address,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 18,
+        "pair_name": f"{tkn0_address}/{tkn1_address}",
+        "descr": f"{exchange_name} {tkn0_address}/{tkn1_address} {fee}",
+        "fee": fee,
+        "fee_float": float(fee),
+        "tkn0_balance": 1,
+        "tkn1_balance": 1,
+    }
+
+def query_interface():
+    cfg = SimpleNamespace(logger=MagicMock(), GAS_TKN_IN_FLASHLOAN_TOKENS=False)
+    state = [
+        pool("1", "uniswap_v2", "0x1", WETH, USDC),
+        pool("2", "sushiswap_v2", "0x2", WETH, USDC),
+        pool("3", "uniswap_v2", "0x3", WETH, DAI),
+        pool("4", "uniswap_v3", "0x1", WETH, USDC, fee="0.0005"),
+    ]
+    return QueryInterface(mgr=None, ConfigObj=cfg, state=state)
+
+def test_get_pool_by_attributes():
+    qi = query_interface()
+    assert qi.get_pool(cid="3").cid == "3"
+    assert qi.get_pool(address="0x1").cid == "1"
+    assert qi.get_pool(address="0x1", exchange_name="uniswap_v3").cid == "4"
+    assert qi.get_pool(tkn0_address=WETH, tkn1_address=USDC, exchange_name="sushiswap_v2").cid == "2"
+    assert qi.get_pool(exchange_name="uniswap_v2", tkn1_address=DAI).cid == "3"
+    assert qi.get_pool(fee="0.0005").cid == "4"
+    assert qi.get_pool(address="0x9") is None
+    assert qi.get_pool(unknown_attribute=1) is None
+
+def test_indexes_are_built_once_per_state():
+    qi = query_interface()
+    with patch.object(qi, "create_pool_and_tokens", wraps=qi.create_pool_and_tokens) as create:
+        for _ in range(3):
+            qi.get_pool(address="0x3")
+        assert create.call_count == 4
+    assert list(qi._pool_indexes) == [("address",)]
+
+    # the pools removed from the state can no longer be found
+    qi.update_state([p for p in qi.state if p["address"] != "0x3"])
+    assert qi.get_pool(address="0x3") is None
+    assert qi.get_pool(cid="3") is None
@@ -0,0 +1,62 @@
+# coding=utf-8
+
+'''
+This module tests the slotted representation of the PoolAndTokens objects
+'''
+
+import pickle
+from dataclasses import fields
+
+from fastlane_bot.events.interface import QueryInterface
+from fastlane_bot.helpers.poolandtokens import PoolAndTokens
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+def pool_and_tokens(**kwargs):
+    record = {
+        "cid": "0x1",
+        "last_updated_block": 1,
+        "descr": f"balancer {WETH}/{USDC}/{DAI} 0.003",
+        "pair_name": f"{WETH}/{USDC}",
+        "exchange_name": "balancer",
+        "fee": "0.003",
+        "fee_float": 0.003,
+        "tkn0_address": WETH,
+        "tkn1_address": USDC,
+        "tkn2_address": DAI,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 6,
+        "tkn2_decimals": 18,
+        "tkn0_balance": 10,
+        "tkn1_balance": 20,
+        "tkn2_balance": 30,
+        "tkn0_weight": 0.5,
+        "tkn1_weight": 0.25,
+        "tkn2_weight": 0.25,
+        "tkn3_weight": float("nan"),
+        **kwargs,
+    }
+    return QueryInterface(ConfigObj=None).create_pool_and_tokens(0, record)
+
+def test_pool_and_tokens_are_slotted():
+    pool = pool_and_tokens()
+    assert not hasattr(pool, "__dict__")
+    assert set(PoolAndTokens.__slots__) == {f.name for f in fields(PoolAndTokens)} | {"ADDRDEC"}
+    assert pool.ADDRDEC is None and pool.tkn7_symbol is None and pool.A_0 == 0
+    pool.ADDRDEC = {WETH: (WETH, 18)}
+
+    copy = pickle.loads(pickle.dumps(pool))
+    assert repr(copy) == repr(pool) and copy.ADDRDEC == pool.ADDRDEC
+
+def test_token_lists_are_computed_from_the_fields():
+    pool = pool_and_tokens()
+    assert pool.tokens == [WETH, USDC, DAI]
+    assert pool.token_weights == [0.5, 0.25, 0.25]
+    assert pool.token_balances == [10, 20, 30]
+    assert pool.token_decimals == [18, 6, 18]
+    assert pool.get_token_decimals(USDC) == 6
+
+    pool.tkn2_balance = 40
+    assert pool.get_token_balance(DAI) == 40
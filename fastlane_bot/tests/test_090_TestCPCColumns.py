@@ -0,0 +1,51 @@
+# coding=utf-8
+
+'''
+This module tests the columnar representation of the curves of a CPCContainer
+'''
+
+import numpy as np
+
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer, CPCColumns
+
+def curves():
+    return [
+        CPC.from_univ2(x_tknb=10, y_tknq=20000, pair="ETH/USDC", fee=0.003, cid="1", descr="univ2"),
+        CPC.from_univ2(x_tknb=30000, y_tknq=15, pair="USDC/ETH", fee=0.003, cid="2", descr="univ2"),
+        CPC.from_univ2(x_tknb=1, y_tknq=15, pair="ETH/LINK", fee=0.001, cid="3", descr="univ2"),
+        CPC.from_pk(p=2100, k=1000000, pair="ETH/USDC", cid="4", descr="univ2"),
+        CPC.from_carbon(pa=2000, pb=2200, yint=1, y=1, tkny="ETH", pair="ETH/USDC", fee=0.002, cid="5", isdydx=False, descr="carbon"),
+    ]
+
+def test_columns_match_curves():
+    CC = CPCContainer(curves())
+    cols = CC.columns
+    assert isinstance(cols, CPCColumns) and len(cols) == len(CC)
+    assert cols.tokens == ("ETH", "LINK", "USDC")
+    assert [cols.tokens[i] for i in cols.tknx_ix] == [c.tknx for c in CC]
+    assert [cols.tokens[i] for i in cols.tkny_ix] == [c.tkny for c in CC]
+    for name in ["k", "x", "x_act", "y_act", "alpha", "p", "at_boundary"]:
+        assert getattr(cols, name).tolist() == [getattr(c, name) for c in CC], name
+    assert cols.bypair("ETH", "USDC").tolist() == [0, 3]
+    assert cols.bypair("USDC", "ETH").tolist() == [1, 4]
+    assert cols.bypair("LINK", "ETH").tolist() == []
+    assert cols.bypair("WBTC", "ETH").tolist() == []
+
+def test_columns_are_reset_by_add():
+    CC = CPCContainer(curves()[:3])
+    assert len(CC.columns) == 3
+    CC += curves()[3:]
+    assert len(CC.columns) == 5
+
+def test_price_estimate_from_columns():
+    CC = CPCContainer(curves())
+    data = [(c.p, c.k) for c in CC if not c.at_boundary and c.pair == "ETH/USDC"]
+    data += [(1 / c.p, c.k) for c in CC if not c.at_boundary and c.pair == "USDC/ETH"]
+    prices, weights = CC.price_estimate(tknb="ETH", tknq="USDC", result=CC.PE_DATA)
+    assert prices.tolist() == [p for p, _ in data]
+    assert weights.tolist() == [np.sqrt(k) for _, k in data]
+    assert CC.price_estimate(tknb="ETH", tknq="USDC") == np.average(prices, weights=weights)
+    assert len(CC.price_estimate(tknb="ETH", tknq="USDC", result=CC.PE_CURVES)) == len(data)
+    assert CC.price_estimate(tknb="LINK", tknq="USDC", raiseonerror=False) is None
+    estimates = CC.price_estimates(tknqs=["USDC"], tknbs=["ETH", "LINK"], triangulate=False, raiseonerror=False)
+    assert estimates.tolist() == [CC.price_estimate(tknb="ETH", tknq="USDC"), None]
@@ -0,0 +1,247 @@
+# coding=utf-8
+
+'''
+This module tests the modelling of Uniswap v3 pools as chains of tick ranges
+'''
+
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from eth_abi import encode
+from web3.datastructures import AttributeDict
+
+from fastlane_bot.bot import CarbonBot
+from fastlane_bot.data.abi import UNISWAP_V3_POOL_ABI
+from fastlane_bot.events.async_backdate_utils import async_handle_main_backdate_from_contracts
+from fastlane_bot.events.interface import QueryInterface
+from fastlane_bot.events.pools.uniswap_v3 import UniswapV3Pool
+from fastlane_bot.events.utils import filter_latest_events
+from fastlane_bot.helpers.routehandler import TxRouteHandler
+from fastlane_bot.helpers.univ3calc import Univ3Calculator as U3
+from fastlane_bot.modes.base import ArbitrageFinderBase
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.optimizer import CPCArbOptimizer
+
+TKN0 = "0x1111111111111111111111111111111111111111"
+TKN1 = "0x2222222222222222222222222222222222222222"
+Q96 = 2**96
+
+# liquidity 5e17 in [-20, 0), 1e18 in [0, 10), 2e17 in [10, 30) and none outside of [-20, 30)
+TICKS = [[-2560, 0], [-20, 5 * 10**17], [0, 5 * 10**17], [10, -8 * 10**17], [30, -2 * 10**17], [2560, 0]]
+
+def calculator():
+    return U3(tkn0=TKN0, tkn0decv=18, tkn1=TKN1, tkn1decv=18, sp96=Q96, tick=0, liquidity=10**18, fee_const=U3.FEE500)
+
+def test_range_params():
+    params = calculator().range_params(TICKS)
+    assert sorted(params) == [-1, 1]
+    assert params[1]["uniL"] == 0.2 and params[-1]["uniL"] == 0.5
+    assert params[1]["uniPa"] == params[1]["Pmarg"] == 1.0001**10
+    assert params[1]["uniPb"] == 1.0001**30
+    assert params[-1]["uniPa"] == 1.0001**-20
+    assert params[-1]["uniPb"] == params[-1]["Pmarg"] == 1
+
+def test_range_cids():
+    assert U3.range_cid("0xabc", 2) == "0xabc#u2"
+    assert U3.range_cid("0xabc", -1) == "0xabc#d1"
+    assert U3.pool_cid("0xabc#d1") == U3.pool_cid("0xabc") == "0xabc"
+    assert U3.is_range_cid("0xabc#u2") and not U3.is_range_cid("0xabc")
+    assert "-" not in U3.range_cid("0xabc", -1)
+
+def test_range_curves():
+    cfg = SimpleNamespace(logger=MagicMock(), UNI_V3_FORKS=["uniswap_v3"])
+    record = {
+        "cid": "0xabc",
+        "last_updated_block": 1,
+        "descr": f"uniswap_v3 {TKN0}/{TKN1} 0.0005",
+        "pair_name": f"{TKN0}/{TKN1}",
+        "exchange_name": "uniswap_v3",
+        "fee": "0.0005",
+        "fee_float": 0.0005,
+        "tkn0_address": TKN0,
+        "tkn1_address": TKN1,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 18,
+        "sqrt_price_q96": Q96,
+        "tick": 0,
+        "tick_spacing": 10,
+        "liquidity": 10**18,
+    }
+    qi = QueryInterface(ConfigObj=cfg)
+    addrdec = {TKN0: (TKN0, 18), TKN1: (TKN1, 18)}
+    pool = qi.create_pool_and_tokens(0, record)
+    pool.ADDRDEC = addrdec
+    assert [curve.cid for curve in pool._univ3_to_cpc()] == ["0xabc"]
+
+    pool = qi.create_pool_and_tokens(0, {**record, "ticks": TICKS})
+    pool.ADDRDEC = addrdec
+    curves = pool._univ3_to_cpc()
+    assert [curve.cid for curve in curves] == ["0xabc", "0xabc#u1", "0xabc#d1"]
+    above, below = curves[1:]
+    assert above.y_act == 0 and above.x_act > 0
+    assert below.x_act == 0 and below.y_act > 0
+    assert all(curve.params.exchange == "uniswap_v3" for curve in curves)
+
+def test_ticks_from_bitmap():
+    assert UniswapV3Pool.ticks_from_bitmap(0, 0b1011, 10) == [0, 10, 30]
+    assert UniswapV3Pool.ticks_from_bitmap(-1, 1 << 255, 60) == [-60]
+    assert UniswapV3Pool.ticks_from_bitmap(3, 0, 1) == []
+
+def event(name, tick_lower, tick_upper, amount):
+    return {"event": name, "args": {"tickLower": tick_lower, "tickUpper": tick_upper, "amount": amount}}
+
+def test_update_ticks_from_event():
+    pool = UniswapV3Pool(state={"ticks": TICKS, "liquidity": 10**18})
+    data = pool.update_from_event(event("Mint", -10, 20, 100), {})
+    assert data["ticks"] == [[-2560, 0], [-20, 5 * 10**17], [-10, 100], [0, 5 * 10**17], [10, -8 * 10**17],
+                             [20, -100], [30, -2 * 10**17], [2560, 0]]
+    pool.update_from_event(event("Burn", -10, 5000, 100), {})
+    assert pool.state["ticks"][2] == [-10, 0]
+    assert pool.state["ticks"][-1] == [2560, 0]
+    assert pool.state["liquidity"] == 10**18
+
+    # pools without ticks are not changed
+    pool = UniswapV3Pool(state={"liquidity": 10**18})
+    assert pool.update_from_event(event("Mint", -10, 20, 100), {}) == {}
+    assert "ticks" not in pool.state
+
+def pool_contract(call):
+    """A mocked pool contract at tick 5 (tick spacing 10), whose tickBitmap and ticks multicalls are answered by `call`"""
+    async def block_number():
+        return 123
+
+    contract = MagicMock(abi=UNISWAP_V3_POOL_ABI, address="0x01")
+    contract.w3.to_checksum_address.side_effect = lambda x: x
+    type(contract.w3.eth).block_number = property(lambda _: block_number())
+    caller = contract.caller
+    caller.return_value = caller
+    caller.slot0 = AsyncMock(return_value=(Q96, 5))
+    caller.fee = AsyncMock(return_value=500)
+    caller.liquidity = AsyncMock(return_value=10**18)
+    caller.tickSpacing = AsyncMock(return_value=10)
+    contract.w3.eth.contract.return_value.functions.aggregate.return_value.call = call
+    return contract
+
+def test_async_update_from_contract_fetches_ticks():
+    # the initialized ticks of TICKS: -20 in the word -1, 0, 10 and 30 in the word 0
+    bitmaps = [encode(["uint256"], [1 << 254]), encode(["uint256"], [0b1011]), encode(["uint256"], [0])]
+    tick_types = ["uint128", "int128", "uint256", "uint256", "int56", "uint160", "uint32", "bool"]
+    ticks = [encode(tick_types, [0, net, 0, 0, 0, 0, 0, True]) for net in [5 * 10**17, 5 * 10**17, -8 * 10**17, -2 * 10**17]]
+    call = AsyncMock(side_effect=[(123, bitmaps), (123, ticks)])
+    contract = pool_contract(call)
+    pool = UniswapV3Pool(state={"exchange_name": "uniswap_v3", "address": "0x01"}, tick_words=1, multicall_address="0x02")
+    pool_info = {"cid": "0xabc"}
+    idx, pool_info = asyncio.run(async_handle_main_backdate_from_contracts(
+        idx=0, pool=pool, w3_tenderly=None, w3_async=contract.w3, tenderly_fork_id=None, pool_info=pool_info, contract=contract,
+    ))
+    # the state and the ticks are read at the same block
+    contract.caller.assert_called_with(block_identifier=123)
+    assert [c.kwargs for c in call.call_args_list] == [{"block_identifier": 123}] * 2
+    assert pool_info["tick"] == 5 and pool_info["tick_spacing"] == 10
+    assert pool_info["ticks"] == [[-2560, 0], [-20, 5 * 10**17], [0, 5 * 10**17], [10, -8 * 10**17], [30, -2 * 10**17], [5120, 0]]
+    assert pool.state["ticks"] == pool_info["ticks"]
+
+    # without tracked ticks, the latest state is read with no multicall
+    call = AsyncMock()
+    contract = pool_contract(call)
+    pool = UniswapV3Pool(state={"exchange_name": "uniswap_v3", "address": "0x01"})
+    params = asyncio.run(pool.async_update_from_contract(contract))
+    assert "ticks" not in params and params["tick"] == 5
+    contract.caller.assert_not_called()
+    call.assert_not_called()
+
+class MockPoolType:
+    def unique_key(self):
+        return "address"
+
+    def is_incremental_event(self, event):
+        return UniswapV3Pool.is_incremental_event(event)
+
+class MockManager:
+    pool_data = []
+
+    def pool_type_from_exchange_name(self, exchange_name):
+        return MockPoolType()
+
+    def exchange_name_from_event(self, event):
+        return "uniswap_v3"
+
+def log(name, args, block):
+    return AttributeDict({"event": name, "args": args, "address": "0x01", "blockNumber": block, "transactionIndex": 0, "logIndex": 0})
+
+def test_filter_latest_events_keeps_incremental_events():
+    swap = {"sqrtPriceX96": Q96, "liquidity": 1, "tick": 0}
+    mint = {"tickLower": -10, "tickUpper": 10, "amount": 1}
+    events = [[log("Swap", swap, 1), log("Mint", mint, 2)], [log("Burn", mint, 3), log("Swap", swap, 4)]]
+    result = filter_latest_events(MockManager(), events)
+    assert [(e["event"], e["blockNumber"]) for e in result] == [("Swap", 4), ("Mint", 2), ("Burn", 3)]
+
+def test_merge_range_trades():
+    TI = CPCArbOptimizer.TradeInstruction
+    curve = CPC.from_xy(x=100, y=100, pair=f"{TKN0}/{TKN1}", cid="0xabc")
+    trade_instructions = (
+        TI(cid="0xabc", tknin=TKN0, amtin=10, tknout=TKN1, amtout=-9, curve=curve),
+        TI(cid="0xdef-0", tknin=TKN1, amtin=12, tknout=TKN0, amtout=-13),
+        TI(cid="0xabc#u1", tknin=TKN0, amtin=3, tknout=TKN1, amtout=-2),
+    )
+    robj = SimpleNamespace(p_optimal={TKN0: 1.0, TKN1: 1.0})
+    aggr = TI.to_format(trade_instructions, robj, ti_format=TI.TIF_AGGR)
+    arb_opp = (1, aggr, TI.to_dicts(trade_instructions), TKN0, trade_instructions)
+    _, merged_aggr, merged_dic, _, merged = CarbonBot.merge_range_trades(arb_opp)
+    assert [(ti.cid, ti.tknin, ti.amtin, ti.tknout, ti.amtout) for ti in merged] == [
+        ("0xabc", TKN0, 13, TKN1, -11),
+        ("0xdef-0", TKN1, 12, TKN0, -13),
+    ]
+    assert merged[0].curve is curve and merged[1].curve is None
+    assert [(ti["cid"], ti["amtin"], ti["amtout"]) for ti in merged_dic] == [("0xabc", 13, -11), ("0xdef-0", 12, -13)]
+    assert merged_aggr.trade_instructions == merged and merged_aggr.robj is robj
+    assert list(merged_aggr.netchange) == list(aggr.netchange) == [0, 1]
+    assert list(merged_aggr.df.index[:2]) == ["0xabc", "0xdef-0"]
+
+    arb_opp = (1, aggr, TI.to_dicts(trade_instructions[:2]), TKN0, trade_instructions[:2])
+    assert CarbonBot.merge_range_trades(arb_opp) is arb_opp
+
+    # only the range curves of the pool were traded: the curve of the current range is taken from the container,
+    # or stood in for by the curve of a traded range
+    range_curve = CPC.from_xy(x=50, y=50, pair=f"{TKN0}/{TKN1}", cid="0xabc#d1")
+    range_trades = (
+        TI(cid="0xabc#d1", tknin=TKN0, amtin=3, tknout=TKN1, amtout=-2, curve=range_curve),
+        TI(cid="0xabc#u1", tknin=TKN0, amtin=1, tknout=TKN1, amtout=-1),
+    )
+    arb_opp = (1, aggr, TI.to_dicts(range_trades), TKN0, range_trades)
+    (merged_ti,) = CarbonBot.merge_range_trades(arb_opp, CCm=CPCContainer([curve, range_curve]))[4]
+    assert merged_ti.curve is curve and merged_ti.error is None
+    (merged_ti,) = CarbonBot.merge_range_trades(arb_opp)[4]
+    assert merged_ti.curve.cid == "0xabc" and merged_ti.curve.x == range_curve.x and merged_ti.error is None
+    assert merged_ti.curve.pair == curve.pair
+
+def test_swap_across_ticks():
+    handler = TxRouteHandler.__new__(TxRouteHandler)
+    handler.ConfigObj = SimpleNamespace(Q96=Decimal(2) ** 96)
+    args = dict(
+        fee=Decimal("0.0005"),
+        liquidity=Decimal(10**18),
+        sqrt_price=Decimal("1.0001") ** Decimal("2.5") * Q96,
+        decimal_tkn0_modifier=Decimal(10**18),
+        decimal_tkn1_modifier=Decimal(10**18),
+        tkn_0_address=TKN0,
+        tkn_1_address=TKN1,
+    )
+    for tkn_in, tkn_out in [(TKN0, TKN1), (TKN1, TKN0)]:
+        # within the current range the result is the same as for a single range
+        small = handler._calc_uniswap_v3_output(amount_in=Decimal("0.0001"), tkn_in=tkn_in, tkn_out=tkn_out, **args)
+        ticked = handler._calc_uniswap_v3_output(amount_in=Decimal("0.0001"), tkn_in=tkn_in, tkn_out=tkn_out, tick=5, ticks=TICKS, **args)
+        assert abs(ticked - small) < Decimal("1e-15")
+
+        # beyond the current range the liquidity of the next ranges is lower
+        large = handler._calc_uniswap_v3_output(amount_in=Decimal("0.01"), tkn_in=tkn_in, tkn_out=tkn_out, **args)
+        ticked = handler._calc_uniswap_v3_output(amount_in=Decimal("0.01"), tkn_in=tkn_in, tkn_out=tkn_out, tick=5, ticks=TICKS, **args)
+        assert 0 < ticked < large
+
+def test_group_curves_by_pool():
+    curves = [SimpleNamespace(cid=cid) for cid in ["0xabc", "0xdef", "0xabc#u1", "0xabc#d1", "0xdef-0"]]
+    groups = ArbitrageFinderBase.group_curves_by_pool(curves)
+    assert [[curve.cid for curve in group] for group in groups] == [["0xabc", "0xabc#u1", "0xabc#d1"], ["0xdef"], ["0xdef-0"]]
+    assert [curve.cid for curve in ArbitrageFinderBase.remove_range_curves(curves)] == ["0xabc", "0xdef", "0xdef-0"]
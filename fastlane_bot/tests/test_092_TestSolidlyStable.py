@@ -0,0 +1,131 @@
+# coding=utf-8
+
+'''
+This module tests the Solidly stable pool curves and their fast invariant solver
+'''
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from fastlane_bot.events.interface import QueryInterface
+from fastlane_bot.helpers.routehandler import TxRouteHandler
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.invariants.solidly import SolidlySwapFunction
+from fastlane_bot.tools.optimizer import MargPOptimizer, PairOptimizer
+
+USDC = "0x0b2C639c533813f4Aa9D7837CAf62653d097Ff85"
+DAI = "0xDA10009cBd5D07dd0CeCc66161FC93D7c9000da1"
+
+def test_newton_solver():
+    f = SolidlySwapFunction(k=1000, method=SolidlySwapFunction.METHOD_NEWTON)
+    f_dec = SolidlySwapFunction(k=1000)
+    assert f_dec.method == f_dec.METHOD_DEC1000
+    assert f.update(k=2000).method == f.METHOD_NEWTON
+    for x in [0.1, 1, 4.7, 5.5, 20, 100]:
+        y = f(x)
+        assert y == pytest.approx(f_dec(x), rel=1e-12)
+        assert x**3 * y + x * y**3 == pytest.approx(1000, rel=1e-12)
+        assert f.p(x) == pytest.approx(-f_dec.df_dx_rel(x), rel=1e-6)
+        assert f.pp(x) == pytest.approx(-f_dec.d2f_dx2_rel(x), rel=1e-4, abs=1e-6)
+
+def test_xyfromp():
+    f = SolidlySwapFunction(k=1000, method=SolidlySwapFunction.METHOD_NEWTON)
+    for p in [0.01, 0.5, 0.99, 1, 1.01, 2, 100]:
+        x, y = f.xyfromp(p)
+        assert f.p(x) == pytest.approx(p, rel=1e-10)
+        assert x**3 * y + x * y**3 == pytest.approx(1000, rel=1e-12)
+    x, y = SolidlySwapFunction.xyfromkp(np.array([1000, 16]), np.array([0.5, 1]))
+    assert x.tolist() == pytest.approx([f.xyfromp(0.5)[0], 16 ** 0.25 / 2 ** 0.25])
+
+def test_exact_curve():
+    c = CPC.from_solidly(x=100, y=300, pair="DAI/USDC", cid="1", fee=0.0005, exact=True)[0]
+    assert c.constr == "solidly" and c.swapfunc.k == 100**3 * 300 + 100 * 300**3
+    assert c.x_act == 100 and c.y_act == 300
+    assert c.p == pytest.approx(c.swapfunc.p(100))
+    assert c.dxdyfromp_f(c.p)[:2] == pytest.approx((0, 0), abs=1e-9)
+
+    dx, dy, _ = c.dxdyfromp_f(1)
+    assert dx > 0 and dy < 0 and 100 + dx == pytest.approx(300 + dy)
+    assert c.dyfromdx_f(dx) == pytest.approx(dy)
+    assert c.dxfromdy_f(dy) == pytest.approx(dx)
+
+    # the curve survives a round trip through its parameters
+    copy = CPC(k=c.k, x=c.x, x_act=c.x_act, y_act=c.y_act, pair=c.pair, cid=c.cid, fee=c.fee, params=dict(c.params))
+    assert copy.swapfunc == c.swapfunc
+
+    # the approximation of the flat part is unchanged
+    assert CPC.from_solidly(x=100, y=300) == []
+    assert CPC.from_solidly(x=100, y=100)[0].swapfunc is None
+
+def curves():
+    return [
+        CPC.from_solidly(x=1000, y=1000, pair="DAI/USDC", cid="s", fee=0.0005, exact=True)[0],
+        CPC.from_univ2(x_tknb=1000, y_tknq=1100, pair="DAI/USDC", fee=0.003, cid="u", descr="univ2"),
+        CPC.from_univ2(x_tknb=1050, y_tknq=1000, pair="USDC/DAI", fee=0.003, cid="v", descr="univ2"),
+    ]
+
+def test_pair_optimizer():
+    problems = [(CPCContainer(curves()[:2]), "USDC"), (CPCContainer([curves()[0], curves()[2]]), "DAI")]
+    expected = [PairOptimizer(CC).optimize(targettkn) for CC, targettkn in problems]
+    results = PairOptimizer.optimize_batch([CC for CC, _ in problems], [targettkn for _, targettkn in problems])
+    for r, r0 in zip(results, expected):
+        assert not r0.is_error and r0.result < 0
+        assert r.result == pytest.approx(r0.result)
+        assert r.p_optimal_t == pytest.approx(r0.p_optimal_t)
+
+def test_margp_optimizer():
+    # the balanced stable pool sits on the cusp of its price curve, where undamped Newton steps oscillate
+    r = MargPOptimizer(CPCContainer(curves()[:2])).optimize("USDC")
+    assert not r.is_error
+    assert r.result == pytest.approx(PairOptimizer(CPCContainer(curves()[:2])).optimize("USDC").result, rel=1e-6)
+    r = MargPOptimizer(CPCContainer(curves())).optimize("USDC")
+    assert not r.is_error and r.result < 0
+    assert r.dtokens_t[0] == pytest.approx(0, abs=1e-6)
+
+def test_stable_pool_to_cpc():
+    cfg = SimpleNamespace(
+        logger=MagicMock(),
+        UNI_V3_FORKS=[],
+        CARBON_V1_FORKS=[],
+        BANCOR_POL_NAME="bancor_pol",
+        BALANCER_NAME="balancer",
+        SOLIDLY_V2_FORKS=["velodrome_v2"],
+        NATIVE_GAS_TOKEN_ADDRESS="0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE",
+        WRAPPED_GAS_TOKEN_ADDRESS="0x4200000000000000000000000000000000000006",
+    )
+    record = {
+        "cid": "0xabc",
+        "last_updated_block": 1,
+        "descr": f"velodrome_v2 {DAI}/{USDC} 0.0005",
+        "pair_name": f"{DAI}/{USDC}",
+        "exchange_name": "velodrome_v2",
+        "pool_type": "stable",
+        "fee": "0.0005",
+        "fee_float": 0.0005,
+        "tkn0_address": DAI,
+        "tkn1_address": USDC,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 6,
+        "tkn0_balance": 2 * 10**24,
+        "tkn1_balance": 10**12,
+    }
+    curves = QueryInterface(ConfigObj=cfg).create_pool_and_tokens(0, record).to_cpc()
+    assert len(curves) == 1
+    curve = curves[0]
+    assert curve.x_act == 2e6 and curve.y_act == 1e6
+    assert curve.swapfunc.k == pytest.approx(2e6**3 * 1e6 + 2e6 * 1e6**3)
+    assert curve.params.exchange == "velodrome_v2"
+
+    assert QueryInterface(ConfigObj=cfg).create_pool_and_tokens(0, {**record, "tkn1_balance": 0}).to_cpc() == []
+
+def test_stable_trade_result():
+    amount_out = TxRouteHandler._single_trade_result_solidly_stable(
+        tokens_in=Decimal(1000), token0_amt=Decimal(2e6), token1_amt=Decimal(1e6), fee=0.0005,
+    )
+    f = SolidlySwapFunction(k=2e6**3 * 1e6 + 2e6 * 1e6**3, method=SolidlySwapFunction.METHOD_NEWTON)
+    assert float(amount_out) == pytest.approx(1e6 - f(2e6 + 1000 * 0.9995), rel=1e-9)
+    assert 0 < amount_out < 1000
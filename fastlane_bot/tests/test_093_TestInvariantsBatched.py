@@ -0,0 +1,88 @@
+# coding=utf-8
+
+'''
+This module tests the batched (numpy array) evaluation of the invariant functions
+'''
+
+import numpy as np
+import pytest
+
+from fastlane_bot.tools.invariants.functions import (
+    Function, FunctionVector, Kernel, dataclass, CPMM, Quadratic, Trig, Log, UniV3, LCPMM,
+)
+from fastlane_bot.tools.invariants.solidly import SolidlySwapFunction
+from fastlane_bot.tools.invariants.bancor import BancorSwapFunction
+
+@dataclass(frozen=True)
+class SqrtFunction(Function):
+    k: float = 1
+
+    def f(self, x):
+        if x < 0:
+            return None
+        return x**0.5 * self.k
+
+def pointwise(func, x):
+    values = [func(x_) for x_ in x]
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+FUNCTIONS = [
+    CPMM(k=4),
+    BancorSwapFunction(k=4),
+    Quadratic(a=1, b=2, c=3),
+    Trig(amp=2, omega=0.3),
+    Log(x0=0.1),
+    UniV3(L=10, Pa=4, Pb=1),
+    LCPMM(k=4, x0=1, y0=1),
+    SqrtFunction(k=2),
+    SolidlySwapFunction(k=1000, method=SolidlySwapFunction.METHOD_NEWTON),
+    SolidlySwapFunction(k=1000),
+]
+
+@pytest.mark.parametrize("func", FUNCTIONS, ids=lambda func: type(func).__name__)
+def test_vectorized_functions(func):
+    x = np.linspace(0.5, 20, 25)
+    assert np.allclose(func.f_vec(x), pointwise(func.f, x), equal_nan=True)
+    assert np.allclose(func.p_vec(x), pointwise(func.p, x), equal_nan=True)
+    assert np.array_equal(func.df_dx_vec(x), -func.p_vec(x), equal_nan=True)
+    assert np.allclose(func.pp_vec(x), pointwise(func.pp, x), equal_nan=True, rtol=1e-4)
+    assert func.f_vec(x.reshape(5, 5)).shape == (5, 5)
+
+def test_none_values_become_nan():
+    f = SqrtFunction()
+    assert np.isnan(f.f_vec([-1, 4])).tolist() == [True, False]
+    assert f.f_vec([-1, 4])[1] == 2
+    assert np.isnan(UniV3(L=10, Pa=4, Pb=1).p_vec([100])[0])
+    assert np.isnan(Log(x0=1).f_vec([0.5])[0])
+
+@pytest.mark.parametrize("kernel", [
+    Kernel.FLAT, Kernel.TRIANGLE, Kernel.SAWTOOTHL, Kernel.SAWTOOTHR, Kernel.GAUSS, Kernel.GAUSSW, Kernel.GAUSSN,
+])
+def test_vectorized_kernels(kernel):
+    k = Kernel(x_min=1, x_max=5, kernel=kernel)
+    x = np.linspace(0, 6, 31)
+    assert np.allclose(k.k_vec(x), [k(x_) for x_ in x])
+    assert k.integrate(lambda x: x**2, vectorized=True) == pytest.approx(k.integrate(lambda x: x**2), rel=1e-12)
+
+def test_custom_kernel():
+    k = Kernel(x_min=0, x_max=2, kernel=lambda x: 1 if x < 1 else 0)
+    assert k.k_vec([0.5, 1.5, 3]).tolist() == [1, 0, 0]
+    assert k.integrate(lambda x: x, vectorized=True) == k.integrate(lambda x: x)
+
+def test_function_vector():
+    kernel = Kernel(x_min=1, x_max=10, kernel=Kernel.GAUSS)
+    f1 = SolidlySwapFunction(k=1000, method=SolidlySwapFunction.METHOD_NEWTON)
+    f2 = SqrtFunction(k=2)
+    fv = FunctionVector({f1: 1, f2: -0.5}, kernel=kernel)
+    x = np.linspace(1, 10, 10)
+    assert np.allclose(fv.f_vec(x), [fv.f(x_) for x_ in x])
+    assert np.allclose(fv.p_vec(x), [fv.p(x_) for x_ in x])
+    assert np.allclose(fv.pp_vec(x), [fv.pp(x_) for x_ in x], rtol=1e-4)
+
+    # integrals and distances on the whole grid give the same results as point by point
+    assert fv.integrate() == pytest.approx(kernel.integrate(fv.f), rel=1e-12)
+    g = CPMM(k=900)
+    assert fv.dist2_L2(g) == pytest.approx(kernel.integrate(lambda x: (fv.f(x)-g(x))**2 * kernel(x)), rel=1e-12)
+    assert fv.dist_L1(g.f) == pytest.approx(kernel.integrate(lambda x: abs(fv.f(x)-g(x)) * kernel(x)), rel=1e-12)
+    assert fv.distp2_L2(g.p) == pytest.approx(kernel.integrate(lambda x: (fv.p(x)-g.p(x))**2 * kernel(x)), rel=1e-9)
+    assert fv.norm2() == fv.dist2_L2()
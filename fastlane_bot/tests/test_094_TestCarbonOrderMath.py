@@ -0,0 +1,137 @@
+# coding=utf-8
+
+'''
+This module tests the Carbon order math (decoding, curve parameters and contract trade functions)
+'''
+
+import math
+from decimal import Decimal, getcontext
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from fastlane_bot.events.interface import QueryInterface
+from fastlane_bot.events.multicall_utils import encode_token_price
+from fastlane_bot.helpers.carboncalc import CarbonCalculator
+from fastlane_bot.helpers.routehandler import TxRouteHandler
+from fastlane_bot.utils import EncodedOrder
+
+getcontext().prec = 100
+
+ETH = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+def order(p_start=Decimal(2), p_end=Decimal(1), y=10**21, z=2 * 10**21):
+    A = CarbonCalculator.encode_float(CarbonCalculator.encode_rate(p_start) - CarbonCalculator.encode_rate(p_end))
+    return CarbonCalculator.from_state(y=y, z=z, A=A, B=encode_token_price(p_end))
+
+def test_encoding():
+    assert CarbonCalculator.bit_length(0) == 0 and CarbonCalculator.bit_length(5) == 3
+    for price in [Decimal("0.000001"), Decimal(1), Decimal("3.7"), Decimal(10**12)]:
+        rate = CarbonCalculator.encode_rate(price)
+        assert CarbonCalculator.decode_float(CarbonCalculator.encode_float(rate)) == rate
+        assert (rate / CarbonCalculator.ONE) ** 2 == pytest.approx(float(price), rel=1e-10)
+        assert EncodedOrder.decodeFloat(encode_token_price(price)) == rate
+
+def test_from_state():
+    o = order()
+    assert order() is o
+    assert CarbonCalculator.from_state(y=o.y, z=o.z, A=None, B=o.B).A == 0
+    assert o.p_start == pytest.approx(2, rel=1e-12) and o.p_end == pytest.approx(1, rel=1e-12)
+    eo = EncodedOrder(token="ETH", y=o.y, z=o.z, A=o.A, B=o.B)
+    assert (o.A_, o.B_, o.p_start, o.p_end) == (eo.A_, eo.B_, eo.p_start, eo.p_end)
+
+    args = o.cpc_args(decimals_y=18, decimals_x=6)
+    assert args["yint"] == 2000 and args["y"] == 1000
+    assert args["pa"] == pytest.approx(2e-12) and args["pb"] == pytest.approx(1e-12)
+    assert o.cpc_args(decimals_y=6, decimals_x=18)["pa"] == pytest.approx(2e12)
+
+def test_trade_functions():
+    o = order()
+    A, B = Decimal(o.A_exp) / CarbonCalculator.ONE, Decimal(o.B_exp) / CarbonCalculator.ONE
+    y, z = Decimal(o.y), Decimal(o.z)
+    for x in [1, 10**6, 10**18, 3 * 10**20]:
+        target = (x * (B * z + A * y) ** 2) / (x * (B * A * z + A**2 * y) + z**2)
+        assert o.target_amount(x) == int(target)
+        dy = o.target_amount(x)
+        source = (dy * z**2) / ((A * y + B * z) * (A * y + B * z - A * dy))
+        assert o.source_amount(dy) == math.ceil(source)
+        assert o.source_amount(dy) <= x
+
+    # orders without range (A == 0) trade at the fixed price B^2
+    flat = CarbonCalculator.from_state(y=10**21, z=10**21, A=0, B=encode_token_price(Decimal(4)))
+    assert flat.target_amount(10**18) == pytest.approx(4 * 10**18, rel=1e-10)
+    assert flat.source_amount(flat.target_amount(10**18)) in (10**18 - 1, 10**18)
+
+def test_trade_by_source():
+    o = order()
+    x, dy = o.trade_by_source(10**18, fee_ppm=2000)
+    assert x == 10**18 and dy == o.target_amount(x) * 998_000 // 1_000_000
+
+    # the order runs out of liquidity: only the amount needed to buy it is sold
+    x, dy = o.trade_by_source(10**24, fee_ppm=0)
+    assert dy == o.y and x == o.source_amount(o.y) < 10**24
+
+def cfg():
+    return SimpleNamespace(
+        logger=MagicMock(),
+        UNI_V3_FORKS=[],
+        CARBON_V1_FORKS=["carbon_v1"],
+        BANCOR_POL_NAME="bancor_pol",
+        BALANCER_NAME="balancer",
+        SOLIDLY_V2_FORKS=[],
+        NATIVE_GAS_TOKEN_ADDRESS=ETH,
+        WRAPPED_GAS_TOKEN_ADDRESS=WETH,
+    )
+
+def record():
+    sell_usdc = order(p_start=Decimal("3000e-12"), p_end=Decimal("2500e-12"), y=5 * 10**9, z=10**10)
+    sell_eth = order(p_start=Decimal("1e12") / 3500, p_end=Decimal("1e12") / 4000, y=10**18, z=10**18)
+    return {
+        "cid": "0xabc",
+        "strategy_id": 1,
+        "last_updated_block": 1,
+        "descr": f"carbon_v1 {ETH}/{USDC} 0.002",
+        "pair_name": f"{ETH}/{USDC}",
+        "exchange_name": "carbon_v1",
+        "fee": "0.002",
+        "fee_float": 0.002,
+        "tkn0_address": ETH,
+        "tkn1_address": USDC,
+        "tkn0_decimals": 18,
+        "tkn1_decimals": 6,
+        "y_0": sell_eth.y, "z_0": sell_eth.z, "A_0": sell_eth.A, "B_0": sell_eth.B,
+        "y_1": sell_usdc.y, "z_1": sell_usdc.z, "A_1": sell_usdc.A, "B_1": sell_usdc.B,
+    }
+
+def test_carbon_to_cpc():
+    curves = QueryInterface(ConfigObj=cfg()).create_pool_and_tokens(0, record()).to_cpc()
+    assert [c.cid for c in curves] == ["0xabc-0", "0xabc-1"]
+    usdc, eth = curves
+    assert usdc.tkny == USDC and usdc.y_act == 5000 and usdc.params["yint"] == 10000
+    assert usdc.params["pa"] == pytest.approx(3000, rel=1e-9) and usdc.params["pb"] == pytest.approx(2500, rel=1e-9)
+    assert 2500 < usdc.p < 3000
+    assert eth.tkny == WETH and eth.y_act == 1 and eth.p_min == pytest.approx(1 / 4000, rel=1e-9)
+
+    # empty orders are skipped
+    curves = QueryInterface(ConfigObj=cfg()).create_pool_and_tokens(0, {**record(), "y_0": 0}).to_cpc()
+    assert [c.cid for c in curves] == ["0xabc-0"]
+
+def test_calc_carbon_output():
+    handler = TxRouteHandler.__new__(TxRouteHandler)
+    handler.ConfigObj = cfg()
+    curve = SimpleNamespace(pair_name=f"{ETH}/{USDC}", fee_float=0.002, **{k: v for k, v in record().items() if k[:2] in ("y_", "z_", "A_", "B_")})
+    amount_in, amount_out = handler._calc_carbon_output(
+        curve=curve, tkn_in=WETH, tkn_in_decimals=18, tkn_out_decimals=6, amount_in=Decimal("0.5")
+    )
+    o = CarbonCalculator.from_state(y=curve.y_1, z=curve.z_1, A=curve.A_1, B=curve.B_1)
+    assert amount_in == Decimal("0.5")
+    assert amount_out == Decimal(o.trade_by_source(5 * 10**17, fee_ppm=2000)[1]) / 10**6
+    assert 2500 * 0.5 * 0.998 < amount_out < 3000 * 0.5
+
+    amount_in, amount_out = handler._calc_carbon_output(
+        curve=curve, tkn_in=USDC, tkn_in_decimals=6, tkn_out_decimals=18, amount_in=Decimal(10**6)
+    )
+    assert amount_out == Decimal("0.998") and amount_in < 4000
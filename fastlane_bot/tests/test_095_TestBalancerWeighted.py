@@ -0,0 +1,153 @@
+# coding=utf-8
+
+'''
+This module tests the weighted (Balancer) pools: n-token curves, their use in the optimizer and the trade simulation
+'''
+
+import json
+import math
+from decimal import Decimal, getcontext
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from fastlane_bot.events.interface import QueryInterface
+from fastlane_bot.helpers.balancercalc import BalancerCalculator, LogExpMath
+from fastlane_bot.helpers.routehandler import TxRouteHandler, BalancerInputTooLargeError
+from fastlane_bot.tools.cpc import ConstantProductCurve as CPC, CPCContainer
+from fastlane_bot.tools.invariants.weighted import WeightedPoolCurve
+from fastlane_bot.tools.optimizer import MargPOptimizer
+
+getcontext().prec = 60
+
+ETH = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+LUSD = "0x5f98805A4E8be255a32880FDeC7F6728C6568bA0"
+RPL = "0xD33526068D116cE69F19A9ee46F0bd304F21A51f"
+
+POOL = WeightedPoolCurve(tokens=("A", "B", "C"), balances=(1000, 2000, 500), weights=(0.5, 0.3, 0.2))
+
+def test_weighted_pool_curve():
+    assert POOL.n == 3 and POOL.price("A", "B") == pytest.approx((2000 / 0.3) / (1000 / 0.5))
+    pvec = {"A": 4.0, "B": 1.0, "C": 3.0}
+    xvec = POOL.xvecfrompvec_f(pvec)
+    invariant = lambda xs: sum(w * math.log(xs[t]) for t, w in zip(POOL.tokens, POOL.weights))
+    assert invariant(xvec) == pytest.approx(invariant(dict(zip(POOL.tokens, POOL.balances))))
+    assert xvec["A"] * 4 / 0.5 == pytest.approx(xvec["B"] / 0.3) == pytest.approx(xvec["C"] * 3 / 0.2)
+    at_market = {t: POOL.balances[0] / POOL.weights[0] / (x / w) for t, x, w in zip(POOL.tokens, POOL.balances, POOL.weights)}
+    assert all(abs(dx) < 1e-9 for dx in POOL.dxvecfrompvec_f(at_market).values())
+
+def test_restrict_and_pairs():
+    pair = POOL.restrict(["C", "A"])
+    assert pair.tokens == ("A", "C") and pair.weights == (0.5, 0.2)
+    c = CPC.from_xyal(x=1000, y=500, eta=0.5 / 0.2, pair="A/C")
+    pvec = {"A": 1.3, "C": 1.0}
+    dx = pair.dxvecfrompvec_f(pvec)
+    assert c.dxvecfrompvec_f(pvec)["A"] == pytest.approx(dx["A"])
+    assert c.dxvecfrompvec_f(pvec)["C"] == pytest.approx(dx["C"])
+
+def test_pairtrades():
+    pvec = {"A": 4.0, "B": 1.0, "C": 3.0}
+    dxvec = POOL.dxvecfrompvec_f(pvec)
+    trades = POOL.pairtradesfrompvec_f(pvec)
+    assert 0 < len(trades) <= POOL.n - 1
+    for t in POOL.tokens:
+        assert sum(dx[0] for k, dx in trades.items() if k[0] == t) + sum(dx[1] for k, dx in trades.items() if k[1] == t) == pytest.approx(dxvec[t])
+    value_in = sum(dx * pvec[t] for t, dx in dxvec.items() if dx > 0)
+    value_out = -sum(dx * pvec[t] for t, dx in dxvec.items() if dx < 0)
+    for (tknin, tknout), (dxin, dxout) in trades.items():
+        assert dxin > 0 > dxout
+        assert dxin * pvec[tknin] / value_in == pytest.approx(-dxout * pvec[tknout] / value_out)
+
+def test_from_balancer():
+    curves = CPC.from_balancer(POOL.tokens, POOL.balances, POOL.weights, cid="0x1", fee=0.01, descr="balancer")
+    assert [c.pair for c in curves] == ["A/B", "A/C", "B/C"]
+    assert all(c.ntokencurve == POOL for c in curves)
+    assert curves[1].eta == pytest.approx(0.5 / 0.2) and curves[1].x == 1000 and curves[1].y == pytest.approx(500)
+    assert CPC.from_xyal(x=1, y=1, pair="A/B").ntokencurve is None
+
+    container = CPCContainer(curves + [CPC.from_xyal(x=1, y=1, pair="A/B", cid="0x2")])
+    (ntokencurve, members), = container.ntokencurves()
+    assert ntokencurve == POOL and members == tuple(curves)
+    assert CPCContainer(curves[:2]).ntokencurves() == tuple()
+    curves4 = CPC.from_balancer(("A", "B", "C", "D"), (1, 2, 3, 4), (1, 1, 1, 1))
+    ntokencurve, _ = CPCContainer([c for c in curves4 if "D" not in c.pair]).ntokencurves()[0]
+    assert ntokencurve.tokens == ("A", "B", "C")
+
+def test_margp():
+    curves = CPC.from_balancer(POOL.tokens, POOL.balances, POOL.weights, cid="0x1", fee=0, descr="balancer")
+    curves += [
+        CPC.from_xy(x=100, y=500, pair="A/B", cid="0x2", fee=0),
+        CPC.from_xy(x=100, y=200, pair="C/B", cid="0x3", fee=0),
+    ]
+    r = MargPOptimizer(CPCContainer(curves)).optimize("B")
+    assert r.is_error is False
+    dxvecs = r.dxvecvalues(asdict=False)
+    assert abs(sum(dxvec.get("A", 0) for dxvec in dxvecs)) < 1e-5
+    assert abs(sum(dxvec.get("C", 0) for dxvec in dxvecs)) < 1e-5
+    assert sum(dxvec.get("B", 0) for dxvec in dxvecs) == pytest.approx(r.result) and r.result < 0
+    pool_dx = {t: 0 for t in POOL.tokens}
+    for dxvec in dxvecs[:3]:
+        for t, dx in dxvec.items():
+            pool_dx[t] += dx
+    ntokendx = POOL.dxvecfrompvec_f(r.p_optimal)
+    assert all(pool_dx[t] == pytest.approx(ntokendx[t]) for t in POOL.tokens)
+    assert sum(1 for dx, dy in r.dxdyvalues(asdict=False)[:3] if dx != 0) <= 2
+
+def test_logexpmath():
+    for x, y in [(Decimal("0.9"), Decimal("1.5")), (Decimal("1.1"), Decimal("0.25")), (Decimal("0.5"), Decimal("3.7"))]:
+        result = LogExpMath.pow(int(x * 10**18), int(y * 10**18))
+        assert result == pytest.approx(int((x ** y) * 10**18), rel=1e-12)
+
+def test_balancer_calculator():
+    pool = BalancerCalculator.from_pool(balances=[10**22, 5 * 10**9], weights=[0.8, 0.2], decimals=[18, 6], fee=0.003)
+    assert pool.weights == (8 * 10**17, 2 * 10**17) and pool.fee == 3 * 10**15
+    amount_in = 10**20
+    net = pool.amount_net_of_fee(amount_in)
+    assert net == amount_in * 997 // 1000
+    expected = Decimal(5 * 10**9) * (1 - (Decimal(10**22) / (10**22 + net)) ** 4)
+    amount_out = pool.trade_by_source(0, 1, amount_in)
+    assert amount_out <= expected and amount_out == pytest.approx(int(expected), rel=1e-9)
+    assert pool.max_amount_in(0) == 3 * 10**21 and pool.max_amount_out(1) == 15 * 10**8
+    with pytest.raises(AssertionError):
+        pool.trade_by_source(0, 1, 10**22)
+
+def cfg():
+    return SimpleNamespace(
+        logger=MagicMock(),
+        UNI_V3_FORKS=[],
+        CARBON_V1_FORKS=[],
+        BANCOR_POL_NAME="bancor_pol",
+        BALANCER_NAME="balancer",
+        SOLIDLY_V2_FORKS=[],
+        NATIVE_GAS_TOKEN_ADDRESS=ETH,
+        WRAPPED_GAS_TOKEN_ADDRESS=WETH,
+    )
+
+def record():
+    with open("fastlane_bot/tests/_data/latest_pool_data_testing.json") as f:
+        pools = json.load(f)
+    return [p for p in pools if p["cid"] == "0xba841adabcc7402bf7410b86b86d3941171b4178df699611eda851e12ed0fe10"][0]
+
+def test_balancer_to_cpc():
+    pool = QueryInterface(ConfigObj=cfg()).create_pool_and_tokens(0, record())
+    curves = pool.to_cpc()
+    assert len(curves) == 10
+    assert all(c.ntokencurve == curves[0].ntokencurve and c.cid == record()["cid"] for c in curves)
+    ntokencurve = curves[0].ntokencurve
+    assert ntokencurve.tokens[0] == LUSD and ntokencurve.balances[0] == pytest.approx(36367.672057726987)
+    assert ntokencurve.weights == (0.1, 0.063, 0.03, 0.257, 0.55)
+    lusd_rpl = [c for c in curves if c.pair == f"{LUSD}/{RPL}"][0]
+    assert lusd_rpl.p == pytest.approx(ntokencurve.price(LUSD, RPL))
+
+def test_calc_balancer_output():
+    handler = TxRouteHandler.__new__(TxRouteHandler)
+    handler.ConfigObj = cfg()
+    pool = QueryInterface(ConfigObj=cfg()).create_pool_and_tokens(0, record())
+    amount_out = handler._calc_balancer_output(curve=pool, tkn_in=LUSD, tkn_out=WETH, amount_in=Decimal("10000"))
+    balance_in, balance_out = Decimal(36367672057726987853387) / 10**18, Decimal(41488113055980883858) / 10**18
+    expected = balance_out * (1 - (balance_in / (balance_in + 10000 * Decimal("0.94"))) ** (Decimal("0.1") / Decimal("0.257")))
+    assert amount_out <= expected and float(amount_out) == pytest.approx(float(expected), rel=1e-9)
+    with pytest.raises(BalancerInputTooLargeError):
+        handler._calc_balancer_output(curve=pool, tkn_in=LUSD, tkn_out=WETH, amount_in=Decimal("100000000000"))
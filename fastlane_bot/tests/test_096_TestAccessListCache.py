@@ -0,0 +1,95 @@
+# coding=utf-8
+
+'''
+This module tests the access list cache of the transaction helpers
+'''
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastlane_bot.helpers import txhelpers
+from fastlane_bot.helpers.txhelpers import TxHelpers
+
+POOL = "0x0000000000000000000000000000000000000001"
+TOKEN = "0x0000000000000000000000000000000000000002"
+OTHER = "0x0000000000000000000000000000000000000003"
+KEY_A, KEY_B = "0x" + "0" * 63 + "a", "0x" + "0" * 63 + "b"
+ACCESS_LIST = [{"address": TOKEN, "storageKeys": [KEY_A]}]
+
+def helpers(gas=100_000, gas_with_list=90_000, created=None):
+    """TxHelpers with a mocked web3: estimate_gas returns gas_with_list if the tx has an access list"""
+    w3 = MagicMock()
+    w3.eth.estimate_gas.side_effect = lambda tx: gas_with_list if tx.get("accessList") else gas
+    w3.eth.create_access_list.return_value = created or {"gasUsed": 95_000, "accessList": ACCESS_LIST}
+    w3.to_json.side_effect = lambda x: json.dumps(x)
+    txh = TxHelpers.__new__(TxHelpers)
+    txh.cfg = SimpleNamespace(w3=w3, network=SimpleNamespace(gas_strategy=lambda w3: {}))
+    txh.use_access_list = True
+    txh.access_list_cache = {}
+    return txh
+
+def test_miss():
+    txh = helpers()
+    tx = {}
+    txh._update_transaction(tx, [POOL, TOKEN])
+    assert txh.cfg.w3.eth.estimate_gas.call_count == 1 and txh.cfg.w3.eth.create_access_list.call_count == 1
+    assert tx["gas"] == 95_000 and tx["accessList"] == ACCESS_LIST
+    assert txh.access_list_cache == {(POOL, TOKEN): ACCESS_LIST}
+
+def test_hit():
+    # a cached route costs a single estimate, with its access list
+    txh = helpers()
+    txh.access_list_cache = {(POOL, TOKEN): ACCESS_LIST}
+    tx = {}
+    txh._update_transaction(tx, [POOL, TOKEN])
+    assert txh.cfg.w3.eth.estimate_gas.call_count == 1 and txh.cfg.w3.eth.create_access_list.call_count == 0
+    assert tx["gas"] == 90_000 and tx["accessList"] == ACCESS_LIST
+
+def test_other_route():
+    txh = helpers()
+    txh.access_list_cache = {(POOL, TOKEN): ACCESS_LIST}
+    tx = {}
+    txh._update_transaction(tx, [POOL, TOKEN, OTHER])
+    assert txh.cfg.w3.eth.create_access_list.call_count == 1
+    assert list(txh.access_list_cache) == [(POOL, TOKEN), (POOL, TOKEN, OTHER)]
+
+def test_replace():
+    created = {"gasUsed": 95_000, "accessList": [{"address": TOKEN, "storageKeys": [KEY_B]}]}
+    txh = helpers(created=created)
+    txh.access_list_cache = {(POOL, TOKEN): ACCESS_LIST}
+    txh._update_access_list_cache((POOL, TOKEN), created["accessList"])
+    assert txh.access_list_cache == {(POOL, TOKEN): created["accessList"]}
+
+def test_no_gain():
+    # the access list does not save gas: the route is cached without one, and later txs skip eth_createAccessList
+    created = {"gasUsed": 100_000, "accessList": ACCESS_LIST}
+    txh = helpers(gas=100_000, gas_with_list=101_000, created=created)
+    tx = {}
+    txh._update_transaction(tx, [POOL, TOKEN])
+    assert tx["gas"] == 100_000 and "accessList" not in tx
+    assert txh.access_list_cache == {(POOL, TOKEN): []}
+    tx = {}
+    txh._update_transaction(tx, [POOL, TOKEN])
+    assert tx["gas"] == 100_000 and "accessList" not in tx
+    assert txh.cfg.w3.eth.estimate_gas.call_count == 2 and txh.cfg.w3.eth.create_access_list.call_count == 1
+
+    # errors are not cached
+    txh = helpers(created={"error": "execution reverted"})
+    tx = {}
+    txh._update_transaction(tx, [POOL])
+    assert tx["gas"] == 100_000 and "accessList" not in tx and txh.access_list_cache == {}
+
+def test_bounded(monkeypatch):
+    monkeypatch.setattr(txhelpers, "ACCESS_LIST_CACHE_SIZE", 2)
+    txh = helpers()
+    for route in [(POOL,), (TOKEN,), (OTHER,)]:
+        txh._update_access_list_cache(route, [])
+        txh._get_cached_access_list((POOL,))
+    assert list(txh.access_list_cache) == [(OTHER,), (POOL,)]
+
+def test_private_transactions():
+    cfg = MagicMock(NETWORK="ethereum", NETWORK_ETHEREUM="ethereum", USE_ACCESS_LIST=True, ARB_REWARDS_PPM=500_000)
+    assert TxHelpers(cfg).use_access_list is False
+    cfg.NETWORK = "base"
+    assert TxHelpers(cfg).use_access_list is True
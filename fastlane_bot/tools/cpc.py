@@ -8,8 +8,8 @@ Licensed under MIT
 NOTE: this class is not part of the API of the Carbon protocol, and you must expect breaking
 changes even in minor version updates. Use at your own risk.
 """
-__VERSION__ = "3.4"
-__DATE__ = "23/Jan/2024"
+__VERSION__ = "3.7"
+__DATE__ = "18/Oct/2026"
 
 from dataclasses import dataclass, field, asdict, InitVar
 from .simplepair import SimplePair as Pair
@@ -27,6 +27,8 @@ from sys import float_info
 from hashlib import md5 as digest
 import time
 from .cpcbase import CurveBase, AttrDict, DAttrDict, dataclass_
+from .invariants.solidly import SolidlySwapFunction
+from .invariants.weighted import WeightedPoolCurve
 
 
 AD = DAttrDict
@@ -399,6 +401,20 @@ class ConstantProductCurve(CurveBase):
 
         super().__setattr__("pairo", Pair(self.pair))
 
+        # curves that follow the Solidly invariant exactly (see from_solidly) carry its swap function
+        if self.params.get("s_exact"):
+            super().__setattr__("swapfunc", SolidlySwapFunction(k=self.params["s_k"], method=SolidlySwapFunction.METHOD_NEWTON))
+        else:
+            super().__setattr__("swapfunc", None)
+
+        # curves that are pairs of a weighted pool with n tokens (see from_balancer) carry the pool curve
+        if self.params.get("w_tokens"):
+            super().__setattr__("ntokencurve", WeightedPoolCurve(
+                tokens=self.params["w_tokens"], balances=self.params["w_balances"], weights=self.params["w_weights"],
+            ))
+        else:
+            super().__setattr__("ntokencurve", None)
+
         if self.isbigger(big=self.x_act, small=self.x):
             print(f"[ConstantProductCurve] x_act > x in {self.cid}", self.x_act, self.x)
             
@@ -629,6 +645,47 @@ class ConstantProductCurve(CurveBase):
             params=params,
         )
 
+    @classmethod
+    def from_balancer(
+        cls,
+        tokens,
+        balances,
+        weights,
+        *,
+        cid=None,
+        fee=None,
+        descr=None,
+        params=None,
+    ):
+        """
+        constructor: from a weighted Balancer pool with n tokens (see class docstring for other parameters)
+
+        :tokens:    the tokens of the pool
+        :balances:  the token balances of the pool (in token units)
+        :weights:   the token weights of the pool
+        :returns:   a list of curves, one for every pair of tokens of the pool
+
+        Every curve is the weighted curve of its pair (see ``from_xyal``), ie the pool with the
+        balances of the other tokens constant. All curves carry the n-token curve of the pool
+        (``WeightedPoolCurve``, see the ``ntokencurve`` attribute), so that optimizers can treat
+        the pool as one curve rather than as independent pairs.
+        """
+        params0 = dict(w_tokens=list(tokens), w_balances=list(balances), w_weights=list(weights))
+        params = AttrDict(params0 if params is None else {**params, **params0})
+        return [
+            cls.from_xyal(
+                x=balances[i],
+                y=balances[j],
+                eta=weights[i] / weights[j],
+                pair=f"{tokens[i]}/{tokens[j]}",
+                cid=cid,
+                fee=fee,
+                descr=descr,
+                params=params,
+            )
+            for i, j in it.combinations(range(len(tokens)), 2)
+        ]
+
 
     @classmethod
     def from_pk(
@@ -852,6 +909,7 @@ class ConstantProductCurve(CurveBase):
         descr=None,
         params=None,
         as_list=True,
+        exact=False,
     ):
         """
         constructor: from a Solidly curve (see class docstring for other parameters)*
@@ -862,6 +920,7 @@ class ConstantProductCurve(CurveBase):
         :price_spread:  price spread to use for converting constant price -> constant product
         :as_list:       if True (default) returns a list of curves, otherwise a single curve
                         (see note below and note that as_list=False is deprecated)
+        :exact:         if True, the curve follows the Solidly invariant exactly (see below)
         
         exactly 2 out of those three must be given; the third one is calculated
         
@@ -885,6 +944,13 @@ class ConstantProductCurve(CurveBase):
         may in the future a list of curves, with additional curves matching the function
         in the wings. IT IS RECOMMENDED THAT ANY CODE IMPLEMENTING THIS FUNCTION USES
         as_list = True, AS IN THE FUTURE as_list = FALSE will raise an exception.
+        
+        If exact is True, the curve is not restricted to the flat range. Instead it carries
+        the Solidly swap function (``SolidlySwapFunction`` with the fast float Newton solver,
+        see the ``swapfunc`` attribute) and ``xyfromp_f`` and the related methods use it
+        rather than the constant product formulas. For those methods, x and y are the actual
+        token balances. The constant product parameters of the curve are only a proxy with
+        the same marginal price, and with x_act and y_act set to the token balances.
         """
         # rename the solidly parameters to avoid name confusion
         solidly_x = x
@@ -908,6 +974,28 @@ class ConstantProductCurve(CurveBase):
             raise NotImplementedError("providing k, x not implemented yet")
         else:
             raise ValueError(f"should never get here")
+        
+        if exact:
+            params0 = dict(s_x = solidly_x, s_y = solidly_y, s_k = solidly_k, s_exact = True)
+            params = AttrDict(params0 if params is None else {**params, **params0})
+            # the proxy constant product curve has the marginal price p of the Solidly curve, and
+            # it holds the value of the pool in each of the tokens, ie x = x_act + y_act/p
+            p = SolidlySwapFunction(k=solidly_k, method=SolidlySwapFunction.METHOD_NEWTON).p(solidly_x)
+            cpc_x = solidly_x + solidly_y / p
+            result = cls(
+                k=cpc_x * cpc_x * p,
+                x=cpc_x,
+                x_act=solidly_x,
+                y_act=solidly_y,
+                pair=pair,
+                cid=cid,
+                fee=fee,
+                descr=descr,
+                constr="solidly",
+                params=params,
+            )
+            return [result] if as_list else result
+        
         # kbar = (k/2)**(1/4) is the equivalent of kbar = sqrt(k) for constant product
         # center of the curve is (xy_c, xy_c) = (kbar, kbar)
         # we are looking for the intersects of y=mx for m=2.6 and m=1/2.6 (linear segment)
@@ -1541,6 +1629,12 @@ class ConstantProductCurve(CurveBase):
         if p is None:
             p = self.p
             
+        if self.swapfunc is not None:
+            x, y = self.swapfunc.xyfromp(p)
+            if withunits:
+                return x, y, p, self.tknxp, self.tknyp, self.pairp
+            return x, y, p
+
         if self.is_constant_product():
             sqrt_p = sqrt(p)
             sqrt_k = self.kbar
@@ -1589,8 +1683,12 @@ class ConstantProductCurve(CurveBase):
     def dxdyfromp_f(self, p=None, *, ignorebounds=False, withunits=False):
         """like xyfromp_f, but returns dx,dy,p instead of x,y,p"""
         x, y, p = self.xyfromp_f(p, ignorebounds=ignorebounds)
-        dx = x - self.x
-        dy = y - self.y
+        if self.swapfunc is not None:
+            dx = x - self.x_act
+            dy = y - self.y_act
+        else:
+            dx = x - self.x
+            dy = y - self.y
         if withunits:
             return dx, dy, p, self.tknxp, self.tknyp, self.pairp
         return dx, dy, p
@@ -1637,6 +1735,8 @@ class ConstantProductCurve(CurveBase):
 
     def dyfromdx_f(self, dx, *, ignorebounds=False):
         "dy value for given dx value (if in range; None otherwise)"
+        if self.swapfunc is not None:
+            return self.swapfunc(self.x_act + dx) - self.y_act
         y = self.yfromx_f(self.x + dx, ignorebounds=ignorebounds)
         if y is None:
             return None
@@ -1644,6 +1744,9 @@ class ConstantProductCurve(CurveBase):
 
     def dxfromdy_f(self, dy, *, ignorebounds=False):
         "dx value for given dy value (if in range; None otherwise)"
+        if self.swapfunc is not None:
+            # the Solidly invariant is symmetric in x and y
+            return self.swapfunc(self.y_act + dy) - self.x_act
         x = self.xfromy_f(self.y + dy, ignorebounds=ignorebounds)
         if x is None:
             return None
@@ -1746,6 +1849,80 @@ class ConstantProductCurve(CurveBase):
         return digest(str(datastr).encode()).hexdigest()[:len]
 
 
+@dataclass
+class CPCColumns:
+    """
+    columnar (struct of arrays) representation of a list of curves
+
+    :tokens:            tuple of all tokens of the curves (sorted); tokens are integer coded by their index
+    :token_ix:          dict token -> index in tokens
+    :tknx_ix:           np.array of the token codes of tknx (base token) of each curve
+    :tkny_ix:           np.array of the token codes of tkny (quote token) of each curve
+    :k, x, x_act:       np.arrays of the respective curve values (float, nan if None)
+    :y_act, alpha:      ditto
+    :fee:               ditto
+    :p:                 np.array of the curve prices (in dy/dx)
+    :at_boundary:       np.array of bool, True iff the curve is at either x_min or x_max
+    :ixs_by_pair:       dict (tknx_ix, tkny_ix) -> np.array of the indices of the curves on that (directed) pair
+
+    the arrays are in the order of the curves; use from_curves to create the object
+    """
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    tokens: tuple
+    token_ix: dict
+    tknx_ix: np.ndarray
+    tkny_ix: np.ndarray
+    k: np.ndarray
+    x: np.ndarray
+    x_act: np.ndarray
+    y_act: np.ndarray
+    alpha: np.ndarray
+    fee: np.ndarray
+    p: np.ndarray
+    at_boundary: np.ndarray
+    ixs_by_pair: dict = field(repr=False)
+
+    @classmethod
+    def from_curves(cls, curves):
+        """alternative constructor: creates the columns from a list of curves"""
+        curves = list(curves)
+        f = lambda v: np.nan if v is None else v
+        tknxs = [c.tknx for c in curves]
+        tknys = [c.tkny for c in curves]
+        tokens = tuple(sorted(set(tknxs) | set(tknys)))
+        token_ix = {t: i for i, t in enumerate(tokens)}
+        tknx_ix = np.array([token_ix[t] for t in tknxs], dtype=np.int64)
+        tkny_ix = np.array([token_ix[t] for t in tknys], dtype=np.int64)
+        ixs_by_pair = {}
+        for i, pair in enumerate(zip(tknx_ix.tolist(), tkny_ix.tolist())):
+            ixs_by_pair.setdefault(pair, []).append(i)
+        return cls(
+            tokens=tokens,
+            token_ix=token_ix,
+            tknx_ix=tknx_ix,
+            tkny_ix=tkny_ix,
+            k=np.array([f(c.k) for c in curves], dtype=np.float64),
+            x=np.array([f(c.x) for c in curves], dtype=np.float64),
+            x_act=np.array([f(c.x_act) for c in curves], dtype=np.float64),
+            y_act=np.array([f(c.y_act) for c in curves], dtype=np.float64),
+            alpha=np.array([f(c.alpha) for c in curves], dtype=np.float64),
+            fee=np.array([f(c.fee) for c in curves], dtype=np.float64),
+            p=np.array([c.p for c in curves], dtype=np.float64),
+            at_boundary=np.array([c.at_boundary for c in curves], dtype=bool),
+            ixs_by_pair={pair: np.array(ixs, dtype=np.int64) for pair, ixs in ixs_by_pair.items()},
+        )
+
+    def __len__(self):
+        return len(self.k)
+
+    def bypair(self, tknx, tkny):
+        """returns np.array of the indices of the curves with base token tknx and quote token tkny"""
+        pair = (self.token_ix.get(tknx), self.token_ix.get(tkny))
+        return self.ixs_by_pair.get(pair, np.zeros(0, dtype=np.int64))
+
+
 @dataclass
 class CPCContainer:
     """
@@ -1796,6 +1973,18 @@ class CPCContainer:
                 self.curves_by_primary_pair[c.pairo.primary].append(c)
             except KeyError:
                 self.curves_by_primary_pair[c.pairo.primary] = [c]
+        self._columns = None
+
+    @property
+    def columns(self):
+        """
+        returns the columnar representation of the curves (a CPCColumns object)
+
+        the columns are created on first use, and reset whenever curves are added
+        """
+        if self._columns is None:
+            self._columns = CPCColumns.from_curves(self.curves)
+        return self._columns
 
     TOKENSCALE = ts.TokenScale1Data
     # default token scale object is the trivial scale (everything one)
@@ -1865,6 +2054,7 @@ class CPCContainer:
         self.curves_by_cid[item.cid] = item
         self.curveix_by_curve[item] = len(self)
         self.curves += [item]
+        self._columns = None
         # print("[add] ", self.curves_by_primary_pair)
         try:
             self.curves_by_primary_pair[item.pairo.primary].append(item)
@@ -1996,6 +2186,27 @@ class CPCContainer:
         else:
             return {c.pair for c in self}
 
+    def ntokencurves(self):
+        """
+        returns the n-token curves of the pools that are represented by several pairs (see ``CPC.from_balancer``)
+
+        :returns:   tuple of tuples (ntokencurve, curves), where curves are the curves of a pool and
+                    ntokencurve is the n-token curve of that pool restricted to their tokens; only pools
+                    with at least three tokens and a curve for every pair of them are included
+        """
+        groups = dict()
+        for c in self:
+            if c.ntokencurve is not None:
+                groups.setdefault((c.cid, c.ntokencurve), []).append(c)
+        result = []
+        for (cid, ntokencurve), curves in groups.items():
+            tokens = {t for c in curves for t in (c.tknx, c.tkny)}
+            pairs = {frozenset((c.tknx, c.tkny)) for c in curves}
+            n = len(tokens)
+            if n >= 3 and len(curves) == len(pairs) == n * (n - 1) // 2:
+                result.append((ntokencurve.restrict(tokens), tuple(curves)))
+        return tuple(result)
+
     def cids(self, *, asset=False):
         """returns list of all curve ids (as tuple, or set if asset=True)"""
         if asset:
@@ -2557,6 +2768,22 @@ class CPCContainer:
             return 1
         if result == self.PE_PAIR:
             return f"{tknb}/{tknq}"
+        if not result == self.PE_CURVES:
+            # prices and weights are taken from the columns (same order and values as the curves)
+            cols = self.columns
+            ixs = cols.bypair(tknb, tknq)
+            rixs = cols.bypair(tknq, tknb)
+            ixs = ixs[~cols.at_boundary[ixs]]
+            rixs = rixs[~cols.at_boundary[rixs]]
+            if not len(ixs) + len(rixs) > 0:
+                if raiseonerror:
+                    raise ValueError(f"no curves found for {tknq}/{tknb}")
+                return None
+            prices = np.concatenate((cols.p[ixs], 1 / cols.p[rixs]))
+            weights = np.sqrt(np.concatenate((cols.k[ixs], cols.k[rixs])))
+            if result == self.PE_DATA:
+                return prices, weights
+            return float(np.average(prices, weights=weights))
         crvs = (
             c for c in self if not c.at_boundary and c.tknq == tknq and c.tknb == tknb
         )
@@ -2565,20 +2792,7 @@ class CPCContainer:
         )
         crvs = ((c, c.p, c.k) for c in crvs)
         rcrvs = ((c, 1 / c.p, c.k) for c in rcrvs)
-        acurves = it.chain(crvs, rcrvs)
-        if result == self.PE_CURVES:
-            # return dict(curves=tuple(crvs), rcurves=tuple(rcrvs))
-            return tuple(acurves)
-        data = tuple((r[1], sqrt(r[2])) for r in acurves)
-        if not len(data) > 0:
-            if raiseonerror:
-                raise ValueError(f"no curves found for {tknq}/{tknb}")
-            return None
-        prices, weights = zip(*data)
-        prices, weights = np.array(prices), np.array(weights)
-        if result == self.PE_DATA:
-            return prices, weights
-        return float(np.average(prices, weights=weights))
+        return tuple(it.chain(crvs, rcrvs))
 
     TRIANGTOKENS = f"{T.USDT}, {T.USDC}, {T.DAI}, {T.BNT}, {T.ETH}, {T.WBTC}"
 
@@ -4,8 +4,8 @@ object representing the Bancor (constant product) AMM invariant
 (c) Copyright Bprotocol foundation 2024. 
 Licensed under MIT
 """
-__VERSION__ = '0.9'
-__DATE__ = "18/Jan/2024"
+__VERSION__ = '0.9.1'
+__DATE__ = "18/Oct/2026"
 
 # import decimal as d
 # D = d.Decimal
@@ -20,6 +20,8 @@ class BancorSwapFunction(Function):
     __VERSION__ = __VERSION__
     __DATE__ = __DATE__
     
+    VECTORIZED = True
+    
     k: float
     
     def f(self, x):
@@ -12,7 +12,11 @@ This module contains two classes, ``Function`` and ``FunctionVector``.
     evaluation), a vector interface (from the ``DictVector`` inheritance). A
     ``FunctionVector`` also contains an integration kernel, which allows it to
     expose a number of norms and distance measures.
-    
+
+Both classes also evaluate on numpy arrays of inputs (``f_vec``, ``p_vec``, ``pp_vec``),
+and the integrals behind the norms and distances are calculated on the whole kernel
+grid at once.
+
 TODO: other imported objects eg ``DerivativeFunction``, ``Derivative2Function``
 
 ---
@@ -4,8 +4,8 @@ functions library -- core objects (Function, FunctionVector)
 (c) Copyright Bprotocol foundation 2024. 
 Licensed under MIT
 """
-__VERSION__ = '0.9.7'
-__DATE__ = "21/Mar/2024"
+__VERSION__ = '0.9.8'
+__DATE__ = "18/Oct/2026"
 
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
@@ -261,7 +261,90 @@ class Function(ABC):
         alias for self.f(x)
         """
         return self.f(x)
-    
+
+    ########################################################################
+    ## batched evaluation
+    VECTORIZED = False      # True iff ``f`` (and ``p``, ``pp`` if overridden) accept numpy arrays
+
+    def f_vec(self, x):
+        """
+        returns ``f(x)`` for a numpy array ``x`` of inputs, as array of the same shape (1)
+
+        NOTE 1: if the class is ``VECTORIZED`` then ``f`` is called with the array,
+        otherwise it is called point by point; ``None`` values are returned as ``nan``;
+        subclasses where ``f`` is not numpy-compatible can override this method
+        """
+        x = np.asarray(x, dtype=float)
+        if self.VECTORIZED:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.broadcast_to(np.asarray(self.f(x), dtype=float), x.shape)
+        return self._pointwise(self.f, x)
+
+    def df_dx_vec(self, x, *, precision=None):
+        """
+        vectorized version of ``df_dx`` (alias for ``-p_vec``)
+        """
+        return -self.p_vec(x, precision=precision)
+
+    def p_vec(self, x, *, precision=None):
+        """
+        vectorized version of ``p``, ie returns ``p(x)`` for a numpy array ``x`` (1)
+
+        NOTE 1: if ``p`` is overridden it is called with the array (``VECTORIZED``)
+        or point by point; otherwise the derivative is calculated from ``f_vec`` using
+        the same steps as ``p``, with ``nan`` in place of ``None``
+        """
+        x = np.asarray(x, dtype=float)
+        if self._overrides("p"):
+            if self.VECTORIZED:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return np.broadcast_to(np.asarray(self.p(x), dtype=float), x.shape)
+            return self._pointwise(self.p, x)
+        h = self._h_vec(x, precision)
+        fp, f0, fm = self.f_vec(x+h), self.f_vec(x), self.f_vec(x-h)
+        dfdx = (fp-fm) / (2*h)
+        dfdx = np.where(np.isnan(dfdx), (fp-f0)/h, dfdx)
+        dfdx = np.where(np.isnan(dfdx), (f0-fm)/h, dfdx)
+        return -dfdx
+
+    def pp_vec(self, x, *, precision=None):
+        """
+        vectorized version of ``pp``, ie returns ``pp(x)`` for a numpy array ``x`` (see ``p_vec``)
+        """
+        x = np.asarray(x, dtype=float)
+        if self._overrides("pp"):
+            if self.VECTORIZED:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return np.broadcast_to(np.asarray(self.pp(x), dtype=float), x.shape)
+            return self._pointwise(self.pp, x)
+        h = self._h_vec(x, precision)
+        return -(self.f_vec(x+h) - 2*self.f_vec(x) + self.f_vec(x-h)) / (h*h)
+
+    def _overrides(self, method):
+        """True iff ``method`` is overridden by the class of ``self``"""
+        return getattr(type(self), method) is not getattr(Function, method)
+
+    def _h_vec(self, x, precision):
+        """the step sizes used by ``p_vec`` and ``pp_vec`` (same as ``df_dx_abs`` and ``df_dx_rel``)"""
+        if self.DERIV_IS_ABS:
+            h = np.full(x.shape, self.DERIV_H)
+        else:
+            h = np.where(x != 0, x*self.DERIV_ETA, self.DERIV_H)
+        if precision:
+            h = h*precision
+        return h
+
+    @staticmethod
+    def _pointwise(func, x):
+        """evaluates ``func`` point by point on the array ``x``; ``None`` values and calculation errors become ``nan``"""
+        def func1(x):
+            try:
+                return func(x)
+            except (TypeError, ValueError, ArithmeticError):
+                return None
+        values = [func1(x_) for x_ in x.ravel().tolist()]
+        return np.array([np.nan if v is None else v for v in values], dtype=float).reshape(x.shape)
+
     PLT_STEPS = 100
     PLT_SHOW = False
     PLT_GRID = True
@@ -495,6 +578,48 @@ class FunctionVector(DictVector):
         """
         return sum([F.pp(x) * v for F, v in self.vec.items()])
     
+    def f_vec(self, x):
+        """
+        vectorized version of ``f``, ie returns ``f(x)`` for a numpy array ``x`` (``nan`` values are skipped like ``None``)
+        """
+        x = np.asarray(x, dtype=float)
+        result = np.zeros(x.shape)
+        for F, v in self.vec.items():
+            f_x = F.f_vec(x)
+            result += np.where(np.isnan(f_x), 0, f_x) * v
+        return result
+    
+    def p_vec(self, x):
+        """
+        vectorized version of ``p``, ie returns ``p(x)`` for a numpy array ``x``
+        """
+        x = np.asarray(x, dtype=float)
+        return sum([F.p_vec(x) * v for F, v in self.vec.items()], np.zeros(x.shape))
+    
+    def df_dx_vec(self, x):
+        """
+        vectorized version of ``df_dx`` (alias for ``-p_vec``)
+        """
+        return -self.p_vec(x)
+    
+    def pp_vec(self, x):
+        """
+        vectorized version of ``pp``, ie returns ``pp(x)`` for a numpy array ``x``
+        """
+        x = np.asarray(x, dtype=float)
+        return sum([F.pp_vec(x) * v for F, v in self.vec.items()], np.zeros(x.shape))
+    
+    @staticmethod
+    def vectorized(func):
+        """
+        returns ``func`` as a callable taking and returning numpy arrays (``f_vec`` for ``Function`` objects)
+        """
+        if func is None:
+            return None
+        if isinstance(func, (Function, FunctionVector)):
+            return func.f_vec
+        return lambda x: Function._pointwise(func, np.asarray(x, dtype=float))
+    
     def restricted(self, func, x=None):
         """
         returns ``func(x)`` restricted to the domain of ``self.kernel`` (as value or lambda if ``x`` is ``None``)
@@ -550,15 +675,20 @@ class FunctionVector(DictVector):
     GS_ITERATIONS = 1000    # max iterations
     GS_ETA = 1e-10          # relative step size for calculating derivative
     GS_H = 1e-6             # used for x=0
-    def integrate_func(self, func=None, *, steps=None, method=None):
-        """integrates ``func`` (default: ``self.f``) using the kernel"""
+    def integrate_func(self, func=None, *, steps=None, method=None, vectorized=False):
+        """
+        integrates ``func`` (default: ``self.f``) using the kernel
+        
+        :vectorized:    if True, ``func`` takes and returns numpy arrays and it is evaluated
+                        once on the whole integration grid (default: ``self.f_vec``)
+        """
         if func is None:
-            func = self.f
-        return self.kernel.integrate(func, steps=steps, method=method)
+            func = self.f_vec if vectorized else self.f
+        return self.kernel.integrate(func, steps=steps, method=method, vectorized=vectorized)
         
     def integrate(self, *, steps=None, method=None):
         """integrates ``self.f`` using the kernel [convenience access for ``integrate_func(func=None)``]"""
-        return self.integrate_func(func=self.f, steps=steps, method=method) 
+        return self.integrate_func(func=self.f_vec, steps=steps, method=method, vectorized=True) 
     
     ########################################################################
     ## distance functions
@@ -569,11 +699,12 @@ class FunctionVector(DictVector):
         """
         calculates the L2 distance-squared between ``self`` and ``func`` (L2 norm squared)
         """
+        func = self.vectorized(func)
         if not func is None:
-            f = lambda x: (self.f(x)-func(x))**2 * self.kernel(x)
+            f = lambda x: (self.f_vec(x)-func(x))**2 * self.kernel.k_vec(x)
         else:
-            f = lambda x: self.f(x)**2 * self.kernel(x)
-        return self.integrate_func(func=f, steps=steps, method=method)
+            f = lambda x: self.f_vec(x)**2 * self.kernel.k_vec(x)
+        return self.integrate_func(func=f, steps=steps, method=method, vectorized=True)
     
     def dist_L2(self, func=None, *, steps=None, method=None):
         """calculates the distance between ``self`` and ``func`` (L2 norm)"""
@@ -583,11 +714,12 @@ class FunctionVector(DictVector):
         """
         calculates the L1 distance between ``self`` and ``func`` (L1 norm)
         """
+        func = self.vectorized(func)
         if not func is None:
-            f = lambda x: (abs(self.f(x)-func(x))) * self.kernel(x)
+            f = lambda x: (np.abs(self.f_vec(x)-func(x))) * self.kernel.k_vec(x)
         else:
-            f = lambda x: abs(self.f(x)) * self.kernel(x)
-        return self.integrate_func(func=f, steps=steps, method=method)
+            f = lambda x: np.abs(self.f_vec(x)) * self.kernel.k_vec(x)
+        return self.integrate_func(func=f, steps=steps, method=method, vectorized=True)
 
     ###################################
     ## ...on self.p
@@ -595,11 +727,12 @@ class FunctionVector(DictVector):
         """
         calculates the L2 distance-squared between ``self.p`` and ``func`` (L2 norm squared)
         """
+        func = self.vectorized(func)
         if not func is None:
-            f = lambda x: (self.p(x)-func(x))**2 * self.kernel(x)
+            f = lambda x: (self.p_vec(x)-func(x))**2 * self.kernel.k_vec(x)
         else:
-            f = lambda x: self.p(x)**2 * self.kernel(x)
-        return self.integrate_func(func=f, steps=steps, method=method)
+            f = lambda x: self.p_vec(x)**2 * self.kernel.k_vec(x)
+        return self.integrate_func(func=f, steps=steps, method=method, vectorized=True)
     
     def distp_L2(self, func=None, *, steps=None, method=None):
         """calculates the distance between ``self.p`` and ``func`` (L2 norm)"""
@@ -609,11 +742,12 @@ class FunctionVector(DictVector):
         """
         calculates the L1 distance between ``self.p`` and ``func`` (L1 norm)
         """
+        func = self.vectorized(func)
         if not func is None:
-            f = lambda x: (abs(self.p(x)-func(x))) * self.kernel(x)
+            f = lambda x: (np.abs(self.p_vec(x)-func(x))) * self.kernel.k_vec(x)
         else:
-            f = lambda x: abs(self.p(x)) * self.kernel(x)
-        return self.integrate_func(func=f, steps=steps, method=method)
+            f = lambda x: np.abs(self.p_vec(x)) * self.kernel.k_vec(x)
+        return self.integrate_func(func=f, steps=steps, method=method, vectorized=True)
     
     ########################################################################
     ## norm functions
@@ -9,10 +9,12 @@ Licensed under MIT
 
 from .core import Function as _Function, dataclass as _dataclass
 import math as _m
+import numpy as _np
 
 @_dataclass(frozen=True)
 class QuadraticFunction(_Function):
     """quadratic function ``y = ax^2 + bx + c``"""
+    VECTORIZED = True
     a: float = 0
     b: float = 0
     c: float = 0
@@ -24,6 +26,7 @@ Quadratic=QuadraticFunction
 @_dataclass(frozen=True)
 class PowerlawFunction(_Function):
     """quadratic function ``y = N*(x-x0)^alpha``"""
+    VECTORIZED = True
     N: float = 1
     alpha: float = -1
     x0: float = 0
@@ -43,6 +46,9 @@ class TrigFunction(_Function):
     def f(self, x):
         fx = self.amp * _m.sin( (self.omega*x+self.phase)*self.PI )
         return fx
+    
+    def f_vec(self, x):
+        return self.amp * _np.sin( (self.omega*_np.asarray(x, dtype=float)+self.phase)*self.PI )
 Trig = TrigFunction
 
 @_dataclass(frozen=True)
@@ -55,6 +61,9 @@ class ExpFunction(_Function):
     
     def f(self, x):
         return self.N * _m.exp( self.k*(x-self.x0) )
+    
+    def f_vec(self, x):
+        return self.N * _np.exp( self.k*(_np.asarray(x, dtype=float)-self.x0) )
 Exp = ExpFunction
 
 @_dataclass(frozen=True)
@@ -67,11 +76,18 @@ class LogFunction(_Function):
     
     def f(self, x):
         return self.N * _m.log( x-self.x0, self.base )
+    
+    def f_vec(self, x):
+        x = _np.asarray(x, dtype=float)
+        with _np.errstate(invalid="ignore", divide="ignore"):
+            y = self.N * _np.log( x-self.x0 ) / _m.log( self.base )
+        return _np.where(x > self.x0, y, _np.nan)
 Log = LogFunction
 
 @_dataclass(frozen=True)
 class HyperbolaFunction(_Function):
     """hyperbola function ``y-y0 = k/(x-x0)``"""
+    VECTORIZED = True
     k: float = 1
     x0: float = 0
     y0: float = 0
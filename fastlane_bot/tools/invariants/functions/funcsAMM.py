@@ -9,6 +9,7 @@ Licensed under MIT
 
 from .core import Function as _Function, dataclass as _dataclass
 import math as _m
+import numpy as _np
 import decimal as _d
 _D = _d.Decimal
 
@@ -19,6 +20,7 @@ class CPMMFunction(_Function):
     
     :k:         pool constant (scales with square of pool liquidity)
     """
+    VECTORIZED = True
     k: float = 1
     
     @property
@@ -139,6 +141,13 @@ class VirtualTokenBalancesCPMMFunction(_Function):
             return None
         return y
     
+    def f_vec(self, x):
+        x = _np.asarray(x, dtype=float)
+        y = self.k/(x+self.x0) - self.y0
+        if self.clip:
+            y = _np.where((x<0) | (y<0), _np.nan, y)
+        return y
+    
     # def p(self, x):
     #     p = self.k/(x+self.x0)**2
     #     if p < self.Pb or p > self.Pa:
@@ -239,6 +248,18 @@ class UniV3Function(_Function):
     
     def pp(self, x):
         return -2*self.k/(x+self.x0)**3
+    
+    def f_vec(self, x):
+        x = _np.asarray(x, dtype=float)
+        y = self.k/(x+self.x0) - self.y0
+        return _np.where((x<0) | (y<0), _np.nan, y)
+    
+    def p_vec(self, x, *, precision=None):
+        p = self.k/(_np.asarray(x, dtype=float)+self.x0)**2
+        return _np.where((p<self.Pb) | (p>self.Pa), _np.nan, p)
+    
+    def pp_vec(self, x, *, precision=None):
+        return -2*self.k/(_np.asarray(x, dtype=float)+self.x0)**3
 UniV3 = UniV3Function
 
 @_dataclass(frozen=True)
@@ -310,6 +331,11 @@ class CarbonFunction(_Function):
         if y<0: return None
         return y
     
+    def f_vec(self, x):
+        x = _np.asarray(x, dtype=float)
+        y = self.k/(x+self.x0) - self.y0
+        return _np.where((x<0) | (y<0), _np.nan, y)
+    
     # def p(self, x):
     #     p = self.k/(x+self.x0)**2
     #     if p < self.Pb or p > self.Pa:
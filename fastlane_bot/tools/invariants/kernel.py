@@ -5,8 +5,8 @@ Implements the `Kernel` class, an integration kernel together with numeric integ
 (c) Copyright Bprotocol foundation 2024. 
 Licensed under MIT
 """
-__VERSION__ = '0.9.1'
-__DATE__ = "26/Jan/2024"
+__VERSION__ = '0.9.2'
+__DATE__ = "18/Oct/2026"
 
 from dataclasses import dataclass, asdict
 from scipy.stats import norm
@@ -80,6 +80,7 @@ class Kernel():
             self.kernel_name = self.kernel
             self.kernel = None
             
+        self._kernel_vec = None
         if self.kernel is None:
             w = self.x_max - self.x_min
             ctr = (self.x_max+self.x_min)/2
@@ -87,24 +88,31 @@ class Kernel():
             
             if self.kernel_name == self.FLAT:
                 self.kernel = lambda x: 1/w
+                self._kernel_vec = lambda x: np.full(x.shape, 1/w)
             
             elif self.kernel_name == self.TRIANGLE:
                 self.kernel = lambda x: max(1-2*abs((x-ctr)/w),0)
+                self._kernel_vec = lambda x: np.maximum(1-2*np.abs((x-ctr)/w),0)
                 
             elif self.kernel_name == self.SAWTOOTHL:
                 self.kernel = lambda x: 2/w*max(1-abs((x-self.x_min)/w),0)
+                self._kernel_vec = lambda x: 2/w*np.maximum(1-np.abs((x-self.x_min)/w),0)
                 
             elif self.kernel_name == self.SAWTOOTHR:
                 self.kernel = lambda x: 2/w*(1-max(1-abs((x-self.x_min)/w),0))
+                self._kernel_vec = lambda x: 2/w*(1-np.maximum(1-np.abs((x-self.x_min)/w),0))
                 
             elif self.kernel_name == self.GAUSS:
                 self.kernel = lambda x: norm.pdf(x, loc=ctr, scale=w/6)/0.9973001241637569
+                self._kernel_vec = self.kernel
 
             elif self.kernel_name == self.GAUSSW:
                 self.kernel = lambda x: norm.pdf(x, loc=ctr, scale=w/3)/0.8663853060476605
+                self._kernel_vec = self.kernel
                 
             elif self.kernel_name == self.GAUSSN:
                 self.kernel = lambda x: norm.pdf(x, loc=ctr, scale=w/12)
+                self._kernel_vec = self.kernel
                 
             else:
                 raise ValueError(f"unknown kernel type {self.kernel_name}")
@@ -121,28 +129,50 @@ class Kernel():
         """Alias for `self.k`"""
         return self.k(x)
     
+    def k_vec(self, x):
+        """
+        Vectorized version of `self.k` (`x` is a numpy array)
+        
+        the built-in kernels are evaluated on the whole array at once, custom 
+        kernel functions point by point
+        """
+        x = np.asarray(x, dtype=float)
+        if self._kernel_vec is None:
+            k = np.array([self.kernel(x_) for x_ in x.ravel().tolist()], dtype=float).reshape(x.shape)
+        else:
+            k = self._kernel_vec(x)
+        return np.where(self.in_domain_vec(x), k, 0)
+    
     def in_domain(self, x):
         """Returns True iff x is in the integration domain `x_min`...`x_max`"""
         return self.x_min <= x <= self.x_max
     
+    def in_domain_vec(self, x):
+        """Vectorized version of `self.in_domain` (`x` is a numpy array)"""
+        return (self.x_min <= x) & (x <= self.x_max)
+    
     @property
     def limits(self):
         """Convenience accessor for `(x_min, x_max)`"""
         return (self.x_min, self.x_max)
     domain = limits
     
-    def integrate(self, func, *, steps=None, method=None):
+    def integrate(self, func, *, steps=None, method=None, vectorized=False):
         """
-        Integrates `func` against the kernel (calls `integrate_trapezoid`)
+        Integrates `func` against the kernel (calls `integrate_trapezoid` or `integrate_trapezoid_vec`)
         
-        :func:      function to integrate (single variable)
-        :steps:     number of steps for integration (default: self.steps)
-        :method:    integration method (default: self.method) (1)
-        :returns:   :math:`\int_{x_{min}}^{x_{max}} \mathrm{func}(x)\,\mathrm{kernel}(x)\,dx` 
+        :func:          function to integrate (single variable)
+        :steps:         number of steps for integration (default: self.steps)
+        :method:        integration method (default: self.method) (1)
+        :vectorized:    if True, `func` takes and returns numpy arrays (2)
+        :returns:       :math:`\int_{x_{min}}^{x_{max}} \mathrm{func}(x)\,\mathrm{kernel}(x)\,dx` 
         
         
         NOTE 1: currently the only method supported is `METHOD_TRAPEZOID`
         
+        NOTE 2: in this case `func` and the kernel are evaluated only once, on the 
+        whole integration grid, which is much faster than evaluating them point by point
+        
         EXAMPLE
         
         .. code-block:: python
@@ -155,7 +185,10 @@ class Kernel():
             steps = self.steps
         if method is None:
             method = self.method
-        ifunc = lambda x: func(x) * self.kernel(x)    
+        if vectorized:
+            ifunc = lambda x: func(x) * self.k_vec(x)
+        else:
+            ifunc = lambda x: func(x) * self.kernel(x)    
         
         # integrate = self.METHODS.get(method)
         # if integrate is None:
@@ -166,6 +199,8 @@ class Kernel():
             # I therefore went to the pedestrian version below
         
         if method == self.METHOD_TRAPEZOID:
+            if vectorized:
+                return self.integrate_trapezoid_vec(ifunc, self.x_min, self.x_max, steps)
             return self.integrate_trapezoid(ifunc, self.x_min, self.x_max, steps)
         else:
             raise ValueError(f"unknown integration method {method}")
@@ -204,6 +239,34 @@ class Kernel():
             raise ValueError(f"calculation error (xmin={x_min}, xmax={x_max}, steps={steps}) [{e}]") from e
         return (sum(f) - 0.5*(f[0]+f[-1])) * dx
     
+    @staticmethod
+    def integrate_trapezoid_vec(func, x_min, x_max, steps):
+        """
+        Vectorized version of `integrate_trapezoid` (`func` takes and returns numpy arrays)
+        
+        `func` is evaluated once on the whole grid; like in `integrate_trapezoid`, points 
+        where it can not be calculated (`nan` or infinite values) contribute zero
+        
+        EXAMPLE
+        
+        .. code-block:: python
+            
+                f = lambda x: x**2
+                Kernel.integrate_trapezoid_vec(f, -1, 1, 100)  # ~0.6666
+        """
+        assert x_max > x_min, "x_max must be greater than x_min"
+        assert steps > 0, "steps must be positive"
+        
+        dx = (x_max-x_min)/steps
+        x = x_min + np.arange(steps+1)*dx
+        try:
+            f = np.asarray(func(x), dtype=float)
+        except Exception as e:
+            raise ValueError(f"calculation error (xmin={x_min}, xmax={x_max}, steps={steps}) [{e}]") from e
+        f = np.where(np.isfinite(f), f, 0).tolist()
+        return (sum(f) - 0.5*(f[0]+f[-1])) * dx
+            # summed sequentially like in `integrate_trapezoid` so that both give identical results
+    
     # METHODS = {
     #     METHOD_TRAPEZOID: integrate_trapezoid
     # }
@@ -4,12 +4,13 @@ object representing the Solidly AMM invariant
 (c) Copyright Bprotocol foundation 2024. 
 Licensed under MIT
 """
-__VERSION__ = '0.9'
-__DATE__ = "18/Jan/2024"
+__VERSION__ = '1.1'
+__DATE__ = "18/Oct/2026"
 
 import decimal as d
 D = d.Decimal
 import math as m
+import numpy as np
 
 from .invariant import Invariant, dataclass
 from .functions import Function
@@ -20,7 +21,7 @@ class SolidlySwapFunction(Function):
     r"""
     represents the Solidly AMM swap function y(x,k)=k/x
     
-    :method: METHOD_FLOAT, METHOD_DEC (default), METHOD_TAYLOR
+    :method: METHOD_FLOAT, METHOD_DEC100, METHOD_DEC1000 (default), METHOD_TAYLOR, METHOD_NEWTON
     
     
     ==============================================
@@ -75,21 +76,58 @@ class SolidlySwapFunction(Function):
     $$
 
     and tests suggest that it is very good for at least $|\xi| < 10^{-5}$
+    
+    ==============================================
+                  FAST FLOAT SOLVER
+    ==============================================
+    
+    The **method METHOD_NEWTON** avoids the closed-form solution altogether and 
+    solves the invariant equation for $y$ with Newton's method in float. The 
+    function $F(y) = x^3y+xy^3-k$ is increasing and convex for $y>0$, so starting 
+    from the upper bound $y_0=\min\left((k/x)^{1/3}, k/x^3\right)$ the iteration
+    $$
+    y \leftarrow y - \frac{x^3y+xy^3-k}{x^3+3xy^2}
+    $$
+    converges monotonically, typically in fewer than 10 steps.
+    
+    The **price function** and its derivative are calculated in closed form 
+    (for all methods) from the implicit derivative of the invariant
+    $$
+    p(x) = -\frac{dy}{dx} = \frac{3x^2y+y^3}{x^3+3xy^2}
+    $$
+    $$
+    p'(x) = \frac{6\left(xy(1+p^2) - p(x^2+y^2)\right)}{x^3+3xy^2}
+    $$
+    
+    Finally, with $r=y/x$ the price only depends on $r$ and it can be inverted 
+    in closed form because
+    $$
+    p = \frac{3r+r^3}{1+3r^2} = \frac{(1+r)^3-(1-r)^3}{(1+r)^3+(1-r)^3}
+    \quad\Rightarrow\quad
+    \frac{1-r}{1+r} = \sqrt[3]{\frac{1-p}{1+p}}
+    $$
+    and then $x^4(r+r^3)=k$ (see ``xyfromp``).
     """
     __VERSION__ = __VERSION__
     __DATE__ = __DATE__
     
     k: float
+    method: str = None          # the method used to calculate y(x,k)
     
     METHOD_FLOAT = "float"
     METHOD_DEC100 = "decimal100"
     METHOD_DEC1000 = "decimal1000"
     METHOD_TAYLOR = "taylor"
-    def __post_init__(self, method=None):
+    METHOD_NEWTON = "newton"
+    
+    NEWTON_ITERATIONS = 100     # maximum number of Newton steps
+    NEWTON_TOLERANCE = 1e-15    # relative step size at which the Newton iteration stops
+    
+    def __post_init__(self):
+        method = self.method
         if method is None:
             method = self.METHOD_DEC1000
-        #self._method = method
-        super().__setattr__("_method", method)
+        super().__setattr__("method", method)
         if method == self.METHOD_FLOAT:
             #self.L = self._L1_float
             super().__setattr__("L", self._L1_float)
@@ -102,14 +140,11 @@ class SolidlySwapFunction(Function):
         elif method == self.METHOD_TAYLOR:
             #self.L = self._L2_taylor
             super().__setattr__("L", self._L2_taylor)
+        elif method == self.METHOD_NEWTON:
+            super().__setattr__("L", None)
         else:
-            raise ValueError(f"method={method} must be one of self.METHOD_FLOAT, self.METHOD_DEC, self.METHOD_TAYLOR")
+            raise ValueError(f"method={method} must be one of self.METHOD_FLOAT, self.METHOD_DEC, self.METHOD_TAYLOR, self.METHOD_NEWTON")
 
-    @property
-    def method(self):
-        """the method used to calculate y(x,k)"""
-        return self._method
-    
     @staticmethod    
     def _L1_float(x, k):
         """using float (precision issues)"""
@@ -156,8 +191,99 @@ class SolidlySwapFunction(Function):
         L = lam * (27*k) / (2*x)
         return L
 
+    @classmethod
+    def _y_newton_vec(cls, x, k):
+        """
+        vectorized version of ``_y_newton`` (x is a numpy array)
+        """
+        x3 = x*x*x
+        y = np.minimum(np.cbrt(k/x), k/x3)
+        for _ in range(cls.NEWTON_ITERATIONS):
+            dy = (x3*y + x*y*y*y - k) / (x3 + 3*x*y*y)
+            y = y - dy
+            if not np.any(dy > y*cls.NEWTON_TOLERANCE):
+                break
+        return y
+
+    @classmethod
+    def _y_newton(cls, x, k):
+        """
+        solves the invariant equation for y with Newton's method in float (fast)
+        """
+        x3 = x*x*x
+        y = min((k/x)**(1/3), k/x3)
+        for _ in range(cls.NEWTON_ITERATIONS):
+            dy = (x3*y + x*y*y*y - k) / (x3 + 3*x*y*y)
+            y -= dy
+            if dy <= y*cls.NEWTON_TOLERANCE:
+                break
+        return y
+
+    @staticmethod
+    def _p_xy(x, y):
+        """the price ``-dy/dx`` at the point (x, y) of the curve (x, y can be numpy arrays)"""
+        return (3*x*x*y + y*y*y) / (x*x*x + 3*x*y*y)
+    
+    @classmethod
+    def _pp_xy(cls, x, y):
+        """the derivative of the price at the point (x, y) of the curve (x, y can be numpy arrays)"""
+        p = cls._p_xy(x, y)
+        return 6*(x*y*(1+p*p) - p*(x*x+y*y)) / (x*x*x + 3*x*y*y)
+    
+    def p(self, x, *, precision=None):
+        """
+        price function ``-dy/dx`` (closed form; precision is ignored)
+        """
+        return self._p_xy(x, self.f(x))
+    
+    def pp(self, x, *, precision=None):
+        """
+        derivative of the price function (closed form; precision is ignored)
+        """
+        return self._pp_xy(x, self.f(x))
+    
+    def f_vec(self, x):
+        """
+        vectorized version of ``f`` (fully vectorized for METHOD_NEWTON only)
+        """
+        if self.L is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return self._y_newton_vec(np.asarray(x, dtype=float), self.k)
+        return super().f_vec(x)
+    
+    def p_vec(self, x, *, precision=None):
+        """
+        vectorized version of ``p``
+        """
+        x = np.asarray(x, dtype=float)
+        return self._p_xy(x, self.f_vec(x))
+    
+    def pp_vec(self, x, *, precision=None):
+        """
+        vectorized version of ``pp``
+        """
+        x = np.asarray(x, dtype=float)
+        return self._pp_xy(x, self.f_vec(x))
+    
+    def xyfromp(self, p):
+        """
+        returns the token balances (x, y) at which the price ``-dy/dx`` is p (closed form)
+        """
+        return self.xyfromkp(self.k, p)
+    
+    @staticmethod
+    def xyfromkp(k, p):
+        """
+        like ``xyfromp``, for the pool constant k (k and p can also be numpy arrays)
+        """
+        s = np.cbrt((1-p)/(1+p))
+        r = (1-s)/(1+s)
+        x = (k/(r+r*r*r))**0.25
+        return x, r*x
 
     def f(self, x):
+        if self.L is None:
+            return self._y_newton(x, self.k)
         L,M,y = [None]*3
         try:
             L = self.L(x, self.k)
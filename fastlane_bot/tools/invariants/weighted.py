@@ -0,0 +1,149 @@
+r"""
+object representing a weighted (Balancer style) AMM with n tokens
+
+(c) Copyright Bprotocol foundation 2024.
+Licensed under MIT
+"""
+__VERSION__ = '1.0'
+__DATE__ = "18/Oct/2026"
+
+import math as m
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WeightedPoolCurve():
+    r"""
+    represents a weighted AMM with n tokens, ie the invariant :math:`\prod_i x_i^{w_i} = k`
+
+    :tokens:    the tokens of the pool
+    :balances:  the token balances of the pool (in token units)
+    :weights:   the weights of the tokens (they do not need to be normalized)
+
+    ==============================================
+                MATHEMATICAL BACKGROUND
+    ==============================================
+
+    The marginal price of token i in units of token j is
+
+    .. math::
+        p_{i/j} = \frac{x_j / w_j}{x_i / w_i}
+
+    At the price vector :math:`p_i` (prices of all tokens in a common numeraire)
+    arbitrage moves the pool to the balances where :math:`p_i x_i / w_i = \lambda`
+    for all tokens. The invariant then determines :math:`\lambda`, and we find
+
+    .. math::
+        x_i(p) = \frac{\lambda w_i}{p_i}, \quad
+        \log\lambda = \sum_j \frac{w_j}{W} \log\frac{x_j p_j}{w_j}, \quad
+        W = \sum_j w_j
+
+    Because the weights need not be normalized, a pool restricted to a subset of its
+    tokens, with the balances of the other tokens constant, is again a weighted pool
+    (see ``restrict``). For two tokens x, y this is the curve :math:`x y^{1/\eta} = k`
+    of the ``ConstantProductCurve`` class, with :math:`\eta = w_x / w_y`.
+    """
+    __VERSION__ = __VERSION__
+    __DATE__ = __DATE__
+
+    tokens: tuple
+    balances: tuple
+    weights: tuple
+
+    def __post_init__(self):
+        super().__setattr__("tokens", tuple(self.tokens))
+        super().__setattr__("balances", tuple(float(x) for x in self.balances))
+        super().__setattr__("weights", tuple(float(w) for w in self.weights))
+        assert len(self.tokens) == len(self.balances) == len(self.weights), f"tokens, balances and weights must have the same length [{self}]"
+        assert len(set(self.tokens)) == len(self.tokens), f"tokens must be unique [{self.tokens}]"
+        assert all(x > 0 for x in self.balances), f"balances must be positive [{self.balances}]"
+        assert all(w > 0 for w in self.weights), f"weights must be positive [{self.weights}]"
+
+    @property
+    def n(self):
+        """number of tokens in the pool"""
+        return len(self.tokens)
+
+    def restrict(self, tokens):
+        """
+        returns the pool restricted to the given tokens (the balances of the other tokens being constant)
+
+        :tokens:    the tokens of the restricted pool (an iterable of tokens of the pool)
+        """
+        tokens = set(tokens)
+        assert tokens <= set(self.tokens), f"tokens {tokens - set(self.tokens)} not in pool {self.tokens}"
+        ix = tuple(i for i, t in enumerate(self.tokens) if t in tokens)
+        return self.__class__(
+            tokens=tuple(self.tokens[i] for i in ix),
+            balances=tuple(self.balances[i] for i in ix),
+            weights=tuple(self.weights[i] for i in ix),
+        )
+
+    def price(self, tknb, tknq):
+        """marginal price of tknb in units of tknq"""
+        ib, iq = self.tokens.index(tknb), self.tokens.index(tknq)
+        return (self.balances[iq] / self.weights[iq]) / (self.balances[ib] / self.weights[ib])
+
+    def xvecfrompvec_f(self, pvec):
+        """
+        returns the token balances after arbitrage at the price vector pvec
+
+        :pvec:      a dict containing the prices of all tokens of the pool in any numeraire
+                    (only the ratios are used)
+        :returns:   token balances as dict {tkn: x}
+        """
+        W = sum(self.weights)
+        loglambda = sum(
+            w / W * m.log(x * pvec[t] / w)
+            for t, x, w in zip(self.tokens, self.balances, self.weights)
+        )
+        lambda_ = m.exp(loglambda)
+        return {t: lambda_ * w / pvec[t] for t, w in zip(self.tokens, self.weights)}
+
+    def dxvecfrompvec_f(self, pvec):
+        """
+        like xvecfrompvec_f, but returns the changes of the token balances {tkn: dx}
+        """
+        xvec = self.xvecfrompvec_f(pvec)
+        return {t: xvec[t] - x for t, x in zip(self.tokens, self.balances)}
+
+    def pairtradesfrompvec_f(self, pvec):
+        """
+        splits the changes of the token balances at pvec into trades between pairs of tokens
+
+        :pvec:      see xvecfrompvec_f
+        :returns:   dict {(tknin, tknout): (dxin, dxout)}, where tknin is the token going into
+                    the pool (dxin > 0) and tknout the token coming out of it (dxout < 0); the
+                    sums of the trades by token are the changes returned by dxvecfrompvec_f
+
+        the value (at pvec) of every token going into the pool is allocated to the tokens
+        coming out of the pool in order, which results in at most n-1 trades
+        """
+        dxvec = self.dxvecfrompvec_f(pvec)
+        tkns_in = [(t, dx) for t, dx in dxvec.items() if dx > 0]
+        tkns_out = [(t, dx) for t, dx in dxvec.items() if dx < 0]
+        if not tkns_in or not tkns_out:
+            return dict()
+        values_in = [dx * pvec[t] for t, dx in tkns_in]
+        values_out = [-dx * pvec[t] for t, dx in tkns_out]
+        shares_in = [v / sum(values_in) for v in values_in]
+        shares_out = [v / sum(values_out) for v in values_out]
+
+        trades = dict()
+        i, j = 0, 0
+        left_in, left_out = shares_in[0], shares_out[0]
+        while i < len(tkns_in) and j < len(tkns_out):
+            share = min(left_in, left_out)
+            (tknin, dxin), (tknout, dxout) = tkns_in[i], tkns_out[j]
+            trades[(tknin, tknout)] = (dxin * share / shares_in[i], dxout * share / shares_out[j])
+            if share == left_in:
+                i += 1
+                left_in = shares_in[i] if i < len(tkns_in) else 0
+            else:
+                left_in -= share
+            if share == left_out:
+                j += 1
+                left_out = shares_out[j] if j < len(tkns_out) else 0
+            else:
+                left_out -= share
+        return trades
@@ -44,8 +44,8 @@ The corresponding author is Stefan Loesch <stefan@bancor.network>
 (c) Copyright Bprotocol foundation 2023. 
 Licensed under MIT
 """
-__VERSION__ = "5.1"
-__DATE__ = "15/Sep/2023"
+__VERSION__ = "5.2"
+__DATE__ = "18/Oct/2026"
 
 from dataclasses import dataclass, field, fields, asdict, astuple, InitVar
 import pandas as pd
@@ -83,6 +83,7 @@ TIF_DFAGGR = "dfaggr"
 TIF_DFAGGR8 = "dfaggr8"
 TIF_DFPG = "dfgain"
 TIF_DFPG8 = "dfgain8"
+TIF_AGGR = "aggr"
 
 
 class CPCArbOptimizer(OptimizerBase):
@@ -116,6 +117,21 @@ class CPCArbOptimizer(OptimizerBase):
         """the curve container (CPCContainer)"""
         return self._curve_container
 
+    def set_curves(self, curves):
+        """
+        replaces the curves the optimizer is using, allowing to reuse the optimizer instance
+
+        :curves:         the CPCContainer object (or the curves therein) to use from now on
+        :returns:        self
+
+        NOTE: results hold a reference to the optimizer, therefore results that rely on
+        it (eg `curves_new`) must be used before the curves are replaced
+        """
+        if not isinstance(curves, CPCContainer):
+            curves = CPCContainer(curves)
+        self._curve_container = curves
+        return self
+
     CC = curve_container
     curves = curve_container
 
@@ -497,6 +513,7 @@ class CPCArbOptimizer(OptimizerBase):
         TIF_DF8 = TIFDF8
         TIF_DFPG = TIF_DFPG
         TIF_DFPG8 = TIF_DFPG8
+        TIF_AGGR = TIF_AGGR
 
         @classmethod
         def to_format(cls, trade_instructions, robj=None, *, ti_format=None):
@@ -518,6 +535,7 @@ class CPCArbOptimizer(OptimizerBase):
             TIF_DFP           returns a "pretty" dataframe (holes are spaces)
             TIF_DFAGRR        aggregated dataframe
             TIF_DF            alias for TIF_DFRAW
+            TIF_AGGR          an AggrTradeInstructions object (lazy TIF_DFAGGR)
             ================  ====================================================
             """
             # print("[TradeInstruction] to_format", ti_format)
@@ -527,6 +545,8 @@ class CPCArbOptimizer(OptimizerBase):
                 return tuple(trade_instructions)
             elif ti_format == cls.TIF_DICTS:
                 return cls.to_dicts(trade_instructions)
+            elif ti_format == cls.TIF_AGGR:
+                return CPCArbOptimizer.AggrTradeInstructions(tuple(trade_instructions), robj=robj)
             elif ti_format[:2] == "df":
                 trade_instructions = tuple(trade_instructions)
                 if len(trade_instructions) == 0:
@@ -553,6 +573,59 @@ class CPCArbOptimizer(OptimizerBase):
 
         pp = prices
 
+    @dataclass
+    class AggrTradeInstructions:
+        """
+        lightweight aggregated trade instructions (returned for TIF_AGGR)
+
+        :trade_instructions:    tuple of TradeInstruction objects
+        :robj:                  OptimizationResult object generating the trade instructions
+
+        the net change per token is computed directly from the trade instructions; the
+        aggregated dataframe (TIF_DFAGGR) is only built when ``df`` is accessed, eg when
+        the winning arbitrage is logged
+        """
+        trade_instructions: tuple
+        robj: object = field(default=None, repr=False)
+
+        def __post_init__(self):
+            self._df = None
+
+        def __len__(self):
+            return len(self.trade_instructions)
+
+        def __str__(self):
+            return str(self.df)
+
+        @property
+        def tokens(self):
+            """tokens in order of first appearance (ie the token columns of the TIF_DFAGGR dataframe)"""
+            return tuple(dict.fromkeys(
+                tkn for ti in self.trade_instructions for tkn in (ti.tknin, ti.tknout)
+            ))
+
+        @property
+        def netchange(self):
+            """net change per token (ie the TOTAL NET row of the TIF_DFAGGR dataframe)"""
+            tknix = {tkn: ix for ix, tkn in enumerate(self.tokens)}
+            result = np.zeros(len(tknix))
+            for ti in self.trade_instructions:
+                result[tknix[ti.tknin]] += ti.amtin
+                result[tknix[ti.tknout]] += ti.amtout
+            return result
+
+        @property
+        def df(self):
+            """the aggregated dataframe (TIF_DFAGGR), built on first access"""
+            if self._df is None:
+                if len(self.trade_instructions) == 0:
+                    self._df = pd.DataFrame()
+                else:
+                    self._df = CPCArbOptimizer.TradeInstruction.to_df(
+                        self.trade_instructions, robj=self.robj, ti_format=TIF_DFAGGR
+                    )
+            return self._df
+
     TIF_OBJECTS = TIF_OBJECTS
     TIF_DICTS = TIF_DICTS
     TIF_DFRAW = TIF_DFRAW
@@ -562,6 +635,7 @@ class CPCArbOptimizer(OptimizerBase):
     TIF_DF8 = TIFDF8
     TIF_DFPG = TIF_DFPG
     TIF_DFPG8 = TIF_DFPG8
+    TIF_AGGR = TIF_AGGR
 
     METHOD_MARGP = "margp"
 
@@ -592,6 +666,7 @@ class CPCArbOptimizer(OptimizerBase):
         TIF_DF8 = TIFDF8
         TIF_DFPG = TIF_DFPG
         TIF_DFPG8 = TIF_DFPG8
+        TIF_AGGR = TIF_AGGR
 
         curves: any = field(repr=False, default=None)
         targettkn: str = field(repr=True, default=None)
@@ -654,8 +729,9 @@ class CPCArbOptimizer(OptimizerBase):
                 not self.curves is None
             ), "curves must be set [do not use minimal results]"
             assert self.is_error is False, "cannot get this data from an error result"
+            ntokendxdy = self._ntokendxdy()
             result = (
-                (c.cid, c.dxdyfromp_f(self.price(c.tknb, c.tknq))[0:2])
+                (c.cid, ntokendxdy[id(c)] if id(c) in ntokendxdy else c.dxdyfromp_f(self.price(c.tknb, c.tknq))[0:2])
                 for c in self.curves
             )
             if asdict:
@@ -670,11 +746,37 @@ class CPCArbOptimizer(OptimizerBase):
                 not self.curves is None
             ), "curves must be set [do not use minimal results]"
             assert self.is_error is False, "cannot get this data from an error result"
-            result = ((c.cid, c.dxvecfrompvec_f(self.p_optimal)) for c in self.curves)
+            ntokendxdy = self._ntokendxdy()
+            result = (
+                (c.cid, dict(zip((c.tknx, c.tkny), ntokendxdy[id(c)])) if id(c) in ntokendxdy else c.dxvecfrompvec_f(self.p_optimal))
+                for c in self.curves
+            )
             if asdict:
                 return {cid: dxvec for cid, dxvec in result}
             return tuple(dxvec for cid, dxvec in result)
 
+        def _ntokendxdy(self):
+            """
+            returns the (dx, dy) values of the curves that are pairs of an n-token pool, as dict {id(curve): (dx, dy)}
+
+            the changes of the token balances of the pool are split into trades between pairs of
+            tokens (see ``WeightedPoolCurve.pairtradesfrompvec_f``), which are assigned to the curves
+            of those pairs; curves of the pool not needed for the trades do not trade
+            """
+            curves = self.curves if isinstance(self.curves, CPCContainer) else CPCContainer(self.curves)
+            result = dict()
+            for ntokencurve, curves_ in curves.ntokencurves():
+                trades = ntokencurve.pairtradesfrompvec_f(self.p_optimal)
+                for c in curves_:
+                    if (c.tknx, c.tkny) in trades:
+                        dx, dy = trades[(c.tknx, c.tkny)]
+                    elif (c.tkny, c.tknx) in trades:
+                        dy, dx = trades[(c.tkny, c.tknx)]
+                    else:
+                        dx, dy = 0, 0
+                    result[id(c)] = (dx, dy)
+            return result
+
         @property
         def dxvalues(self):
             return tuple(dx for dx, dy in self.dxdyvalues())
@@ -696,7 +798,7 @@ class CPCArbOptimizer(OptimizerBase):
             """
             returns list of TradeInstruction objects
 
-            :ti_format:     TIF_OBJECTS, TIF_DICTS, TIF_DFP, TIF_DFRAW, TIF_DFAGGR, TIF_DF
+            :ti_format:     TIF_OBJECTS, TIF_DICTS, TIF_DFP, TIF_DFRAW, TIF_DFAGGR, TIF_DF, TIF_AGGR
             """
             try:
                 assert (
@@ -709,7 +811,7 @@ class CPCArbOptimizer(OptimizerBase):
                     CPCArbOptimizer.TradeInstruction.new(
                         curve_or_cid=c, tkn1=c.tknx, amt1=dx, tkn2=c.tkny, amt2=dy
                     )
-                    for c, dx, dy in zip(self.curves, self.dxvalues, self.dyvalues)
+                    for c, (dx, dy) in zip(self.curves, self.dxdyvalues())
                     if dx != 0 or dy != 0
                 )
                 return CPCArbOptimizer.TradeInstruction.to_format(
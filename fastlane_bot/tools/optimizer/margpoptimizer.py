@@ -22,8 +22,8 @@ author is Stefan Loesch <stefan@bancor.network>
 (c) Copyright Bprotocol foundation 2023. 
 Licensed under MIT
 """
-__VERSION__ = "5.2"
-__DATE__ = "15/Sep/2023"
+__VERSION__ = "5.4"
+__DATE__ = "18/Oct/2026"
 
 from dataclasses import dataclass, field, fields, asdict, astuple, InitVar
 import pandas as pd
@@ -83,6 +83,7 @@ class MargPOptimizer(CPCArbOptimizer):
 
     MOEPS = 1e-6
     MOMAXITER = 50
+    MODAMPING = 8
     
     class OptimizationError(Exception): pass
     class ConvergenceError(OptimizationError): pass
@@ -164,9 +165,21 @@ class MargPOptimizer(CPCArbOptimizer):
         tokens_t = tuple(t for t in alltokens_s if t != targettkn) # all _other_ tokens...
         tokens_ix = {t: i for i, t in enumerate(tokens_t)}         # ...with index lookup
         pairs = self.curve_container.pairs(standardize=False)
-        curves_by_pair = { 
-            pair: tuple(c for c in curves_t if c.pair == pair) for pair in pairs }
+        curves_by_pair = {pair: [] for pair in pairs}
+        for c in curves_t:
+            curves_by_pair[c.pair] += [c]
+        curves_by_pair = {pair: tuple(curves) for pair, curves in curves_by_pair.items()}
         pairs_t = tuple(tuple(p.split("/")) for p in pairs)
+
+        # the curves that are pairs of the same n-token pool (eg Balancer weighted pools) are not
+        # evaluated independently, but the pool is evaluated once via its n-token curve
+        ntokencurves = self.curve_container.ntokencurves()
+        ntokencurve_members = {id(c) for _, curves in ntokencurves for c in curves}
+
+        # curves that follow their invariant exactly (eg Solidly stable pools) are stiff: around
+        # their cusp a price step below eps still moves material token amounts, so problems that
+        # contain them only stop after two consecutive steps below eps
+        stiff = any(c.swapfunc is not None for c in curves_t)
         
         try:
         
@@ -257,7 +270,7 @@ class MargPOptimizer(CPCArbOptimizer):
                     curves = curves_by_pair[pair]
                     c0 = curves[0]
                     #dxdy = tuple(dxdy_f(c.dxdyfromp_f(price)) for c in curves)
-                    dxvecs = (c.dxvecfrompvec_f(pvec) for c in curves)
+                    dxvecs = (c.dxvecfrompvec_f(pvec) for c in curves if id(c) not in ntokencurve_members)
                     
                     if P("debug2") and not quiet:
                         dxdy = tuple(dxdy_f(c.dxdyfromp_f(price)) for c in curves)
@@ -285,6 +298,10 @@ class MargPOptimizer(CPCArbOptimizer):
                     # if P("debug") and not quiet:
                     #     print(f"pair={c0.pairp}, {sumdy:,.4f} {tn(tknq)}, {sumdx:,.4f} {tn(tknb)}, price={price:,.4f} {tn(tknq)} per {tn(tknb)} [{len(curves)} funcs]")
 
+                for ntokencurve, _ in ntokencurves:
+                    for tkn, dx_ in ntokencurve.dxvecfrompvec_f(pvec).items():
+                        sum_by_tkn[tkn] += dx_
+
                 result = tuple(sum_by_tkn[t] for t in tokens_t)
                 if P("debug") and not quiet:
                     print(f"sum_by_tkn={sum_by_tkn}")
@@ -332,6 +349,7 @@ class MargPOptimizer(CPCArbOptimizer):
                 #     print("[margp_optimizer] dtkn_d", dtkn_d)
 
             ## MAIN OPTIMIZATION LOOP
+            criterium = np.inf
             for i in range(maxiter):
 
                 if P("progress"):
@@ -367,11 +385,22 @@ class MargPOptimizer(CPCArbOptimizer):
                     # https://numpy.org/doc/stable/reference/generated/numpy.linalg.solve.html
                     # https://numpy.org/doc/stable/reference/generated/numpy.linalg.lstsq.html
                 
+                # if the steps stop shrinking, halve the step until it reduces the residual; near 
+                # the cusp of stiff curves (eg Solidly stable pools around p=1) the full Newton step
+                # overshoots and the iteration oscillates; if no step reduces the residual the full
+                # step is kept; converging iterations are not affected
+                if np.linalg.norm(dplog10) >= criterium:
+                    dtkn_norm = np.linalg.norm(dtkn)
+                    for j in range(self.MODAMPING + 1):
+                        if np.linalg.norm(dtknfromp_f(plog10 + dplog10 / 2**j, quiet=True)) < dtkn_norm:
+                            dplog10 = dplog10 / 2**j
+                            break
+                
                 # update log prices, prices and determine the criterium...
                 p0log10 = [*plog10]
                 plog10 += dplog10
                 p = np.exp(plog10 * np.log(10))
-                criterium = np.linalg.norm(dplog10)
+                criterium0, criterium = criterium, np.linalg.norm(dplog10)
                 
                 # ...print out some info if requested...
                 if P("verbose"):
@@ -395,7 +424,7 @@ class MargPOptimizer(CPCArbOptimizer):
                     print(f"<<<========== cycle {i} ======= [margp_optimizer]")
 
                 # ...and finally check the criterium (percentage changes this step) for convergence
-                if criterium < eps:
+                if criterium < eps and (not stiff or criterium0 < eps):
                     if i != 0:
                         # we don't break in the first iteration because we need this first iteration
                         # to establish a common baseline price, therefore d logp ~ 0 is not good
@@ -25,6 +25,7 @@ import time
 # import numbers
 # import pickle
 from ..cpc import ConstantProductCurve as CPC, CPCInverter, CPCContainer
+from ..invariants.solidly import SolidlySwapFunction
 #from sys import float_info
 
 from .dcbase import DCBase
@@ -168,6 +169,7 @@ class PairOptimizer(CPCArbOptimizer):
     #         return CPCArbOptimizer.TradeInstruction.to_format(result, ti_format=ti_format)
 
     PAIROPTIMIZEREPS = 1e-15
+    PAIROPTIMIZERPSTARTWIDTH = 1e-3
 
     SO_DXDYVECFUNC = "dxdyvecfunc"
     SO_DXDYSUMFUNC = "dxdysumfunc"
@@ -187,6 +189,8 @@ class PairOptimizer(CPCArbOptimizer):
                             depending on whether or not targettkn is None
         :params:            dict of parameters
         :eps:               accuracy parameter passed to bisection method (default: 1e-6)
+        :pstart:            starting price dict {tkn: p} with prices quoted in targettkn (1)
+        :pstartwidth:       relative width of the bisection bracket around pstart (default: 1e-3)
         :returns:           depending on the `result` parameter 
 
         =================   ============================================================      
@@ -202,7 +206,11 @@ class PairOptimizer(CPCArbOptimizer):
         None                SO_GLOBALMAX if targettkn is None, SO_TARGETTKN otherwise                                         
         =================   ============================================================      
 
-        NOTE 1: the modes SO_PMAX and SO_GLOBALMAX are deprecated and the code may or 
+        NOTE 1: if pstart is given (eg the equilibrium price of the previous block), the
+        bisection first runs on a narrow bracket around it; if that bracket does not contain
+        the solution, it falls back to the full bracket spanned by the curve prices
+
+        NOTE 2: the modes SO_PMAX and SO_GLOBALMAX are deprecated and the code may or 
         may not be working properly; if every those functions are needed they need to 
         be reviewed and tests need to be added (most tests in NBTests 002 have been disabled)
         """
@@ -262,18 +270,20 @@ class PairOptimizer(CPCArbOptimizer):
             eps = params.get("eps", self.PAIROPTIMIZEREPS)
             
             assert targettkn in {c0.tknx, c0.tkny,}, f"targettkn {targettkn} not in {c0.tknx}, {c0.tkny}"
+            pstart = self._pstart_for_pair(params.get("pstart"), targettkn, c0)
+            pstartwidth = params.get("pstartwidth", self.PAIROPTIMIZERPSTARTWIDTH)
             
             # we are now running a goalseek == 0 on the token that is NOT the target token
             if targettkn == c0.tknx:
                 func = lambda p: dxdyfromp_sum_f(p)[1]
-                p_optimal = self.goalseek(func, p_min * 0.99, p_max * 1.01, eps=eps)
+                p_optimal = self._goalseek_warm(func, pstart, pstartwidth, p_min * 0.99, p_max * 1.01, eps=eps)
                 p_optimal_t = (1/float(p_optimal),)
                 full_result = dxdyfromp_sum_f(float(p_optimal))
                 opt_result  = full_result[0]
                 
             else:
                 func = lambda p: dxdyfromp_sum_f(p)[0]
-                p_optimal = self.goalseek(func, p_min * 0.99, p_max * 1.01, eps=eps)
+                p_optimal = self._goalseek_warm(func, pstart, pstartwidth, p_min * 0.99, p_max * 1.01, eps=eps)
                 p_optimal_t = (float(p_optimal),)
                 full_result = dxdyfromp_sum_f(float(p_optimal))
                 opt_result = full_result[1]
@@ -315,4 +325,268 @@ class PairOptimizer(CPCArbOptimizer):
             tokens_t=(c0.tknx if targettkn==c0.tkny else c0.tkny,),
             n_iterations=None, # not available
         )
-    
\ No newline at end of file
+    
+
+    PAIROPTIMIZERMAXITER = 200
+    CURVEPARAMS = ("inverted", "cp", "kbar", "eta", "alpha", "x", "y", "x_min", "x_max", "y_min", "y_max", "s_k")
+
+    @staticmethod
+    def _curve_params(c):
+        """
+        returns the parameters needed to evaluate dxdyfromp_f of c as a tuple (1)
+
+        NOTE 1: the tuple is (inverted, is_constant_product, kbar, eta, alpha, x, y, x_min, x_max,
+        y_min, y_max, s_k) for the underlying curve if c is wrapped in a CPCInverter, and for c otherwise;
+        missing bounds are returned as -inf (min) and +inf (max); s_k is the Solidly pool constant for
+        curves following the Solidly invariant exactly (in which case x, y are the token balances), and
+        nan otherwise
+        """
+        inverted = isinstance(c, CPCInverter)
+        if inverted:
+            c = c.curve
+        if c.swapfunc is not None:
+            return (inverted, False, np.nan, np.nan, np.nan, c.x_act, c.y_act, -np.inf, np.inf, -np.inf, np.inf, c.swapfunc.k)
+        bound = lambda v, default: default if v is None else v
+        return (
+            inverted,
+            c.is_constant_product(),
+            c.kbar,
+            c.eta,
+            c.alpha,
+            c.x,
+            c.y,
+            bound(c.x_min, -np.inf),
+            bound(c.x_max, np.inf),
+            bound(c.y_min, -np.inf),
+            bound(c.y_max, np.inf),
+            np.nan,
+        )
+
+    @staticmethod
+    def _dxdyfromp_batch(cp, p):
+        """
+        vectorized equivalent of dxdyfromp_f over many curves
+
+        :cp:        dict of np.arrays of curve parameters (see _curve_params)
+        :p:         np.array of prices, one per curve (in the convention of the wrapped curves)
+        :returns:   tuple of np.arrays (dx, dy), one entry per curve
+        """
+        pu = np.where(cp["inverted"], 1 / p, p)
+        with np.errstate(all="ignore"):
+            sqrt_p = np.sqrt(pu)
+            x = np.where(cp["cp"], cp["kbar"] / sqrt_p, (cp["eta"] / pu) ** (1 - cp["alpha"]) * cp["kbar"])
+            y = np.where(cp["cp"], cp["kbar"] * sqrt_p, (pu / cp["eta"]) ** cp["alpha"] * cp["kbar"])
+            solidly = ~np.isnan(cp["s_k"])
+            if solidly.any():
+                xs, ys = SolidlySwapFunction.xyfromkp(cp["s_k"], pu)
+                x, y = np.where(solidly, xs, x), np.where(solidly, ys, y)
+        x = np.minimum(np.maximum(x, cp["x_min"]), cp["x_max"])
+        y = np.minimum(np.maximum(y, cp["y_min"]), cp["y_max"])
+        dx = x - cp["x"]
+        dy = y - cp["y"]
+        return np.where(cp["inverted"], dy, dx), np.where(cp["inverted"], dx, dy)
+
+    @classmethod
+    def optimize_batch(cls, curves_l, targettkns, *, pstarts=None, params=None, optimizer=None):
+        """
+        solves many independent pair problems at once, equivalent to optimize(targettkn) for each
+
+        :curves_l:          iterable of CPCContainer objects (or iterables of curves), one per problem
+        :targettkns:        iterable of target tokens, one per problem
+        :pstarts:           iterable of pstart dicts (or None), one per problem (see optimize)
+        :params:            dict of parameters common to all problems (eps, pstartwidth)
+        :optimizer:         the optimizer instance to reuse for setting up the problems; if None,
+                            one instance is created for the whole batch
+        :returns:           list of MargpOptimizerResult objects, one per problem; problems that
+                            can not be solved return a result with errormsg set
+
+        the bisection runs simultaneously for all problems, with the curve parameters held in
+        numpy arrays, so that every step evaluates all curves of all problems in one go
+
+        NOTE: all results refer to the same optimizer instance, whose curves are those of the last
+        problem; results that rely on the optimizer (eg `curves_new`) are therefore not available
+        for the other problems (see `set_curves`)
+        """
+        start_time = time.time()
+        if params is None:
+            params = dict()
+        eps = params.get("eps", cls.PAIROPTIMIZEREPS)
+        pstartwidth = params.get("pstartwidth", cls.PAIROPTIMIZERPSTARTWIDTH)
+        curves_l = list(curves_l)
+        targettkns = list(targettkns)
+        pstarts = list(pstarts) if pstarts is not None else [None] * len(curves_l)
+        assert len(curves_l) == len(targettkns) == len(pstarts), "curves_l, targettkns and pstarts must have the same length"
+
+        # setting up the problems; invalid problems are flagged with an error message
+        problems = []
+        curveparams, curve_pix, n_valid = [], [], 0
+        for curves, targettkn, pstart in zip(curves_l, targettkns, pstarts):
+            optimizer = cls(curves) if optimizer is None else optimizer.set_curves(curves)
+            try:
+                curves_t = CPCInverter.wrap(optimizer.curve_container)
+                assert len(curves_t) > 0, "no curves found"
+                c0 = curves_t[0]
+                pairs = set(c.pair for c in curves_t)
+                assert (len(pairs) == 1), f"pair_optimizer only works on curves of exactly one pair [{pairs}]"
+                assert targettkn in {c0.tknx, c0.tkny,}, f"targettkn {targettkn} not in {c0.tknx}, {c0.tkny}"
+                params_t = [cls._curve_params(c) for c in curves_t]
+                prices = [c.p for c in curves_t]
+            except Exception as e:
+                problems.append(dict(optimizer=optimizer, targettkn=targettkn, errormsg=e))
+                continue
+            pix = n_valid
+            n_valid += 1
+            curveparams += params_t
+            curve_pix += [pix] * len(params_t)
+            problems.append(dict(
+                optimizer=optimizer,
+                targettkn=targettkn,
+                curves_t=curves_t,
+                c0=c0,
+                pix=pix,
+                p_min=np.min(prices),
+                p_max=np.max(prices),
+                pstart=cls._pstart_for_pair(pstart, targettkn, c0),
+                errormsg=None,
+            ))
+        valid = [p for p in problems if p["errormsg"] is None]
+        n = len(valid)
+
+        if n > 0:
+            cp = {k: np.array(v) for k, v in zip(cls.CURVEPARAMS, zip(*curveparams))}
+            curve_pix = np.array(curve_pix)
+            usedy = np.array([p["targettkn"] == p["c0"].tknx for p in valid])
+
+            def dxdyfromp_sum_f(p):
+                """returns (sum dx, sum dy) per problem for the price vector p (one price per problem)"""
+                dx, dy = cls._dxdyfromp_batch(cp, p[curve_pix])
+                return (
+                    np.bincount(curve_pix, weights=dx, minlength=n),
+                    np.bincount(curve_pix, weights=dy, minlength=n),
+                )
+
+            def func(p):
+                """the quantity that must be zero, ie the change in the token that is NOT the target"""
+                sumdx, sumdy = dxdyfromp_sum_f(p)
+                return np.where(usedy, sumdy, sumdx)
+
+            # brackets: around pstart if given, falling back to the curve price range (see optimize)
+            a_full = np.array([p["p_min"] * 0.99 for p in valid])
+            b_full = np.array([p["p_max"] * 1.01 for p in valid])
+            pstart = np.array([p["pstart"] if p["pstart"] is not None else np.nan for p in valid])
+            warm = ~np.isnan(pstart)
+            a = np.where(warm, pstart * (1 - pstartwidth), a_full)
+            b = np.where(warm, pstart * (1 + pstartwidth), b_full)
+            fa, fb = func(a), func(b)
+            retry = warm & (fa * fb > 0)
+            if retry.any():
+                a, b = np.where(retry, a_full, a), np.where(retry, b_full, b)
+                fa, fb = np.where(retry, func(a), fa), np.where(retry, func(b), fb)
+            error = fa * fb > 0
+            done = error.copy()
+            p_optimal = np.full(n, np.nan)
+
+            # the bisection, run on all problems at once (see goalseek)
+            counter = 0
+            while True:
+                active = ~done & ((b / a - 1) > eps)
+                if not active.any():
+                    break
+                if counter > cls.PAIROPTIMIZERMAXITER:
+                    error |= active
+                    done |= active
+                    break
+                c = (a + b) / 2
+                fc = func(c)
+                zero = active & (fc == 0)
+                p_optimal[zero] = c[zero]
+                done |= zero
+                left = active & ~zero & (fa * fc < 0)
+                right = active & ~zero & ~left
+                b[left] = c[left]
+                a[right], fa[right] = c[right], fc[right]
+                counter += 1
+            p_optimal = np.where(np.isnan(p_optimal), (a + b) / 2, p_optimal)
+            full_result = dxdyfromp_sum_f(np.where(error, 1, p_optimal))
+
+        results = []
+        for problem in problems:
+            optimizer, targettkn = problem["optimizer"], problem["targettkn"]
+            if problem["errormsg"] is not None:
+                results.append(cls.MargpOptimizerResult(
+                    method="margp-pair",
+                    optimizer=optimizer,
+                    result=None,
+                    time=time.time() - start_time,
+                    targettkn=targettkn,
+                    curves=None,
+                    p_optimal_t=None,
+                    dtokens=None,
+                    dtokens_t=None,
+                    tokens_t=None,
+                    n_iterations=None,
+                    errormsg=problem["errormsg"],
+                ))
+                continue
+            pix, c0, curves_t = problem["pix"], problem["c0"], problem["curves_t"]
+            tokens_t = (c0.tknx if targettkn==c0.tkny else c0.tkny,)
+            if error[pix]:
+                results.append(cls.MargpOptimizerResult(
+                    method="margp-pair",
+                    optimizer=optimizer,
+                    result=None,
+                    time=time.time() - start_time,
+                    targettkn=targettkn,
+                    curves=curves_t,
+                    p_optimal_t=None,
+                    dtokens=None,
+                    dtokens_t=None,
+                    tokens_t=tokens_t,
+                    n_iterations=None,
+                    errormsg="bisection did not converge",
+                ))
+                continue
+            dx, dy = full_result[0][pix], full_result[1][pix]
+            p = float(p_optimal[pix])
+            results.append(cls.MargpOptimizerResult(
+                method="margp-pair",
+                optimizer=optimizer,
+                result=dx if usedy[pix] else dy,
+                time=time.time() - start_time,
+                targettkn=targettkn,
+                curves=curves_t,
+                p_optimal_t=(1/p,) if usedy[pix] else (p,),
+                dtokens={c0.tknx: dx, c0.tkny: dy},
+                dtokens_t=(dy if usedy[pix] else dx,),
+                tokens_t=tokens_t,
+                n_iterations=counter,
+            ))
+        return results
+
+    @staticmethod
+    def _pstart_for_pair(pstart, targettkn, c0):
+        """
+        converts a pstart dict {tkn: p} (quoted in targettkn) into the price of c0.tknx in c0.tkny
+
+        :returns:   the price, or None if pstart does not contain a usable price
+        """
+        if pstart is None:
+            return None
+        try:
+            if targettkn == c0.tkny:
+                p = float(pstart[c0.tknx])
+            else:
+                p = 1 / float(pstart[c0.tkny])
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            return None
+        return p if np.isfinite(p) and p > 0 else None
+
+    def _goalseek_warm(self, func, pstart, pstartwidth, a, b, *, eps=None):
+        """
+        goalseek on a narrow bracket around pstart first (if given), then on the full bracket a, b
+        """
+        if pstart is not None:
+            p_optimal = self.goalseek(func, pstart * (1 - pstartwidth), pstart * (1 + pstartwidth), eps=eps)
+            if not p_optimal.is_error:
+                return p_optimal
+        return self.goalseek(func, a, b, eps=eps)
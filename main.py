@@ -29,6 +29,7 @@ from fastlane_bot.events.async_event_update_utils import (
 )
 from fastlane_bot.events.managers.manager import Manager
 from fastlane_bot.events.multicall_utils import multicall_every_iteration
+from fastlane_bot.events.terraformer_worker import TerraformerWorker
 from fastlane_bot.events.utils import (
     add_initial_pool_data,
     get_static_data,
@@ -43,6 +44,7 @@ from fastlane_bot.events.utils import (
     get_cached_events,
     handle_subsequent_iterations,
     verify_state_changed,
+    set_missing_last_updated_block,
     handle_duplicates,
     get_latest_events,
     get_start_block,
@@ -96,6 +98,8 @@ def process_arguments(args):
         "self_fund": is_true,
         "read_only": is_true,
         "is_args_test": is_true,
+        "use_access_list": is_true,
+        "uni_v3_tick_words": int,
     }
 
     # Apply the transformations
@@ -136,6 +140,8 @@ def main(args: argparse.Namespace) -> None:
         args.tenderly_fork_id,
         args.self_fund,
         args.rpc_url,
+        args.use_access_list,
+        args.uni_v3_tick_words,
     )
 
     if not cfg.SELF_FUND and cfg.network.IS_NO_FLASHLOAN_AVAILABLE:
@@ -227,6 +233,8 @@ def main(args: argparse.Namespace) -> None:
             prefix_path: {args.prefix_path}
             self_fund: {args.self_fund}
             read_only: {args.read_only}
+            use_access_list: {args.use_access_list}
+            uni_v3_tick_words: {args.uni_v3_tick_words}
 
             +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
             +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -308,19 +316,19 @@ def run(mgr, args, tenderly_uri=None) -> None:
     start_timeout = time.time()
     mainnet_uri = mgr.cfg.w3.provider.endpoint_uri
     handle_static_pools_update(mgr)
+    terraformer_worker = TerraformerWorker(terraform=terraform_blockchain, logger=mgr.cfg.logger)
     while True:
         try:
-            # Save initial state of pool data to assert whether it has changed
-            initial_state = mgr.pool_data.copy()
+            # Merge the pools discovered by the background terraformer
+            terraformer_delta = terraformer_worker.pop_delta()
+            if terraformer_delta is not None:
+                handle_static_pools_update(mgr, terraformer_delta)
 
             # ensure 'last_updated_block' is in pool_data for all pools
-            for idx, pool in enumerate(mgr.pool_data):
-                if "last_updated_block" not in pool:
-                    pool["last_updated_block"] = last_block_queried
-                    mgr.pool_data[idx] = pool
-                if not pool["last_updated_block"]:
-                    pool["last_updated_block"] = last_block_queried
-                    mgr.pool_data[idx] = pool
+            set_missing_last_updated_block(mgr, last_block_queried)
+
+            # Save initial state of pool data to assert whether it has changed
+            initial_state = mgr.pool_data.version
 
             # Get current block number, then adjust to the block number reorg_delay blocks ago to avoid reorgs
             start_block, replay_from_block = get_start_block(
@@ -502,33 +510,25 @@ def run(mgr, args, tenderly_uri=None) -> None:
                     loop_idx % args.pool_data_update_frequency == 0
                     and args.pool_data_update_frequency != -1
             ):
-                mgr.cfg.logger.info(
-                    f"[main] Terraforming {args.blockchain}. Standby for oxygen levels."
-                )
                 sblock = (
                     (current_block - (current_block - last_block_queried))
                     if loop_idx > 1
                     else None
                 )
-                (
-                    exchange_df,
-                    uniswap_v2_event_mappings,
-                    uniswap_v3_event_mappings,
-                    solidly_v2_event_mappings,
-                ) = terraform_blockchain(
+                # Terraform in the background, the new pools are merged at the start of a later iteration
+                if terraformer_worker.start(
+                    known_addresses=[
+                        *mgr.uniswap_v2_event_mappings,
+                        *mgr.uniswap_v3_event_mappings,
+                        *mgr.solidly_v2_event_mappings,
+                    ],
                     network_name=args.blockchain,
                     web3=mgr.web3,
                     start_block=sblock,
-                )
-                mgr.uniswap_v2_event_mappings = dict(
-                    uniswap_v2_event_mappings[["address", "exchange"]].values
-                )
-                mgr.uniswap_v3_event_mappings = dict(
-                    uniswap_v3_event_mappings[["address", "exchange"]].values
-                )
-                mgr.solidly_v2_event_mappings = dict(
-                    solidly_v2_event_mappings[["address", "exchange"]].values
-                )
+                ):
+                    mgr.cfg.logger.info(
+                        f"[main] Terraforming {args.blockchain} in the background. Standby for oxygen levels."
+                    )
             last_block_queried = current_block
 
             total_iteration_time += time.time() - iteration_start_time
@@ -747,6 +747,20 @@ if __name__ == "__main__":
         default=None,
         help="Custom RPC URL. If not set, the bot will use the default Alchemy RPC URL for the blockchain (if available).",
     )
+    parser.add_argument(
+        "--use_access_list",
+        default='False',
+        help="If True, the bot will attach an access list to arbitrage transactions (except on Ethereum, where "
+             "transactions are sent through flashbots). The access list of a route is cached after its first "
+             "eth_createAccessList result, if it saves gas.",
+    )
+    parser.add_argument(
+        "--uni_v3_tick_words",
+        default=0,
+        help="The number of tick bitmap words (256 ticks each) fetched on either side of the current tick of "
+             "Uniswap v3 pools. If greater than 0, the liquidity of the initialized ticks near the price is tracked "
+             "and every pool is modeled as a chain of adjacent ranges rather than by its current range only.",
+    )
 
     # Process the arguments
     args = parser.parse_args()
@@ -1,6 +1,7 @@
+import json
 import math
 from dataclasses import dataclass
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 
 import pandas as pd
 from dotenv import load_dotenv
@@ -10,11 +11,14 @@ from pandas import DataFrame
 load_dotenv()
 import os
 import requests
-import pathlib
 
 from web3 import Web3, AsyncWeb3
 
 from fastlane_bot.utils import safe_int
+from fastlane_bot.config.network import ConfigNetwork
+from fastlane_bot.events.log_fetcher import LogFetcher
+from fastlane_bot.events.token_store import TokenStore
+from fastlane_bot.events.keyed_dataset import KeyedDataset, STATIC_POOL_DATA_KEY, EVENT_MAPPINGS_KEY
 from fastlane_bot.events.exchanges.solidly_v2 import SolidlyV2
 from fastlane_bot.events.exchanges.solidly_v2 import EXCHANGE_INFO as SOLIDLY_EXCHANGE_INFO
 from fastlane_bot.data.abi import ERC20_ABI, UNISWAP_V2_FACTORY_ABI, UNISWAP_V3_FACTORY_ABI
@@ -82,6 +86,22 @@ BLOCK_CHUNK_SIZE_MAP = {
     "linea": 0
 }
 
+# The block range sizes are adapted and remembered per blockchain and exchange across terraformer runs
+LOG_FETCHER = LogFetcher()
+
+MAX_CONCURRENT_EXCHANGES = 4
+MAX_CONCURRENT_RPC_REQUESTS = 8
+TERRAFORMER_CHECKPOINTS_FILE = "terraformer_checkpoints.json"
+
+# The RPC requests budget shared by all the exchanges processed concurrently
+RPC_BUDGET = threading.BoundedSemaphore(MAX_CONCURRENT_RPC_REQUESTS)
+
+# Serializes the writes to the CSVs and the checkpoints
+_WRITE_LOCK = threading.Lock()
+
+# The keyed datasets of the static pool data and event mappings CSVs, per path
+_DATASETS = {}
+
 ALCHEMY_KEY_DICT = {
     "ethereum": "WEB3_ALCHEMY_PROJECT_ID",
     "polygon": "WEB3_ALCHEMY_POLYGON",
@@ -258,11 +278,14 @@ skip_token_list = ["0xaD67F7a72BA2ca971390B2a1dD907303bD577a4F".lower()]
 @dataclass
 class TokenManager:
     token_dict: Dict
+    token_store: TokenStore = None
+    multicall_address: str = None
 
 
 def get_all_token_details(web3: Web3, network: str, write_path: str) -> TokenManager:
     """
     This function collects the number of decimals and symbol of a token, and formats it for use in a dataframe.
+    The tokens CSV is only read the first time it is loaded in the process, and the token manager is updated in place.
     :param web3: the Web3 reference
     :param network: the network name
 
@@ -270,41 +293,32 @@ def get_all_token_details(web3: Web3, network: str, write_path: str) -> TokenMan
     """
 
     token_path = os.path.join(write_path, "tokens.csv")
-    token_file_exists = os.path.exists(token_path)
-    if token_file_exists:
-        token_df = pd.read_csv(token_path, index_col=False)
-
-        token_dict = {}
-        for idx, row in token_df.iterrows():
-            address, decimals, symbol = row
-            token_dict[address] = {"address": address, "decimals": decimals, "symbol": symbol}
-
-        return TokenManager(token_dict)
+    token_store = TokenStore.load(token_path)
+    multicall_address = get_multicall_address(network)
+    if len(token_store) > 0:
+        return TokenManager(token_dict=token_store.tokens, token_store=token_store, multicall_address=multicall_address)
 
     url = f"https://tokens.coingecko.com/{coingecko_network_map[network]}/all.json"
     response = requests.get(url).json()["tokens"]
-    token_dict = {
-        "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE": {"address": "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE",
-                                                       "decimals": 18, "symbol": "ETH"}
-    } if network in ["ethereum", "coinbase_base", "arbitrum_one", "optimism"] else {}
+    if network in ["ethereum", "coinbase_base", "arbitrum_one", "optimism"]:
+        token_store.add(address="0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE", symbol="ETH", decimals=18)
     for token in response:
         address = web3.to_checksum_address(token.get("address"))
         symbol = token.get("symbol")
         decimals = token.get("decimals")
-        try:
-            # try to write to csv
-            pd.DataFrame(
-                {"token": [address], "symbol": [symbol], "decimals": [decimals]}
-            ).to_csv("token_details.csv")
-            token_dict[address] = {
-                "address": address,
-                "decimals": decimals,
-                "symbol": symbol,
-            }
-        except Exception as e:
-            print(f"Failed to get token details for token: {address} with error: {e}")
-            continue
-    return TokenManager(token_dict=token_dict)
+        token_store.add(address=address, symbol=symbol, decimals=decimals)
+    return TokenManager(token_dict=token_store.tokens, token_store=token_store, multicall_address=multicall_address)
+
+
+def get_multicall_address(network: str) -> Optional[str]:
+    """
+    This function returns the address of the multicall contract of the network (None if there is none).
+    :param network: the network name
+    """
+    try:
+        return ConfigNetwork.new(network).MULTICALL_CONTRACT_ADDRESS or None
+    except ValueError:
+        return None
 
 
 def get_token_details_from_contract(
@@ -365,12 +379,43 @@ def get_token_details(
         symbol = token_manager.token_dict.get(tkn).get("symbol")
         decimal = token_manager.token_dict.get(tkn).get("decimals")
     else:
-        symbol, decimal = get_token_details_from_contract(token=tkn, web3=web3)
+        with RPC_BUDGET:
+            symbol, decimal = get_token_details_from_contract(token=tkn, web3=web3)
         if type(decimal) == int and type(symbol) == str:
-            token_manager.token_dict[tkn] = {"address": tkn, "decimals": decimal, "symbol": symbol}
+            if token_manager.token_store is not None:
+                token_manager.token_store.add(address=tkn, symbol=symbol, decimals=decimal)
+            else:
+                token_manager.token_dict[tkn] = {"address": tkn, "decimals": decimal, "symbol": symbol}
     return symbol, decimal
 
 
+def prefetch_token_details(pool_data: list, token_manager: TokenManager, web3: Web3):
+    """
+    This function fetches the details of the unknown tokens of pool creation events with batched multicalls, so that
+    processing the pools does not require one contract call per token.
+    :param pool_data: the pool creation events
+    :param token_manager: the token information dict
+    :param web3: the Web3 object
+    """
+    if token_manager.token_store is None or not token_manager.multicall_address:
+        return
+    tokens = [
+        web3.to_checksum_address(pool["args"][key])
+        for pool in pool_data
+        for key in ["token0", "token1", "token"]
+        if key in pool["args"]
+    ]
+    tokens = [tkn for tkn in tokens if not skip_tokens(addr=tkn)]
+    with RPC_BUDGET:
+        details = token_manager.token_store.add_missing(web3, tokens, token_manager.multicall_address)
+    for tkn, (symbol, decimals) in details.items():
+        if decimals is None:
+            print(f"Cannot get token details for token: {tkn}")
+            skip_token_list.append(tkn.lower())
+        elif symbol is None:
+            token_manager.token_store.add(address=tkn, symbol="SYMBOL_FAILED", decimals=decimals)
+
+
 def fix_missing_symbols(symbol: str, addr: str) -> str:
     """
     This function fixes specific tokens that have an issue getting their Symbol from the contract.
@@ -788,32 +833,25 @@ def organize_pool_details_solidly_v2(
     return pool
 
 
-def get_events(contract: any, blockchain: str, exchange: str, start_block: int, end_block: int) -> list:
-    chunk_size = BLOCK_CHUNK_SIZE_MAP[blockchain]
-    get_logs = contract.events[EXCHANGE_POOL_CREATION_EVENT_NAMES[exchange]].get_logs
-    if chunk_size > 0:
-        return get_events_iterative(get_logs, start_block, end_block, chunk_size)
-    else:
-        return get_events_recursive(get_logs, start_block, end_block)
-
-
-def get_events_iterative(get_logs: any, start_block: int, end_block: int, chunk_size: int) -> list:
-    block_numbers = list(range(start_block, end_block + 1, chunk_size)) + [end_block + 1]
-    event_lists = [get_logs(fromBlock=block_numbers[n-1], toBlock=block_numbers[n]-1) for n in range(1, len(block_numbers))]
-    return [event for event_list in event_lists for event in event_list]
-
+def get_events(contract: any, blockchain: str, exchange: str, event_name: str, start_block: int, end_block: int) -> list:
+    """
+    This function fetches the pool creation events of an exchange, in block ranges whose size is adapted to the responses
+    of the provider. The range size which works for an exchange on a blockchain is remembered for its subsequent runs.
+    :param contract: the factory contract
+    :param blockchain: the blockchain name
+    :param exchange: the name of the exchange
+    :param event_name: the name of the pool creation event
+    :param start_block: the block number from which to start
+    :param end_block: the block number at which to end
+    returns: the list of events
+    """
+    def get_logs(**kwargs) -> list:
+        with RPC_BUDGET:
+            return contract.events[event_name].get_logs(**kwargs)
 
-def get_events_recursive(get_logs: any, start_block: int, end_block: int) -> list:
-    if start_block <= end_block:
-        try:
-            return get_logs(fromBlock=start_block, toBlock=end_block)
-        except Exception as e:
-            assert "eth_getLogs" in str(e), str(e)
-            mid_block = (start_block + end_block) // 2
-            event_list_1 = get_events_recursive(get_logs, start_block, mid_block)
-            event_list_2 = get_events_recursive(get_logs, mid_block + 1, end_block)
-            return event_list_1 + event_list_2
-    return []
+    return LOG_FETCHER.get_logs(
+        get_logs, start_block, end_block, key=(blockchain, exchange), initial_range_size=BLOCK_CHUNK_SIZE_MAP[blockchain]
+    )
 
 
 def get_uni_v3_pools(
@@ -836,7 +874,8 @@ def get_uni_v3_pools(
     :param blockchain: the blockchain name
     returns: a tuple containing a Dataframe of pool creation and a Dataframe of Uni V3 pool mappings
     """
-    pool_data = get_events(factory_contract, blockchain, UNISWAP_V3_NAME, start_block, end_block)
+    pool_data = get_events(factory_contract, blockchain, exchange, EXCHANGE_POOL_CREATION_EVENT_NAMES[UNISWAP_V3_NAME], start_block, end_block)
+    prefetch_token_details(pool_data=pool_data, token_manager=token_manager, web3=web3)
 
     with parallel_backend(n_jobs=-1, backend="threading"):
         pools = Parallel(n_jobs=-1)(
@@ -877,7 +916,8 @@ def get_uni_v2_pools(
     :param blockchain: the blockchain name
     returns: a tuple containing a Dataframe of pool creation and a Dataframe of Uni V3 pool mappings
     """
-    pool_data = get_events(factory_contract, blockchain, UNISWAP_V2_NAME, start_block, end_block)
+    pool_data = get_events(factory_contract, blockchain, exchange, EXCHANGE_POOL_CREATION_EVENT_NAMES[UNISWAP_V2_NAME], start_block, end_block)
+    prefetch_token_details(pool_data=pool_data, token_manager=token_manager, web3=web3)
 
     with parallel_backend(n_jobs=-1, backend="threading"):
         pools = Parallel(n_jobs=-1)(
@@ -921,7 +961,8 @@ def get_solidly_v2_pools(
     :param blockchain: the blockchain name
     returns: a tuple containing a Dataframe of pool creation and a Dataframe of Uni V3 pool mappings
     """
-    pool_data = get_events(factory_contract, blockchain, exchange, start_block, end_block)
+    pool_data = get_events(factory_contract, blockchain, exchange, EXCHANGE_POOL_CREATION_EVENT_NAMES[exchange], start_block, end_block)
+    prefetch_token_details(pool_data=pool_data, token_manager=token_manager, web3=web3)
     solidly_exchange = SolidlyV2(exchange_name=exchange, factory_contract=async_factory_contract)
 
     with parallel_backend(n_jobs=-1, backend="threading"):
@@ -1044,10 +1085,14 @@ def get_last_block_updated(df: pd.DataFrame, exchange: str) -> int:
 
 def save_token_data(token_dict: TokenManager, write_path: str):
     """
-    Saves token data to a CSV
+    Saves token data to a CSV. With a token store, only the tokens added since the last save are appended.
 
     """
 
+    if token_dict.token_store is not None:
+        token_dict.token_store.flush()
+        return
+
     token_path = os.path.join(write_path, "tokens.csv")
     token_list = []
 
@@ -1059,162 +1104,300 @@ def save_token_data(token_dict: TokenManager, write_path: str):
     token_df.to_csv(token_path)
 
 
-def terraform_blockchain(network_name: str):
+def read_checkpoints(write_path: str) -> Dict[str, int]:
+    """
+    This function reads the last block processed for each exchange
+    :param write_path: the path of the blockchain data
+
+    returns: a dict of the last block processed for each exchange
+    """
+    checkpoint_path = os.path.join(write_path, TERRAFORMER_CHECKPOINTS_FILE)
+    if not os.path.exists(checkpoint_path):
+        return {}
+    with open(checkpoint_path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(write_path: str, exchange: str, block_number: int):
+    """
+    This function saves the last block processed for an exchange. The file is replaced atomically, so that an interrupted
+    run never leaves it partially written.
+    :param write_path: the path of the blockchain data
+    :param exchange: the name of the exchange
+    :param block_number: the last block processed
+    """
+    checkpoint_path = os.path.join(write_path, TERRAFORMER_CHECKPOINTS_FILE)
+    with _WRITE_LOCK:
+        checkpoints = read_checkpoints(write_path)
+        checkpoints[exchange] = block_number
+        with open(checkpoint_path + ".tmp", "w") as f:
+            json.dump(checkpoints, f, indent=4, sort_keys=True)
+        os.replace(checkpoint_path + ".tmp", checkpoint_path)
+
+
+def get_dataset(path: str) -> KeyedDataset:
+    """
+    This function returns the keyed dataset of a static pool data or event mappings CSV, which is kept across terraformer
+    runs so that the keys of the pools are only read once
+    :param path: the path of the CSV
+
+    returns: the keyed dataset
+    """
+    path = os.path.normpath(path)
+    if path not in _DATASETS:
+        key = STATIC_POOL_DATA_KEY if os.path.basename(path) == "static_pool_data.csv" else EVENT_MAPPINGS_KEY
+        _DATASETS[path] = KeyedDataset(csv_path=path, key=key)
+    return _DATASETS[path]
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    """
+    This function reads a static pool data or event mappings CSV from its keyed dataset, which is (re)built from the CSV
+    first if it is not in sync with it (e.g., if no pools were upserted during this run)
+    :param path: the path of the CSV
+
+    returns: the rows of the CSV
+    """
+    dataset = get_dataset(path)
+    dataset.sync()
+    return dataset.read()
+
+
+def save_exchange_data(write_path: str, exchange: str, block_number: int, pool_df: pd.DataFrame, mapping_file: str = None, mapping_df: pd.DataFrame = None):
+    """
+    This function upserts the pools found for an exchange into the CSVs (i.e., only the pools which are not in the CSVs
+    yet are appended), then saves the checkpoint of the exchange
+    :param write_path: the path of the blockchain data
+    :param exchange: the name of the exchange
+    :param block_number: the last block processed (None if the exchange is not fetched by block)
+    :param pool_df: the dataframe of pools
+    :param mapping_file: the name of the event mappings CSV of the exchange (if any)
+    :param mapping_df: the dataframe of event mappings
+    """
+    with _WRITE_LOCK:
+        get_dataset(os.path.join(write_path, "static_pool_data.csv")).upsert(pool_df)
+        if mapping_file is not None:
+            get_dataset(os.path.join(write_path, mapping_file)).upsert(mapping_df)
+    if block_number is not None:
+        save_checkpoint(write_path, exchange, block_number)
+
+
+def terraform_exchange(
+        row: pd.Series,
+        token_manager: TokenManager,
+        from_block: int,
+        to_block: int,
+        web3: Web3,
+        async_web3: AsyncWeb3,
+        network_name: str,
+) -> Tuple[DataFrame, str, DataFrame] or None:
+    """
+    This function collects the pools of a single exchange
+    :param row: the row of the exchange in multichain_addresses.csv
+    :param token_manager: the dict containing token information
+    :param from_block: the block number from which to start
+    :param to_block: the block number at which to end
+    :param web3: the Web3 object
+    :param async_web3: the Async Web3 object
+    :param network_name: the name of the blockchain
+
+    returns: a tuple containing a Dataframe of pools, the name of the event mappings CSV and a Dataframe of event mappings, or None if the exchange is skipped
+    """
+    exchange_name = row["exchange_name"]
+    fork = row["fork"]
+    factory_address = row["factory_address"]
+    fee = row["fee"]
+
+    if fork in "uniswap_v2":
+        if fee == "TBD":
+            return None
+        if fork in SOLIDLY_FORKS:
+            return None
+
+        factory_abi = UNISWAP_V2_FACTORY_ABI
+        add_to_exchange_ids(exchange=exchange_name, fork=fork)
+
+        factory_contract = web3.eth.contract(
+            address=factory_address, abi=factory_abi
+        )
+        u_df, m_df = get_uni_v2_pools(
+            token_manager=token_manager,
+            exchange=exchange_name,
+            factory_contract=factory_contract,
+            default_fee=fee,
+            start_block=from_block,
+            end_block=to_block,
+            web3=web3,
+            blockchain=network_name
+        )
+        return u_df, "uniswap_v2_event_mappings.csv", m_df.reset_index(drop=True)
+    elif fork in "uniswap_v3":
+        if fee == "TBD":
+            return None
+        add_to_exchange_ids(exchange=exchange_name, fork=fork)
+        factory_abi = UNISWAP_V3_FACTORY_ABI
+        factory_contract = web3.eth.contract(
+            address=factory_address, abi=factory_abi
+        )
+        u_df, m_df = get_uni_v3_pools(
+            token_manager=token_manager,
+            exchange=exchange_name,
+            factory_contract=factory_contract,
+            start_block=from_block,
+            end_block=to_block,
+            web3=web3,
+            blockchain=network_name
+        )
+        return u_df, "uniswap_v3_event_mappings.csv", m_df.reset_index(drop=True)
+    elif "solidly" in fork:
+        add_to_exchange_ids(exchange=exchange_name, fork=fork)
+
+        factory_abi = SOLIDLY_EXCHANGE_INFO[exchange_name]["factory_abi"]
+        factory_contract = web3.eth.contract(
+            address=factory_address, abi=factory_abi
+        )
+
+        async_factory_contract = async_web3.eth.contract(
+            address=factory_address, abi=factory_abi
+        )
+        u_df, m_df = get_solidly_v2_pools(
+            token_manager=token_manager,
+            exchange=exchange_name,
+            factory_contract=factory_contract,
+            async_factory_contract=async_factory_contract,
+            start_block=from_block,
+            end_block=to_block,
+            web3=web3,
+            async_web3=async_web3,
+            blockchain=network_name
+        )
+        return u_df, "solidly_v2_event_mappings.csv", m_df.reset_index(drop=True)
+    elif "balancer" in fork:
+        subgraph_url = BALANCER_SUBGRAPH_CHAIN_URL[network_name]
+        return get_balancer_pools(subgraph_url=subgraph_url, web3=web3), None, None
+    else:
+        print(f"Fork {fork} for exchange {exchange_name} not in supported forks.")
+        return None
+
+
+def terraform_exchange_and_save(
+        row: pd.Series,
+        token_manager: TokenManager,
+        from_block: int,
+        to_block: int,
+        web3: Web3,
+        async_web3: AsyncWeb3,
+        network_name: str,
+        write_path: str,
+) -> bool:
+    """
+    This function collects the pools of a single exchange and saves them along with the checkpoint of the exchange.
+    A failure is reported and leaves the checkpoint unchanged, so that the next run resumes from it.
+
+    returns: True if the exchange was processed successfully
+    """
+    exchange_name = row["exchange_name"]
+    try:
+        result = terraform_exchange(row, token_manager, from_block, to_block, web3, async_web3, network_name)
+    except Exception as e:
+        print(f"Terraforming {network_name} / {exchange_name} failed:\n{e}")
+        return False
+    if result is not None:
+        u_df, mapping_file, m_df = result
+        block_number = None if mapping_file is None else to_block
+        save_exchange_data(write_path, exchange_name, block_number, u_df, mapping_file, m_df)
+    return True
+
+
+def terraform_blockchain(network_name: str, web3: Web3 = None, start_block: int = None, n_jobs: int = MAX_CONCURRENT_EXCHANGES) -> Tuple[DataFrame, DataFrame, DataFrame, DataFrame]:
     """
     This function collects all pool creation events for Uniswap V2/V3 and Solidly pools for a given network.
     The factory addresses for each exchange for which to extract pools must be defined in fastlane_bot/data/multichain_addresses.csv.
 
+    The exchanges are processed concurrently, and share a budget of concurrent RPC requests. The new pools of each exchange
+    are upserted into the CSVs and their keyed Parquet datasets (see ``KeyedDataset``) as soon as the exchange is done,
+    along with a checkpoint of the last block processed for the exchange; the next run of an exchange (including after an interrupted or failed run) resumes from its checkpoint.
+
     :param network_name: the name of the blockchain from which to get data
+    :param web3: the Web3 object (if None, an Alchemy connection is created)
+    :param start_block: the block number from which to start at the earliest the exchanges without a checkpoint (if None, their start blocks of multichain_addresses.csv are used); the exchanges with a checkpoint always resume right after it
+    :param n_jobs: the number of exchanges processed concurrently
+
+    returns: a tuple containing the Dataframes of static pool data, and of the Uniswap V2, Uniswap V3 and Solidly V2 event mappings
     """
 
-    url = ALCHEMY_RPC_LIST[network_name] + os.environ.get(ALCHEMY_KEY_DICT[network_name])
-    web3 = Web3(Web3.HTTPProvider(url))
+    if web3 is None:
+        url = ALCHEMY_RPC_LIST[network_name] + os.environ.get(ALCHEMY_KEY_DICT[network_name])
+        web3 = Web3(Web3.HTTPProvider(url))
+    else:
+        url = web3.provider.endpoint_uri
     async_web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
 
     PROJECT_PATH = os.path.normpath(f"{os.getcwd()}")
     write_path = os.path.normpath(f"{PROJECT_PATH}/fastlane_bot/data/blockchain_data/{network_name}")
-    path_exists = os.path.exists(write_path)
-    data_path = os.path.normpath(write_path + "/static_pool_data.csv")
-    data_exists = os.path.exists(data_path)
     token_manager = get_all_token_details(web3, network=network_name, write_path=write_path)
 
-    if not path_exists:
+    if not os.path.exists(write_path):
         os.makedirs(write_path)
-    if not data_exists:
-        exchange_df = pd.DataFrame(columns=dataframe_key)
-        univ2_mapdf = pd.DataFrame(columns=["exchange", "address"])
-        univ3_mapdf = pd.DataFrame(columns=["exchange", "address"])
-        solidly_v2_mapdf = pd.DataFrame(columns=["exchange", "address"])
-    else:
-        exchange_df = pd.read_csv(
-            write_path + "/static_pool_data.csv",
-            low_memory=False,
-            dtype=str,
-            index_col=False,
-        )
-        univ2_mapdf = pd.read_csv(
-            write_path + "/uniswap_v2_event_mappings.csv", index_col=False
-        )
-        univ3_mapdf = pd.read_csv(
-            write_path + "/uniswap_v3_event_mappings.csv", index_col=False
-        )
-        solidly_v2_mapdf = pd.read_csv(
-            write_path + "/solidly_v2_event_mappings.csv", index_col=False
-        )
+    for mapping_file in ["uniswap_v2_event_mappings.csv", "uniswap_v3_event_mappings.csv", "solidly_v2_event_mappings.csv"]:
+        if not os.path.exists(os.path.join(write_path, mapping_file)):
+            pd.DataFrame(columns=["exchange", "address"]).to_csv(os.path.join(write_path, mapping_file), index=False)
+    if not os.path.exists(os.path.join(write_path, "static_pool_data.csv")):
+        pd.DataFrame(columns=dataframe_key).to_csv(os.path.join(write_path, "static_pool_data.csv"), index=False)
 
     save_token_data(token_dict=token_manager, write_path=write_path)
 
     to_block = web3.eth.block_number
+    checkpoints = read_checkpoints(write_path)
 
-    for row in get_multichain_addresses(network_name=network_name).iterrows():
-        exchange_name = row[1]["exchange_name"]
-        chain = row[1]["chain"]
-        fork = row[1]["fork"]
-        factory_address = row[1]["factory_address"]
-        fee = row[1]["fee"]
+    jobs = []
+    for _, row in get_multichain_addresses(network_name=network_name).iterrows():
+        exchange_name = row["exchange_name"]
+        chain = row["chain"]
+        factory_address = row["factory_address"]
 
-        if row[1]["active"] == "FALSE":
+        if row["active"] == "FALSE":
             continue
 
-        from_block = int(row[1]["start_block"]) if not math.isnan(row[1]["start_block"]) else 0
+        # an exchange with a checkpoint resumes right after it, so that no block is skipped (start_block only applies
+        # to the exchanges which were never terraformed)
+        from_block = int(row["start_block"]) if not math.isnan(row["start_block"]) else 0
+        if exchange_name in checkpoints:
+            from_block = max(from_block, checkpoints[exchange_name] + 1)
+        elif start_block is not None:
+            from_block = max(from_block, start_block)
         if factory_address is None or type(factory_address) != str or factory_address == "TBD":
             print(f"No factory contract address for exchange {exchange_name} on {chain}")
             continue
-        print(f"*** Terraforming {chain} / {exchange_name} from block {from_block:,} to block {to_block:,} ***")
-
-        if fork in "uniswap_v2":
-            if fee == "TBD":
-                continue
-            if fork in SOLIDLY_FORKS:
-                continue
-
-            factory_abi = UNISWAP_V2_FACTORY_ABI
-            add_to_exchange_ids(exchange=exchange_name, fork=fork)
-
-            factory_contract = web3.eth.contract(
-                address=factory_address, abi=factory_abi
-            )
-            u_df, m_df = get_uni_v2_pools(
-                token_manager=token_manager,
-                exchange=exchange_name,
-                factory_contract=factory_contract,
-                default_fee=fee,
-                start_block=from_block,
-                end_block=to_block,
-                web3=web3,
-                blockchain=network_name
-            )
-            m_df = m_df.reset_index(drop=True)
-            univ2_mapdf = pd.concat([univ2_mapdf, m_df], ignore_index=True)
-        elif fork in "uniswap_v3":
-            if fee == "TBD":
-                continue
-            add_to_exchange_ids(exchange=exchange_name, fork=fork)
-            factory_abi = UNISWAP_V3_FACTORY_ABI
-            factory_contract = web3.eth.contract(
-                address=factory_address, abi=factory_abi
-            )
-            u_df, m_df = get_uni_v3_pools(
-                token_manager=token_manager,
-                exchange=exchange_name,
-                factory_contract=factory_contract,
-                start_block=from_block,
-                end_block=to_block,
-                web3=web3,
-                blockchain=network_name
-            )
-            m_df = m_df.reset_index(drop=True)
-            univ3_mapdf = pd.concat([univ3_mapdf, m_df], ignore_index=True)
-        elif "solidly" in fork:
-            add_to_exchange_ids(exchange=exchange_name, fork=fork)
-
-            factory_abi = SOLIDLY_EXCHANGE_INFO[exchange_name]["factory_abi"]
-            factory_contract = web3.eth.contract(
-                address=factory_address, abi=factory_abi
-            )
-
-            async_factory_contract = async_web3.eth.contract(
-                address=factory_address, abi=factory_abi
-            )
-            u_df, m_df = get_solidly_v2_pools(
-                token_manager=token_manager,
-                exchange=exchange_name,
-                factory_contract=factory_contract,
-                async_factory_contract=async_factory_contract,
-                start_block=from_block,
-                end_block=to_block,
-                web3=web3,
-                async_web3=async_web3,
-                blockchain=network_name
-            )
-            m_df = m_df.reset_index(drop=True)
-            solidly_v2_mapdf = pd.concat([solidly_v2_mapdf, m_df], ignore_index=True)
-        elif "balancer" in fork:
-            try:
-                subgraph_url = BALANCER_SUBGRAPH_CHAIN_URL[network_name]
-                u_df = get_balancer_pools(subgraph_url=subgraph_url, web3=web3)
-            except Exception as e:
-                print(f"Fetching balancer pools for chain {network_name} failed:\n{e}")
-                continue
-        else:
-            print(f"Fork {fork} for exchange {exchange_name} not in supported forks.")
+        if from_block > to_block:
             continue
-        exchange_df = pd.concat([exchange_df, u_df])
+        print(f"*** Terraforming {chain} / {exchange_name} from block {from_block:,} to block {to_block:,} ***")
+        jobs.append((row, from_block))
+
+    results = Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(terraform_exchange_and_save)(
+            row=row,
+            token_manager=token_manager,
+            from_block=from_block,
+            to_block=to_block,
+            web3=web3,
+            async_web3=async_web3,
+            network_name=network_name,
+            write_path=write_path,
+        )
+        for row, from_block in jobs
+    )
+    failed_exchanges = [row["exchange_name"] for (row, _), success in zip(jobs, results) if not success]
+    if failed_exchanges:
+        print(f"Terraforming {network_name} failed for {failed_exchanges}, these exchanges will resume from their last checkpoint")
 
     save_token_data(token_dict=token_manager, write_path=write_path)
 
-    exchange_df.to_csv((write_path + "/static_pool_data.csv"), index=False)
-    univ2_mapdf.to_csv((write_path + "/uniswap_v2_event_mappings.csv"), index=False)
-    univ3_mapdf.to_csv((write_path + "/uniswap_v3_event_mappings.csv"), index=False)
-    solidly_v2_mapdf.to_csv((write_path + "/solidly_v2_event_mappings.csv"), index=False)
-
-    for path in pathlib.Path(write_path).glob("**/*.csv"):
-        file_desc = open(f"{path}", "r")
-        lines = file_desc.readlines()
-        file_desc.close()
-        file_desc = open(f"{path}", "w")
-        file_desc.writelines(list(dict.fromkeys(lines)))
-        file_desc.close()
+    exchange_df = read_dataset(os.path.join(write_path, "static_pool_data.csv"))
+    univ2_mapdf = read_dataset(os.path.join(write_path, "uniswap_v2_event_mappings.csv"))
+    univ3_mapdf = read_dataset(os.path.join(write_path, "uniswap_v3_event_mappings.csv"))
+    solidly_v2_mapdf = read_dataset(os.path.join(write_path, "solidly_v2_event_mappings.csv"))
+    return exchange_df, univ2_mapdf, univ3_mapdf, solidly_v2_mapdf
 
 
 #terraform_blockchain(network_name=ETHEREUM)